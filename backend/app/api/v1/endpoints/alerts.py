@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.core.alerts.engine import OPERATORS
+from app.core.alerts.metrics import metric_descriptions
+from app.dependencies import get_alert_service
+from app.schemas.alerts import (
+    AlertMetricsResponse,
+    AlertRuleCreateRequest,
+    AlertRuleResponse,
+    AlertRulesResponse,
+)
+from app.services.alert_service import AlertService
+
+router = APIRouter(prefix="/alerts", tags=["Alerts"])
+
+# SSE 無事件時的心跳間隔，避免代理伺服器切斷閒置連線
+HEARTBEAT_SECONDS = 15.0
+
+
+@router.get("/metrics", response_model=AlertMetricsResponse)
+async def get_alert_metrics():
+    """可用的警示指標與比較運算子"""
+    return AlertMetricsResponse(**metric_descriptions(), operators=OPERATORS)
+
+
+@router.get("/rules", response_model=AlertRulesResponse)
+async def list_alert_rules(service: AlertService = Depends(get_alert_service)):
+    """取得所有警示規則"""
+    rules = await service.list_rules()
+    return AlertRulesResponse(rules=[AlertRuleResponse(**r) for r in rules])
+
+
+@router.post("/rules", response_model=AlertRuleResponse)
+async def create_alert_rule(
+    request: AlertRuleCreateRequest,
+    service: AlertService = Depends(get_alert_service),
+):
+    """新增警示規則（立即加入評估索引）"""
+    try:
+        rule = await service.create_rule(**request.model_dump())
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"detail": str(e)})
+    return AlertRuleResponse(**rule)
+
+
+@router.delete("/rules/{rule_id}")
+async def delete_alert_rule(rule_id: int, service: AlertService = Depends(get_alert_service)):
+    """刪除警示規則"""
+    if not await service.delete_rule(rule_id):
+        return JSONResponse(status_code=404, content={"detail": f"Alert rule {rule_id} not found"})
+    return {"status": "ok", "deleted": rule_id}
+
+
+@router.get("/stream")
+async def stream_alerts(request: Request, service: AlertService = Depends(get_alert_service)):
+    """觸發事件串流（Server-Sent Events）：每個事件一筆 `event: alert`"""
+    queue = service.subscribe()
+
+    async def _events():
+        try:
+            yield ": connected\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: alert\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        finally:
+            service.unsubscribe(queue)
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
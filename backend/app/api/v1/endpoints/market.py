@@ -7,19 +7,13 @@ import pandas as pd
 from fastapi import APIRouter, Depends, Query
 from fastapi.responses import JSONResponse
 
+from app.core.timeframes import TIMEFRAME_MS, TIMEFRAME_PATTERN
 from app.dependencies import get_aggregator, get_market_service
 
 logger = logging.getLogger(__name__)
 from app.schemas.market import CoinSearchResult, MarketCoinResponse, MarketOverviewResponse, OhlcvEntry, PriceResponse
 from app.services.market_service import MarketService
 
-TIMEFRAME_MS = {
-    "15m": 900_000, "30m": 1_800_000,
-    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "12h": 43_200_000,
-    "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000,
-}
-TIMEFRAME_PATTERN = "^(15m|30m|1h|2h|4h|12h|1d|3d|1w)$"
-
 router = APIRouter(prefix="/market", tags=["Market"])
 
 
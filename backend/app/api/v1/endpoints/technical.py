@@ -1,18 +1,33 @@
 from __future__ import annotations
 
+import json
 import logging
+from typing import List
 
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
 
-from app.api.v1.endpoints.market import TIMEFRAME_PATTERN
-from app.dependencies import get_technical_service
+from app.core.backtest.engine import BacktestConfig
+from app.core.compute import compute
+from app.core.indicators.screen import SCREEN_FIELDS, parse_conditions
+from app.core.indicators.sweep import parse_grid_values
+from app.core.timeframes import TIMEFRAME_MS, TIMEFRAME_PATTERN
+from app.dependencies import get_backtest_service, get_screener_service, get_technical_service
 from app.schemas.technical import (
+    BacktestResponse,
+    BatchAnalysisRequest,
+    BatchAnalysisResponse,
     IndicatorSeriesResponse,
+    MTFAnalysisResponse,
+    ScoreSeriesResponse,
     SingleIndicatorResponse,
     SupportResistanceResponse,
+    SweepResponse,
     TechnicalAnalysisResponse,
 )
+from app.services.backtest_service import BacktestService
+from app.services.screener_service import ScreenerService
 from app.services.technical_service import TechnicalService
 
 logger = logging.getLogger(__name__)
@@ -20,6 +35,67 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/technical", tags=["Technical Analysis"])
 
 
+async def _render(model: type[BaseModel], result: dict) -> Response:
+    """大型時間序列回應：在 thread pool 驗證並序列化成 JSON，不佔用 event loop"""
+    body = await compute.thread(lambda: model(**result).model_dump_json())
+    return Response(content=body, media_type="application/json")
+
+
+@router.get("/screener")
+async def screener(
+    where: List[str] = Query(
+        default=[], description="篩選條件，例如 rsi<30、ema_cross=bullish（AND）"
+    ),
+    timeframe: str = Query(default="4h", pattern=TIMEFRAME_PATTERN),
+    top: int = Query(default=100, ge=1, le=250, description="市值前 N 大"),
+    sort: str = Query(default="score", description="排序欄位"),
+    order: str = Query(default="desc", pattern="^(asc|desc)$"),
+    limit: int = Query(default=50, ge=1, le=250),
+    service: ScreenerService = Depends(get_screener_service),
+):
+    """市場篩選器（NDJSON 串流）
+
+    每行一個事件：start → match（每批算完立即送出）/ progress → result（排序後結果）。
+    可用欄位：price, change, rsi, ema_fast, ema_slow, ema_trend, ema_cross,
+    macd_hist, macd_cross, bb_pct_b, volume_ratio, score
+    """
+    try:
+        conditions = parse_conditions(where)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"detail": str(e)})
+    if sort not in SCREEN_FIELDS:
+        return JSONResponse(status_code=422, content={"detail": f"Unknown sort field: {sort}"})
+
+    async def _events():
+        try:
+            async for event in service.stream(
+                conditions, timeframe=timeframe, top=top,
+                sort=sort, descending=order == "desc", limit=limit,
+            ):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.warning(f"Screener failed: {e}")
+            yield json.dumps({"type": "error", "detail": "Screener failed"}) + "\n"
+
+    return StreamingResponse(_events(), media_type="application/x-ndjson")
+
+
+@router.post("/analysis:batch", response_model=BatchAnalysisResponse)
+async def get_batch_analysis(
+    request: BatchAnalysisRequest,
+    service: TechnicalService = Depends(get_technical_service),
+):
+    """批次完整技術分析（多幣種 × 多週期，一次回應；單項失敗以 error 回報）"""
+    unknown = [tf for tf in request.timeframes if tf not in TIMEFRAME_MS]
+    if unknown:
+        return JSONResponse(
+            status_code=422,
+            content={"detail": f"Invalid timeframes: {unknown}. Available: {list(TIMEFRAME_MS)}"},
+        )
+    results = await service.get_batch_analysis(request.symbols, request.timeframes)
+    return await _render(BatchAnalysisResponse, {"results": results})
+
+
 @router.get("/{symbol}/analysis", response_model=TechnicalAnalysisResponse)
 async def get_full_analysis(
     symbol: str,
@@ -35,6 +111,33 @@ async def get_full_analysis(
     return TechnicalAnalysisResponse(**result)
 
 
+@router.get("/{symbol}/mtf", response_model=MTFAnalysisResponse)
+async def get_mtf_analysis(
+    symbol: str,
+    timeframes: str = Query(default="1h,4h,1d", description="逗號分隔的週期，例如 1h,4h,1d"),
+    service: TechnicalService = Depends(get_technical_service),
+):
+    """多週期共振分析（只抓最細週期一次，其餘本地重採樣；衍生品共用）"""
+    tfs = [tf.strip() for tf in timeframes.split(",") if tf.strip()]
+    unknown = [tf for tf in tfs if tf not in TIMEFRAME_MS]
+    if not tfs or unknown:
+        return JSONResponse(
+            status_code=422,
+            content={
+                "detail": f"Invalid timeframes: {unknown or timeframes}. "
+                f"Available: {list(TIMEFRAME_MS)}"
+            },
+        )
+    try:
+        result = await service.get_mtf_analysis(symbol, tfs)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"detail": str(e)})
+    except Exception as e:
+        logger.warning(f"MTF analysis failed for {symbol}: {e}")
+        return JSONResponse(status_code=422, content={"detail": f"No data available for {symbol}"})
+    return MTFAnalysisResponse(**result)
+
+
 @router.get("/{symbol}/series/{indicator_name}", response_model=IndicatorSeriesResponse)
 async def get_indicator_series(
     symbol: str,
@@ -44,18 +147,85 @@ async def get_indicator_series(
 ):
     """取得指標完整時間序列（K 線圖覆蓋用）"""
     result = await service.get_indicator_series(symbol, indicator_name, timeframe)
-    return IndicatorSeriesResponse(**result)
+    return await _render(IndicatorSeriesResponse, result)
+
+
+@router.get("/{symbol}/score-series", response_model=ScoreSeriesResponse)
+async def get_score_series(
+    symbol: str,
+    timeframe: str = Query(default="1d", pattern=TIMEFRAME_PATTERN),
+    limit: int = Query(default=200, ge=50, le=1000, description="K 線根數"),
+    service: TechnicalService = Depends(get_technical_service),
+):
+    """取得綜合評分時間序列（各技術指標連續分數 + 分組加權評分）"""
+    try:
+        result = await service.get_score_series(symbol, timeframe, limit)
+    except Exception as e:
+        logger.warning(f"Score series failed for {symbol}: {e}")
+        return JSONResponse(status_code=422, content={"detail": f"No data available for {symbol}"})
+    return await _render(ScoreSeriesResponse, result)
+
+
+@router.get("/{symbol}/backtest", response_model=BacktestResponse)
+async def backtest(
+    symbol: str,
+    timeframe: str = Query(default="4h", pattern=TIMEFRAME_PATTERN),
+    days: int = Query(default=365, ge=7, le=3650, description="回測天數"),
+    entry: float = Query(default=0.2, ge=-1, le=1, description="進場門檻 (overall_score >)"),
+    exit: float = Query(default=-0.2, ge=-1, le=1, description="出場門檻 (overall_score <)"),
+    fee: float = Query(default=0.001, ge=0, lt=0.1, description="單邊手續費率"),
+    service: BacktestService = Depends(get_backtest_service),
+):
+    """綜合評分策略 walk-forward 回測（只做多，下一根執行）"""
+    try:
+        config = BacktestConfig(entry_threshold=entry, exit_threshold=exit, fee_rate=fee)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"detail": str(e)})
+    try:
+        result = await service.run(symbol, timeframe, days, config)
+    except Exception as e:
+        logger.warning(f"Backtest failed for {symbol}: {e}")
+        return JSONResponse(status_code=422, content={"detail": f"No data available for {symbol}"})
+    return await _render(BacktestResponse, result)
+
+
+@router.get("/{symbol}/sweep/{indicator_name}", response_model=SweepResponse)
+async def sweep_indicator(
+    symbol: str,
+    indicator_name: str,
+    request: Request,
+    timeframe: str = Query(default="1d", pattern=TIMEFRAME_PATTERN),
+    service: TechnicalService = Depends(get_technical_service),
+):
+    """指標參數掃描（rsi, ema, macd, bbands）
+
+    其餘 query 參數為掃描網格，例如：
+    `/technical/BTC/sweep/rsi?period=5-50`
+    `/technical/BTC/sweep/ema?fast_period=5-20&slow_period=20-60:5`
+    `/technical/BTC/sweep/macd?fast=8,12&slow=21,26&signal_period=9`
+    """
+    try:
+        grid = {
+            k: parse_grid_values(v)
+            for k, v in request.query_params.items()
+            if k != "timeframe"
+        }
+        result = await service.sweep_indicator(symbol, indicator_name, grid, timeframe)
+    except ValueError as e:
+        return JSONResponse(status_code=422, content={"detail": str(e)})
+    return await _render(SweepResponse, result)
 
 
 @router.get("/{symbol}/support-resistance", response_model=SupportResistanceResponse)
 async def get_support_resistance(
     symbol: str,
     timeframe: str = Query(default="1d", pattern=TIMEFRAME_PATTERN),
+    n: int = Query(default=5, ge=1, le=20, description="上方/下方各回傳最近幾個價格區"),
     service: TechnicalService = Depends(get_technical_service),
 ):
-    """取得支撐/壓力位（Pivot Points）"""
+    """取得支撐/壓力位（Pivot Points + 歷史擺動點價格區）"""
     try:
-        result = await service.get_support_resistance(symbol, timeframe)
+        result = await service.get_support_resistance(symbol, timeframe, n)
     except Exception as e:
         logger.warning(f"Support/resistance failed for {symbol}: {e}")
         return JSONResponse(status_code=422, content={"detail": f"No data available for {symbol}"})
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import market, onchain, sentiment, settings, technical
+from app.api.v1.endpoints import alerts, market, onchain, sentiment, settings, technical
 
 api_router = APIRouter()
 api_router.include_router(market.router)
@@ -9,3 +9,4 @@ api_router.include_router(technical.router)
 api_router.include_router(sentiment.router)
 api_router.include_router(onchain.router)
 api_router.include_router(settings.router)
+api_router.include_router(alerts.router)
@@ -1,13 +1,23 @@
 from __future__ import annotations
-import asyncio
 from typing import Optional
 
 import typer
 from rich.console import Console
 from rich.panel import Panel
+from rich.progress import Progress
 from rich.table import Table
 
-from app.dependencies import get_aggregator, get_technical_service
+from app.cli.runtime import run
+from app.core.backtest.engine import BacktestConfig
+from app.core.compute import compute
+from app.core.indicators.screen import parse_conditions
+from app.db.session import init_db
+from app.dependencies import (
+    get_aggregator,
+    get_backtest_service,
+    get_screener_service,
+    get_technical_service,
+)
 
 analyze_app = typer.Typer(no_args_is_help=True)
 console = Console()
@@ -24,6 +34,7 @@ async def _cleanup():
     for p in aggregator._providers.values():
         if hasattr(p, "close"):
             await p.close()
+    compute.shutdown()
 
 
 @analyze_app.command("run")
@@ -40,7 +51,7 @@ def run_analysis(
         finally:
             await _cleanup()
 
-    result = asyncio.run(_run())
+    result = run(_run())
 
     # 標題面板
     overall = result["overall_signal"]
@@ -85,6 +96,8 @@ def run_analysis(
         )
 
     console.print(table)
+    if result.get("missing"):
+        console.print(f"[dim]未納入評分（逾時或失敗）: {', '.join(result['missing'])}[/dim]")
 
 
 @analyze_app.command("indicator")
@@ -102,7 +115,7 @@ def single_indicator(
         finally:
             await _cleanup()
 
-    result = asyncio.run(_run())
+    result = run(_run())
     result_dict = result.to_dict()
 
     console.print(Panel(
@@ -125,3 +138,138 @@ def single_indicator(
             table.add_row(k, str(v))
 
     console.print(table)
+
+
+@analyze_app.command("backtest")
+def backtest(
+    symbol: str = typer.Argument(help="幣種代號，例如 BTC"),
+    timeframe: str = typer.Option("4h", "--timeframe", "-t", help="時間週期: 1h, 4h, 1d"),
+    days: int = typer.Option(365, "--days", "-d", help="回測天數"),
+    entry: float = typer.Option(0.2, "--entry", help="進場門檻 (overall_score >)"),
+    exit_: float = typer.Option(-0.2, "--exit", help="出場門檻 (overall_score <)"),
+    fee: float = typer.Option(0.001, "--fee", help="單邊手續費率"),
+):
+    """綜合評分策略回測（只做多，下一根執行，K 線存入本地資料庫）"""
+
+    async def _run():
+        await init_db()
+        service = get_backtest_service()
+        try:
+            return await service.run(
+                symbol, timeframe, days,
+                BacktestConfig(entry_threshold=entry, exit_threshold=exit_, fee_rate=fee),
+            )
+        finally:
+            await _cleanup()
+
+    result = run(_run())
+    m = result["metrics"]
+
+    def _pct(v: float) -> str:
+        color = "green" if v > 0 else "red" if v < 0 else "yellow"
+        return f"[{color}]{v * 100:+.2f}%[/{color}]"
+
+    console.print(Panel(
+        f"[bold]{symbol.upper()}/USDT[/bold]  週期: {timeframe}  K 棒: {int(m['bars'])}\n"
+        f"進場 > {entry:+.2f}  出場 < {exit_:+.2f}  手續費 {fee * 100:.2f}%",
+        title="策略回測",
+        border_style="cyan",
+    ))
+
+    table = Table(show_header=True)
+    table.add_column("指標", style="cyan", min_width=12)
+    table.add_column("數值", justify="right", min_width=12)
+    table.add_row("策略報酬", _pct(m["total_return"]))
+    table.add_row("買進持有", _pct(m["buy_hold_return"]))
+    table.add_row("年化報酬", _pct(m["annualized_return"]))
+    table.add_row("最大回撤", _pct(m["max_drawdown"]))
+    table.add_row("Sharpe", f"{m['sharpe']:.2f}")
+    table.add_row("交易次數", str(int(m["trades"])))
+    table.add_row("勝率", f"{m['hit_rate'] * 100:.1f}%")
+    table.add_row("持倉比例", f"{m['exposure'] * 100:.1f}%")
+    console.print(table)
+
+
+@analyze_app.command("screen")
+def screen(
+    where: list[str] = typer.Option(
+        [], "--where", "-w", help="篩選條件，可重複，例如 -w 'rsi<30' -w ema_cross=bullish"
+    ),
+    timeframe: str = typer.Option("4h", "--timeframe", "-t", help="時間週期"),
+    top: int = typer.Option(100, "--top", help="市值前 N 大"),
+    sort: str = typer.Option("score", "--sort", help="排序欄位"),
+    ascending: bool = typer.Option(False, "--asc", help="由小到大排序"),
+    limit: int = typer.Option(30, "--limit", "-n", help="顯示筆數"),
+):
+    """市場篩選器：市值前 N 大幣種中符合條件者，依指定欄位排序"""
+    try:
+        conditions = parse_conditions(where)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    async def _run():
+        service = get_screener_service()
+        result: dict = {}
+        try:
+            with Progress(console=console, transient=True) as progress:
+                task = progress.add_task("篩選中...", total=None)
+                async for event in service.stream(
+                    conditions, timeframe=timeframe, top=top,
+                    sort=sort, descending=not ascending, limit=limit,
+                ):
+                    if event["type"] == "start":
+                        progress.update(task, total=event["total"])
+                    elif event["type"] == "progress":
+                        progress.update(task, completed=event["done"])
+                    elif event["type"] == "match":
+                        progress.console.print(f"  [green]✓[/green] {event['symbol']}")
+                    elif event["type"] == "result":
+                        result = event
+            return result
+        finally:
+            await _cleanup()
+
+    try:
+        result = run(_run())
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+    cond_str = " AND ".join(where) if where else "（無條件）"
+    console.print(Panel(
+        f"條件: {cond_str}  週期: {timeframe}\n"
+        f"篩選 {result['screened']} 個幣種，符合 {len(result['rows'])} 個",
+        title="市場篩選",
+        border_style="cyan",
+    ))
+
+    table = Table(show_header=True)
+    table.add_column("#", justify="right")
+    table.add_column("幣種", style="cyan")
+    table.add_column("價格", justify="right")
+    table.add_column("漲跌%", justify="right")
+    table.add_column("RSI", justify="right")
+    table.add_column("EMA", justify="center")
+    table.add_column("MACD 柱", justify="right")
+    table.add_column("%B", justify="right")
+    table.add_column("評分", justify="right")
+
+    def _fmt(v, spec: str) -> str:
+        return "-" if v is None else format(v, spec)
+
+    for row in result["rows"]:
+        trend = row["ema_trend"]
+        table.add_row(
+            str(row["rank"]),
+            row["symbol"],
+            _fmt(row["price"], ",.4g"),
+            _fmt(row["change"], "+.2f"),
+            _fmt(row["rsi"], ".1f"),
+            "[green]↑[/green]" if trend == 1 else "[red]↓[/red]" if trend == -1 else "-",
+            _fmt(row["macd_hist"], ".4g"),
+            _fmt(row["bb_pct_b"], ".2f"),
+            _fmt(row["score"], "+.2f"),
+        )
+
+    console.print(table)
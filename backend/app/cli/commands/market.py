@@ -1,10 +1,10 @@
 from __future__ import annotations
-import asyncio
 
 import typer
 from rich.console import Console
 from rich.table import Table
 
+from app.cli.runtime import run
 from app.dependencies import get_aggregator, get_market_service
 
 market_app = typer.Typer(no_args_is_help=True)
@@ -30,7 +30,7 @@ def get_price(
                     await p.close()
         return prices
 
-    prices = asyncio.run(_run())
+    prices = run(_run())
 
     table = Table(title="即時價格")
     table.add_column("幣種", style="cyan", justify="center")
@@ -59,7 +59,7 @@ def market_top(
                     await p.close()
         return df
 
-    df = asyncio.run(_run())
+    df = run(_run())
 
     table = Table(title=f"市值排行 Top {limit}")
     table.add_column("#", style="dim", justify="right")
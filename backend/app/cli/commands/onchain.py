@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-import asyncio
-
 import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
+from app.cli.runtime import run
 from app.services.onchain_service import OnchainService
 
 onchain_app = typer.Typer(no_args_is_help=True)
@@ -29,7 +28,7 @@ def exchange_flow(
         service = OnchainService()
         return await service.get_exchange_flow(asset)
 
-    result = asyncio.run(_run())
+    result = run(_run())
 
     if result.latest_netflow == 0 and result.history.empty:
         console.print(Panel(
@@ -63,7 +62,7 @@ def mvrv(
         service = OnchainService()
         return await service.get_mvrv(asset)
 
-    result = asyncio.run(_run())
+    result = run(_run())
 
     if result.current_mvrv == 0 and result.history.empty:
         console.print(Panel(
@@ -101,7 +100,7 @@ def nupl(
         service = OnchainService()
         return await service.get_nupl(asset)
 
-    result = asyncio.run(_run())
+    result = run(_run())
 
     if result.current_nupl == 0 and result.history.empty:
         console.print(Panel(
@@ -138,7 +137,7 @@ def btc_network():
         service = OnchainService()
         return await service.get_btc_network_stats()
 
-    stats = asyncio.run(_run())
+    stats = run(_run())
 
     if not stats:
         console.print("[red]無法取得 BTC 網路統計[/red]")
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-import asyncio
-
 import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 
+from app.cli.runtime import run
 from app.services.sentiment_service import SentimentService
 
 sentiment_app = typer.Typer(no_args_is_help=True)
@@ -43,7 +42,7 @@ def fear_greed(
         service = SentimentService()
         return await service.get_fear_greed(limit)
 
-    result = asyncio.run(_run())
+    result = run(_run())
 
     color = _fear_greed_color(result.current_value)
 
@@ -87,7 +86,7 @@ def funding_rates(
         service = SentimentService()
         return await service.get_funding_rates(symbol)
 
-    result = asyncio.run(_run())
+    result = run(_run())
 
     avg_pct = result.avg_rate * 100
 
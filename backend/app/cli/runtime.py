@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from app.data.exchanges import exchanges
+from app.data.http import http_clients
+
+T = TypeVar("T")
+
+
+def run(coro: Coroutine[Any, Any, T]) -> T:
+    """執行 CLI 的 async 工作，結束後關閉交易所連線與共用 HTTP 連線池"""
+
+    async def _main() -> T:
+        try:
+            return await coro
+        finally:
+            await exchanges.aclose()
+            await http_clients.aclose()
+
+    return asyncio.run(_main())
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Optional
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -18,14 +18,86 @@ class Settings(BaseSettings):
     glassnode_api_key: Optional[str] = None
     cryptoquant_api_key: Optional[str] = None
 
+    # CoinGecko 幣種索引（symbol → coin id、幣種搜尋）
+    coingecko_index_path: str = "./coingecko_coins.json"
+    coingecko_index_refresh_hours: float = 24.0
+    coingecko_index_rank_pages: int = 4  # 取前 N × 250 名市值排名（同 symbol 多幣時排序用）
+
     # 快取
     cache_ttl_seconds: int = 300
+    settings_snapshot_ttl_seconds: float = 300.0  # API key / 偏好設定記憶體快照重新載入間隔
     use_redis: bool = False
     redis_url: str = "redis://localhost:6379"
 
+    # 交易所（ccxt）：第一個為主要來源，其餘可用 provider=<id> 指定
+    ccxt_exchanges: List[str] = ["binance"]
+    ccxt_markets_refresh_minutes: float = 360.0  # 背景重新載入 markets 的間隔
+    ccxt_tickers_ttl_seconds: float = 10.0  # 全市場 tickers 快照有效時間（價格 / 市場總覽共用）
+    ccxt_ticker_concurrency: int = 8  # 不支援 fetchTickers 的交易所逐一查詢時的並行上限
+    futures_symbols_path: str = "./binance_futures_symbols.json"  # Binance 合約 exchangeInfo 快照
+    futures_symbols_refresh_minutes: float = 60.0
+
+    # 即時行情（Binance 現貨 WebSocket：miniTicker + kline）
+    stream_enabled: bool = False
+    stream_url: str = "wss://stream.binance.com:9443/stream"
+    stream_price_max_age_seconds: float = 10.0  # 即時價格超過此秒數未更新則改走 REST
+    stream_keep_bars: int = 3  # 每個 (幣種, 週期) 保留的最近 K 棒數
+    stream_sync_seconds: float = 60.0  # 重新讀取 watchlist 並調整訂閱的間隔
+    stream_reconnect_max_seconds: float = 60.0  # 重連退避上限
+
+    # HTTP 連線（所有 provider 共用，每個 host 一個連線池）
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 5.0
+    http_max_connections_per_host: int = 20
+    http_max_keepalive_per_host: int = 10
+    http_keepalive_expiry_seconds: float = 30.0  # 閒置連線保留秒數
+    http2_enabled: bool = False  # 需安裝 h2（pip install 'httpx[http2]'）
+    http_rate_limit_enabled: bool = True  # 依 host × API key 等級的 token bucket 限流
+    http_rate_limit_max_wait_seconds: float = 30.0  # 預估排隊超過此秒數直接失敗（例如 IP 被封鎖中）
+    http_rate_limit_retries: int = 1  # 429 退避後重試次數
+
+    # 資料來源斷路器（DataAggregator 每個 provider 一個）
+    circuit_window_seconds: float = 60.0  # 錯誤率 / 延遲的滾動統計視窗
+    circuit_min_calls: int = 5  # 視窗內至少這麼多次呼叫才判斷
+    circuit_error_rate: float = 0.5  # 錯誤率達此比例 → 開啟
+    circuit_slow_call_seconds: float = 5.0  # 超過此秒數視為慢呼叫
+    circuit_slow_call_rate: float = 0.5  # 慢呼叫比例達此值 → 開啟
+    circuit_open_seconds: float = 30.0  # 開啟後多久放行探測請求（half-open）
+
+    # 對沖請求：主要來源超過其 p90 延遲仍未回應時，並行呼叫備援，取先成功者
+    hedge_enabled: bool = False
+    hedge_quantile: float = 0.9  # 依主要來源的延遲分位數決定觸發時間
+    hedge_min_delay_seconds: float = 0.2  # 觸發時間下限
+    hedge_default_delay_seconds: float = 2.0  # 延遲樣本不足時的觸發時間
+    hedge_budget_ratio: float = 0.1  # 對沖請求最多為主要請求的此比例
+    hedge_budget_burst: float = 5.0  # 可累積的對沖額度
+
+    # 技術指標
+    indicator_warmup_tolerance: float = 1e-4  # latest-only 模式 EMA 類指標收斂容差
+    analysis_deadline_seconds: float = 3.0  # 衍生品來源等待上限，逾時視為缺失並重新分配群組權重
+    analysis_batch_concurrency: int = 8  # 批次分析同時進行的 (幣種, 週期) 數
+
+    # 運算執行器
+    compute_process_workers: Optional[int] = None  # None = CPU 核心數，0 = 停用 process pool
+    compute_thread_workers: int = 4
+    compute_process_threshold: int = 20_000  # 輸入數值個數（列 × 欄）達此值改走 process pool
+
+    # 市場篩選器
+    screener_concurrency: int = 8  # 同時抓取 OHLCV 的幣種數
+    screener_max_symbols: int = 250  # CoinGecko 單頁上限
+
     # 排程
     scheduler_enabled: bool = True
-    price_fetch_interval_minutes: int = 5
+    price_fetch_interval_minutes: int = 5  # 資金費率/衍生品刷新間隔
+    scheduler_timeframes: List[str] = ["1h", "4h", "1d"]  # K 棒收盤後刷新分析的週期
+    scheduler_concurrency: int = 4
+    scheduler_jitter_seconds: float = 20.0  # 每個刷新工作隨機延遲 0 ~ N 秒，分散上游負載
+    scheduler_close_delay_seconds: float = 5.0  # 收盤後等待交易所結算的秒數
+
+    # 警示
+    alert_webhook_url: Optional[str] = None  # 規則未指定 webhook 時的預設推送位址
+    alert_webhook_timeout_seconds: float = 5.0
+    alert_stream_queue_size: int = 100  # 每個 SSE 訂閱者的待送事件上限（滿了丟最舊的）
 
     model_config = {"env_file": ".env", "env_prefix": "CRYPTO_"}
 
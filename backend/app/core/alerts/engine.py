@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from typing import Optional
+
+# 比較運算：level 型在條件「由否轉是」時觸發，cross 型需要前值且必須穿越門檻
+OPERATORS: dict[str, str] = {
+    ">": "高於",
+    ">=": "高於或等於",
+    "<": "低於",
+    "<=": "低於或等於",
+    "crosses_above": "向上穿越",
+    "crosses_below": "向下穿越",
+}
+
+# (symbol, timeframe, metric)；衍生品指標沒有週期，timeframe 為 None
+RuleKey = tuple[str, Optional[str], str]
+
+
+def _compare(op: str, value: float, threshold: float) -> bool:
+    if op in (">", "crosses_above"):
+        return value > threshold
+    if op == ">=":
+        return value >= threshold
+    if op in ("<", "crosses_below"):
+        return value < threshold
+    return value <= threshold
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """已編譯的警示規則，例如 ETH 1h rsi crosses_below 30"""
+
+    id: int
+    symbol: str
+    timeframe: Optional[str]
+    metric: str
+    op: str
+    threshold: float
+    webhook_url: Optional[str] = None
+
+    def __post_init__(self):
+        if self.op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {self.op}. Available: {list(OPERATORS)}")
+
+    @property
+    def key(self) -> RuleKey:
+        return (self.symbol, self.timeframe, self.metric)
+
+    def triggered(self, previous: Optional[float], value: float) -> bool:
+        """本次更新是否觸發：條件成立，且前值不成立（cross 型必須有前值）"""
+        if not math.isfinite(value) or not _compare(self.op, value, self.threshold):
+            return False
+        if previous is None or not math.isfinite(previous):
+            return not self.op.startswith("crosses")
+        return not _compare(self.op, previous, self.threshold)
+
+    def describe(self) -> str:
+        tf = f" {self.timeframe}" if self.timeframe else ""
+        return f"{self.symbol}{tf} {self.metric} {self.op} {self.threshold:g}"
+
+
+class AlertIndex:
+    """以 (symbol, timeframe, metric) 為鍵的規則索引
+
+    新資料進來時只查受影響的鍵，成本與變動的資料量成正比，與規則總數無關。
+    每個鍵記住上一次的值，供 cross 型規則與「由否轉是」判斷使用。
+    """
+
+    def __init__(self, rules: Iterable[AlertRule] = ()):
+        self._rules: dict[RuleKey, dict[int, AlertRule]] = {}
+        self._by_id: dict[int, AlertRule] = {}
+        # (symbol, timeframe) → 有規則的指標；資料更新時只計算這些
+        self._metrics: dict[tuple[str, Optional[str]], set[str]] = {}
+        self._last: dict[RuleKey, float] = {}
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def add(self, rule: AlertRule) -> None:
+        self.remove(rule.id)
+        self._rules.setdefault(rule.key, {})[rule.id] = rule
+        self._by_id[rule.id] = rule
+        self._metrics.setdefault((rule.symbol, rule.timeframe), set()).add(rule.metric)
+
+    def get(self, rule_id: int) -> Optional[AlertRule]:
+        return self._by_id.get(rule_id)
+
+    def remove(self, rule_id: int) -> Optional[AlertRule]:
+        rule = self._by_id.pop(rule_id, None)
+        if rule is None:
+            return None
+        bucket = self._rules[rule.key]
+        del bucket[rule_id]
+        if not bucket:
+            del self._rules[rule.key]
+            self._last.pop(rule.key, None)
+            metrics = self._metrics[(rule.symbol, rule.timeframe)]
+            metrics.discard(rule.metric)
+            if not metrics:
+                del self._metrics[(rule.symbol, rule.timeframe)]
+        return rule
+
+    def keys(self) -> set[RuleKey]:
+        return set(self._rules)
+
+    def pairs(self) -> set[tuple[str, Optional[str]]]:
+        """有規則的 (symbol, timeframe)"""
+        return set(self._metrics)
+
+    def metrics(self, symbol: str, timeframe: Optional[str]) -> set[str]:
+        """此 (symbol, timeframe) 有規則的指標名稱；空集合表示不需計算"""
+        return set(self._metrics.get((symbol, timeframe), ()))
+
+    def evaluate(
+        self,
+        symbol: str,
+        timeframe: Optional[str],
+        values: Mapping[str, float],
+        previous: Optional[Mapping[str, float]] = None,
+        now_ms: Optional[int] = None,
+    ) -> list[dict]:
+        """套用一次資料更新，回傳觸發的事件
+
+        Args:
+            values: {metric: 最新值}
+            previous: {metric: 前一根的值}；未提供時使用上一次更新記住的值
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        events: list[dict] = []
+        for metric, value in values.items():
+            key = (symbol, timeframe, metric)
+            rules = self._rules.get(key)
+            if not rules:
+                continue
+            prev = previous.get(metric) if previous is not None else self._last.get(key)
+            self._last[key] = value
+            for rule in rules.values():
+                if rule.triggered(prev, value):
+                    events.append({
+                        "rule_id": rule.id,
+                        "symbol": symbol,
+                        "timeframe": timeframe,
+                        "metric": metric,
+                        "op": rule.op,
+                        "threshold": rule.threshold,
+                        "value": value,
+                        "previous": prev,
+                        "message": rule.describe(),
+                        "triggered_at": now_ms,
+                    })
+        return events
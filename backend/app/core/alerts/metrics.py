@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Collection
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from app.core.indicators.pattern import divergence_score, momentum_oscillators, pattern_score
+
+
+def _close(df: pd.DataFrame) -> np.ndarray:
+    return df["close"].to_numpy(dtype=np.float64)
+
+
+def _change_pct(df: pd.DataFrame) -> np.ndarray:
+    close = _close(df)
+    out = np.full(len(close), np.nan)
+    out[1:] = (close[1:] / close[:-1] - 1) * 100
+    return out
+
+
+def _pattern(df: pd.DataFrame) -> np.ndarray:
+    ohlc = (df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close"))
+    return pattern_score(*ohlc)
+
+
+def _divergence(df: pd.DataFrame) -> np.ndarray:
+    return divergence_score(*(df[c].to_numpy(dtype=np.float64) for c in ("high", "low", "close")))
+
+
+# K 線指標：df → 與 df 等長的序列；規則帶 timeframe，於該週期 K 棒收盤時評估
+CANDLE_METRICS: dict[str, tuple[str, Callable[[pd.DataFrame], np.ndarray]]] = {
+    "price": ("收盤價", _close),
+    "change_pct": ("單根漲跌幅 (%)", _change_pct),
+    "rsi": ("RSI(14)", lambda df: momentum_oscillators(_close(df))[0]),
+    "macd_hist": ("MACD histogram (12, 26, 9)", lambda df: momentum_oscillators(_close(df))[1]),
+    "pattern": ("K 線型態分數 (-1 ~ +1)", _pattern),
+    "divergence": ("背離分數 (-1 ~ +1)", _divergence),
+}
+
+# 衍生品指標：快照 → 單一數值；規則不帶 timeframe，於衍生品刷新時評估
+DERIVATIVE_METRICS: dict[str, tuple[str, Callable[[dict[str, Any]], float]]] = {
+    "funding_avg": ("多交易所平均資金費率 (%)", lambda s: s["funding"].avg_rate * 100),
+    "oi_change_pct": ("未平倉量變化 (%)", lambda s: s["open_interest"].change_pct),
+    "ls_ratio": ("多空比", lambda s: s["long_short"].current_ratio),
+    "taker_ratio": ("主動買賣比", lambda s: s["taker"].current_ratio),
+}
+
+
+def metric_descriptions() -> dict[str, dict[str, str]]:
+    return {
+        "candle": {name: label for name, (label, _) in CANDLE_METRICS.items()},
+        "derivatives": {name: label for name, (label, _) in DERIVATIVE_METRICS.items()},
+    }
+
+
+def candle_values(
+    df: pd.DataFrame, metrics: Collection[str]
+) -> tuple[dict[str, float], dict[str, float]]:
+    """計算指定 K 線指標在最後兩根的值 → (最新, 前一根)；只計算有規則的指標"""
+    latest: dict[str, float] = {}
+    previous: dict[str, float] = {}
+    if len(df) < 2:
+        return latest, previous
+    for name in metrics:
+        series = CANDLE_METRICS[name][1](df)
+        latest[name] = float(series[-1])
+        previous[name] = float(series[-2])
+    return latest, previous
+
+
+def derivative_values(snapshot: dict[str, Any], metrics: Collection[str]) -> dict[str, float]:
+    """由衍生品快照取出指定指標；快照缺少的來源（上游失敗）略過"""
+    values: dict[str, float] = {}
+    for name in metrics:
+        try:
+            values[name] = float(DERIVATIVE_METRICS[name][1](snapshot))
+        except (KeyError, AttributeError, TypeError):
+            continue
+    return values
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from app.core.indicators.scoring import SIGNAL_THRESHOLD
+from app.core.timeframes import bars_per_year
+
+
+@dataclass
+class BacktestConfig:
+    """綜合評分策略參數（只做多）"""
+    entry_threshold: float = SIGNAL_THRESHOLD     # overall_score 高於此值 → 進場
+    exit_threshold: float = -SIGNAL_THRESHOLD     # overall_score 低於此值 → 出場
+    fee_rate: float = 0.001                       # 單邊手續費 (0.1%)
+
+    def __post_init__(self):
+        if self.exit_threshold > self.entry_threshold:
+            raise ValueError("exit_threshold must not exceed entry_threshold")
+        if not 0 <= self.fee_rate < 1:
+            raise ValueError("fee_rate must be in [0, 1)")
+
+
+@dataclass
+class BacktestResult:
+    metrics: dict[str, float]
+    equity: pd.Series                                   # 策略淨值（起始 1.0）
+    trades: pd.DataFrame = field(default_factory=pd.DataFrame)  # entry_time, exit_time, return
+
+
+def target_positions(score: np.ndarray, entry: float, exit: float) -> np.ndarray:
+    """分數 → 目標倉位 (0/1)
+
+    高於 entry 持有、低於 exit 空手，介於兩者之間（或 NaN）維持前一狀態。
+    """
+    state = np.full(len(score), np.nan)
+    with np.errstate(invalid="ignore"):
+        state[score > entry] = 1.0
+        state[score < exit] = 0.0
+    return pd.Series(state).ffill().fillna(0.0).to_numpy()
+
+
+def max_drawdown(equity: np.ndarray) -> float:
+    if len(equity) == 0:
+        return 0.0
+    peak = np.maximum.accumulate(equity)
+    return float((equity / peak - 1.0).min())
+
+
+def run_backtest(
+    df: pd.DataFrame,
+    score: pd.Series,
+    config: BacktestConfig,
+    timeframe: str,
+) -> BacktestResult:
+    """向量化 walk-forward 回測
+
+    第 t 根收盤時的分數只用到 t 以前的資料，於 t 收盤下單、承擔 t+1 的報酬
+    （倉位整體後移一根），不存在未來函數。分數仍在暖機 (NaN) 的開頭 K 棒略過。
+    """
+    score = score.reindex(df.index)
+    valid = np.flatnonzero(np.isfinite(score.to_numpy(dtype=np.float64)))
+    if len(valid) < 2:
+        raise ValueError("Not enough bars with a valid score to backtest")
+    start = valid[0]
+
+    index = df.index[start:]
+    close = df["close"].to_numpy(dtype=np.float64)[start:]
+    signal = target_positions(
+        score.to_numpy(dtype=np.float64)[start:],
+        config.entry_threshold,
+        config.exit_threshold,
+    )
+
+    position = np.empty_like(signal)
+    position[0] = 0.0
+    position[1:] = signal[:-1]
+
+    bar_ret = np.zeros_like(close)
+    bar_ret[1:] = close[1:] / close[:-1] - 1.0
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    strat_ret = position * bar_ret - config.fee_rate * turnover
+    equity = np.cumprod(1.0 + strat_ret)
+
+    # 交易：倉位 0→1 的 K 棒為進場，1→0 為出場（出場手續費記在該根），未平倉算到最後一根
+    change = np.diff(position, prepend=0.0)
+    entries = np.flatnonzero(change > 0)
+    exits = np.flatnonzero(change < 0)
+    if len(exits) < len(entries):
+        exits = np.append(exits, len(position) - 1)
+    trade_ret = equity[exits] / equity[entries - 1] - 1.0
+    trades = pd.DataFrame({
+        "entry_time": index[entries],
+        "exit_time": index[exits],
+        "return": trade_ret,
+    })
+
+    n = len(equity)
+    per_year = bars_per_year(timeframe)
+    total_return = float(equity[-1] - 1.0)
+    std = float(strat_ret[1:].std()) if n > 2 else 0.0
+    metrics = {
+        "bars": float(n),
+        "total_return": total_return,
+        "buy_hold_return": float(close[-1] / close[0] - 1.0),
+        "annualized_return": (
+            float(equity[-1] ** (per_year / (n - 1)) - 1.0) if equity[-1] > 0 else -1.0
+        ),
+        "max_drawdown": max_drawdown(equity),
+        "sharpe": float(strat_ret[1:].mean() / std * math.sqrt(per_year)) if std > 0 else 0.0,
+        "trades": float(len(trades)),
+        "hit_rate": float((trade_ret > 0).mean()) if len(trades) else 0.0,
+        "exposure": float(position.mean()),
+        "turnover": float(turnover.sum()),
+    }
+
+    return BacktestResult(
+        metrics=metrics,
+        equity=pd.Series(equity, index=index, name="equity"),
+        trades=trades,
+    )
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Optional, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+# ── DataFrame ↔ NumPy buffers ───────────────────────────────────────
+# 跨 process 只傳連續的 float64 / int64 陣列（pickle protocol 5 直接搬 buffer），
+# 不序列化 DataFrame 的 block manager 與 object 欄位
+
+
+def frame_to_arrays(df: pd.DataFrame) -> dict[str, Any]:
+    """時間索引 OHLCV DataFrame → {index: int64, unit, tz, name, columns: {欄名: float64}}"""
+    index = pd.DatetimeIndex(df.index)
+    return {
+        "index": index.asi8,
+        "unit": index.unit,
+        "tz": str(index.tz) if index.tz is not None else None,
+        "name": df.index.name,
+        "columns": {
+            str(col): np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+            for col in df.columns
+        },
+    }
+
+
+def arrays_to_frame(payload: dict[str, Any]) -> pd.DataFrame:
+    index = pd.DatetimeIndex(
+        payload["index"].view(f"datetime64[{payload['unit']}]"), name=payload["name"]
+    )
+    if payload["tz"] is not None:
+        index = index.tz_localize("UTC").tz_convert(payload["tz"])
+    return pd.DataFrame(payload["columns"], index=index, copy=False)
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+class ComputeExecutor:
+    """CPU 密集運算執行器：依輸入大小分流
+
+    - 小量（< process_threshold 個數值）→ thread pool，不阻塞 event loop
+    - 大量 → process pool，繞過 GIL 用滿多核心
+
+    兩個 pool 都在第一次使用時建立；process pool 用 spawn，避免 fork 帶走 event loop 狀態。
+    process pool 損壞（worker 被 OOM kill 等）時退回 thread pool 並於下次重建。
+    """
+
+    def __init__(
+        self,
+        process_workers: Optional[int] = None,
+        thread_workers: Optional[int] = None,
+        process_threshold: Optional[int] = None,
+    ):
+        if process_workers is None:
+            process_workers = settings.compute_process_workers
+        if process_workers is None:
+            process_workers = os.cpu_count() or 1
+        self._process_workers = process_workers
+        self._thread_workers = thread_workers or settings.compute_thread_workers
+        self._threshold = (
+            process_threshold if process_threshold is not None
+            else settings.compute_process_threshold
+        )
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def process_threshold(self) -> int:
+        return self._threshold
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(
+                max_workers=self._thread_workers, thread_name_prefix="compute"
+            )
+        return self._threads
+
+    def _process_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self._process_workers <= 0:
+            return None
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(
+                max_workers=self._process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._processes
+
+    def route(self, size: int) -> str:
+        """回傳 size 個數值的工作會送到哪個 pool："process" 或 "thread" """
+        if size >= self._threshold and self._process_workers > 0:
+            return "process"
+        return "thread"
+
+    def start(self) -> None:
+        """預先建立 pool 並喚醒 worker（spawn 需重新 import，避免第一個大請求付啟動成本）"""
+        self._thread_pool()
+        pool = self._process_pool()
+        if pool is None:
+            return
+        try:
+            for _ in range(self._process_workers):
+                pool.submit(_noop)
+        except Exception:
+            # 例如主模組未使用 __main__ guard，spawn 無法啟動 → 全部改走 thread pool
+            logger.warning("Compute process pool unavailable, using threads only", exc_info=True)
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+            self._process_workers = 0
+
+    async def thread(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._thread_pool(), partial(fn, *args, **kwargs))
+
+    async def run(self, fn: Callable[..., T], *args: Any, size: int, **kwargs: Any) -> T:
+        """依 size 分流執行 fn(*args, **kwargs)
+
+        送進 process pool 的 fn 必須是模組層級函式、參數可 pickle
+        （DataFrame 請先用 frame_to_arrays 轉成陣列）。
+        """
+        if self.route(size) == "thread":
+            return await self.thread(fn, *args, **kwargs)
+
+        pool: Executor = self._process_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(pool, partial(fn, *args, **kwargs))
+        except BrokenProcessPool:
+            logger.warning("Compute process pool broken, falling back to threads")
+            self._processes = None
+            return await self.thread(fn, *args, **kwargs)
+
+    def shutdown(self) -> None:
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+        if self._threads is not None:
+            self._threads.shutdown(wait=False, cancel_futures=True)
+            self._threads = None
+
+
+compute = ComputeExecutor()
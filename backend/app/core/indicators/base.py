@@ -1,13 +1,43 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
+from collections.abc import Iterator, Mapping
 from dataclasses import dataclass, field
 from typing import Any
 
 import math
 
+import numpy as np
 import pandas as pd
 
 
+# latest-only 模式下指數平滑類指標的預設收斂容差：
+# 起始值殘留權重 (1-α)^k 低於此值即視為已收斂
+DEFAULT_WARMUP_TOLERANCE = 1e-4
+
+# latest-only 模式保留的尾端 K 棒數（訊號判斷最多需要前一根）
+LATEST_KEEP = 2
+
+
+def ema_warmup(alpha: float, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int:
+    """EMA 起始值影響衰減到 tolerance 以下所需的 K 棒數
+
+    adjust=False 的 EMA 起始值殘留權重為 (1-α)^k，
+    解 (1-α)^k <= tolerance 得 k >= log(tolerance) / log(1-α)
+    """
+    if alpha >= 1.0:
+        return 1
+    return int(math.ceil(math.log(tolerance) / math.log(1.0 - alpha)))
+
+
+def shift_prev(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """陣列往後平移 periods 根（前 periods 根補 NaN），用於向量化的「前一根」比較"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if periods < len(values):
+        out[periods:] = values[: len(values) - periods]
+    return out
+
+
 def _safe_float(val) -> float | None:
     """將值轉為安全的 float，NaN/Inf 轉為 None"""
     if val is None:
@@ -32,17 +62,81 @@ def _safe_metadata(meta: dict) -> dict:
     return cleaned
 
 
+class IndicatorLines(Mapping):
+    """指標輸出線 — 共用時間索引 + 每條線一個 float64 NumPy buffer
+
+    以 Mapping[str, pd.Series] 介面存取，pd.Series 只在讀取時才建立；
+    最新值、序列化、圖表輸出等路徑直接讀 buffer。
+    """
+
+    __slots__ = ("index", "_buffers")
+
+    def __init__(self, index: pd.Index, buffers: dict[str, np.ndarray]):
+        self.index = index
+        self._buffers = buffers
+
+    @classmethod
+    def from_series(cls, series: Mapping[str, pd.Series]) -> IndicatorLines:
+        """由多條 pd.Series 建立（以第一條線的索引為共用索引）"""
+        if isinstance(series, IndicatorLines):
+            return series
+        if not series:
+            return cls(pd.Index([]), {})
+
+        index = next(iter(series.values())).index
+        buffers: dict[str, np.ndarray] = {}
+        for name, s in series.items():
+            if not s.index.equals(index):
+                s = s.reindex(index)
+            buffers[name] = s.to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(index, buffers)
+
+    def __getitem__(self, name: str) -> pd.Series:
+        return pd.Series(self._buffers[name], index=self.index, name=name, copy=False)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._buffers)
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def __repr__(self) -> str:
+        return f"IndicatorLines(lines={list(self._buffers)}, length={len(self.index)})"
+
+    @property
+    def buffers(self) -> dict[str, np.ndarray]:
+        return self._buffers
+
+    def buffer(self, name: str) -> np.ndarray:
+        return self._buffers[name]
+
+    def latest(self, name: str) -> float | None:
+        """直接從 buffer 讀最新值"""
+        buf = self._buffers[name]
+        return float(buf[-1]) if len(buf) > 0 else None
+
+    def tail(self, n: int) -> IndicatorLines:
+        """取尾端 n 根（buffer 切片為 view，不複製）"""
+        return IndicatorLines(
+            self.index[-n:], {k: v[-n:] for k, v in self._buffers.items()}
+        )
+
+
 @dataclass
 class IndicatorResult:
     """指標計算結果"""
 
     name: str
-    values: dict[str, pd.Series]  # 多條輸出線 (如 MACD 有 macd, signal, histogram)
+    values: IndicatorLines  # 多條輸出線 (如 MACD 有 macd, signal, histogram)
     signal: str  # "bullish" | "bearish" | "neutral"
     strength: float  # 0.0 ~ 1.0
     continuous_score: float = 0.0  # -1.0 (極度看空) ~ +1.0 (極度看多)
     metadata: dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self) -> None:
+        # 指標以 dict[str, pd.Series] 傳入，統一轉為 array-backed lines
+        self.values = IndicatorLines.from_series(self.values)
+
     def to_dict(self) -> dict:
         """轉為可序列化的 dict"""
         return {
@@ -52,8 +146,7 @@ class IndicatorResult:
             "continuous_score": round(self.continuous_score, 4),
             "metadata": _safe_metadata(self.metadata),
             "latest_values": {
-                k: _safe_float(v.iloc[-1]) if len(v) > 0 else None
-                for k, v in self.values.items()
+                k: _safe_float(self.values.latest(k)) for k in self.values
             },
         }
 
@@ -77,3 +170,39 @@ class BaseIndicator(ABC):
             IndicatorResult
         """
         ...
+
+    @abstractmethod
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        """每一根 K 棒的 continuous_score（向量化，一次計算整段歷史）
+
+        第 i 個值等同於以 df.iloc[:i+1] 呼叫 calculate() 得到的 continuous_score
+        （未經四捨五入），資料不足的 K 棒為 NaN
+        """
+        ...
+
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int | None:
+        """最新值收斂所需的最少 K 棒數
+
+        Args:
+            tolerance: 指數平滑類指標起始值殘留權重上限
+
+        Returns:
+            K 棒數；None 表示需要完整歷史（如 OBV 等累積型指標）
+        """
+        return None
+
+    def calculate_latest(
+        self, df: pd.DataFrame, tolerance: float = DEFAULT_WARMUP_TOLERANCE
+    ) -> IndicatorResult:
+        """latest-only 模式：只在收斂所需的尾端區間計算，並只保留最後幾個值
+
+        適用於只需最新值的查詢（完整分析、單一指標），
+        圖表用的完整序列請使用 calculate()
+        """
+        warmup = self.warmup_period(tolerance)
+        if warmup is not None and len(df) > warmup:
+            df = df.iloc[-warmup:]
+
+        result = self.calculate(df)
+        result.values = result.values.tail(LATEST_KEEP)
+        return result
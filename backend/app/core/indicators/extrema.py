@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+
+import numpy as np
+
+
+def _rolling_extreme(values: np.ndarray, window: int, op: np.ufunc, fill: float) -> np.ndarray:
+    """整段陣列的滾動極值 (van Herk / Gil-Werman)
+
+    將序列切成長度 window 的區塊，區塊內前綴極值與後綴極值各做一次 accumulate，
+    任一視窗 = 前一區塊的後綴極值 ⊕ 後一區塊的前綴極值。
+    總成本 O(n)，與視窗長度無關；視窗內含 NaN 時輸出 NaN（同 pandas min_periods=window）。
+    """
+    if window < 1:
+        raise ValueError("window must be >= 1")
+    x = np.asarray(values, dtype=np.float64)
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+
+    pad = (-n) % window
+    padded = np.concatenate([x, np.full(pad, fill)]) if pad else x
+    blocks = padded.reshape(-1, window)
+    prefix = op.accumulate(blocks, axis=1).ravel()
+    suffix = op.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = op(suffix[: n - window + 1], prefix[window - 1: n])
+    return out
+
+
+def rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """滾動最大值，O(n)；前 window-1 根為 NaN"""
+    return _rolling_extreme(values, window, np.maximum, -np.inf)
+
+
+def rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """滾動最小值，O(n)；前 window-1 根為 NaN"""
+    return _rolling_extreme(values, window, np.minimum, np.inf)
+
+
+class RollingExtrema:
+    """單調佇列滾動極值 — 逐根更新，每根攤銷 O(1)
+
+    佇列保存 (位置, 值)，值單調（max 遞減 / min 遞增），隊首即為視窗極值。
+    與 rolling_max / rolling_min 結果一致，適合即時 K 棒串流。
+
+    Example:
+        rx = RollingExtrema(14, mode="max")
+        for high in highs:
+            current = rx.update(high)
+    """
+
+    def __init__(self, window: int, mode: str = "max"):
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        if mode not in ("max", "min"):
+            raise ValueError("mode must be 'max' or 'min'")
+        self.window = window
+        self.mode = mode
+        self._deque: deque[tuple[int, float]] = deque()
+        self._pos = -1
+        self._last_nan = -1  # 最近一次 NaN 的位置
+
+    @classmethod
+    def from_array(cls, values: np.ndarray, window: int, mode: str = "max") -> RollingExtrema:
+        """以歷史序列建立狀態（只需掃描最後 window 根）"""
+        rx = cls(window, mode)
+        x = np.asarray(values, dtype=np.float64)
+        rx._pos = len(x) - window - 1 if len(x) > window else -1
+        for v in x[-window:]:
+            rx.update(float(v))
+        return rx
+
+    def _dominates(self, new: float, old: float) -> bool:
+        return new >= old if self.mode == "max" else new <= old
+
+    def update(self, value: float) -> float:
+        """推入新的一根，回傳目前視窗的極值（視窗未滿或含 NaN 時為 NaN）"""
+        self._pos += 1
+        pos = self._pos
+        dq = self._deque
+
+        if math.isnan(value):
+            self._last_nan = pos
+        else:
+            while dq and self._dominates(value, dq[-1][1]):
+                dq.pop()
+            dq.append((pos, value))
+
+        while dq and dq[0][0] <= pos - self.window:
+            dq.popleft()
+
+        return self.current
+
+    @property
+    def current(self) -> float:
+        if self._pos < self.window - 1 or self._pos - self._last_nan < self.window:
+            return math.nan
+        return self._deque[0][1] if self._deque else math.nan
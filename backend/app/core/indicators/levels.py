@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import bisect
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.core.indicators.extrema import rolling_max, rolling_min
+
+# fractal 擺動點：左右各 FRACTAL_WIDTH 根內的最高/最低
+FRACTAL_WIDTH = 2
+# 相對價差在此比例內的擺動點歸為同一價格區
+ZONE_TOLERANCE = 0.005
+# 觸碰權重半衰期（K 棒數）：越久以前的觸碰分量越輕
+RECENCY_HALF_LIFE = 200
+
+
+def fractal_swings(
+    high: np.ndarray, low: np.ndarray, width: int = FRACTAL_WIDTH
+) -> tuple[np.ndarray, np.ndarray]:
+    """fractal 擺動高/低點的位置
+
+    擺動高點：高點嚴格高於左側 width 根、且不低於右側 width 根（平台只取第一根）；
+    擺動低點對稱。最後 width 根右側尚未收齊，不列入。
+    """
+    if width < 1:
+        raise ValueError("width must be >= 1")
+    h = np.asarray(high, dtype=np.float64)
+    lo = np.asarray(low, dtype=np.float64)
+    n = len(h)
+    span = 2 * width + 1
+    if n < span:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty
+
+    centers = np.arange(width, n - width)
+    # rolling 視窗結尾 = center + width → 以 center 為中心的 span 根極值
+    h_max = rolling_max(h, span)[span - 1:]
+    l_min = rolling_min(lo, span)[span - 1:]
+    # 左側 width 根（結尾 = center - 1）
+    h_left = rolling_max(h, width)[centers - 1]
+    l_left = rolling_min(lo, width)[centers - 1]
+
+    swing_highs = centers[(h[centers] >= h_max) & (h[centers] > h_left)]
+    swing_lows = centers[(lo[centers] <= l_min) & (lo[centers] < l_left)]
+    return swing_highs, swing_lows
+
+
+@dataclass
+class Zone:
+    """價格區：同一價位附近的擺動點聚合"""
+
+    price: float  # 觸碰價格平均
+    low: float
+    high: float
+    touches: int
+    last_bar: int  # 最近一次觸碰的 K 棒序號
+    last_time: int  # 最近一次觸碰的時間 (ms)
+    weight: float  # 於 last_bar 時的衰減觸碰權重
+
+    def strength(self, bar: int, half_life: float = RECENCY_HALF_LIFE) -> float:
+        """觸碰次數 × 新近度：每次觸碰權重 1，隨 K 棒數指數衰減"""
+        return self.weight * 0.5 ** ((bar - self.last_bar) / half_life)
+
+    def to_dict(self, bar: int, half_life: float = RECENCY_HALF_LIFE) -> dict:
+        return {
+            "price": self.price,
+            "low": self.low,
+            "high": self.high,
+            "touches": self.touches,
+            "strength": round(self.strength(bar, half_life), 4),
+            "last_touch": self.last_time,
+        }
+
+
+class LevelIndex:
+    """支撐/壓力區的排序索引 — 依價格排序，逐根收盤增量更新
+
+    最近 N 個上方/下方價格區以二分搜尋定位，查詢 O(log Z + N)。
+
+    Example:
+        index = LevelIndex.from_ohlcv(high, low, times)
+        index.update(new_high, new_low, new_time)   # 每根收盤後
+        index.above(price, 5), index.below(price, 5)
+    """
+
+    def __init__(
+        self,
+        width: int = FRACTAL_WIDTH,
+        tolerance: float = ZONE_TOLERANCE,
+        half_life: float = RECENCY_HALF_LIFE,
+    ):
+        if width < 1:
+            raise ValueError("width must be >= 1")
+        self.width = width
+        self.tolerance = tolerance
+        self.half_life = half_life
+        self._prices: list[float] = []  # 與 _zones 對齊的排序鍵
+        self._zones: list[Zone] = []
+        # 尚待右側確認的最近 2×width+1 根 (high, low, time)
+        self._window: deque[tuple[float, float, int]] = deque(maxlen=2 * width + 1)
+        self.bars = 0
+        self.last_time: int | None = None
+
+    @classmethod
+    def from_ohlcv(
+        cls, high: np.ndarray, low: np.ndarray, times: np.ndarray, **kwargs
+    ) -> LevelIndex:
+        """以整段歷史建立索引（擺動點向量化偵測，結果與逐根 update 相同）"""
+        index = cls(**kwargs)
+        h = np.asarray(high, dtype=np.float64)
+        lo = np.asarray(low, dtype=np.float64)
+        t = np.asarray(times, dtype=np.int64)
+        swing_highs, swing_lows = fractal_swings(h, lo, index.width)
+
+        # 依時間順序、同根先高後低加入，與串流確認順序一致
+        events = sorted(
+            [(int(i), 0, float(h[i])) for i in swing_highs]
+            + [(int(i), 1, float(lo[i])) for i in swing_lows]
+        )
+        for i, _, price in events:
+            index.add_touch(price, i, int(t[i]))
+
+        index.bars = len(h)
+        index.last_time = int(t[-1]) if len(t) else None
+        tail = index._window.maxlen
+        for bar_high, bar_low, bar_time in zip(h[-tail:], lo[-tail:], t[-tail:]):
+            index._window.append((float(bar_high), float(bar_low), int(bar_time)))
+        return index
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    @property
+    def zones(self) -> list[Zone]:
+        return list(self._zones)
+
+    def update(self, high: float, low: float, time: int) -> None:
+        """推入新收盤的 K 棒；中心那根的左右都到齊時確認是否為擺動點"""
+        self._window.append((high, low, time))
+        self.bars += 1
+        self.last_time = time
+        if len(self._window) < self._window.maxlen:
+            return
+
+        w = self.width
+        bars = list(self._window)
+        center_high, center_low, center_time = bars[w]
+        center_bar = self.bars - 1 - w
+        left, right = bars[:w], bars[w + 1:]
+        if center_high > max(b[0] for b in left) and center_high >= max(b[0] for b in right):
+            self.add_touch(center_high, center_bar, center_time)
+        if center_low < min(b[1] for b in left) and center_low <= min(b[1] for b in right):
+            self.add_touch(center_low, center_bar, center_time)
+
+    def add_touch(self, price: float, bar: int, time: int) -> None:
+        """加入一次擺動點觸碰：落在既有價格區容差內則合併，否則新增價格區"""
+        self._insert(Zone(price, price, price, 1, bar, time, 1.0))
+
+    def _insert(self, zone: Zone) -> None:
+        i = bisect.bisect_left(self._prices, zone.price)
+        nearest = None
+        for j in (i - 1, i):
+            if 0 <= j < len(self._prices):
+                gap = abs(self._prices[j] - zone.price)
+                if gap <= self.tolerance * zone.price and (
+                    nearest is None or gap < abs(self._prices[nearest] - zone.price)
+                ):
+                    nearest = j
+        if nearest is None:
+            self._prices.insert(i, zone.price)
+            self._zones.insert(i, zone)
+            return
+
+        # 合併後中心價會移動，先移除再重新插入（可能連帶與另一側鄰區合併）
+        other = self._zones.pop(nearest)
+        self._prices.pop(nearest)
+        self._insert(self._merge(other, zone))
+
+    def _merge(self, a: Zone, b: Zone) -> Zone:
+        latest = a if a.last_bar >= b.last_bar else b
+        touches = a.touches + b.touches
+        return Zone(
+            price=(a.price * a.touches + b.price * b.touches) / touches,
+            low=min(a.low, b.low),
+            high=max(a.high, b.high),
+            touches=touches,
+            last_bar=latest.last_bar,
+            last_time=latest.last_time,
+            weight=a.strength(latest.last_bar, self.half_life)
+            + b.strength(latest.last_bar, self.half_life),
+        )
+
+    def above(self, price: float, n: int) -> list[Zone]:
+        """價格之上最近的 n 個價格區（由近到遠）"""
+        i = bisect.bisect_right(self._prices, price)
+        return self._zones[i:i + n]
+
+    def below(self, price: float, n: int) -> list[Zone]:
+        """價格之下最近的 n 個價格區（由近到遠）"""
+        i = bisect.bisect_left(self._prices, price)
+        return self._zones[max(i - n, 0):i][::-1]
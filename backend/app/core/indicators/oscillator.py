@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from ta.momentum import RSIIndicator as _RSI
-from ta.momentum import StochasticOscillator
 
-from app.core.indicators.base import BaseIndicator, IndicatorResult
+from app.core.indicators.base import (
+    DEFAULT_WARMUP_TOLERANCE,
+    LATEST_KEEP,
+    BaseIndicator,
+    IndicatorResult,
+    ema_warmup,
+    shift_prev,
+)
+from app.core.indicators.extrema import rolling_max, rolling_min
 
 
 class RSIIndicator(BaseIndicator):
@@ -17,25 +25,43 @@ class RSIIndicator(BaseIndicator):
     def name(self) -> str:
         return "RSI"
 
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int:
+        # diff 消耗 1 根 + Wilder 平滑 (α = 1/period) 收斂
+        return max(self.period, ema_warmup(1 / self.period, tolerance)) + 1 + LATEST_KEEP
+
     @staticmethod
-    def _continuous(rsi: float) -> float:
-        """RSI → 連續分數 (-1.0 ~ +1.0)
+    def continuous_array(rsi: np.ndarray) -> np.ndarray:
+        """RSI → 連續分數 (-1.0 ~ +1.0)，逐元素計算
         RSI=0 → +1.0 (極度超賣=看多)
         RSI=30 → +0.4, RSI=50 → 0.0, RSI=70 → -0.4
         RSI=100 → -1.0 (極度超買=看空)
+        NaN 輸入輸出 NaN
         """
-        if rsi <= 30:
-            return 0.4 + (30 - rsi) / 30 * 0.6
-        elif rsi <= 50:
-            return (50 - rsi) / 20 * 0.4
-        elif rsi <= 70:
-            return -(rsi - 50) / 20 * 0.4
-        else:
-            return -(0.4 + (rsi - 70) / 30 * 0.6)
+        rsi = np.asarray(rsi, dtype=np.float64)
+        out = np.select(
+            [rsi <= 30, rsi <= 50, rsi <= 70],
+            [
+                0.4 + (30 - rsi) / 30 * 0.6,
+                (50 - rsi) / 20 * 0.4,
+                -(rsi - 50) / 20 * 0.4,
+            ],
+            default=-(0.4 + (rsi - 70) / 30 * 0.6),
+        )
+        out[np.isnan(rsi)] = np.nan
+        return out
+
+    @classmethod
+    def _continuous(cls, rsi: float) -> float:
+        return float(cls.continuous_array(np.array([rsi]))[0])
+
+    def lines(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        return {"rsi": _RSI(close=df["close"], window=self.period).rsi()}
+
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        return self.continuous_array(self.lines(df)["rsi"].to_numpy(dtype=np.float64))
 
     def calculate(self, df: pd.DataFrame) -> IndicatorResult:
-        rsi_indicator = _RSI(close=df["close"], window=self.period)
-        rsi = rsi_indicator.rsi()
+        rsi = self.lines(df)["rsi"]
         latest = float(rsi.iloc[-1])
 
         if latest < 30:
@@ -70,42 +96,64 @@ class KDIndicator(BaseIndicator):
     def name(self) -> str:
         return "KD"
 
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int:
+        # 純滾動視窗：K 需 k_period 根，D 再平均 d_period 根
+        return self.k_period + self.d_period + LATEST_KEEP
+
     @staticmethod
-    def _continuous(k_now: float, k_prev: float, d_now: float, d_prev: float) -> float:
-        """KD → 連續分數 (-1.0 ~ +1.0)
+    def continuous_array(k_now: np.ndarray, k_prev: np.ndarray,
+                         d_now: np.ndarray, d_prev: np.ndarray) -> np.ndarray:
+        """KD → 連續分數 (-1.0 ~ +1.0)，逐元素計算
         K 值區間分數 + 交叉加成
         """
+        k_now, k_prev, d_now, d_prev = np.broadcast_arrays(
+            *(np.asarray(a, dtype=np.float64) for a in (k_now, k_prev, d_now, d_prev))
+        )
         # K 值基礎分數
-        if k_now <= 20:
-            base = 0.3 + (20 - k_now) / 20 * 0.4
-        elif k_now <= 50:
-            base = (50 - k_now) / 30 * 0.3
-        elif k_now <= 80:
-            base = -(k_now - 50) / 30 * 0.3
-        else:
-            base = -(0.3 + (k_now - 80) / 20 * 0.4)
+        base = np.select(
+            [k_now <= 20, k_now <= 50, k_now <= 80],
+            [
+                0.3 + (20 - k_now) / 20 * 0.4,
+                (50 - k_now) / 30 * 0.3,
+                -(k_now - 50) / 30 * 0.3,
+            ],
+            default=-(0.3 + (k_now - 80) / 20 * 0.4),
+        )
 
         # 交叉加成 ±0.3
-        cross_up = k_now > d_now and k_prev <= d_prev
-        cross_down = k_now < d_now and k_prev >= d_prev
-        if cross_up:
-            base = min(base + 0.3, 1.0)
-        elif cross_down:
-            base = max(base - 0.3, -1.0)
+        cross_up = (k_now > d_now) & (k_prev <= d_prev)
+        cross_down = (k_now < d_now) & (k_prev >= d_prev)
+        base = np.where(
+            cross_up,
+            np.minimum(base + 0.3, 1.0),
+            np.where(cross_down, np.maximum(base - 0.3, -1.0), base),
+        )
+        return np.where(np.isnan(k_now), np.nan, base)
 
-        return base
+    @classmethod
+    def _continuous(cls, k_now: float, k_prev: float, d_now: float, d_prev: float) -> float:
+        return float(cls.continuous_array(k_now, k_prev, d_now, d_prev))
 
-    def calculate(self, df: pd.DataFrame) -> IndicatorResult:
-        stoch = StochasticOscillator(
-            high=df["high"],
-            low=df["low"],
-            close=df["close"],
-            window=self.k_period,
-            smooth_window=self.d_period,
-        )
+    def lines(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        # %K = (close - 最低低點) / (最高高點 - 最低低點)，極值以 O(n) 滾動極值計算
+        lowest = rolling_min(df["low"].to_numpy(dtype=np.float64), self.k_period)
+        highest = rolling_max(df["high"].to_numpy(dtype=np.float64), self.k_period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k_values = 100 * (df["close"].to_numpy(dtype=np.float64) - lowest) / (highest - lowest)
+
+        k_line = pd.Series(k_values, index=df.index, name="stoch_k")
+        d_line = k_line.rolling(self.d_period, min_periods=self.d_period).mean()
+        return {"K": k_line, "D": d_line}
 
-        k_line = stoch.stoch()
-        d_line = stoch.stoch_signal()
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        lines = self.lines(df)
+        k = lines["K"].to_numpy(dtype=np.float64)
+        d = lines["D"].to_numpy(dtype=np.float64)
+        return self.continuous_array(k, shift_prev(k), d, shift_prev(d))
+
+    def calculate(self, df: pd.DataFrame) -> IndicatorResult:
+        lines = self.lines(df)
+        k_line, d_line = lines["K"], lines["D"]
 
         k_now = float(k_line.iloc[-1])
         d_now = float(d_line.iloc[-1])
@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.core.indicators.base import (
+    DEFAULT_WARMUP_TOLERANCE,
+    LATEST_KEEP,
+    BaseIndicator,
+    IndicatorResult,
+    shift_prev,
+)
+from app.core.indicators.oscillator import RSIIndicator
+from app.core.indicators.trend import MACDIndicator
+from app.core.indicators.vectorized import ema_columns, ewm_columns, rsi_columns
+
+# 以下函式皆接受 (n,) 或 (n, S) 陣列（S 個幣種並排），沿第 0 軸（時間）計算，
+# 全部以整段陣列的布林遮罩完成，不逐根迴圈。
+
+# ── K 線型態 ──
+
+# 前段趨勢：前一根收盤與再往前 N 根比較
+PATTERN_TREND_LOOKBACK = 5
+# 十字線：實體 ≤ 全長此比例
+DOJI_BODY_RATIO = 0.1
+# 錘子/流星：長影線 ≥ 實體此倍數
+SHADOW_RATIO = 2.0
+# 型態訊號延續根數（每根減半）
+PATTERN_DECAY_BARS = 3
+
+# 各型態對分數的貢獻（正 = 看多反轉）
+PATTERN_SCORES: dict[str, float] = {
+    "bullish_engulfing": 0.6,
+    "bearish_engulfing": -0.6,
+    "hammer": 0.4,
+    "shooting_star": -0.4,
+    "morning_star": 0.7,
+    "evening_star": -0.7,
+}
+# 十字線只代表猶豫，往前段趨勢的反方向小幅加分
+DOJI_SCORE = 0.2
+
+# ── 背離 ──
+
+# 擺動點左右確認根數（訊號在擺動點後 width 根才確認，無未來資料）
+DIVERGENCE_WIDTH = 2
+# 兩個擺動點最多相隔的 K 棒數
+DIVERGENCE_LOOKBACK = 30
+# 背離訊號延續根數（每根減半）
+DIVERGENCE_DECAY_BARS = 5
+
+
+def _decay(raw: np.ndarray, bars: int) -> np.ndarray:
+    """訊號延續：score_t = Σ raw_{t-k} × 0.5^k (k < bars)，夾在 ±1"""
+    out = np.array(raw, dtype=np.float64)
+    for k in range(1, bars):
+        out += np.nan_to_num(shift_prev(raw, k)) * 0.5 ** k
+    return np.clip(out, -1.0, 1.0)
+
+
+def _trend(close: np.ndarray) -> np.ndarray:
+    """本根之前的趨勢方向：+1 上漲、-1 下跌、0 持平/資料不足"""
+    prev = shift_prev(close)
+    base = shift_prev(close, PATTERN_TREND_LOOKBACK + 1)
+    with np.errstate(invalid="ignore"):
+        return np.sign(np.nan_to_num(prev - base))
+
+
+def candlestick_masks(
+    open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray
+) -> dict[str, np.ndarray]:
+    """各 K 線型態的布林遮罩（True = 該根完成此型態）"""
+    o, h, lo, c = (np.asarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    body = np.abs(c - o)
+    rng = h - lo
+    upper = h - np.maximum(o, c)
+    lower = np.minimum(o, c) - lo
+
+    po, pc = shift_prev(o), shift_prev(c)
+    p_body, p_rng = shift_prev(body), shift_prev(rng)
+    o2, c2 = shift_prev(o, 2), shift_prev(c, 2)
+    body2, rng2 = shift_prev(body, 2), shift_prev(rng, 2)
+
+    trend = _trend(c)
+    # 三根型態看第一根之前的趨勢
+    trend2 = np.nan_to_num(shift_prev(trend, 2))
+
+    with np.errstate(invalid="ignore"):
+        doji = (rng > 0) & (body <= DOJI_BODY_RATIO * rng)
+        small_prev = p_body <= 0.3 * p_rng
+        long2 = body2 >= 0.5 * rng2
+        return {
+            "bullish_engulfing": (pc < po) & (c > o) & (c >= po) & (o <= pc) & (body > p_body),
+            "bearish_engulfing": (pc > po) & (c < o) & (o >= pc) & (c <= po) & (body > p_body),
+            "hammer": (trend < 0) & ~doji
+            & (lower >= SHADOW_RATIO * body) & (upper <= body),
+            "shooting_star": (trend > 0) & ~doji
+            & (upper >= SHADOW_RATIO * body) & (lower <= body),
+            "morning_star": (trend2 < 0) & (c2 < o2) & long2 & small_prev
+            & (c > o) & (c > (o2 + c2) / 2),
+            "evening_star": (trend2 > 0) & (c2 > o2) & long2 & small_prev
+            & (c < o) & (c < (o2 + c2) / 2),
+            "doji": doji,
+        }
+
+
+def pattern_score(
+    open_: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray
+) -> np.ndarray:
+    """K 線型態 → 連續分數 (-1.0 ~ +1.0)，訊號延續 PATTERN_DECAY_BARS 根後淡出"""
+    masks = candlestick_masks(open_, high, low, close)
+    raw = np.zeros(np.shape(close))
+    for name, weight in PATTERN_SCORES.items():
+        raw += masks[name] * weight
+    raw -= masks["doji"] * _trend(np.asarray(close, dtype=np.float64)) * DOJI_SCORE
+    return _decay(raw, PATTERN_DECAY_BARS)
+
+
+def swing_masks(
+    high: np.ndarray, low: np.ndarray, width: int = DIVERGENCE_WIDTH
+) -> tuple[np.ndarray, np.ndarray]:
+    """fractal 擺動高/低點遮罩（標在擺動點本身，需要右側 width 根才成立）
+
+    定義同 levels.fractal_swings：嚴格高於左側、不低於右側（平台只取第一根）。
+    """
+    h = np.asarray(high, dtype=np.float64)
+    lo = np.asarray(low, dtype=np.float64)
+    n = h.shape[0]
+    span = 2 * width + 1
+    swing_high = np.zeros(h.shape, dtype=bool)
+    swing_low = np.zeros(lo.shape, dtype=bool)
+    if n < span:
+        return swing_high, swing_low
+
+    center = slice(width, n - width)
+    with np.errstate(invalid="ignore"):
+        h_max = sliding_window_view(h, span, axis=0).max(axis=-1)
+        l_min = sliding_window_view(lo, span, axis=0).min(axis=-1)
+        h_left = sliding_window_view(h, width, axis=0).max(axis=-1)[: n - span + 1]
+        l_left = sliding_window_view(lo, width, axis=0).min(axis=-1)[: n - span + 1]
+        swing_high[center] = (h[center] >= h_max) & (h[center] > h_left)
+        swing_low[center] = (lo[center] <= l_min) & (lo[center] < l_left)
+    return swing_high, swing_low
+
+
+def _previous_swing(mask: np.ndarray) -> np.ndarray:
+    """每一列之前（不含本列）最近一個擺動點的位置，沒有則為 -1"""
+    rows = np.arange(mask.shape[0]).reshape((-1,) + (1,) * (mask.ndim - 1))
+    latest = np.maximum.accumulate(np.where(mask, rows, -1), axis=0)
+    prev = np.full(mask.shape, -1, dtype=np.int64)
+    prev[1:] = latest[:-1]
+    return prev
+
+
+def _delay(mask: np.ndarray, periods: int) -> np.ndarray:
+    return np.nan_to_num(shift_prev(mask.astype(np.float64), periods)) > 0
+
+
+def _at(values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    return np.take_along_axis(values, np.maximum(positions, 0), axis=0)
+
+
+def divergence_masks(
+    high: np.ndarray,
+    low: np.ndarray,
+    oscillator: np.ndarray,
+    width: int = DIVERGENCE_WIDTH,
+    lookback: int = DIVERGENCE_LOOKBACK,
+) -> tuple[np.ndarray, np.ndarray]:
+    """一般背離遮罩，標在確認根（擺動點後 width 根）
+
+    看多：價格低點創新低、震盪指標低點墊高；看空：價格高點創新高、指標高點降低。
+    """
+    h = np.asarray(high, dtype=np.float64)
+    lo = np.asarray(low, dtype=np.float64)
+    osc = np.asarray(oscillator, dtype=np.float64)
+    swing_high, swing_low = swing_masks(h, lo, width)
+    rows = np.arange(h.shape[0]).reshape((-1,) + (1,) * (h.ndim - 1))
+
+    prev_high = _previous_swing(swing_high)
+    prev_low = _previous_swing(swing_low)
+    near_high = swing_high & (prev_high >= 0) & (rows - prev_high <= lookback)
+    near_low = swing_low & (prev_low >= 0) & (rows - prev_low <= lookback)
+
+    with np.errstate(invalid="ignore"):
+        bearish = near_high & (h > _at(h, prev_high)) & (osc < _at(osc, prev_high))
+        bullish = near_low & (lo < _at(lo, prev_low)) & (osc > _at(osc, prev_low))
+
+    # 擺動點需右側 width 根確認 → 訊號延後到確認根
+    return _delay(bullish, width), _delay(bearish, width)
+
+
+def momentum_oscillators(close: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """RSI(14) 與 MACD histogram (12, 26, 9)，形狀同 close
+
+    單一序列走 ta（pandas ewm，C 實作）；(n, S) 矩陣以逐欄向量化 EMA 一次推進所有幣種。
+    """
+    c = np.asarray(close, dtype=np.float64)
+    if c.ndim == 1:
+        frame = pd.DataFrame({"close": c})
+        rsi = RSIIndicator().lines(frame)["rsi"].to_numpy(dtype=np.float64)
+        hist = MACDIndicator().lines(frame)["histogram"].to_numpy(dtype=np.float64)
+        return rsi, hist
+
+    width = c.shape[1]
+    rsi = rsi_columns(c, np.full(width, RSIIndicator().period))
+    macd = MACDIndicator()
+    fast = ema_columns(c, np.full(width, macd.fast))
+    slow = ema_columns(c, np.full(width, macd.slow))
+    macd_line = fast - slow
+    signal_alpha = np.full(width, 2.0 / (macd.signal_period + 1))
+    signal = ewm_columns(macd_line, signal_alpha, macd.signal_period)
+    return rsi, macd_line - signal
+
+
+def divergence_score(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """RSI / MACD histogram 與價格的背離 → 連續分數 (-1.0 ~ +1.0)
+
+    兩種震盪指標各佔一半，訊號延續 DIVERGENCE_DECAY_BARS 根後淡出。
+    """
+    raw = np.zeros(np.shape(close))
+    for osc in momentum_oscillators(close):
+        bullish, bearish = divergence_masks(high, low, osc)
+        raw += (bullish.astype(np.float64) - bearish) * 0.5
+    return _decay(raw, DIVERGENCE_DECAY_BARS)
+
+
+def _signal(score: float) -> tuple[str, float]:
+    if score > 0.1:
+        return "bullish", min(score, 1.0)
+    if score < -0.1:
+        return "bearish", min(-score, 1.0)
+    return "neutral", 0.0
+
+
+def _latest_event(masks: dict[str, np.ndarray], max_age: int) -> tuple[str | None, int | None]:
+    """max_age 根內最近一次出現的型態名稱與距今根數"""
+    for age in range(max_age):
+        for name, mask in masks.items():
+            if len(mask) > age and mask[-1 - age]:
+                return name, age
+    return None, None
+
+
+class CandlestickPatternIndicator(BaseIndicator):
+    """K 線型態（吞噬、錘子、流星、晨星/暮星、十字線）"""
+
+    @property
+    def name(self) -> str:
+        return "Pattern"
+
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int:
+        # 趨勢回看 + 三根型態 + 訊號延續
+        return PATTERN_TREND_LOOKBACK + 2 + 2 + PATTERN_DECAY_BARS + LATEST_KEEP
+
+    @staticmethod
+    def _arrays(df: pd.DataFrame) -> tuple[np.ndarray, ...]:
+        return tuple(df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close"))
+
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        return pattern_score(*self._arrays(df))
+
+    def calculate(self, df: pd.DataFrame) -> IndicatorResult:
+        arrays = self._arrays(df)
+        score = pattern_score(*arrays)
+        latest = float(score[-1])
+        signal, strength = _signal(latest)
+
+        masks = candlestick_masks(*arrays)
+        pattern, bars_ago = _latest_event(masks, PATTERN_DECAY_BARS)
+
+        return IndicatorResult(
+            name="Pattern",
+            values={"pattern_score": pd.Series(score, index=df.index)},
+            signal=signal,
+            strength=strength,
+            continuous_score=round(latest, 4),
+            metadata={
+                "patterns": [name for name, mask in masks.items() if mask[-1]],
+                "last_pattern": pattern,
+                "bars_ago": bars_ago,
+            },
+        )
+
+
+class DivergenceIndicator(BaseIndicator):
+    """RSI / MACD 與價格背離"""
+
+    @property
+    def name(self) -> str:
+        return "Divergence"
+
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int:
+        # 震盪指標收斂 + 兩個擺動點間距 + 確認根 + 訊號延續
+        oscillator = max(
+            RSIIndicator().warmup_period(tolerance), MACDIndicator().warmup_period(tolerance)
+        )
+        return oscillator + DIVERGENCE_LOOKBACK + 2 * DIVERGENCE_WIDTH + DIVERGENCE_DECAY_BARS
+
+    @staticmethod
+    def _arrays(df: pd.DataFrame) -> tuple[np.ndarray, ...]:
+        return tuple(df[c].to_numpy(dtype=np.float64) for c in ("high", "low", "close"))
+
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        return divergence_score(*self._arrays(df))
+
+    def calculate(self, df: pd.DataFrame) -> IndicatorResult:
+        high, low, close = self._arrays(df)
+        score = divergence_score(high, low, close)
+        latest = float(score[-1])
+        signal, strength = _signal(latest)
+
+        rsi, hist = momentum_oscillators(close)
+        masks: dict[str, np.ndarray] = {}
+        for osc_name, osc in (("rsi", rsi), ("macd", hist)):
+            bullish, bearish = divergence_masks(high, low, osc)
+            masks[f"bullish_{osc_name}"] = bullish
+            masks[f"bearish_{osc_name}"] = bearish
+        divergence, bars_ago = _latest_event(masks, DIVERGENCE_DECAY_BARS)
+
+        return IndicatorResult(
+            name="Divergence",
+            values={"divergence_score": pd.Series(score, index=df.index)},
+            signal=signal,
+            strength=strength,
+            continuous_score=round(latest, 4),
+            metadata={"last_divergence": divergence, "bars_ago": bars_ago},
+        )
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from app.core.indicators.extrema import RollingExtrema, rolling_max, rolling_min
+
+# 經典 Pivot Points 預設回看 K 棒數
+PIVOT_LOOKBACK = 20
+
+
+def _levels(high: float, low: float, close: float) -> dict[str, float]:
+    """經典 Pivot Points：PP 與 R1/R2/S1/S2"""
+    pp = (high + low + close) / 3
+    return {
+        "S2": pp - (high - low),
+        "S1": 2 * pp - high,
+        "PP": pp,
+        "R1": 2 * pp - low,
+        "R2": pp + (high - low),
+    }
+
+
+def pivot_levels(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, lookback: int = PIVOT_LOOKBACK
+) -> dict[str, float]:
+    """最新一根的 Pivot Points（回看 lookback 根高低點；資料不足時用全部）"""
+    window = min(lookback, len(high))
+    hh = rolling_max(high, window)[-1]
+    ll = rolling_min(low, window)[-1]
+    return _levels(float(hh), float(ll), float(close[-1]))
+
+
+def pivot_series(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, lookback: int = PIVOT_LOOKBACK
+) -> dict[str, np.ndarray]:
+    """每一根 K 棒的 Pivot Points 序列（前 lookback-1 根為 NaN）"""
+    hh = rolling_max(high, lookback)
+    ll = rolling_min(low, lookback)
+    return _levels(hh, ll, np.asarray(close, dtype=np.float64))
+
+
+class StreamingPivot:
+    """逐根更新的 Pivot Points（高低點以單調佇列維護）"""
+
+    def __init__(self, lookback: int = PIVOT_LOOKBACK):
+        self.lookback = lookback
+        self._high = RollingExtrema(lookback, mode="max")
+        self._low = RollingExtrema(lookback, mode="min")
+
+    def update(self, high: float, low: float, close: float) -> dict[str, float] | None:
+        """推入新收盤的 K 棒，視窗未滿時回傳 None"""
+        hh = self._high.update(high)
+        ll = self._low.update(low)
+        if math.isnan(hh) or math.isnan(ll):
+            return None
+        return _levels(hh, ll, close)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import math
+from collections.abc import Collection, Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from app.core.indicators.base import BaseIndicator
+from app.core.timeframes import TIMEFRAME_MS
+
+# ── 分組加權綜合評分（連續分數版）──
+# 使用各指標的 continuous_score（-1.0 ~ +1.0）取代離散 signal×strength
+GROUP_WEIGHTS: dict[str, float] = {
+    "momentum": 0.25,    # RSI, KD, MACD
+    "trend": 0.20,       # EMA
+    "volatility": 0.10,  # BBANDS
+    "volume": 0.10,      # Volume
+    "pattern": 0.10,     # Pattern, Divergence
+    "derivatives": 0.25, # OI, LS_Ratio, Taker
+}
+
+INDICATOR_GROUP: dict[str, str] = {
+    "RSI": "momentum",
+    "KD": "momentum",
+    "MACD": "momentum",
+    "EMA": "trend",
+    "BBANDS": "volatility",
+    "Volume": "volume",
+    "Pattern": "pattern",
+    "Divergence": "pattern",
+    "OI": "derivatives",
+    "LS_Ratio": "derivatives",
+    "Taker": "derivatives",
+}
+
+# overall_score 超過 ±此值才判定為看多/看空
+SIGNAL_THRESHOLD = 0.2
+
+
+def overall_signal(score: float) -> str:
+    if score > SIGNAL_THRESHOLD:
+        return "bullish"
+    if score < -SIGNAL_THRESHOLD:
+        return "bearish"
+    return "neutral"
+
+
+def composite_score(
+    scores: Iterable[tuple[str, float]],
+    missing_groups: Collection[str] = (),
+) -> tuple[float, float]:
+    """最新一根的綜合評分與一致性
+
+    Args:
+        scores: (指標名稱, continuous_score) 序列
+        missing_groups: 資料來源缺失（逾時/失敗）的群組，其權重按比例分給其餘群組
+
+    Returns:
+        (overall_score, consensus)
+        overall_score = Σ(組內平均 × 群組權重) / Σ(未缺失群組權重)
+        consensus = 1 - std(all_scores)，std=0 → 完全一致，std≈1 → 極度分歧
+    """
+    group_values: dict[str, list[float]] = {g: [] for g in GROUP_WEIGHTS}
+    all_scores: list[float] = []
+    for name, score in scores:
+        group = INDICATOR_GROUP.get(name)
+        # 資料不足（暖機中）的指標分數為 NaN，不列入
+        if group and score is not None and math.isfinite(score):
+            group_values[group].append(score)
+            all_scores.append(score)
+
+    overall = 0.0
+    for group, weight in GROUP_WEIGHTS.items():
+        values = group_values[group]
+        if values:
+            overall += sum(values) / len(values) * weight
+
+    present_weight = sum(w for g, w in GROUP_WEIGHTS.items() if g not in missing_groups)
+    if missing_groups and present_weight > 0:
+        overall /= present_weight
+
+    if len(all_scores) >= 2:
+        mean_s = sum(all_scores) / len(all_scores)
+        variance = sum((s - mean_s) ** 2 for s in all_scores) / len(all_scores)
+        consensus = max(1.0 - math.sqrt(variance), 0.0)
+    else:
+        consensus = 1.0
+
+    return overall, consensus
+
+
+def confluence_score(scores: Mapping[str, float], base: str) -> tuple[float, float]:
+    """多週期共振評分
+
+    Args:
+        scores: {timeframe: overall_score}
+        base: 基礎（最細）週期
+
+    Returns:
+        (confluence, alignment)
+        confluence = 各週期 overall_score 加權平均，權重 1 + log2(週期 / 基礎週期)，
+                     大週期趨勢權重較高（1h/4h/1d → 1 : 3 : 5.6）
+        alignment = 與共振方向 (overall_signal) 相同的週期佔比
+    """
+    if not scores:
+        return 0.0, 0.0
+    base_ms = TIMEFRAME_MS[base]
+    weights = {tf: 1.0 + math.log2(TIMEFRAME_MS[tf] / base_ms) for tf in scores}
+    total = sum(weights.values())
+    confluence = sum(scores[tf] * w for tf, w in weights.items()) / total
+
+    direction = overall_signal(confluence)
+    alignment = sum(overall_signal(s) == direction for s in scores.values()) / len(scores)
+    return confluence, alignment
+
+
+def composite_series(score_frame: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    """composite_score 的向量化版本：每一根 K 棒的綜合評分與一致性
+
+    Args:
+        score_frame: 每欄一個指標（欄名為指標名稱）的 continuous_score，NaN 表示該根無值
+
+    與 composite_score 同尺度：每根只以「該根有值的群組」權重和正規化
+    （等同把該根無值的群組當作 missing_groups），衍生品等沒有歷史的群組不會壓低分數。
+
+    Returns:
+        (overall_score, consensus) 兩個 (n,) 陣列
+    """
+    n = len(score_frame)
+    overall = np.zeros(n)
+    present_weight = np.zeros(n)
+    named = [c for c in score_frame.columns if c in INDICATOR_GROUP]
+
+    for group, weight in GROUP_WEIGHTS.items():
+        cols = [c for c in named if INDICATOR_GROUP[c] == group]
+        if not cols:
+            continue
+        block = score_frame[cols].to_numpy(dtype=np.float64)
+        count = (~np.isnan(block)).sum(axis=1)
+        total = np.nansum(block, axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            overall += np.where(count > 0, total / count, 0.0) * weight
+        present_weight += np.where(count > 0, weight, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        overall = np.where(present_weight > 0, overall / present_weight, 0.0)
+
+    if named:
+        all_scores = score_frame[named].to_numpy(dtype=np.float64)
+        count = (~np.isnan(all_scores)).sum(axis=1)
+        with np.errstate(invalid="ignore"):
+            mean = np.nansum(all_scores, axis=1) / np.maximum(count, 1)
+            variance = np.nansum((all_scores - mean[:, None]) ** 2, axis=1) / np.maximum(count, 1)
+        consensus = np.where(count >= 2, np.maximum(1.0 - np.sqrt(variance), 0.0), 1.0)
+    else:
+        consensus = np.ones(n)
+
+    return overall, consensus
+
+
+def score_timeline(df: pd.DataFrame, indicators: Iterable[BaseIndicator]) -> pd.DataFrame:
+    """整段歷史的分數時間序列（每個指標一次向量化計算，不逐根重跑分析）
+
+    回傳 DataFrame（索引同 df）：各指標 continuous_score 欄位 + overall_score + consensus。
+    只含 K 線可推得的技術指標；衍生品沒有對應歷史，不列入。
+    """
+    frame = pd.DataFrame(index=df.index)
+    for indicator in indicators:
+        frame[indicator.name] = indicator.continuous_series(df)
+
+    overall, consensus = composite_series(frame)
+    frame["overall_score"] = overall
+    frame["consensus"] = consensus
+    return frame
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import operator
+import re
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from app.core.indicators.oscillator import RSIIndicator
+from app.core.indicators.pattern import divergence_score, pattern_score
+from app.core.indicators.scoring import composite_series
+from app.core.indicators.trend import EMAIndicator, MACDIndicator
+from app.core.indicators.vectorized import ema_columns, ewm_columns, rsi_columns
+from app.core.indicators.volatility import BollingerBandsIndicator
+
+# 每個幣種抓取的 K 線根數（足夠 MACD/EMA 收斂）
+SCREEN_BARS = 200
+# 少於此根數的幣種（新上市）不列入篩選
+MIN_SCREEN_BARS = 35
+
+# 類別型欄位的文字值
+CATEGORY_VALUES: dict[str, float] = {"bullish": 1.0, "bearish": -1.0, "none": 0.0}
+
+_OPS: dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_CONDITION_RE = re.compile(r"^\s*([a-z_]+)\s*(<=|>=|==|!=|<|>|=)\s*(\S+)\s*$")
+
+# 可篩選/排序的欄位
+SCREEN_FIELDS: dict[str, str] = {
+    "price": "最新收盤價",
+    "change": "最後一根漲跌幅 (%)",
+    "rsi": "RSI(14)",
+    "ema_fast": "EMA(9)",
+    "ema_slow": "EMA(21)",
+    "ema_trend": "EMA 多空排列 (bullish / bearish)",
+    "ema_cross": "最後一根 EMA 交叉 (bullish / bearish / none)",
+    "macd_hist": "MACD histogram (12, 26, 9)",
+    "macd_cross": "最後一根 MACD 交叉 (bullish / bearish / none)",
+    "bb_pct_b": "布林帶 %B (20, 2)",
+    "volume_ratio": "最後一根成交量 / 前 20 根均量",
+    "pattern": "K 線型態分數 (-1 ~ +1)",
+    "divergence": "RSI/MACD 背離分數 (-1 ~ +1)",
+    "score": "RSI/MACD/EMA/BBANDS/型態/背離 分組加權評分",
+}
+
+# 批次篩選使用的 OHLCV 欄位
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class Condition:
+    """單一篩選條件，例如 rsi<30、ema_cross=bullish"""
+    field: str
+    op: str
+    value: float
+
+    def evaluate(self, fields: Mapping[str, np.ndarray]) -> np.ndarray:
+        values = fields[self.field]
+        with np.errstate(invalid="ignore"):
+            mask = _OPS[self.op](values, self.value)
+        return mask & ~np.isnan(values)
+
+    def __str__(self) -> str:
+        return f"{self.field}{self.op}{self.value:g}"
+
+
+def parse_condition(spec: str) -> Condition:
+    match = _CONDITION_RE.match(spec.lower())
+    if match is None:
+        raise ValueError(
+            f"Invalid condition: {spec!r} (expected e.g. 'rsi<30' or 'ema_cross=bullish')"
+        )
+    field, op, raw = match.groups()
+    if field not in SCREEN_FIELDS:
+        raise ValueError(f"Unknown screen field: {field}. Available: {list(SCREEN_FIELDS)}")
+    if raw in CATEGORY_VALUES:
+        value = CATEGORY_VALUES[raw]
+    else:
+        try:
+            value = float(raw)
+        except ValueError:
+            raise ValueError(f"Invalid value in condition {spec!r}") from None
+    return Condition(field, op, value)
+
+
+def parse_conditions(specs: Iterable[str]) -> list[Condition]:
+    """解析多個條件（也接受以逗號連接的單一字串），條件之間為 AND"""
+    return [
+        parse_condition(part)
+        for spec in specs
+        for part in spec.split(",")
+        if part.strip()
+    ]
+
+
+def stack_tail(frames: Iterable[pd.DataFrame], column: str, length: int) -> np.ndarray:
+    """各幣種最後 length 根的某欄位 → (length, S) 矩陣，較短者左側補 NaN（尾端對齊）"""
+    frames = list(frames)
+    out = np.full((length, len(frames)), np.nan)
+    for j, df in enumerate(frames):
+        tail = df[column].to_numpy(dtype=np.float64)[-length:]
+        out[length - len(tail):, j] = tail
+    return out
+
+
+def _cross(
+    now_a: np.ndarray, now_b: np.ndarray, prev_a: np.ndarray, prev_b: np.ndarray
+) -> np.ndarray:
+    up = (now_a > now_b) & (prev_a <= prev_b)
+    down = (now_a < now_b) & (prev_a >= prev_b)
+    out = np.where(up, 1.0, np.where(down, -1.0, 0.0))
+    undefined = np.isnan(now_a) | np.isnan(prev_a) | np.isnan(now_b) | np.isnan(prev_b)
+    return np.where(undefined, np.nan, out)
+
+
+def screen_fields(columns: Mapping[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """OHLCV 各欄 (n, S) 矩陣 → 每個欄位一個 (S,) 陣列
+
+    所有幣種共用同一次時間迴圈（逐欄 EMA / Wilder 平滑），K 線型態與背離以
+    整個矩陣的布林遮罩計算，不逐幣種建立 DataFrame 或指標物件。
+    """
+    close, volume = columns["close"], columns["volume"]
+    width = close.shape[1]
+    rsi = rsi_columns(close, np.full(width, RSIIndicator().period))[-1]
+
+    ema = EMAIndicator()
+    fast = ema_columns(close, np.full(width, ema.fast_period))
+    slow = ema_columns(close, np.full(width, ema.slow_period))
+
+    macd = MACDIndicator()
+    macd_fast = (
+        fast if macd.fast == ema.fast_period else ema_columns(close, np.full(width, macd.fast))
+    )
+    macd_slow = (
+        slow if macd.slow == ema.slow_period else ema_columns(close, np.full(width, macd.slow))
+    )
+    macd_line = macd_fast - macd_slow
+    signal_alpha = np.full(width, 2.0 / (macd.signal_period + 1))
+    signal = ewm_columns(macd_line, signal_alpha, macd.signal_period)
+    hist = macd_line - signal
+
+    bb = BollingerBandsIndicator()
+    window = close[-bb.period:]
+    middle = window.mean(axis=0)
+    std = window.std(axis=0)
+    upper = middle + bb.std_dev * std
+    lower = middle - bb.std_dev * std
+    last = close[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_b = np.where(upper == lower, 0.5, (last - lower) / (upper - lower))
+        change = (last / close[-2] - 1.0) * 100
+        volume_ratio = volume[-1] / np.nanmean(volume[-21:-1], axis=0)
+
+    high, low = columns["high"], columns["low"]
+    pattern = pattern_score(columns["open"], high, low, close)[-1]
+    divergence = divergence_score(high, low, close)[-1]
+
+    scores = pd.DataFrame({
+        "RSI": RSIIndicator.continuous_array(rsi),
+        "MACD": MACDIndicator.continuous_array(hist[-1], hist[-2], last),
+        "EMA": EMAIndicator.continuous_array(fast[-1], slow[-1], fast[-2], slow[-2]),
+        "BBANDS": BollingerBandsIndicator.continuous_array(pct_b),
+        "Pattern": pattern,
+        "Divergence": divergence,
+    })
+    score, _ = composite_series(scores)
+
+    return {
+        "price": last,
+        "change": change,
+        "rsi": rsi,
+        "ema_fast": fast[-1],
+        "ema_slow": slow[-1],
+        "ema_trend": np.where(np.isnan(slow[-1]), np.nan, np.where(fast[-1] > slow[-1], 1.0, -1.0)),
+        "ema_cross": _cross(fast[-1], slow[-1], fast[-2], slow[-2]),
+        "macd_hist": hist[-1],
+        "macd_cross": _cross(macd_line[-1], signal[-1], macd_line[-2], signal[-2]),
+        "bb_pct_b": pct_b,
+        "volume_ratio": volume_ratio,
+        "pattern": pattern,
+        "divergence": divergence,
+        "score": score,
+    }
+
+
+def screen(frames: Mapping[str, pd.DataFrame], conditions: Iterable[Condition]) -> pd.DataFrame:
+    """對一批幣種計算篩選欄位並套用條件
+
+    Returns:
+        以 symbol 為索引的 DataFrame：SCREEN_FIELDS 各欄 + matched (bool)
+    """
+    symbols = list(frames)
+    if not symbols:
+        return pd.DataFrame(columns=[*SCREEN_FIELDS, "matched"])
+    length = min(SCREEN_BARS, max(len(df) for df in frames.values()))
+    columns = {c: stack_tail(frames.values(), c, length) for c in OHLCV_COLUMNS}
+    return screen_matrix(symbols, columns, conditions)
+
+
+def screen_matrix(
+    symbols: list[str],
+    columns: Mapping[str, np.ndarray],
+    conditions: Iterable[Condition],
+) -> pd.DataFrame:
+    """screen 的矩陣版本：OHLCV 各欄 (n, S) 矩陣，欄位順序同 symbols"""
+    fields = screen_fields(columns)
+    matched = np.ones(len(symbols), dtype=bool)
+    for condition in conditions:
+        matched &= condition.evaluate(fields)
+
+    table = pd.DataFrame(fields, index=pd.Index(symbols, name="symbol"))
+    table["matched"] = matched
+    return table
+
+
+def rank(table: pd.DataFrame, sort: str = "score", descending: bool = True) -> pd.DataFrame:
+    """依欄位排序（NaN 置後），加上 rank 欄"""
+    if sort not in SCREEN_FIELDS:
+        raise ValueError(f"Unknown sort field: {sort}. Available: {list(SCREEN_FIELDS)}")
+    ranked = table.sort_values(sort, ascending=not descending, na_position="last", kind="stable")
+    ranked = ranked.copy()
+    ranked["rank"] = np.arange(1, len(ranked) + 1)
+    return ranked
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import inspect
+import itertools
+import math
+from collections.abc import Callable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.core.indicators.oscillator import RSIIndicator
+from app.core.indicators.trend import EMAIndicator, MACDIndicator
+from app.core.indicators.vectorized import ema_columns, rolling_mean_std_last, rsi_columns
+from app.core.indicators.volatility import BollingerBandsIndicator
+
+# 單次參數掃描的組合數上限（避免請求打爆記憶體）
+MAX_SWEEP_COMBINATIONS = 5000
+
+
+def _grid_range(spec: str) -> list[float]:
+    """"start-stop[:step]" → 等差數列；先檢查數量再展開，避免巨大範圍在 event loop 上建立 list"""
+    try:
+        bounds, _, step_str = spec.partition(":")
+        start_str, _, stop_str = bounds.partition("-")
+        start, stop = float(start_str), float(stop_str)
+        step = float(step_str) if step_str else 1.0
+    except ValueError:
+        raise ValueError(f"Invalid grid spec: {spec!r}") from None
+    if not all(map(math.isfinite, (start, stop, step))) or step <= 0 or stop < start:
+        raise ValueError(f"Invalid grid spec: {spec!r}")
+
+    count = int(round((stop - start) / step)) + 1
+    if count > MAX_SWEEP_COMBINATIONS:
+        raise ValueError(f"Grid spec {spec!r} has {count} values (max {MAX_SWEEP_COMBINATIONS})")
+    return [start + i * step for i in range(count)]
+
+
+def parse_grid_values(spec: str) -> list[float]:
+    """解析單一參數的網格字串
+
+    支援格式：
+        "5-50"      → 5, 6, ..., 50
+        "10-60:5"   → 10, 15, ..., 60
+        "9,12,26"   → 9, 12, 26
+    整數網格回傳 int，否則回傳 float
+    """
+    spec = spec.strip()
+    if "," in spec or "-" not in spec:
+        try:
+            values = [float(v) for v in spec.split(",") if v.strip()]
+        except ValueError:
+            raise ValueError(f"Invalid grid spec: {spec!r}") from None
+        if not all(map(math.isfinite, values)):
+            raise ValueError(f"Invalid grid spec: {spec!r}")
+    else:
+        values = _grid_range(spec)
+
+    if all(v.is_integer() for v in values):
+        return [int(v) for v in values]
+    return values
+
+
+def _defaults(indicator_cls: type) -> dict[str, object]:
+    """取得指標建構子的預設參數"""
+    sig = inspect.signature(indicator_cls.__init__)
+    return {
+        name: p.default
+        for name, p in sig.parameters.items()
+        if name != "self" and p.default is not inspect.Parameter.empty
+    }
+
+
+def _expand(grid: dict[str, Sequence], names: Sequence[str], defaults: dict) -> pd.DataFrame:
+    """參數網格 → 每列一組參數的 DataFrame（未指定的參數用預設值）"""
+    unknown = set(grid) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}. Available: {list(names)}")
+
+    axes = [list(grid.get(name, [defaults[name]])) for name in names]
+    if any(len(a) == 0 for a in axes):
+        raise ValueError("Sweep grid must not contain empty parameter lists")
+
+    total = int(np.prod([len(a) for a in axes]))
+    if total > MAX_SWEEP_COMBINATIONS:
+        raise ValueError(
+            f"Sweep grid too large: {total} combinations (max {MAX_SWEEP_COMBINATIONS})"
+        )
+    return pd.DataFrame(list(itertools.product(*axes)), columns=list(names))
+
+
+def _check_periods(params: pd.DataFrame, columns: Sequence[str], label: str) -> None:
+    for col in columns:
+        if (params[col] < 1).any():
+            raise ValueError(f"{label} {col} must be >= 1")
+
+
+def _last_two(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(n, P) → 最後一列與倒數第二列"""
+    if matrix.shape[0] < 2:
+        raise ValueError("Not enough bars for sweep")
+    return matrix[-1], matrix[-2]
+
+
+def sweep_rsi(df: pd.DataFrame, grid: dict[str, Sequence]) -> pd.DataFrame:
+    params = _expand(grid, SWEEP_PARAMS["rsi"], _defaults(RSIIndicator))
+    _check_periods(params, ["period"], "RSI")
+    periods = params["period"].to_numpy(dtype=np.int64)
+
+    rsi = rsi_columns(df["close"].to_numpy(dtype=np.float64), periods)[-1]
+    params["rsi"] = rsi
+    params["continuous_score"] = RSIIndicator.continuous_array(rsi)
+    return params
+
+
+def sweep_ema(df: pd.DataFrame, grid: dict[str, Sequence]) -> pd.DataFrame:
+    params = _expand(grid, SWEEP_PARAMS["ema"], _defaults(EMAIndicator))
+    _check_periods(params, ["fast_period", "slow_period"], "EMA")
+    params = params[params["fast_period"] < params["slow_period"]].reset_index(drop=True)
+    if params.empty:
+        raise ValueError("EMA sweep needs at least one pair with fast_period < slow_period")
+
+    # 每個不重複週期只算一次 EMA，快慢線再依索引取欄
+    unique = np.unique(params[["fast_period", "slow_period"]].to_numpy(dtype=np.int64))
+    ema = ema_columns(df["close"].to_numpy(dtype=np.float64), unique)
+    fi = np.searchsorted(unique, params["fast_period"].to_numpy())
+    si = np.searchsorted(unique, params["slow_period"].to_numpy())
+
+    now, prev = _last_two(ema)
+    params["ema_fast"] = now[fi]
+    params["ema_slow"] = now[si]
+    params["continuous_score"] = EMAIndicator.continuous_array(now[fi], now[si], prev[fi], prev[si])
+    return params
+
+
+def sweep_macd(df: pd.DataFrame, grid: dict[str, Sequence]) -> pd.DataFrame:
+    params = _expand(grid, SWEEP_PARAMS["macd"], _defaults(MACDIndicator))
+    _check_periods(params, ["fast", "slow", "signal_period"], "MACD")
+    params = params[params["fast"] < params["slow"]].reset_index(drop=True)
+    if params.empty:
+        raise ValueError("MACD sweep needs at least one combination with fast < slow")
+
+    close = df["close"].to_numpy(dtype=np.float64)
+    unique = np.unique(params[["fast", "slow"]].to_numpy(dtype=np.int64))
+    ema = ema_columns(close, unique)
+    fi = np.searchsorted(unique, params["fast"].to_numpy())
+    si = np.searchsorted(unique, params["slow"].to_numpy())
+
+    # 每組參數一欄 MACD 線，signal 線對所有欄一次平滑
+    macd = ema[:, fi] - ema[:, si]
+    signal = ema_columns(macd, params["signal_period"].to_numpy(dtype=np.int64))
+    hist = macd - signal
+
+    macd_now, _ = _last_two(macd)
+    signal_now, _ = _last_two(signal)
+    hist_now, hist_prev = _last_two(hist)
+    params["macd"] = macd_now
+    params["signal"] = signal_now
+    params["histogram"] = hist_now
+    params["continuous_score"] = MACDIndicator.continuous_array(hist_now, hist_prev, close[-1])
+    return params
+
+
+def sweep_bbands(df: pd.DataFrame, grid: dict[str, Sequence]) -> pd.DataFrame:
+    params = _expand(grid, SWEEP_PARAMS["bbands"], _defaults(BollingerBandsIndicator))
+    _check_periods(params, ["period"], "Bollinger")
+    close = df["close"].to_numpy(dtype=np.float64)
+    mean, std = rolling_mean_std_last(close, params["period"].to_numpy(dtype=np.int64))
+    dev = params["std_dev"].to_numpy(dtype=np.float64)
+
+    upper = mean + dev * std
+    lower = mean - dev * std
+    width = upper - lower
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_b = np.where(width != 0, (close[-1] - lower) / width, 0.5)
+    pct_b[np.isnan(mean)] = np.nan
+
+    params["upper"] = upper
+    params["middle"] = mean
+    params["lower"] = lower
+    params["percent_b"] = pct_b
+    params["continuous_score"] = BollingerBandsIndicator.continuous_array(pct_b)
+    return params
+
+
+# 各指標可掃描的參數
+SWEEP_PARAMS: dict[str, list[str]] = {
+    "rsi": ["period"],
+    "ema": ["fast_period", "slow_period"],
+    "macd": ["fast", "slow", "signal_period"],
+    "bbands": ["period", "std_dev"],
+}
+
+# 支援參數掃描的指標 (名稱同 AVAILABLE_INDICATORS)
+SWEEPS: dict[str, Callable[[pd.DataFrame, dict[str, Sequence]], pd.DataFrame]] = {
+    "rsi": sweep_rsi,
+    "ema": sweep_ema,
+    "macd": sweep_macd,
+    "bbands": sweep_bbands,
+}
+
+
+def sweep_indicator(name: str, df: pd.DataFrame, grid: dict[str, Sequence]) -> pd.DataFrame:
+    """對同一份 OHLCV 一次計算整組參數網格
+
+    Args:
+        name: 指標名稱 (rsi, ema, macd, bbands)
+        df: OHLCV DataFrame
+        grid: 參數名稱 → 候選值，例如 {"period": range(5, 51)}
+
+    Returns:
+        tidy DataFrame：每列一組參數，含各輸出線最新值與 continuous_score
+    """
+    fn = SWEEPS.get(name.lower())
+    if fn is None:
+        raise ValueError(f"Sweep not supported for: {name}. Available: {list(SWEEPS.keys())}")
+    return fn(df, grid)
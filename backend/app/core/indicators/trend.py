@@ -1,12 +1,18 @@
 from __future__ import annotations
 
-import math
-
+import numpy as np
 import pandas as pd
 from ta.trend import MACD as _MACD
 from ta.trend import EMAIndicator as _EMA
 
-from app.core.indicators.base import BaseIndicator, IndicatorResult
+from app.core.indicators.base import (
+    DEFAULT_WARMUP_TOLERANCE,
+    LATEST_KEEP,
+    BaseIndicator,
+    IndicatorResult,
+    ema_warmup,
+    shift_prev,
+)
 
 
 class MACDIndicator(BaseIndicator):
@@ -21,33 +27,58 @@ class MACDIndicator(BaseIndicator):
     def name(self) -> str:
         return "MACD"
 
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int:
+        # 慢線 EMA 收斂後，signal EMA 還需要再收斂一次
+        slow = max(self.slow, ema_warmup(2 / (self.slow + 1), tolerance))
+        signal = ema_warmup(2 / (self.signal_period + 1), tolerance)
+        return slow + signal + LATEST_KEEP
+
     @staticmethod
-    def _continuous(hist_now: float, hist_prev: float, close_now: float) -> float:
-        """MACD histogram → 連續分數 (-1.0 ~ +1.0)
+    def continuous_array(
+        hist_now: np.ndarray, hist_prev: np.ndarray, close_now: np.ndarray
+    ) -> np.ndarray:
+        """MACD histogram → 連續分數 (-1.0 ~ +1.0)，逐元素計算
         用 tanh 平滑映射 histogram 佔價格的百分比
         """
-        if close_now <= 0:
-            return 0.0
-        hist_pct = hist_now / close_now * 100
-        base = math.tanh(hist_pct * 2.0)
+        hist_now, hist_prev, close_now = np.broadcast_arrays(
+            np.asarray(hist_now, dtype=np.float64),
+            np.asarray(hist_prev, dtype=np.float64),
+            np.asarray(close_now, dtype=np.float64),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            hist_pct = hist_now / close_now * 100
+        base = np.tanh(hist_pct * 2.0)
         # 動量加成: histogram 方向加強/減弱
-        if (hist_now > 0 and hist_now > hist_prev) or (hist_now < 0 and hist_now < hist_prev):
-            base *= 1.15
-        elif (hist_now > 0 and hist_now < hist_prev) or (hist_now < 0 and hist_now > hist_prev):
-            base *= 0.85
-        return max(min(base, 1.0), -1.0)
+        growing = ((hist_now > 0) & (hist_now > hist_prev)) | (
+            (hist_now < 0) & (hist_now < hist_prev)
+        )
+        fading = ((hist_now > 0) & (hist_now < hist_prev)) | (
+            (hist_now < 0) & (hist_now > hist_prev)
+        )
+        base = np.where(growing, base * 1.15, np.where(fading, base * 0.85, base))
+        out = np.clip(base, -1.0, 1.0)
+        return np.where(close_now <= 0, 0.0, out)
 
-    def calculate(self, df: pd.DataFrame) -> IndicatorResult:
+    @classmethod
+    def _continuous(cls, hist_now: float, hist_prev: float, close_now: float) -> float:
+        return float(cls.continuous_array(hist_now, hist_prev, close_now))
+
+    def lines(self, df: pd.DataFrame) -> dict[str, pd.Series]:
         macd = _MACD(
             close=df["close"],
             window_slow=self.slow,
             window_fast=self.fast,
             window_sign=self.signal_period,
         )
+        return {"macd": macd.macd(), "signal": macd.macd_signal(), "histogram": macd.macd_diff()}
+
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        hist = self.lines(df)["histogram"].to_numpy(dtype=np.float64)
+        return self.continuous_array(hist, shift_prev(hist), df["close"].to_numpy(dtype=np.float64))
 
-        macd_line = macd.macd()
-        signal_line = macd.macd_signal()
-        histogram = macd.macd_diff()
+    def calculate(self, df: pd.DataFrame) -> IndicatorResult:
+        lines = self.lines(df)
+        macd_line, signal_line, histogram = lines["macd"], lines["signal"], lines["histogram"]
 
         macd_now = float(macd_line.iloc[-1])
         signal_now = float(signal_line.iloc[-1])
@@ -93,28 +124,52 @@ class EMAIndicator(BaseIndicator):
     def name(self) -> str:
         return "EMA"
 
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int:
+        slow = max(self.fast_period, self.slow_period)
+        return max(slow, ema_warmup(2 / (slow + 1), tolerance)) + LATEST_KEEP
+
     @staticmethod
-    def _continuous(fast_now: float, slow_now: float,
-                    fast_prev: float, slow_prev: float) -> float:
-        """EMA 交叉 → 連續分數 (-1.0 ~ +1.0)
+    def continuous_array(fast_now: np.ndarray, slow_now: np.ndarray,
+                         fast_prev: np.ndarray, slow_prev: np.ndarray) -> np.ndarray:
+        """EMA 交叉 → 連續分數 (-1.0 ~ +1.0)，逐元素計算
         fast-slow 差距佔 slow 的百分比 + 交叉加成
         """
-        if slow_now <= 0:
-            return 0.0
-        spread_pct = (fast_now - slow_now) / slow_now * 100
-        base = math.tanh(spread_pct * 1.5)
+        fast_now, slow_now, fast_prev, slow_prev = np.broadcast_arrays(
+            *(np.asarray(a, dtype=np.float64) for a in (fast_now, slow_now, fast_prev, slow_prev))
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spread_pct = (fast_now - slow_now) / slow_now * 100
+        base = np.tanh(spread_pct * 1.5)
         # 交叉加成 ±0.2
-        cross_up = fast_now > slow_now and fast_prev <= slow_prev
-        cross_down = fast_now < slow_now and fast_prev >= slow_prev
-        if cross_up:
-            base = min(base + 0.2, 1.0)
-        elif cross_down:
-            base = max(base - 0.2, -1.0)
-        return base
+        cross_up = (fast_now > slow_now) & (fast_prev <= slow_prev)
+        cross_down = (fast_now < slow_now) & (fast_prev >= slow_prev)
+        base = np.where(
+            cross_up,
+            np.minimum(base + 0.2, 1.0),
+            np.where(cross_down, np.maximum(base - 0.2, -1.0), base),
+        )
+        return np.where(slow_now <= 0, 0.0, base)
+
+    @classmethod
+    def _continuous(cls, fast_now: float, slow_now: float,
+                    fast_prev: float, slow_prev: float) -> float:
+        return float(cls.continuous_array(fast_now, slow_now, fast_prev, slow_prev))
+
+    def lines(self, df: pd.DataFrame) -> dict[str, pd.Series]:
+        return {
+            "ema_fast": _EMA(close=df["close"], window=self.fast_period).ema_indicator(),
+            "ema_slow": _EMA(close=df["close"], window=self.slow_period).ema_indicator(),
+        }
+
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        lines = self.lines(df)
+        fast = lines["ema_fast"].to_numpy(dtype=np.float64)
+        slow = lines["ema_slow"].to_numpy(dtype=np.float64)
+        return self.continuous_array(fast, slow, shift_prev(fast), shift_prev(slow))
 
     def calculate(self, df: pd.DataFrame) -> IndicatorResult:
-        ema_fast = _EMA(close=df["close"], window=self.fast_period).ema_indicator()
-        ema_slow = _EMA(close=df["close"], window=self.slow_period).ema_indicator()
+        lines = self.lines(df)
+        ema_fast, ema_slow = lines["ema_fast"], lines["ema_slow"]
 
         fast_now = float(ema_fast.iloc[-1])
         slow_now = float(ema_slow.iloc[-1])
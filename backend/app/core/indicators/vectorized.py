@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def as_columns(x: np.ndarray, width: int) -> np.ndarray:
+    """將 (n,) 或 (n, 1) 陣列廣播為 (n, width) float64 矩陣"""
+    x = np.asarray(x, dtype=np.float64)
+    if x.ndim == 1:
+        x = x[:, None]
+    return np.broadcast_to(x, (x.shape[0], width))
+
+
+def ewm_columns(
+    x: np.ndarray, alpha: np.ndarray, min_periods: np.ndarray | int = 0
+) -> np.ndarray:
+    """逐欄 EMA — 等同 pandas ewm(alpha=α, adjust=False, min_periods=...)
+
+    一次時間迴圈同時推進所有欄位（每欄各自的 α），
+    各欄開頭的 NaN 會被跳過，從第一個有效值起算。
+
+    Args:
+        x: (n,) 或 (n, P) 輸入
+        alpha: (P,) 每欄的平滑係數
+        min_periods: 純量或 (P,)，有效觀測數不足時輸出 NaN
+
+    Returns:
+        (n, P) 矩陣
+    """
+    alpha = np.asarray(alpha, dtype=np.float64)
+    xb = as_columns(x, alpha.shape[0])
+    n, width = xb.shape
+    out = np.empty((n, width), dtype=np.float64)
+    state = np.full(width, np.nan)
+    decay = 1.0 - alpha
+
+    for t in range(n):
+        xt = xb[t]
+        valid = ~np.isnan(xt)
+        blended = alpha * xt + decay * state
+        state = np.where(valid, np.where(np.isnan(state), xt, blended), state)
+        out[t] = state
+
+    counts = np.cumsum(~np.isnan(xb), axis=0)
+    out[counts < np.asarray(min_periods)] = np.nan
+    return out
+
+
+def ema_columns(x: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """逐欄 EMA (span=period)，與 ta 的 EMA 相同：α = 2/(period+1)，min_periods=period"""
+    periods = np.asarray(periods, dtype=np.int64)
+    return ewm_columns(x, 2.0 / (periods + 1.0), periods)
+
+
+def rsi_columns(close: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """逐欄 RSI（Wilder 平滑，與 ta.momentum.RSIIndicator 相同）
+
+    close 可為 (n,)（同一價格、多個週期）或 (n, P)（每欄各自的價格序列）
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    close = as_columns(close, periods.shape[0])
+    diff = np.vstack([np.full((1, close.shape[1]), np.nan), np.diff(close, axis=0)])
+    with np.errstate(invalid="ignore"):
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+    # ta 的 diff.where(...) 會把第一根的 NaN 轉成 0，但保留價格本身缺值
+    missing = np.isnan(close)
+    up[missing] = np.nan
+    down[missing] = np.nan
+
+    alpha = 1.0 / periods
+    ema_up = ewm_columns(up, alpha, periods)
+    ema_down = ewm_columns(down, alpha, periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(ema_down == 0, 100.0, 100.0 - 100.0 / (1.0 + ema_up / ema_down))
+    rsi[np.isnan(ema_up) | np.isnan(ema_down)] = np.nan
+    return rsi
+
+
+def rolling_mean_std_last(x: np.ndarray, windows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """多個視窗長度的最後一根滾動平均與母體標準差 (ddof=0)
+
+    以尾端前綴和一次求出所有視窗；先減去最後一個值再累加以降低相消誤差。
+    視窗長度超過資料長度的欄位回傳 NaN。
+    """
+    x = np.asarray(x, dtype=np.float64)
+    windows = np.asarray(windows, dtype=np.int64)
+    n = len(x)
+    ok = windows <= n
+    if n == 0 or not ok.any():
+        nan = np.full(windows.shape, np.nan)
+        return nan, nan.copy()
+
+    span = int(windows[ok].max())
+    anchor = x[-1]
+    tail = x[-span:][::-1] - anchor  # 由新到舊
+    csum = np.cumsum(tail)
+    csum2 = np.cumsum(tail * tail)
+
+    w = np.where(ok, windows, 1)
+    mean_shifted = csum[w - 1] / w
+    var = np.maximum(csum2[w - 1] / w - mean_shifted * mean_shifted, 0.0)
+    mean = mean_shifted + anchor
+    std = np.sqrt(var)
+    mean[~ok] = np.nan
+    std[~ok] = np.nan
+    return mean, std
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 from ta.volatility import BollingerBands
 
-from app.core.indicators.base import BaseIndicator, IndicatorResult
+from app.core.indicators.base import (
+    DEFAULT_WARMUP_TOLERANCE,
+    LATEST_KEEP,
+    BaseIndicator,
+    IndicatorResult,
+)
 
 
 class BollingerBandsIndicator(BaseIndicator):
@@ -17,35 +23,60 @@ class BollingerBandsIndicator(BaseIndicator):
     def name(self) -> str:
         return "BBANDS"
 
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> int:
+        return self.period + LATEST_KEEP
+
     @staticmethod
-    def _continuous(pct_b: float) -> float:
-        """%B → 連續分數 (-1.0 ~ +1.0)
+    def continuous_array(pct_b: np.ndarray) -> np.ndarray:
+        """%B → 連續分數 (-1.0 ~ +1.0)，逐元素計算
         %B=0 (下軌) → +0.5, %B=0.5 (中線) → 0.0, %B=1 (上軌) → -0.5
         突破上下軌則趨向 ±1.0
         """
-        if pct_b <= 0.0:
-            return min(0.5 + abs(pct_b) * 0.5, 1.0)
-        elif pct_b <= 0.2:
-            return 0.5 - (pct_b / 0.2) * 0.15  # [0.35, 0.5]
-        elif pct_b <= 0.5:
-            return (0.5 - pct_b) / 0.3 * 0.35  # [0.0, 0.35]
-        elif pct_b <= 0.8:
-            return -((pct_b - 0.5) / 0.3 * 0.35)  # [-0.35, 0.0]
-        elif pct_b <= 1.0:
-            return -(0.35 + (pct_b - 0.8) / 0.2 * 0.15)  # [-0.5, -0.35]
-        else:
-            return max(-(0.5 + (pct_b - 1.0) * 0.5), -1.0)
+        pct_b = np.asarray(pct_b, dtype=np.float64)
+        out = np.select(
+            [pct_b <= 0.0, pct_b <= 0.2, pct_b <= 0.5, pct_b <= 0.8, pct_b <= 1.0],
+            [
+                np.minimum(0.5 + np.abs(pct_b) * 0.5, 1.0),
+                0.5 - (pct_b / 0.2) * 0.15,  # [0.35, 0.5]
+                (0.5 - pct_b) / 0.3 * 0.35,  # [0.0, 0.35]
+                -((pct_b - 0.5) / 0.3 * 0.35),  # [-0.35, 0.0]
+                -(0.35 + (pct_b - 0.8) / 0.2 * 0.15),  # [-0.5, -0.35]
+            ],
+            default=np.maximum(-(0.5 + (pct_b - 1.0) * 0.5), -1.0),
+        )
+        out[np.isnan(pct_b)] = np.nan
+        return out
 
-    def calculate(self, df: pd.DataFrame) -> IndicatorResult:
+    @classmethod
+    def _continuous(cls, pct_b: float) -> float:
+        return float(cls.continuous_array(np.array([pct_b]))[0])
+
+    def lines(self, df: pd.DataFrame) -> dict[str, pd.Series]:
         bb = BollingerBands(
             close=df["close"],
             window=self.period,
-            window_dev=int(self.std_dev),
+            window_dev=self.std_dev,
         )
+        return {
+            "upper": bb.bollinger_hband(),
+            "middle": bb.bollinger_mavg(),
+            "lower": bb.bollinger_lband(),
+        }
+
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        lines = self.lines(df)
+        upper = lines["upper"].to_numpy(dtype=np.float64)
+        lower = lines["lower"].to_numpy(dtype=np.float64)
+        close = df["close"].to_numpy(dtype=np.float64)
+        width = upper - lower
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct_b = np.where(width != 0, (close - lower) / width, 0.5)
+        pct_b[np.isnan(width)] = np.nan
+        return self.continuous_array(pct_b)
 
-        upper = bb.bollinger_hband()
-        mid = bb.bollinger_mavg()
-        lower = bb.bollinger_lband()
+    def calculate(self, df: pd.DataFrame) -> IndicatorResult:
+        lines = self.lines(df)
+        upper, mid, lower = lines["upper"], lines["middle"], lines["lower"]
 
         close_now = float(df["close"].iloc[-1])
         upper_now = float(upper.iloc[-1])
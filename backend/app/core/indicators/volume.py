@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-import math
-
+import numpy as np
 import pandas as pd
 from ta.volume import OnBalanceVolumeIndicator
 
-from app.core.indicators.base import BaseIndicator, IndicatorResult
+from app.core.indicators.base import (
+    DEFAULT_WARMUP_TOLERANCE,
+    BaseIndicator,
+    IndicatorResult,
+    shift_prev,
+)
+
+# OBV / 價格趨勢比較的回看距離（與 4 根前比較）
+TREND_LOOKBACK = 4
 
 
 class VolumeAnalysis(BaseIndicator):
@@ -18,6 +25,48 @@ class VolumeAnalysis(BaseIndicator):
     def name(self) -> str:
         return "Volume"
 
+    def warmup_period(self, tolerance: float = DEFAULT_WARMUP_TOLERANCE) -> None:
+        # OBV 為自序列起點累積的值，截斷歷史會改變其數值
+        return None
+
+    @staticmethod
+    def continuous_array(
+        obv_rising: np.ndarray, price_rising: np.ndarray, vol_ratio: np.ndarray
+    ) -> np.ndarray:
+        """量價 → 連續分數 (-1.0 ~ +1.0)，逐元素計算
+        OBV 方向 × 成交量放大倍率；量價同向加強，量價背離取 OBV 方向但減弱
+        """
+        obv_dir = np.where(obv_rising, 1.0, -1.0)
+        price_dir = np.where(price_rising, 1.0, -1.0)
+        expansion = np.tanh((np.asarray(vol_ratio, dtype=np.float64) - 1.0) * 1.5)
+        cscore = np.where(
+            obv_dir == price_dir,
+            obv_dir * expansion * 0.6 + obv_dir * 0.2,
+            obv_dir * 0.3 * expansion,
+        )
+        return np.clip(cscore, -1.0, 1.0)
+
+    def continuous_series(self, df: pd.DataFrame) -> np.ndarray:
+        volume = df["volume"].to_numpy(dtype=np.float64)
+        close = df["close"].to_numpy(dtype=np.float64)
+        obv = OnBalanceVolumeIndicator(
+            close=df["close"], volume=df["volume"]
+        ).on_balance_volume().to_numpy(dtype=np.float64)
+        vol_ma = df["volume"].rolling(window=self.ma_period).mean().to_numpy(dtype=np.float64)
+
+        vol_ma = np.where(np.isnan(vol_ma), volume, vol_ma)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vol_ratio = np.where(vol_ma > 0, volume / vol_ma, 1.0)
+
+        # 前 TREND_LOOKBACK 根沒有比較基準：OBV 視為未上升、價格視為上升
+        has_prev = np.arange(len(df)) > TREND_LOOKBACK
+        obv_rising = has_prev & (obv > shift_prev(obv, TREND_LOOKBACK))
+        price_rising = ~has_prev | (close > shift_prev(close, TREND_LOOKBACK))
+
+        scores = self.continuous_array(obv_rising, price_rising, vol_ratio)
+        # 截至該根成交量仍全為 0（如 CoinGecko OHLC）→ 中性
+        return np.where(np.cumsum(volume) == 0, 0.0, scores)
+
     def calculate(self, df: pd.DataFrame) -> IndicatorResult:
         volume = df["volume"]
 
@@ -37,14 +86,19 @@ class VolumeAnalysis(BaseIndicator):
         vol_now = float(volume.iloc[-1])
         vol_ma_now = float(volume_ma.iloc[-1]) if not pd.isna(volume_ma.iloc[-1]) else vol_now
         obv_now = float(obv.iloc[-1])
-        obv_prev = float(obv.iloc[-5]) if len(obv) > 5 else obv_now
+        obv_prev = (
+            float(obv.iloc[-1 - TREND_LOOKBACK]) if len(obv) > TREND_LOOKBACK + 1 else obv_now
+        )
 
         # 相對成交量比率
         vol_ratio = vol_now / vol_ma_now if vol_ma_now > 0 else 1.0
 
         # OBV 趨勢
         obv_rising = obv_now > obv_prev
-        price_rising = float(df["close"].iloc[-1]) > float(df["close"].iloc[-5]) if len(df) > 5 else True
+        price_rising = (
+            float(df["close"].iloc[-1]) > float(df["close"].iloc[-1 - TREND_LOOKBACK])
+            if len(df) > TREND_LOOKBACK + 1 else True
+        )
 
         # 量價配合判斷
         if obv_rising and price_rising and vol_ratio > 1.5:
@@ -63,14 +117,7 @@ class VolumeAnalysis(BaseIndicator):
             signal, strength = "neutral", 0.0
 
         # 連續分數: OBV 方向 × 成交量放大倍率
-        obv_dir = 1.0 if obv_rising else -1.0
-        price_dir = 1.0 if price_rising else -1.0
-        # 量價同向加強，量價背離取 OBV 方向但減弱
-        if obv_dir == price_dir:
-            cscore = obv_dir * math.tanh((vol_ratio - 1.0) * 1.5) * 0.6 + obv_dir * 0.2
-        else:
-            cscore = obv_dir * 0.3 * math.tanh((vol_ratio - 1.0) * 1.5)
-        cscore = max(min(cscore, 1.0), -1.0)
+        cscore = float(self.continuous_array(obv_rising, price_rising, vol_ratio))
 
         return IndicatorResult(
             name="Volume",
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import pandas as pd
+
+# K 線週期 → 毫秒
+TIMEFRAME_MS: dict[str, int] = {
+    "15m": 900_000, "30m": 1_800_000,
+    "1h": 3_600_000, "2h": 7_200_000, "4h": 14_400_000, "12h": 43_200_000,
+    "1d": 86_400_000, "3d": 259_200_000, "1w": 604_800_000,
+}
+TIMEFRAME_PATTERN = "^(15m|30m|1h|2h|4h|12h|1d|3d|1w)$"
+
+YEAR_MS = 365 * 86_400_000
+
+
+def to_datetime_index(index: pd.Index) -> pd.DatetimeIndex:
+    """任意時間索引 → UTC DatetimeIndex（L2 快取還原的 DataFrame 索引為字串）"""
+    if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+        return index.tz_convert("UTC")
+    return pd.DatetimeIndex(pd.to_datetime(index, utc=True))
+
+
+def bars_per_year(timeframe: str) -> float:
+    """每年 K 棒數（加密貨幣 24/7 交易）"""
+    return YEAR_MS / TIMEFRAME_MS[timeframe]
+
+
+def base_timeframe(timeframes: Iterable[str]) -> str:
+    """能整除所有週期的最大可用週期（通常就是其中最細的週期）
+
+    例如 {1h, 4h, 1d} → 1h；{3d, 1w} → 1d（1w 不是 3d 的整數倍）
+    """
+    wanted = [TIMEFRAME_MS[tf] for tf in timeframes]
+    if not wanted:
+        raise ValueError("At least one timeframe is required")
+    candidates = [
+        tf for tf, ms in TIMEFRAME_MS.items()
+        if all(w % ms == 0 for w in wanted)
+    ]
+    if not candidates:
+        raise ValueError(f"No common base timeframe for {list(timeframes)}")
+    return max(candidates, key=TIMEFRAME_MS.__getitem__)
+
+
+# 週 K 以週一 00:00 UTC 開盤（與 Binance 相同）；其餘週期對齊 unix epoch
+_WEEK_ORIGIN = pd.Timestamp("1970-01-05", tz="UTC")
+_WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def last_candle_close(now_ms: int, timeframe: str) -> int:
+    """now_ms 之前（含）最近一次 K 棒收盤時間 = 目前這根的開盤時間 (ms)"""
+    tf_ms = TIMEFRAME_MS[timeframe]
+    offset = _WEEK_OFFSET_MS if timeframe == "1w" else 0
+    return (now_ms - offset) // tf_ms * tf_ms + offset
+
+
+def next_candle_close(now_ms: int, timeframe: str) -> int:
+    """now_ms 之後下一次 K 棒收盤時間 (ms)"""
+    return last_candle_close(now_ms, timeframe) + TIMEFRAME_MS[timeframe]
+
+
+def resample_ohlcv(df: pd.DataFrame, source: str, target: str) -> pd.DataFrame:
+    """將較細週期 K 線聚合成較大週期（open first / high max / low min / close last / volume sum）
+
+    開頭若從桶中間開始（基礎資料不足一整根）會捨棄該根；最後一根未收盤 K 棒保留，
+    與交易所回傳的行為一致。
+    """
+    src_ms, dst_ms = TIMEFRAME_MS[source], TIMEFRAME_MS[target]
+    if dst_ms % src_ms:
+        raise ValueError(f"Cannot resample {source} into {target}")
+    if dst_ms == src_ms or df.empty:
+        return df
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is None:
+        index = index.tz_localize("UTC")
+    grouped = df.set_axis(index).resample(
+        pd.Timedelta(milliseconds=dst_ms),
+        origin=_WEEK_ORIGIN if target == "1w" else "epoch",
+        label="left",
+        closed="left",
+    )
+    out = grouped.agg({
+        "open": "first",
+        "high": "max",
+        "low": "min",
+        "close": "last",
+        "volume": "sum",
+    })
+    counts = grouped["close"].count()
+    complete_first = counts.iloc[0] >= dst_ms // src_ms
+    out = out[counts > 0]
+    if not complete_first:
+        out = out.iloc[1:]
+    out.index.name = df.index.name
+    return out
@@ -1,25 +1,52 @@
 from __future__ import annotations
+import asyncio
 import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
 
 import pandas as pd
 
+from app.config import settings
 from app.data.base import MarketDataProvider
+from app.data.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.data.hedging import HedgeBudget
 
 logger = logging.getLogger(__name__)
 
 
+def _consume(task: asyncio.Task) -> None:
+    # 被放棄的 task 也取出例外，避免 "exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
 class DataAggregator:
-    """數據聚合器 — 多來源整合、自動降級"""
+    """數據聚合器 — 多來源整合、自動降級
+
+    每個來源各有一個斷路器：主要來源錯誤率或延遲過高時斷路器開啟，
+    之後的請求直接走備援，不必先等主要來源失敗。
+
+    啟用對沖（hedge）時，主要來源超過其 p90 延遲仍未回應就並行呼叫備援，
+    取先成功的結果並取消另一個；額外請求量受 HedgeBudget 比例限制。
+    """
 
     def __init__(
         self,
         providers: dict[str, MarketDataProvider],
         primary: str = "ccxt",
         fallback: str = "coingecko",
+        hedge: Optional[bool] = None,
     ):
         self._providers = providers
         self._primary = primary
         self._fallback = fallback
+        self._breakers = {name: CircuitBreaker(name) for name in providers}
+        self._hedge = settings.hedge_enabled if hedge is None else hedge
+        self._budget = HedgeBudget()
+
+    @property
+    def primary(self) -> str:
+        return self._primary
 
     def _get_provider(self, name: str) -> MarketDataProvider:
         provider = self._providers.get(name)
@@ -27,6 +54,119 @@ class DataAggregator:
             raise ValueError(f"Unknown provider: {name}")
         return provider
 
+    def health(self) -> dict[str, dict]:
+        """各來源斷路器狀態與健康分數"""
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
+
+    def hedge_stats(self) -> dict:
+        return {"enabled": self._hedge, **self._budget.stats()}
+
+    async def _call(
+        self,
+        name: str,
+        fn: Callable[[MarketDataProvider], Awaitable[Any]],
+        probe: bool = False,
+    ) -> Any:
+        """呼叫來源並記錄成功 / 失敗與延遲（指定 provider 時也計入，但不略過）
+
+        probe: 此呼叫為斷路器 half_open 放行的探測請求，結果決定斷路器狀態
+        """
+        provider = self._get_provider(name)
+        breaker = self._breakers[name]
+        t0 = time.monotonic()
+        try:
+            result = await fn(provider)
+        except Exception:
+            breaker.record(False, time.monotonic() - t0, probe)
+            raise
+        except BaseException:
+            breaker.release(probe)
+            raise
+        breaker.record(True, time.monotonic() - t0, probe)
+        return result
+
+    async def _with_fallback(
+        self, fn: Callable[[MarketDataProvider], Awaitable[Any]]
+    ) -> Any:
+        """依序嘗試主要 / 備援來源，略過斷路器開啟中的來源"""
+        if self._hedge:
+            probe = self._breakers[self._primary].acquire()
+            if probe is not None:
+                return await self._hedged(fn, probe)
+
+        error: Optional[Exception] = None
+        for name in (self._primary, self._fallback):
+            probe = self._breakers[name].acquire()
+            if probe is None:
+                logger.debug(f"Circuit for {name} is open, skipping")
+                continue
+            try:
+                return await self._call(name, fn, probe)
+            except Exception as e:
+                if name == self._primary:
+                    logger.warning(f"Primary provider ({name}) failed: {e}, falling back")
+                error = e
+        if error is not None:
+            raise error
+        raise CircuitOpenError(f"All providers unavailable: {self._primary}, {self._fallback}")
+
+    def _hedge_delay(self) -> float:
+        latency = self._breakers[self._primary].latency_quantile(settings.hedge_quantile)
+        if latency is None:
+            return settings.hedge_default_delay_seconds
+        return max(latency, settings.hedge_min_delay_seconds)
+
+    def _start(
+        self,
+        name: str,
+        fn: Callable[[MarketDataProvider], Awaitable[Any]],
+        probe: bool = False,
+    ) -> asyncio.Task:
+        task = asyncio.create_task(self._call(name, fn, probe))
+        task.add_done_callback(_consume)
+        return task
+
+    async def _hedged(
+        self, fn: Callable[[MarketDataProvider], Awaitable[Any]], probe: bool = False
+    ) -> Any:
+        """主要來源逾時未回應 → 並行呼叫備援，回傳先成功者並取消另一個"""
+        self._budget.deposit()
+        tasks = {self._start(self._primary, fn, probe): self._primary}
+        hedged = False
+        error: Optional[Exception] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay())
+            fallback_probe = (
+                self._breakers[self._fallback].acquire()
+                if not done and self._budget.available()
+                else None
+            )
+            if fallback_probe is not None:
+                self._budget.spend()
+                tasks[self._start(self._fallback, fn, fallback_probe)] = self._fallback
+                hedged = True
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks.pop(task)
+                    if task.exception() is None:
+                        if name == self._fallback:
+                            self._budget.wins += 1
+                        return task.result()
+                    error = task.exception()
+                    logger.warning(f"Provider ({name}) failed: {error}")
+        finally:
+            for task in tasks:
+                task.cancel()  # 落後的一方：取消，不計入斷路器統計
+
+        # 未對沖且主要來源失敗 → 照常降級
+        if not hedged:
+            fallback_probe = self._breakers[self._fallback].acquire()
+            if fallback_probe is not None:
+                return await self._call(self._fallback, fn, fallback_probe)
+        raise error
+
     async def get_ohlcv(
         self,
         symbol: str,
@@ -36,29 +176,21 @@ class DataAggregator:
         since: int | None = None,
     ) -> pd.DataFrame:
         """取得 OHLCV 數據，支援自動降級"""
+        fetch = lambda p: p.get_ohlcv(symbol, timeframe, limit, since=since)  # noqa: E731
         if provider:
-            return await self._get_provider(provider).get_ohlcv(symbol, timeframe, limit, since=since)
-
-        try:
-            return await self._get_provider(self._primary).get_ohlcv(symbol, timeframe, limit, since=since)
-        except Exception as e:
-            logger.warning(f"Primary provider ({self._primary}) failed: {e}, falling back")
-            return await self._get_provider(self._fallback).get_ohlcv(symbol, timeframe, limit, since=since)
+            return await self._call(provider, fetch)
+        return await self._with_fallback(fetch)
 
     async def get_current_price(
         self, symbols: list[str], provider: str | None = None
     ) -> dict[str, float]:
+        fetch = lambda p: p.get_current_price(symbols)  # noqa: E731
         if provider:
-            return await self._get_provider(provider).get_current_price(symbols)
-
-        try:
-            return await self._get_provider(self._primary).get_current_price(symbols)
-        except Exception as e:
-            logger.warning(f"Primary provider ({self._primary}) failed: {e}, falling back")
-            return await self._get_provider(self._fallback).get_current_price(symbols)
+            return await self._call(provider, fetch)
+        return await self._with_fallback(fetch)
 
     async def get_market_overview(
         self, limit: int = 20, provider: str | None = None
     ) -> pd.DataFrame:
         target = provider or self._fallback  # 市場總覽預設用 CoinGecko (有 market_cap)
-        return await self._get_provider(target).get_market_overview(limit)
+        return await self._call(target, lambda p: p.get_market_overview(limit))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import base64
 import importlib
 import json
 import logging
@@ -7,8 +8,10 @@ import time
 from dataclasses import fields as dataclass_fields
 from typing import Any, Optional
 
+import numpy as np
 import pandas as pd
 
+from app.core.indicators.base import IndicatorLines
 from app.data.db_cache import DBCache
 
 logger = logging.getLogger(__name__)
@@ -28,6 +31,7 @@ DB_MAX_AGE: dict[str, float] = {
     "open_interest":     300,      # 5 分鐘
     "long_short_ratio":  300,      # 5 分鐘
     "taker_volume":      300,      # 5 分鐘
+    "analysis":          300,      # 5 分鐘
 }
 
 OHLCV_DB_MAX_AGE: dict[str, float] = {
@@ -50,20 +54,66 @@ def _resolve_db_max_age(key: str) -> float:
 
 # ── 序列化/反序列化 ──────────────────────────────────────────────────
 
+def _b64(arr: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(arr).tobytes()).decode("ascii")
+
+
+def _unb64(raw: str, dtype: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(raw), dtype=np.dtype(dtype)).copy()
+
+
+def _encode_index(index: pd.Index) -> dict:
+    """時間索引以 int64 (ns) 原始 buffer 輸出，其餘索引輸出 list"""
+    if isinstance(index, pd.DatetimeIndex):
+        tz = str(index.tz) if index.tz is not None else None
+        return {"kind": "datetime", "tz": tz, "ns": _b64(index.as_unit("ns").asi8)}
+    return {"kind": "list", "data": index.tolist()}
+
+
+def _decode_index(obj: dict) -> pd.Index:
+    if obj["kind"] == "datetime":
+        idx = pd.DatetimeIndex(_unb64(obj["ns"], "<i8").astype("datetime64[ns]"))
+        return idx.tz_localize("UTC").tz_convert(obj["tz"]) if obj["tz"] else idx
+    return pd.Index(obj["data"])
+
+
+def _encode_value(v: Any) -> Any:
+    if isinstance(v, pd.DataFrame):
+        return {"__type": "dataframe", "data": v.to_dict(orient="split")}
+    if isinstance(v, IndicatorLines):
+        # 指標線直接輸出 float64 原始 buffer (base64)，不展開成逐點 JSON
+        return {
+            "__type": "lines",
+            "dtype": "<f8",
+            "index": _encode_index(v.index),
+            "buffers": {k: _b64(b.astype("<f8")) for k, b in v.buffers.items()},
+        }
+    return v
+
+
+def _decode_value(v: Any) -> Any:
+    if not isinstance(v, dict):
+        return v
+    obj_type = v.get("__type")
+    if obj_type == "dataframe":
+        return pd.DataFrame(**v["data"])
+    if obj_type == "lines":
+        return IndicatorLines(
+            _decode_index(v["index"]),
+            {k: _unb64(b, v["dtype"]) for k, b in v["buffers"].items()},
+        )
+    return v
+
+
 def _serialize(value: Any) -> str:
-    """將 Python 物件序列化為 JSON 字串。支援 DataFrame 和 dataclass。"""
-    if isinstance(value, pd.DataFrame):
-        payload = {"__type": "dataframe", "data": value.to_dict(orient="split")}
-        return json.dumps(payload, default=str)
+    """將 Python 物件序列化為 JSON 字串。支援 DataFrame、指標線和 dataclass。"""
+    if isinstance(value, (pd.DataFrame, IndicatorLines)):
+        return json.dumps(_encode_value(value), default=str)
 
     if hasattr(value, "__dataclass_fields__"):
         field_dict: dict[str, Any] = {}
         for f in dataclass_fields(value):
-            v = getattr(value, f.name)
-            if isinstance(v, pd.DataFrame):
-                field_dict[f.name] = {"__type": "dataframe", "data": v.to_dict(orient="split")}
-            else:
-                field_dict[f.name] = v
+            field_dict[f.name] = _encode_value(getattr(value, f.name))
         payload = {
             "__type": "dataclass",
             "module": type(value).__module__,
@@ -82,18 +132,13 @@ def _deserialize(raw: str) -> Any:
         return obj
 
     obj_type = obj.get("__type")
-    if obj_type == "dataframe":
-        return pd.DataFrame(**obj["data"])
+    if obj_type in ("dataframe", "lines"):
+        return _decode_value(obj)
 
     if obj_type == "dataclass":
         mod = importlib.import_module(obj["module"])
         cls = getattr(mod, obj["class"])
-        restored: dict[str, Any] = {}
-        for k, v in obj["fields"].items():
-            if isinstance(v, dict) and v.get("__type") == "dataframe":
-                restored[k] = pd.DataFrame(**v["data"])
-            else:
-                restored[k] = v
+        restored = {k: _decode_value(v) for k, v in obj["fields"].items()}
         return cls(**restored)
 
     return obj
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+from typing import Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """所有可用來源的斷路器皆為開啟狀態，不送出請求"""
+
+
+def _or_default(value, default):
+    # 0 / 0.0 是合法設定，不能用 `value or default`
+    return default if value is None else value
+
+
+class CircuitBreaker:
+    """單一資料來源的斷路器（closed → open → half_open → closed）
+
+    - closed：正常呼叫，記錄滾動視窗內的成功 / 失敗與延遲
+    - 視窗內請求數達 min_calls，且錯誤率或慢呼叫比例超過門檻 → open
+    - open：直接略過此來源，open_seconds 後進入 half_open
+    - half_open：只放行一個探測請求，只有該探測的結果決定 closed（清空視窗）或再次 open；
+      開啟前已送出、或指定來源（不經 allow）的呼叫結果只計入統計
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        slow_call_seconds: Optional[float] = None,
+        slow_call_rate: Optional[float] = None,
+        open_seconds: Optional[float] = None,
+    ):
+        self.name = name
+        self._window = _or_default(window_seconds, settings.circuit_window_seconds)
+        self._min_calls = _or_default(min_calls, settings.circuit_min_calls)
+        self._error_rate = _or_default(error_rate, settings.circuit_error_rate)
+        self._slow_seconds = _or_default(slow_call_seconds, settings.circuit_slow_call_seconds)
+        self._slow_rate = _or_default(slow_call_rate, settings.circuit_slow_call_rate)
+        self._open_seconds = _or_default(open_seconds, settings.circuit_open_seconds)
+        self._calls: deque[tuple[float, bool, float]] = deque()  # (時間, 成功, 延遲秒數)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0  # 開啟次數
+        self.rejected = 0  # 因開啟而略過的呼叫數
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._open_seconds:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        """是否可呼叫此來源；half_open 時只放行一個探測請求"""
+        return self.acquire() is not None
+
+    def acquire(self) -> Optional[bool]:
+        """取得呼叫許可：None → 拒絕；True → half_open 探測請求；False → 一般呼叫
+
+        探測請求的結果須以 record(..., probe=True) / release(probe=True) 回報。
+        """
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return None
+
+    def record(self, ok: bool, latency: float, probe: bool = False) -> None:
+        now = time.monotonic()
+        if probe:
+            self._probing = False
+            if self._state != HALF_OPEN:
+                return
+            if ok and latency < self._slow_seconds:
+                self._state = CLOSED
+                self._calls.clear()
+                logger.info("Circuit %s closed after successful probe", self.name)
+            else:
+                self._trip(now, "probe failed")
+            return
+
+        self._calls.append((now, ok, latency))
+        self._trim(now)
+        if self._state != CLOSED or len(self._calls) < self._min_calls:
+            return
+        errors, slow = self._counts()
+        n = len(self._calls)
+        if errors / n >= self._error_rate:
+            self._trip(now, f"error rate {errors}/{n}")
+        elif slow / n >= self._slow_rate:
+            self._trip(now, f"slow calls {slow}/{n}")
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """視窗內成功呼叫的延遲分位數；樣本不足 min_calls 時回傳 None"""
+        self._trim(time.monotonic())
+        latencies = sorted(latency for _, ok, latency in self._calls if ok)
+        if len(latencies) < self._min_calls:
+            return None
+        return latencies[min(int(len(latencies) * q), len(latencies) - 1)]
+
+    def release(self, probe: bool = False) -> None:
+        """呼叫被取消（非來源錯誤）：不計入統計；探測請求則釋放 half_open 探測名額"""
+        if probe:
+            self._probing = False
+
+    def _trip(self, now: float, reason: str) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self.opened += 1
+        logger.warning(
+            "Circuit %s opened (%s); skipping for %.0fs", self.name, reason, self._open_seconds
+        )
+
+    def _trim(self, now: float) -> None:
+        while self._calls and now - self._calls[0][0] > self._window:
+            self._calls.popleft()
+
+    def _counts(self) -> tuple[int, int]:
+        errors = sum(1 for _, ok, _ in self._calls if not ok)
+        slow = sum(1 for _, ok, latency in self._calls if ok and latency >= self._slow_seconds)
+        return errors, slow
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self._trim(now)
+        state = self.state
+        errors, slow = self._counts()
+        n = len(self._calls)
+        latencies = sorted(latency for _, _, latency in self._calls)
+        # 健康分數 0~1：開啟時為 0，否則依成功率與非慢呼叫比例
+        health = 0.0 if state == OPEN else (1 - errors / n) * (1 - slow / n) if n else 1.0
+        retry_in = max(self._opened_at + self._open_seconds - now, 0.0) if state == OPEN else 0.0
+        return {
+            "state": state,
+            "health": round(health, 3),
+            "calls": n,
+            "error_rate": round(errors / n, 3) if n else 0.0,
+            "slow_rate": round(slow / n, 3) if n else 0.0,
+            "p50_ms": round(latencies[n // 2] * 1000, 1) if n else None,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_in_s": round(retry_in, 1),
+        }
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import difflib
+import re
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Optional
+
+_WORD_SPLIT = re.compile(r"[\s\-_.()]+")
+
+# 搜尋匹配等級：完全符合優先，其餘前綴 / 模糊匹配依市值排名
+EXACT_SYMBOL, EXACT_NAME, PREFIX, FUZZY = 0, 1, 2, 3
+FUZZY_MIN_QUERY = 3
+FUZZY_CUTOFF = 0.75
+
+
+class CoinIndex:
+    """CoinGecko 幣種索引 — symbol → coin id 與名稱 / 代號搜尋
+
+    entries 為 [id, symbol, name, market_cap_rank, thumb]（rank / thumb 可為 None）。
+
+    - resolve()：同一 symbol 有多個幣時取市值排名最前者（無排名者以較短的 id 優先）
+    - search()：symbol、名稱、名稱中每個單字的前綴匹配（排序陣列 + 二分搜尋），
+      結果不足時對有排名的幣種做模糊比對（拼字錯誤）
+    """
+
+    def __init__(self, entries: Iterable[list] = ()):
+        self._coins: list[list] = [list(e) for e in entries]
+
+        by_symbol: dict[str, int] = {}
+        terms: list[tuple[str, int]] = []
+        fuzzy: dict[str, list[int]] = {}
+        for i, (coin_id, symbol, name, rank, _) in enumerate(self._coins):
+            upper = symbol.upper()
+            best = by_symbol.get(upper)
+            if best is None or self._priority(i) < self._priority(best):
+                by_symbol[upper] = i
+
+            lowered = {symbol.lower(), name.lower(), *_WORD_SPLIT.split(name.lower())}
+            terms.extend((t, i) for t in lowered if t)
+            if rank is not None:
+                for t in (symbol.lower(), name.lower()):
+                    fuzzy.setdefault(t, []).append(i)
+
+        self._by_symbol = {s: self._coins[i][0] for s, i in by_symbol.items()}
+        self._terms = sorted(terms)
+        self._fuzzy = fuzzy
+
+    def _priority(self, i: int) -> tuple:
+        coin_id, _, _, rank, _ = self._coins[i]
+        return (rank is None, rank or 0, len(coin_id), coin_id)
+
+    def __len__(self) -> int:
+        return len(self._coins)
+
+    def entries(self) -> list[list]:
+        return self._coins
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        return self._by_symbol.get(symbol.upper())
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        q = query.strip().lower()
+        if not q:
+            return []
+
+        tiers: dict[int, int] = {}
+        start = bisect_left(self._terms, (q, -1))
+        for term, i in self._terms[start:]:
+            if not term.startswith(q):
+                break
+            _, symbol, name, _, _ = self._coins[i]
+            if symbol.lower() == q:
+                tier = EXACT_SYMBOL
+            elif name.lower() == q:
+                tier = EXACT_NAME
+            else:
+                tier = PREFIX
+            tiers[i] = min(tier, tiers.get(i, tier))
+
+        if len(tiers) < limit and len(q) >= FUZZY_MIN_QUERY:
+            for term in difflib.get_close_matches(q, self._fuzzy, n=limit, cutoff=FUZZY_CUTOFF):
+                for i in self._fuzzy[term]:
+                    tiers.setdefault(i, FUZZY)
+
+        def _order(i: int) -> tuple:
+            _, _, name, rank, _ = self._coins[i]
+            exact = tiers[i] if tiers[i] < PREFIX else PREFIX
+            return (exact, rank is None, rank or 0, tiers[i], len(name))
+
+        return [
+            {"symbol": symbol.upper(), "name": name, "market_cap_rank": rank, "thumb": thumb}
+            for _, symbol, name, rank, thumb in (
+                self._coins[i] for i in sorted(tiers, key=_order)[:limit]
+            )
+        ]
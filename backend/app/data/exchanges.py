@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterable
+from typing import Any, Optional
+
+import ccxt.async_support as ccxt
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExchangePool:
+    """常駐 ccxt exchange 實例 — 每個 exchange id 一個，跨請求共用
+
+    - 實例綁定建立時的 event loop，換 loop（CLI 多次 asyncio.run）時重建
+    - markets 於啟動時預先載入（preload），之後由背景工作定期刷新
+    - 同一 exchange 同時多個 load_markets 請求只會實際載入一次
+    - 由 FastAPI lifespan / CLI 呼叫 aclose() 關閉連線
+
+    Example:
+        exchange = await exchanges.get("binance")   # markets 已載入
+        ticker = await exchange.fetch_ticker("BTC/USDT")
+    """
+
+    def __init__(self, options: Optional[dict[str, Any]] = None):
+        self._options = {"enableRateLimit": True, **(options or {})}
+        self._exchanges: dict[str, ccxt.Exchange] = {}
+        self._loads: dict[str, asyncio.Task] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # 舊 loop 上的 aiohttp session 無法在新 loop 使用 → 捨棄
+            self._exchanges, self._loads, self._loaded_at = {}, {}, {}
+            self._refresh_task = None
+            self._loop = loop
+
+    def exchange(self, exchange_id: str) -> ccxt.Exchange:
+        """取得 exchange 實例（不保證 markets 已載入）"""
+        self._check_loop()
+        exchange = self._exchanges.get(exchange_id)
+        if exchange is None:
+            exchange_class = getattr(ccxt, exchange_id, None)
+            if exchange_class is None:
+                raise ValueError(f"Unknown ccxt exchange: {exchange_id}")
+            exchange = exchange_class(dict(self._options))
+            self._exchanges[exchange_id] = exchange
+        return exchange
+
+    async def get(self, exchange_id: str) -> ccxt.Exchange:
+        """取得 exchange 實例，必要時先載入 markets"""
+        exchange = self.exchange(exchange_id)
+        if not exchange.markets:
+            await self.load_markets(exchange_id)
+        return exchange
+
+    async def load_markets(self, exchange_id: str, reload: bool = False) -> dict:
+        """載入（或重新載入）markets；並行的呼叫共用同一個載入工作"""
+        exchange = self.exchange(exchange_id)
+        task = self._loads.get(exchange_id)
+        if task is None:
+            task = asyncio.create_task(self._load(exchange_id, exchange, reload))
+            self._loads[exchange_id] = task
+        return await asyncio.shield(task)
+
+    async def _load(self, exchange_id: str, exchange: ccxt.Exchange, reload: bool) -> dict:
+        try:
+            t0 = time.perf_counter()
+            markets = await exchange.load_markets(reload=reload)
+            self._loaded_at[exchange_id] = time.time()
+            logger.info(
+                "Loaded %d %s markets in %.2fs",
+                len(markets), exchange_id, time.perf_counter() - t0,
+            )
+            return markets
+        finally:
+            if self._loads.get(exchange_id) is asyncio.current_task():
+                del self._loads[exchange_id]
+
+    def loaded_at(self, exchange_id: str) -> Optional[float]:
+        return self._loaded_at.get(exchange_id)
+
+    async def preload(self, exchange_ids: Optional[Iterable[str]] = None) -> None:
+        """並行載入 markets；失敗只記錄，第一次使用時會再嘗試"""
+        ids = list(exchange_ids or settings.ccxt_exchanges)
+        results = await asyncio.gather(
+            *(self.load_markets(i) for i in ids), return_exceptions=True
+        )
+        for exchange_id, result in zip(ids, results):
+            if isinstance(result, Exception):
+                logger.warning("Failed to preload %s markets: %s", exchange_id, result)
+
+    def start(
+        self,
+        exchange_ids: Optional[Iterable[str]] = None,
+        interval_seconds: Optional[float] = None,
+    ) -> None:
+        """背景預先載入 markets，之後定期重新載入（新上架 / 下架的交易對）
+
+        不阻塞啟動：載入期間進來的請求會等待同一個載入工作。
+        """
+        self._check_loop()
+        if self._refresh_task is None:
+            ids = list(exchange_ids or settings.ccxt_exchanges)
+            for exchange_id in ids:
+                self.exchange(exchange_id)
+            interval = interval_seconds or settings.ccxt_markets_refresh_minutes * 60
+            self._refresh_task = asyncio.create_task(
+                self._refresh_loop(ids, interval), name="ccxt-markets-refresh"
+            )
+
+    async def _refresh_loop(self, exchange_ids: list[str], interval: float) -> None:
+        await self.preload(exchange_ids)
+        while True:
+            await asyncio.sleep(interval)
+            for exchange_id in list(self._exchanges):
+                try:
+                    await self.load_markets(exchange_id, reload=True)
+                except Exception as e:
+                    logger.warning("Failed to refresh %s markets: %s", exchange_id, e)
+
+    async def close(self, exchange_id: str) -> None:
+        exchange = self._exchanges.pop(exchange_id, None)
+        self._loaded_at.pop(exchange_id, None)
+        if exchange is not None:
+            await exchange.close()
+
+    async def aclose(self) -> None:
+        same_loop = self._loop is asyncio.get_running_loop()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            if same_loop:
+                try:
+                    await self._refresh_task
+                except asyncio.CancelledError:
+                    pass
+            self._refresh_task = None
+        if not same_loop:
+            self._exchanges, self._loads, self._loaded_at = {}, {}, {}
+            return
+        for exchange_id in list(self._exchanges):
+            await self.close(exchange_id)
+
+
+exchanges = ExchangePool()
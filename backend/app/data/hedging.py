@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from app.config import settings
+
+
+class HedgeBudget:
+    """對沖請求預算 — 限制額外上游負載不超過主要請求的固定比例
+
+    每個主要請求存入 ratio 個 token（上限 burst），每次對沖花費 1 個；
+    例如 ratio=0.1 → 長期而言對沖請求不超過主要請求的 10%。
+    """
+
+    def __init__(self, ratio: Optional[float] = None, burst: Optional[float] = None):
+        self.ratio = settings.hedge_budget_ratio if ratio is None else ratio
+        self.burst = burst or settings.hedge_budget_burst
+        self._tokens = self.burst
+        self.requests = 0
+        self.hedged = 0
+        self.denied = 0  # 達到延遲門檻但預算不足而未對沖
+        self.wins = 0  # 備援先回應的次數
+
+    def deposit(self) -> None:
+        self.requests += 1
+        self._tokens = min(self._tokens + self.ratio, self.burst)
+
+    def available(self) -> bool:
+        if self._tokens >= 1.0:
+            return True
+        self.denied += 1
+        return False
+
+    def spend(self) -> None:
+        self._tokens -= 1.0
+        self.hedged += 1
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_rate": round(self.hedged / self.requests, 3) if self.requests else 0.0,
+            "fallback_wins": self.wins,
+            "denied": self.denied,
+            "tokens": round(self._tokens, 2),
+        }
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import settings
+from app.data.rate_limit import RateLimiter, RateLimitExceededError
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClients:
+    """共用 HTTP client 註冊表 — 每個 host 一個 httpx.AsyncClient
+
+    各 host 各自的連線池（keep-alive 重用 TCP + TLS），連線數上限與 timeout 由 Settings 統一設定。
+    請求先經 RateLimiter 依 host × API key 等級排隊；429 會依 Retry-After 退避後重試。
+    由 FastAPI lifespan / CLI 負責 aclose()；client 綁定建立時的 event loop，
+    換 loop（例如 CLI 多次 asyncio.run）時自動重建。
+
+    Example:
+        resp = await http_clients.get("https://fapi.binance.com/fapi/v1/premiumIndex", params=...)
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        self._timeout = httpx.Timeout(
+            timeout or settings.http_timeout_seconds,
+            connect=connect_timeout or settings.http_connect_timeout_seconds,
+        )
+        self._limits = httpx.Limits(
+            max_connections=max_connections or settings.http_max_connections_per_host,
+            max_keepalive_connections=max_keepalive or settings.http_max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry or settings.http_keepalive_expiry_seconds,
+        )
+        self._http2 = settings.http2_enabled if http2 is None else http2
+        if self._http2 and importlib.util.find_spec("h2") is None:
+            # HTTP/2 需要 h2 套件（pip install 'httpx[http2]'），未安裝時退回 HTTP/1.1
+            logger.warning("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1")
+            self._http2 = False
+        self._transport = transport  # 測試用
+        if limiter is None and settings.http_rate_limit_enabled:
+            limiter = RateLimiter()
+        self._limiter = limiter
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def hosts(self) -> list[str]:
+        return list(self._clients)
+
+    def client(self, url: str) -> httpx.AsyncClient:
+        """取得 url 所屬 host 的共用 client（不存在則建立）"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # 舊 loop 上的連線無法在新 loop 使用，也無法在此關閉 → 直接捨棄
+            self._clients = {}
+            self._loop = loop
+
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+                transport=self._transport,
+            )
+            self._clients[origin] = client
+        return client
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        client = self.client(url)
+        if self._limiter is None:
+            return await client.request(method, url, **kwargs)
+
+        target = httpx.URL(url)
+        resp: Optional[httpx.Response] = None
+        for _ in range(settings.http_rate_limit_retries + 1):
+            try:
+                bucket = await self._limiter.acquire(
+                    target, kwargs.get("headers"), kwargs.get("params"),
+                    max_wait=settings.http_rate_limit_max_wait_seconds,
+                )
+            except RateLimitExceededError:
+                # 重試時 Retry-After 太長 → 直接回傳 429，交給呼叫端處理
+                if resp is not None:
+                    return resp
+                raise
+            resp = await client.request(method, url, **kwargs)
+            self._limiter.observe(bucket, resp)
+            # 429：限流器已依 Retry-After 暫停該 host，重新排隊後重試
+            if resp.status_code != 429:
+                return resp
+        return resp
+
+    def rate_limit_stats(self) -> dict[str, dict]:
+        """各 host 的限流狀態：目前速率、排隊數、平均 / 最大等待時間"""
+        return self._limiter.stats() if self._limiter is not None else {}
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        if self._loop is not None and self._loop is not asyncio.get_running_loop():
+            return
+        for client in clients:
+            await client.aclose()
+
+
+http_clients = HttpClients()
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import httpx
 import pandas as pd
 
 from app.data.base import SentimentDataProvider
+from app.data.http import http_clients
 
 ALTERNATIVE_ME_URL = "https://api.alternative.me/fng/"
 
@@ -18,14 +18,13 @@ class AlternativeMeProvider(SentimentDataProvider):
         value: 0 (極度恐懼) ~ 100 (極度貪婪)
         classification: Extreme Fear / Fear / Neutral / Greed / Extreme Greed
         """
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                ALTERNATIVE_ME_URL,
-                params={"limit": str(limit), "format": "json"},
-                timeout=15.0,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+        resp = await http_clients.get(
+            ALTERNATIVE_ME_URL,
+            params={"limit": str(limit), "format": "json"},
+            timeout=15.0,
+        )
+        resp.raise_for_status()
+        data = resp.json()
 
         rows = []
         for entry in data.get("data", []):
@@ -3,9 +3,9 @@ from __future__ import annotations
 import logging
 from typing import Optional
 
-import httpx
 import pandas as pd
 
+from app.data.http import http_clients
 from app.data.providers.binance_pair_resolver import resolve_futures_pair
 from app.db.session import async_session
 from app.services.settings_service import SettingsService
@@ -39,14 +39,13 @@ class BinanceDerivativesProvider:
         pair = await resolve_futures_pair(symbol)
         headers = await self._get_headers()
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    f"{BINANCE_FAPI_URL}/futures/data/openInterestHist",
-                    params={"symbol": pair, "period": period, "limit": limit},
-                    headers=headers,
-                )
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await http_clients.get(
+                f"{BINANCE_FAPI_URL}/futures/data/openInterestHist",
+                params={"symbol": pair, "period": period, "limit": limit},
+                headers=headers,
+            )
+            resp.raise_for_status()
+            data = resp.json()
 
             rows = []
             for item in data:
@@ -75,14 +74,13 @@ class BinanceDerivativesProvider:
         pair = await resolve_futures_pair(symbol)
         headers = await self._get_headers()
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    f"{BINANCE_FAPI_URL}/futures/data/topLongShortAccountRatio",
-                    params={"symbol": pair, "period": period, "limit": limit},
-                    headers=headers,
-                )
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await http_clients.get(
+                f"{BINANCE_FAPI_URL}/futures/data/topLongShortAccountRatio",
+                params={"symbol": pair, "period": period, "limit": limit},
+                headers=headers,
+            )
+            resp.raise_for_status()
+            data = resp.json()
 
             rows = []
             for item in data:
@@ -116,14 +114,13 @@ class BinanceDerivativesProvider:
         pair = await resolve_futures_pair(symbol)
         headers = await self._get_headers()
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    f"{BINANCE_FAPI_URL}/futures/data/takerlongshortRatio",
-                    params={"symbol": pair, "period": period, "limit": limit},
-                    headers=headers,
-                )
-                resp.raise_for_status()
-                data = resp.json()
+            resp = await http_clients.get(
+                f"{BINANCE_FAPI_URL}/futures/data/takerlongshortRatio",
+                params={"symbol": pair, "period": period, "limit": limit},
+                headers=headers,
+            )
+            resp.raise_for_status()
+            data = resp.json()
 
             rows = []
             for item in data:
@@ -6,9 +6,9 @@ import logging
 import time
 from typing import Optional
 
-import httpx
 import pandas as pd
 
+from app.data.http import http_clients
 from app.data.providers.binance_pair_resolver import resolve_futures_pair
 from app.db.session import async_session
 from app.services.settings_service import SettingsService
@@ -40,24 +40,23 @@ class BinanceFundingProvider:
         pair = await resolve_futures_pair(symbol)
         headers = await self._get_headers()
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # 取得最新資金費率
-                resp = await client.get(
-                    f"{BINANCE_FAPI_URL}/fapi/v1/fundingRate",
-                    params={"symbol": pair, "limit": 1},
-                    headers=headers,
-                )
-                resp.raise_for_status()
-                data = resp.json()
-
-                # 取得 premiumIndex (包含預估下次費率)
-                resp2 = await client.get(
-                    f"{BINANCE_FAPI_URL}/fapi/v1/premiumIndex",
-                    params={"symbol": pair},
-                    headers=headers,
-                )
-                resp2.raise_for_status()
-                premium = resp2.json()
+            # 取得最新資金費率
+            resp = await http_clients.get(
+                f"{BINANCE_FAPI_URL}/fapi/v1/fundingRate",
+                params={"symbol": pair, "limit": 1},
+                headers=headers,
+            )
+            resp.raise_for_status()
+            data = resp.json()
+
+            # 取得 premiumIndex (包含預估下次費率)
+            resp2 = await http_clients.get(
+                f"{BINANCE_FAPI_URL}/fapi/v1/premiumIndex",
+                params={"symbol": pair},
+                headers=headers,
+            )
+            resp2.raise_for_status()
+            premium = resp2.json()
 
             if not data:
                 return pd.DataFrame(columns=["exchange", "symbol", "rate", "predicted_rate"])
@@ -84,13 +83,12 @@ class BinanceFundingProvider:
         rows = []
         headers = await self._get_headers()
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                resp = await client.get(
-                    f"{BINANCE_FAPI_URL}/fapi/v1/premiumIndex",
-                    headers=headers,
-                )
-                resp.raise_for_status()
-                all_data = resp.json()
+            resp = await http_clients.get(
+                f"{BINANCE_FAPI_URL}/fapi/v1/premiumIndex",
+                headers=headers,
+            )
+            resp.raise_for_status()
+            all_data = resp.json()
 
             target_pairs = {f"{s.upper()}USDT" for s in symbols}
             for item in all_data:
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 from typing import Optional
 
-import httpx
 import pandas as pd
 
 from app.data.base import OnchainDataProvider
+from app.data.http import http_clients
 
 BLOCKCHAIN_API_URL = "https://api.blockchain.info"
 
@@ -14,14 +14,13 @@ class BlockchainProvider(OnchainDataProvider):
     """Blockchain.com API — BTC 基本鏈上數據 (完全免費)"""
 
     async def _request(self, endpoint: str, params: Optional[dict] = None) -> dict:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{BLOCKCHAIN_API_URL}/{endpoint}",
-                params=params or {},
-                timeout=15.0,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await http_clients.get(
+            f"{BLOCKCHAIN_API_URL}/{endpoint}",
+            params=params or {},
+            timeout=15.0,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def _get_chart_data(self, chart_name: str, timespan: str = "1year") -> pd.DataFrame:
         """取得 Blockchain.com chart 數據"""
@@ -1,12 +1,17 @@
 from __future__ import annotations
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
+from typing import Optional
 
 import ccxt.async_support as ccxt
 import pandas as pd
 
+from app.config import settings
 from app.data.base import MarketDataProvider
+from app.data.exchanges import ExchangePool, exchanges
+from app.data.symbol_index import SymbolIndex
 
 logger = logging.getLogger(__name__)
 
@@ -14,65 +19,39 @@ logger = logging.getLogger(__name__)
 class CCXTProvider(MarketDataProvider):
     """透過 ccxt 從交易所取得市場數據"""
 
-    def __init__(self, exchange_id: str = "binance"):
+    def __init__(self, exchange_id: str = "binance", pool: ExchangePool | None = None):
         self._exchange_id = exchange_id
-        self._exchange: ccxt.Exchange | None = None
-        self._pair_cache: dict[str, str] = {}  # symbol -> resolved pair
+        self._pool = pool or exchanges
+        self._pairs = SymbolIndex()  # base asset → 現貨 USDT 交易對
+        self._markets_loaded_at: float | None = None
+        # 全市場 tickers 快照：價格查詢與市場總覽共用，TTL 內不重抓
+        self._tickers: dict[str, dict] = {}
+        self._tickers_at = float("-inf")
+        self._tickers_task: Optional[asyncio.Task] = None
 
     async def _get_exchange(self) -> ccxt.Exchange:
-        # 每次請求都建立新 exchange 實例，避免 event loop 問題
-        if self._exchange is not None:
-            try:
-                # 測試 exchange 是否仍然可用
-                loop = asyncio.get_event_loop()
-                if loop.is_closed():
-                    self._exchange = None
-            except RuntimeError:
-                self._exchange = None
-
-        if self._exchange is None:
-            exchange_class = getattr(ccxt, self._exchange_id)
-            self._exchange = exchange_class({"enableRateLimit": True})
-        return self._exchange
+        # 共用常駐實例（markets 已於啟動時預先載入）
+        exchange = await self._pool.get(self._exchange_id)
+        loaded_at = self._pool.loaded_at(self._exchange_id)
+        if loaded_at != self._markets_loaded_at:
+            # markets 重新載入過（上架 / 下架）→ 重建交易對索引
+            self._pairs = SymbolIndex(
+                (m["symbol"], m["base"]) for m in exchange.markets.values()
+                if m.get("quote") == "USDT" and ":" not in m["symbol"]
+            )
+            self._markets_loaded_at = loaded_at
+        return exchange
 
     async def _resolve_pair(self, symbol: str) -> str:
-        """解析交易對：先嘗試 SYMBOL/USDT，找不到則搜尋包含該 symbol 的現貨 USDT 對。"""
-        upper = symbol.upper()
-        if upper in self._pair_cache:
-            return self._pair_cache[upper]
+        """解析交易對：現貨 USDT 對的 base asset 索引（含 1000PEPE 這類倍數前綴）
 
-        exchange = await self._get_exchange()
-        direct = f"{upper}/USDT"
-
-        # 確保 markets 已載入
-        if not exchange.markets:
-            await exchange.load_markets()
-
-        # 直接匹配
-        if direct in exchange.symbols:
-            self._pair_cache[upper] = direct
-            return direct
-
-        # 模糊搜尋：找包含該 symbol 關鍵字的現貨 USDT 對
-        candidates = [
-            s for s in exchange.symbols
-            if upper in s.upper() and s.endswith("/USDT") and ":" not in s
-        ]
-        if candidates:
-            # 優先選最短的（最精確匹配）
-            best = min(candidates, key=len)
-            logger.info(f"Resolved {upper} -> {best}")
-            self._pair_cache[upper] = best
-            return best
-
-        # 找不到，回傳原始 pair（讓後續報錯）
-        self._pair_cache[upper] = direct
-        return direct
+        找不到則回傳 SYMBOL/USDT（讓後續報錯）。
+        """
+        await self._get_exchange()
+        return self._pairs.resolve(symbol) or f"{symbol.upper()}/USDT"
 
     async def close(self) -> None:
-        if self._exchange is not None:
-            await self._exchange.close()
-            self._exchange = None
+        await self._pool.close(self._exchange_id)
 
     async def get_ohlcv(
         self, symbol: str, timeframe: str = "1d", limit: int = 100,
@@ -87,23 +66,78 @@ class CCXTProvider(MarketDataProvider):
         df = df.set_index("timestamp")
         return df
 
+    async def _all_tickers(self, exchange: ccxt.Exchange) -> dict[str, dict]:
+        """全市場 tickers 快照（TTL 內共用；並行的請求只抓一次）"""
+        if time.monotonic() - self._tickers_at < settings.ccxt_tickers_ttl_seconds:
+            return self._tickers
+        task = self._tickers_task
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.create_task(self._fetch_all_tickers(exchange))
+            self._tickers_task = task
+        return await asyncio.shield(task)
+
+    async def _fetch_all_tickers(self, exchange: ccxt.Exchange) -> dict[str, dict]:
+        tickers = await exchange.fetch_tickers()
+        self._tickers, self._tickers_at = tickers, time.monotonic()
+        return tickers
+
+    async def _fetch_tickers(self, exchange: ccxt.Exchange, pairs: list[str]) -> dict[str, dict]:
+        """批次取得指定交易對；交易所不支援 fetchTickers 時以有限並行逐一 fetch_ticker
+
+        fetch_tickers 只要有一個未上架的交易對就整批 BadSymbol → 先濾掉不在 markets 的交易對，
+        仍失敗則退回逐一查詢（單一交易對失敗只略過該幣種）。
+        """
+        markets = exchange.markets or {}
+        unknown = [p for p in pairs if markets and p not in markets]
+        if unknown:
+            logger.debug("Skipping pairs not listed on %s: %s", self._exchange_id, unknown)
+            pairs = [p for p in pairs if p not in unknown]
+        if not pairs:
+            return {}
+
+        if exchange.has.get("fetchTickers"):
+            try:
+                return await exchange.fetch_tickers(pairs)
+            except ccxt.BadSymbol as e:
+                logger.debug("Batch fetch_tickers rejected a symbol, fetching one by one: %s", e)
+
+        semaphore = asyncio.Semaphore(settings.ccxt_ticker_concurrency)
+
+        async def _one(pair: str) -> Optional[dict]:
+            async with semaphore:
+                try:
+                    return await exchange.fetch_ticker(pair)
+                except Exception as e:
+                    logger.debug("fetch_ticker %s failed: %s", pair, e)
+                    return None
+
+        results = await asyncio.gather(*(_one(p) for p in pairs))
+        return {p: t for p, t in zip(pairs, results) if t is not None}
+
     async def get_current_price(self, symbols: list[str]) -> dict[str, float]:
         exchange = await self._get_exchange()
-        prices: dict[str, float] = {}
+        pairs = {symbol.upper(): await self._resolve_pair(symbol) for symbol in symbols}
 
-        for symbol in symbols:
+        # 先用快照（例如剛載入過市場總覽），缺的才批次查詢
+        fresh = time.monotonic() - self._tickers_at < settings.ccxt_tickers_ttl_seconds
+        tickers = self._tickers if fresh else {}
+        missing = sorted({p for p in pairs.values() if p not in tickers})
+        if missing:
             try:
-                pair = await self._resolve_pair(symbol)
-                ticker = await exchange.fetch_ticker(pair)
-                prices[symbol.upper()] = ticker["last"]
-            except Exception:
-                continue
+                tickers = {**tickers, **await self._fetch_tickers(exchange, missing)}
+            except Exception as e:
+                logger.warning("Batch ticker fetch failed: %s", e)
 
+        prices: dict[str, float] = {}
+        for symbol, pair in pairs.items():
+            last = tickers.get(pair, {}).get("last")
+            if last is not None:
+                prices[symbol] = last
         return prices
 
     async def get_market_overview(self, limit: int = 20) -> pd.DataFrame:
         exchange = await self._get_exchange()
-        tickers = await exchange.fetch_tickers()
+        tickers = await self._all_tickers(exchange)
 
         rows = []
         for pair, ticker in tickers.items():
@@ -1,42 +1,33 @@
 from __future__ import annotations
+
+import asyncio
+import logging
 from typing import Optional
 
-import httpx
 import pandas as pd
 
+from app.config import settings
+from app.data.coin_index import CoinIndex
+from app.data.http import http_clients
+from app.data.snapshots import SnapshotIndex
 from app.db.session import async_session
 from app.services.settings_service import SettingsService
 
+logger = logging.getLogger(__name__)
+
 COINGECKO_BASE_URL = "https://api.coingecko.com/api/v3"
 COINGECKO_PRO_URL = "https://pro-api.coingecko.com/api/v3"
 
 _settings_svc = SettingsService(async_session)
 
-# CoinGecko 常用幣種 ID 映射
-SYMBOL_TO_ID: dict[str, str] = {
-    "BTC": "bitcoin",
-    "ETH": "ethereum",
-    "BNB": "binancecoin",
-    "SOL": "solana",
-    "XRP": "ripple",
-    "ADA": "cardano",
-    "DOGE": "dogecoin",
-    "DOT": "polkadot",
-    "AVAX": "avalanche-2",
-    "MATIC": "matic-network",
-    "LINK": "chainlink",
-    "UNI": "uniswap",
-    "ATOM": "cosmos",
-    "LTC": "litecoin",
-    "FIL": "filecoin",
-}
-
-
 class CoinGeckoProvider:
     """透過 CoinGecko API 取得市場數據"""
 
-    def _get_coin_id(self, symbol: str) -> str:
-        return SYMBOL_TO_ID.get(symbol.upper(), symbol.lower())
+    async def _get_coin_id(self, symbol: str) -> str:
+        # 本地幣種索引（同 symbol 取市值排名最前者）；索引不可用時猜 symbol 小寫
+        # 冷啟動（無快照）不等待下載數萬筆的 /coins/list，背景建立索引
+        await coin_index.ensure(wait=False)
+        return coin_index.resolve(symbol) or symbol.lower()
 
     async def _get_api_config(self) -> tuple[str, dict[str, str]]:
         """動態取得 API URL 和 headers（支援 DB 儲存的 key）。"""
@@ -47,21 +38,20 @@ class CoinGeckoProvider:
 
     async def _request(self, endpoint: str, params: Optional[dict] = None) -> dict | list:
         base_url, headers = await self._get_api_config()
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{base_url}{endpoint}",
-                params=params or {},
-                headers=headers,
-                timeout=30.0,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await http_clients.get(
+            f"{base_url}{endpoint}",
+            params=params or {},
+            headers=headers,
+            timeout=30.0,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_ohlcv(
         self, symbol: str, timeframe: str = "1d", limit: int = 100,
         since: int | None = None,
     ) -> pd.DataFrame:
-        coin_id = self._get_coin_id(symbol)
+        coin_id = await self._get_coin_id(symbol)
 
         # CoinGecko OHLC 只接受: 1, 7, 14, 30, 90, 180, 365, max
         valid_days = [1, 7, 14, 30, 90, 180, 365]
@@ -85,13 +75,13 @@ class CoinGeckoProvider:
         return df.tail(limit)
 
     async def get_current_price(self, symbols: list[str]) -> dict[str, float]:
-        ids = [self._get_coin_id(s) for s in symbols]
+        ids = [await self._get_coin_id(s) for s in symbols]
         data = await self._request(
             "/simple/price",
             params={"ids": ",".join(ids), "vs_currencies": "usd"},
         )
 
-        id_to_symbol = {self._get_coin_id(s): s.upper() for s in symbols}
+        id_to_symbol = {coin_id: s.upper() for coin_id, s in zip(ids, symbols)}
         prices: dict[str, float] = {}
         for coin_id, price_data in data.items():
             symbol = id_to_symbol.get(coin_id, coin_id.upper())
@@ -100,7 +90,11 @@ class CoinGeckoProvider:
         return prices
 
     async def search_coins(self, query: str, limit: int = 20) -> list[dict]:
-        """使用 CoinGecko /search API 搜尋幣種"""
+        """搜尋幣種：本地索引（前綴 / 模糊比對），索引不可用時改用 CoinGecko /search API"""
+        await coin_index.ensure()
+        if len(coin_index):
+            return coin_index.search(query, limit)
+
         data = await self._request("/search", params={"query": query})
         coins = data.get("coins", [])
         results = []
@@ -138,3 +132,72 @@ class CoinGeckoProvider:
             })
 
         return pd.DataFrame(rows)
+
+
+def _thumb(image: Optional[str]) -> Optional[str]:
+    # /coins/markets 的 image 為大圖；CoinGecko 縮圖與大圖只差路徑中的尺寸段
+    return image.replace("/large/", "/thumb/") if image else None
+
+
+class CoinGeckoIndex(SnapshotIndex):
+    """CoinGecko 全幣種索引 — /coins/list + 前幾頁市值排名，快照存檔、背景定期刷新"""
+
+    label = "CoinGecko coins"
+
+    def __init__(
+        self,
+        provider: CoinGeckoProvider,
+        path: Optional[str] = None,
+        refresh_seconds: Optional[float] = None,
+        rank_pages: Optional[int] = None,
+    ):
+        super().__init__(
+            path or settings.coingecko_index_path,
+            refresh_seconds or settings.coingecko_index_refresh_hours * 3600,
+        )
+        self._provider = provider
+        self._rank_pages = settings.coingecko_index_rank_pages if rank_pages is None else rank_pages
+        self._index = CoinIndex()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    async def _download(self) -> list[list]:
+        coins = await self._provider._request("/coins/list")
+
+        # 市值排名與縮圖：/coins/markets 依市值排序，每頁 250 個；失敗的頁面略過
+        pages = await asyncio.gather(
+            *(
+                self._provider._request("/coins/markets", params={
+                    "vs_currency": "usd", "order": "market_cap_desc",
+                    "per_page": "250", "page": str(page), "sparkline": "false",
+                })
+                for page in range(1, self._rank_pages + 1)
+            ),
+            return_exceptions=True,
+        )
+        ranked: dict[str, tuple] = {}
+        for page in pages:
+            if isinstance(page, Exception):
+                logger.warning("Failed to load CoinGecko market ranks: %s", page)
+                continue
+            for coin in page:
+                ranked[coin["id"]] = (coin.get("market_cap_rank"), _thumb(coin.get("image")))
+
+        return [
+            [c["id"], c["symbol"], c["name"], *ranked.get(c["id"], (None, None))]
+            for c in coins
+            if c.get("id") and c.get("symbol")
+        ]
+
+    def _build(self, data: list[list]) -> None:
+        self._index = CoinIndex(data)
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        return self._index.resolve(symbol)
+
+    def search(self, query: str, limit: int = 20) -> list[dict]:
+        return self._index.search(query, limit)
+
+
+coin_index = CoinGeckoIndex(CoinGeckoProvider())
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from typing import Optional
 
-import httpx
 import pandas as pd
 
+from app.data.http import http_clients
 from app.db.session import async_session
 from app.services.settings_service import SettingsService
 
@@ -27,15 +27,14 @@ class CoinGlassProvider:
 
     async def _request(self, endpoint: str, params: Optional[dict] = None) -> dict:
         headers = await self._get_headers()
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{COINGLASS_BASE_URL}{endpoint}",
-                params=params or {},
-                headers=headers,
-                timeout=15.0,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await http_clients.get(
+            f"{COINGLASS_BASE_URL}{endpoint}",
+            params=params or {},
+            headers=headers,
+            timeout=15.0,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_funding_rates(self, symbol: str = "BTC") -> pd.DataFrame:
         """取得各交易所資金費率"""
@@ -2,9 +2,9 @@ from __future__ import annotations
 
 from typing import Optional
 
-import httpx
 import pandas as pd
 
+from app.data.http import http_clients
 from app.db.session import async_session
 from app.services.settings_service import SettingsService
 
@@ -32,14 +32,13 @@ class GlassnodeProvider:
         if params:
             request_params.update(params)
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{GLASSNODE_BASE_URL}/{endpoint}",
-                params=request_params,
-                timeout=30.0,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        resp = await http_clients.get(
+            f"{GLASSNODE_BASE_URL}/{endpoint}",
+            params=request_params,
+            timeout=30.0,
+        )
+        resp.raise_for_status()
+        return resp.json()
 
     async def get_exchange_flow(
         self, asset: str = "BTC", direction: str = "netflow"
@@ -4,9 +4,9 @@ import asyncio
 import logging
 from typing import Optional
 
-import httpx
 import pandas as pd
 
+from app.data.http import http_clients
 from app.data.providers.binance_pair_resolver import resolve_futures_pair
 
 logger = logging.getLogger(__name__)
@@ -14,11 +14,11 @@ logger = logging.getLogger(__name__)
 COLUMNS = ["exchange", "symbol", "rate", "predicted_rate"]
 
 
-async def _fetch_binance(client: httpx.AsyncClient, symbol: str) -> list[dict]:
+async def _fetch_binance(symbol: str) -> list[dict]:
     """Binance — 免費公開端點"""
     pair = await resolve_futures_pair(symbol)
     try:
-        resp = await client.get(
+        resp = await http_clients.get(
             "https://fapi.binance.com/fapi/v1/premiumIndex",
             params={"symbol": pair},
         )
@@ -35,11 +35,11 @@ async def _fetch_binance(client: httpx.AsyncClient, symbol: str) -> list[dict]:
         return []
 
 
-async def _fetch_okx(client: httpx.AsyncClient, symbol: str) -> list[dict]:
+async def _fetch_okx(symbol: str) -> list[dict]:
     """OKX — 免費公開端點"""
     inst_id = f"{symbol.upper()}-USDT-SWAP"
     try:
-        resp = await client.get(
+        resp = await http_clients.get(
             "https://www.okx.com/api/v5/public/funding-rate",
             params={"instId": inst_id},
         )
@@ -59,10 +59,10 @@ async def _fetch_okx(client: httpx.AsyncClient, symbol: str) -> list[dict]:
         return []
 
 
-async def _fetch_bybit(client: httpx.AsyncClient, symbol: str) -> list[dict]:
+async def _fetch_bybit(symbol: str) -> list[dict]:
     """Bybit — 免費公開端點"""
     try:
-        resp = await client.get(
+        resp = await http_clients.get(
             "https://api.bybit.com/v5/market/tickers",
             params={"category": "linear", "symbol": f"{symbol.upper()}USDT"},
         )
@@ -82,10 +82,10 @@ async def _fetch_bybit(client: httpx.AsyncClient, symbol: str) -> list[dict]:
         return []
 
 
-async def _fetch_bitget(client: httpx.AsyncClient, symbol: str) -> list[dict]:
+async def _fetch_bitget(symbol: str) -> list[dict]:
     """Bitget — 免費公開端點"""
     try:
-        resp = await client.get(
+        resp = await http_clients.get(
             "https://api.bitget.com/api/v2/mix/market/current-fund-rate",
             params={"productType": "USDT-FUTURES", "symbol": f"{symbol.upper()}USDT"},
         )
@@ -105,11 +105,11 @@ async def _fetch_bitget(client: httpx.AsyncClient, symbol: str) -> list[dict]:
         return []
 
 
-async def _fetch_gateio(client: httpx.AsyncClient, symbol: str) -> list[dict]:
+async def _fetch_gateio(symbol: str) -> list[dict]:
     """Gate.io — 免費公開端點"""
     contract = f"{symbol.upper()}_USDT"
     try:
-        resp = await client.get(
+        resp = await http_clients.get(
             f"https://api.gateio.ws/api/v4/futures/usdt/contracts/{contract}",
         )
         resp.raise_for_status()
@@ -136,11 +136,10 @@ _FETCHERS = [
 
 async def fetch_all_funding_rates(symbol: str = "BTC") -> pd.DataFrame:
     """並行取得多個交易所的資金費率，回傳聚合 DataFrame。"""
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        results = await asyncio.gather(
-            *[fn(client, symbol) for fn in _FETCHERS],
-            return_exceptions=True,
-        )
+    results = await asyncio.gather(
+        *[fn(symbol) for fn in _FETCHERS],
+        return_exceptions=True,
+    )
 
     rows: list[dict] = []
     for result in results:
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceededError(Exception):
+    """預估排隊時間超過上限（例如 host 被封鎖中），不送出請求"""
+
+
+@dataclass(frozen=True)
+class HostLimit:
+    """單一 host（與 API key 等級）的限流設定
+
+    rate / burst 以「權重」為單位；weight_header 為交易所回報的已用權重（每分鐘視窗）。
+    """
+
+    rate: float  # 每秒補充的權重
+    burst: float  # 桶容量
+    weight_header: Optional[str] = None
+    weight_limit: Optional[int] = None
+
+
+# 依各交易所公開文件的 IP 限額保守設定；未列出的 host 不限流。
+# 未列出的等級沿用該 host 第一個設定（同一個 bucket）
+HOST_LIMITS: dict[str, dict[str, HostLimit]] = {
+    # 2400 weight / 分鐘，以 IP 計算 → 有無 key 共用同一個 bucket
+    "fapi.binance.com": {"public": HostLimit(20.0, 40.0, "x-mbx-used-weight-1m", 2400)},
+    # 免費 30 次 / 分鐘；Pro 500 次 / 分鐘（不同 host）
+    "api.coingecko.com": {"public": HostLimit(0.5, 5.0)},
+    "pro-api.coingecko.com": {"key": HostLimit(8.0, 20.0)},
+    "www.okx.com": {"public": HostLimit(10.0, 20.0)},  # 20 次 / 2 秒
+    "api.bybit.com": {"public": HostLimit(20.0, 40.0)},
+    "api.bitget.com": {"public": HostLimit(15.0, 20.0)},
+    "api.gateio.ws": {"public": HostLimit(20.0, 40.0)},  # 200 次 / 10 秒
+    "api.glassnode.com": {"key": HostLimit(1.0, 5.0)},
+    "api.alternative.me": {"public": HostLimit(1.0, 5.0)},
+    "open-api.coinglass.com": {"public": HostLimit(0.5, 5.0)},
+}
+
+# 帶 API key 的 header / query 參數 → 以 "key" 等級限流
+_KEY_HEADERS = ("x-mbx-apikey", "x-cg-pro-api-key", "coinglasssecret")
+_KEY_PARAMS = ("api_key",)
+
+# 使用權重達上限此比例時，暫停到下一個分鐘視窗
+WEIGHT_HEADROOM = 0.9
+# 429 未附 Retry-After 時的退避秒數；418（IP 封鎖）最少等待秒數
+DEFAULT_RETRY_AFTER = 5.0
+MIN_BAN_SECONDS = 120.0
+# 429 後速率減半，之後每次成功回升 5%（AIMD）
+BACKOFF_FACTOR = 0.5
+RECOVERY_FACTOR = 1.05
+MIN_RATE_FRACTION = 0.1
+
+
+def request_tier(headers: Optional[Mapping[str, str]], params: Any) -> str:
+    names = {k.lower() for k in (headers or {})}
+    if any(h in names for h in _KEY_HEADERS):
+        return "key"
+    if isinstance(params, Mapping) and any(p in params for p in _KEY_PARAMS):
+        return "key"
+    return "public"
+
+
+def request_weight(host: str, path: str, params: Any) -> float:
+    """請求權重：Binance 不帶 symbol 的全市場查詢權重較高"""
+    if host == "fapi.binance.com" and path in ("/fapi/v1/premiumIndex", "/fapi/v1/ticker/24hr"):
+        has_symbol = isinstance(params, Mapping) and "symbol" in params
+        return 1.0 if has_symbol else 10.0
+    return 1.0
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """公平排隊的 token bucket — 請求依到達順序取得權重（FIFO）
+
+    速率會因 429 自動調降、成功回應時逐步回復；block() 讓整個 host 暫停到指定時間。
+    """
+
+    def __init__(self, limit: HostLimit):
+        self.limit = limit
+        self.rate = limit.rate
+        self._tokens = limit.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.waiting = 0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+
+    def _queue(self) -> asyncio.Lock:
+        # asyncio.Lock 依等待順序喚醒 → FIFO；綁定 event loop，換 loop 時重建
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.limit.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def projected_wait(self, cost: float = 1.0) -> float:
+        """現在排入時預估需等待的秒數（不含排在前面的請求）"""
+        now = time.monotonic()
+        self._refill(now)
+        blocked = max(self._blocked_until - now, 0.0)
+        deficit = max(min(cost, self.limit.burst) - self._tokens, 0.0)
+        return max(blocked, deficit / self.rate)
+
+    async def acquire(self, cost: float = 1.0, max_wait: Optional[float] = None) -> float:
+        """取得 cost 權重，回傳排隊等待秒數"""
+        cost = min(cost, self.limit.burst)
+        t0 = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._queue():
+                while True:
+                    wait = self.projected_wait(cost)
+                    if wait <= 0:
+                        break
+                    if max_wait is not None and time.monotonic() - t0 + wait > max_wait:
+                        raise RateLimitExceededError(
+                            f"Rate limit wait {wait:.1f}s exceeds {max_wait:.1f}s"
+                        )
+                    await asyncio.sleep(wait)
+                self._tokens -= cost
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - t0
+        self.requests += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    def block(self, seconds: float) -> None:
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def backoff(self) -> None:
+        self.throttled += 1
+        self.rate = max(self.rate * BACKOFF_FACTOR, self.limit.rate * MIN_RATE_FRACTION)
+
+    def recover(self) -> None:
+        if self.rate < self.limit.rate:
+            self.rate = min(self.rate * RECOVERY_FACTOR, self.limit.rate)
+
+    def stats(self) -> dict:
+        avg_wait = self.total_wait / self.requests if self.requests else 0.0
+        return {
+            "rate": round(self.rate, 3),
+            "waiting": self.waiting,
+            "requests": self.requests,
+            "avg_wait_ms": round(avg_wait * 1000, 1),
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "throttled": self.throttled,
+            "blocked_for_s": round(max(self._blocked_until - time.monotonic(), 0.0), 1),
+        }
+
+
+class RateLimiter:
+    """各 host × API key 等級的共用限流器
+
+    請求前 acquire()，收到回應後 observe()：讀取已用權重與 Retry-After，
+    429 時暫停並調降速率，418（IP 封鎖）時整個 host 暫停。
+    """
+
+    def __init__(self, limits: Optional[dict[str, dict[str, HostLimit]]] = None):
+        self._limits = HOST_LIMITS if limits is None else limits
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+
+    def bucket(self, host: str, tier: str) -> Optional[TokenBucket]:
+        tiers = self._limits.get(host)
+        if not tiers:
+            return None
+        if tier not in tiers:
+            tier = next(iter(tiers))
+        key = (host, tier)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(tiers[tier])
+        return bucket
+
+    async def acquire(
+        self, url: httpx.URL, headers: Any = None, params: Any = None,
+        max_wait: Optional[float] = None,
+    ) -> Optional[TokenBucket]:
+        bucket = self.bucket(url.host, request_tier(headers, params))
+        if bucket is None:
+            return None
+        waited = await bucket.acquire(request_weight(url.host, url.path, params), max_wait)
+        if waited > 1.0:
+            logger.info("Rate limiter queued %s for %.1fs", url.host, waited)
+        return bucket
+
+    def observe(self, bucket: Optional[TokenBucket], response: httpx.Response) -> None:
+        if bucket is None:
+            return
+        host = response.request.url.host
+        if response.status_code == 418:
+            seconds = max(retry_after_seconds(response) or 0.0, MIN_BAN_SECONDS)
+            bucket.block(seconds)
+            bucket.backoff()
+            logger.error("%s banned this IP (418); pausing %.0fs", host, seconds)
+            return
+        if response.status_code == 429:
+            seconds = retry_after_seconds(response) or DEFAULT_RETRY_AFTER
+            bucket.block(seconds)
+            bucket.backoff()
+            logger.warning("%s rate limited (429); pausing %.1fs", host, seconds)
+            return
+
+        bucket.recover()
+        limit = bucket.limit
+        used = response.headers.get(limit.weight_header) if limit.weight_header else None
+        if used is not None and limit.weight_limit:
+            try:
+                used_weight = int(used)
+            except ValueError:
+                return
+            if used_weight >= limit.weight_limit * WEIGHT_HEADROOM:
+                # 已接近每分鐘權重上限 → 暫停到下一個分鐘視窗
+                bucket.block(60.0 - time.time() % 60.0)
+                logger.warning("%s used weight %d/%d; pausing until next minute",
+                               host, used_weight, limit.weight_limit)
+
+    def stats(self) -> dict[str, dict]:
+        return {f"{host}:{tier}": b.stats() for (host, tier), b in sorted(self._buckets.items())}
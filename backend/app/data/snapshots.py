@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional
+
+from app.core.compute import compute
+
+logger = logging.getLogger(__name__)
+
+RETRY_SECONDS = 60.0  # 下載失敗後多久再試
+
+
+def read_json(path: Path) -> Optional[Any]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def write_json(path: Path, data: Any) -> None:
+    # 先寫暫存檔再 rename，避免中斷時留下損毀的快照
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class SnapshotIndex(ABC):
+    """以磁碟快照持久化、背景定期刷新的查詢索引（基底類別）
+
+    子類別實作 _download()、_build(data) 與 __len__()。
+
+    - 第一次查詢前先載入快照，重啟或 CLI 指令不必重新下載
+    - 刷新失敗保留舊索引；過期時在背景刷新，不阻塞查詢
+    - 並行的刷新共用同一次下載
+    """
+
+    label = "index"
+
+    def __init__(self, path: str, refresh_seconds: float):
+        self._path = Path(path)
+        self._refresh_seconds = refresh_seconds
+        self._updated_at = 0.0  # 快照時間（unix 秒），0 = 尚未載入
+        self._failed_at = float("-inf")
+        self._snapshot_checked = False
+        self._refresh: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def _download(self) -> Any:
+        """下載最新資料（可 JSON 序列化；空值視為失敗）"""
+
+    @abstractmethod
+    def _build(self, data: Any) -> None:
+        """由下載 / 快照資料建立查詢結構"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """索引筆數（0 = 尚不可用）"""
+
+    @property
+    def updated_at(self) -> float:
+        return self._updated_at
+
+    def stale(self) -> bool:
+        return time.time() - self._updated_at >= self._refresh_seconds
+
+    async def load_snapshot(self) -> bool:
+        """從磁碟載入上次的快照"""
+        self._snapshot_checked = True
+        try:
+            snapshot = await compute.thread(read_json, self._path)
+        except (OSError, ValueError) as e:
+            logger.warning("Failed to read %s snapshot %s: %s", self.label, self._path, e)
+            return False
+        if not snapshot or not snapshot.get("data"):
+            return False
+        if snapshot["updated_at"] > self._updated_at:
+            await compute.thread(self._build, snapshot["data"])
+            self._updated_at = snapshot["updated_at"]
+            logger.info("Loaded %d %s entries from %s", len(self), self.label, self._path)
+        return True
+
+    def _refresh_task(self) -> asyncio.Task:
+        task = self._refresh
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = self._refresh = asyncio.create_task(self._fetch())
+        return task
+
+    async def refresh(self) -> bool:
+        """重新下載；並行的呼叫共用同一次下載"""
+        return await asyncio.shield(self._refresh_task())
+
+    async def _fetch(self) -> bool:
+        try:
+            data = await self._download()
+            if not data:
+                raise ValueError("empty response")
+        except Exception as e:
+            logger.warning("Failed to download %s: %s; keeping current index", self.label, e)
+            self._failed_at = time.monotonic()
+            return False
+
+        # 大型索引（數萬筆）建立時間不短 → 送到 thread，不阻塞 event loop
+        await compute.thread(self._build, data)
+        self._updated_at = time.time()
+        logger.info("Loaded %d %s entries", len(self), self.label)
+        try:
+            await compute.thread(
+                write_json, self._path, {"updated_at": self._updated_at, "data": data}
+            )
+        except OSError as e:
+            logger.warning("Failed to save %s snapshot %s: %s", self.label, self._path, e)
+        return True
+
+    async def ensure(self, wait: bool = True) -> None:
+        """查詢前呼叫：必要時載入快照 / 下載；過期則背景刷新
+
+        wait=False：索引仍為空時也只在背景下載，呼叫端自行處理索引不可用的情況
+        """
+        if not self._snapshot_checked:
+            await self.load_snapshot()
+        retry = time.monotonic() - self._failed_at >= RETRY_SECONDS
+        if not len(self):
+            if retry:
+                if wait:
+                    await self.refresh()
+                else:
+                    self._refresh_task()
+        elif self.stale() and retry:
+            self._refresh_task()  # 舊索引照常使用，背景刷新
+
+    def start(self) -> None:
+        """啟動時載入快照，之後定期刷新"""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(
+                self._refresh_loop(), name=f"{self.label}-refresh"
+            )
+
+    async def _refresh_loop(self) -> None:
+        await self.load_snapshot()
+        while True:
+            if self.stale():
+                await self.refresh()
+            wait = self._updated_at + self._refresh_seconds - time.time()
+            await asyncio.sleep(wait if wait > 0 else RETRY_SECONDS)
+
+    async def aclose(self) -> None:
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
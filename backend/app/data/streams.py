@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Optional
+
+import pandas as pd
+from websockets.asyncio.client import ClientConnection, connect
+from websockets.exceptions import ConnectionClosed, InvalidHandshake
+
+from app.config import settings
+from app.core.timeframes import TIMEFRAME_MS, to_datetime_index
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+QUOTE = "USDT"
+# Binance 每個連線每秒最多 5 則訊息、單一 SUBSCRIBE 不宜過長 → 分批送出
+SUBSCRIBE_CHUNK = 200
+SUBSCRIBE_INTERVAL = 0.25
+RECONNECT_INITIAL_SECONDS = 1.0
+
+
+class LiveMarket:
+    """WebSocket 推送的即時行情狀態 — 各幣種最新價格與各週期最近幾根 K 棒
+
+    只存在記憶體；讀取端以 merge() 把即時 K 棒接到 REST 取得的 OHLCV 後面，
+    以 prices() 取代輪詢 ticker。
+    """
+
+    def __init__(self, keep_bars: Optional[int] = None):
+        self._keep_bars = keep_bars or settings.stream_keep_bars
+        self._prices: dict[str, tuple[float, float]] = {}  # symbol → (價格, 收到時間)
+        self._candles: dict[tuple[str, str], dict[int, tuple[float, ...]]] = {}
+
+    def update_price(self, symbol: str, price: float) -> None:
+        self._prices[symbol.upper()] = (price, time.monotonic())
+
+    def prices(self, symbols: Iterable[str], max_age: Optional[float] = None) -> dict[str, float]:
+        """max_age 秒內收到的價格（缺的或過期的不回傳）"""
+        max_age = settings.stream_price_max_age_seconds if max_age is None else max_age
+        now = time.monotonic()
+        result: dict[str, float] = {}
+        for symbol in symbols:
+            entry = self._prices.get(symbol.upper())
+            if entry is not None and now - entry[1] <= max_age:
+                result[symbol.upper()] = entry[0]
+        return result
+
+    def update_candle(
+        self, symbol: str, timeframe: str, open_ms: int, ohlcv: tuple[float, ...]
+    ) -> None:
+        bars = self._candles.setdefault((symbol.upper(), timeframe), {})
+        bars[open_ms] = ohlcv
+        while len(bars) > self._keep_bars:
+            del bars[min(bars)]
+
+    def candles(self, symbol: str, timeframe: str) -> list[tuple[int, tuple[float, ...]]]:
+        return sorted(self._candles.get((symbol.upper(), timeframe), {}).items())
+
+    def merge(self, symbol: str, timeframe: str, df: pd.DataFrame) -> pd.DataFrame:
+        """把即時 K 棒接到 df 尾端（更新最後一根 / 追加新 K 棒），長度不變
+
+        即時 K 棒需與 df 連續（例如斷線期間漏掉的 K 棒）才合併，否則原樣回傳。
+        """
+        bars = self.candles(symbol, timeframe)
+        if not bars or df.empty or timeframe not in TIMEFRAME_MS:
+            return df
+        step = TIMEFRAME_MS[timeframe]
+        index = to_datetime_index(df.index)
+        last_ms = int(index.as_unit("ms").asi8[-1])
+
+        rows = [(t, v) for t, v in bars if t >= last_ms]
+        if not rows or rows[0][0] > last_ms + step:
+            return df
+        if any(b[0] - a[0] != step for a, b in zip(rows, rows[1:])):
+            return df
+
+        base = df.set_axis(index)
+        if rows[0][0] == last_ms:
+            base = base.iloc[:-1]
+        live = pd.DataFrame(
+            [v for _, v in rows],
+            columns=OHLCV_COLUMNS,
+            index=pd.to_datetime([t for t, _ in rows], unit="ms", utc=True).as_unit(index.unit),
+        )
+        live.index.name = df.index.name
+        return pd.concat([base, live]).tail(len(df))
+
+    def clear(self) -> None:
+        self._prices.clear()
+        self._candles.clear()
+
+
+def _streams(symbols: Iterable[str], timeframes: Iterable[str]) -> dict[str, str]:
+    """stream 名稱 → symbol；每個幣種一個 miniTicker + 各週期 kline"""
+    streams: dict[str, str] = {}
+    for symbol in symbols:
+        pair = f"{symbol.lower()}{QUOTE.lower()}"
+        streams[f"{pair}@miniTicker"] = symbol
+        for tf in timeframes:
+            if tf in TIMEFRAME_MS:
+                streams[f"{pair}@kline_{tf}"] = symbol
+    return streams
+
+
+class BinanceStream:
+    """Binance 現貨 combined stream 用戶端 — kline + miniTicker 寫入 LiveMarket
+
+    - 連線後一次訂閱所有 stream；set_symbols() 於連線中以 SUBSCRIBE / UNSUBSCRIBE 增減
+    - 斷線（含交易所每 24 小時主動斷線）以指數退避重連，重連後重新訂閱
+    - K 棒收盤（x=true）時在背景呼叫 on_candle_closed(symbol, timeframe)
+    """
+
+    def __init__(
+        self,
+        live: LiveMarket,
+        url: Optional[str] = None,
+        on_candle_closed: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        reconnect_max_seconds: Optional[float] = None,
+    ):
+        self._live = live
+        self._url = url or settings.stream_url
+        self._on_candle_closed = on_candle_closed
+        self._reconnect_max = reconnect_max_seconds or settings.stream_reconnect_max_seconds
+        self._streams: dict[str, str] = {}  # 期望訂閱
+        self._subscribed: set[str] = set()  # 目前連線上已訂閱
+        self._symbols: dict[str, str] = {}  # "BTCUSDT" → "BTC"
+        self._ws: Optional[ClientConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._background: set[asyncio.Task] = set()
+        self._request_id = 0
+        self.connects = 0
+        self.messages = 0
+        self._last_message_at: Optional[float] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    @property
+    def streams(self) -> list[str]:
+        return sorted(self._streams)
+
+    async def set_symbols(self, symbols: Iterable[str], timeframes: Iterable[str]) -> None:
+        symbols = [s.upper() for s in symbols]
+        self._streams = _streams(symbols, list(timeframes))
+        self._symbols = {f"{s}{QUOTE}": s for s in symbols}
+        if self._ws is not None:
+            await self._sync(self._ws)
+
+    async def _sync(self, ws: ClientConnection) -> None:
+        wanted = set(self._streams)
+        removed = sorted(self._subscribed - wanted)
+        added = sorted(wanted - self._subscribed)
+        if removed:
+            await self._send(ws, "UNSUBSCRIBE", removed)
+        if added:
+            await self._send(ws, "SUBSCRIBE", added)
+        self._subscribed = wanted
+
+    async def _send(self, ws: ClientConnection, method: str, params: list[str]) -> None:
+        for i in range(0, len(params), SUBSCRIBE_CHUNK):
+            if i:
+                await asyncio.sleep(SUBSCRIBE_INTERVAL)
+            self._request_id += 1
+            chunk = params[i:i + SUBSCRIBE_CHUNK]
+            await ws.send(json.dumps({"method": method, "params": chunk, "id": self._request_id}))
+
+    # ── 生命週期 ──
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="binance-stream")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    async def _run(self) -> None:
+        backoff = RECONNECT_INITIAL_SECONDS
+        while True:
+            try:
+                async with connect(self._url, max_size=2**22) as ws:
+                    self._ws = ws
+                    self.connects += 1
+                    backoff = RECONNECT_INITIAL_SECONDS
+                    logger.info("Market stream connected: %d streams", len(self._streams))
+                    self._subscribed = set()
+                    await self._sync(ws)
+                    async for raw in ws:
+                        self._handle(raw)
+                    logger.info("Market stream closed by server; reconnecting")
+            except (OSError, ConnectionClosed, InvalidHandshake, asyncio.TimeoutError) as e:
+                logger.warning("Market stream disconnected: %s; retrying in %.0fs", e, backoff)
+            except Exception:
+                # 非預期錯誤也不能讓 task 結束，否則即時行情永久中斷
+                logger.exception("Market stream failed; retrying in %.0fs", backoff)
+            finally:
+                self._ws = None
+                self._subscribed = set()
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+            backoff = min(backoff * 2, self._reconnect_max)
+
+    # ── 訊息處理 ──
+
+    def _handle(self, raw: str | bytes) -> None:
+        self.messages += 1
+        self._last_message_at = time.monotonic()
+        try:
+            data = json.loads(raw).get("data")
+        except (ValueError, AttributeError):
+            logger.debug("Unparseable stream message: %r", raw[:200])
+            return
+        if not isinstance(data, dict):
+            return  # SUBSCRIBE 回應等
+
+        symbol = self._symbols.get(data.get("s", ""))
+        if symbol is None:
+            return
+        # 欄位缺漏或格式錯誤的訊息只略過該則，不中斷整條連線
+        try:
+            event = data.get("e")
+            if event == "24hrMiniTicker":
+                self._live.update_price(symbol, float(data["c"]))
+            elif event == "kline":
+                k = data["k"]
+                ohlcv = (float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]))
+                self._live.update_candle(symbol, k["i"], int(k["t"]), ohlcv)
+                # 最新成交價也更新（kline 比 miniTicker 更頻繁）
+                self._live.update_price(symbol, ohlcv[3])
+                if k.get("x") and self._on_candle_closed is not None:
+                    self._spawn(self._on_candle_closed(symbol, k["i"]))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug("Malformed stream message (%s): %r", e, raw[:200])
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Candle close handler failed: %s", task.exception())
+
+    def stats(self) -> dict:
+        age = None
+        if self._last_message_at is not None:
+            age = round(time.monotonic() - self._last_message_at, 1)
+        return {
+            "connected": self.connected,
+            "streams": len(self._streams),
+            "connects": self.connects,
+            "messages": self.messages,
+            "last_message_age_s": age,
+        }
+
+
+# 全域即時行情狀態（由 StreamService 寫入，MarketService / TechnicalService 讀取）
+live_market = LiveMarket()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+from typing import Optional
+
+# 交易所對低單價幣種的倍數前綴：1000SHIB、1000000MOG、1MBABYDOGE（1M = 一百萬）
+# 1INCH 這類本身以數字開頭的幣種不符合（需 10…0 或 1M）
+_MULTIPLIER_PREFIX = re.compile(r"^(10+|1M)(?=[A-Z])")
+
+
+def split_multiplier(base: str) -> tuple[str, int]:
+    """1000SHIB → ("SHIB", 1000)；1MBABYDOGE → ("BABYDOGE", 1_000_000)；BTC → ("BTC", 1)"""
+    match = _MULTIPLIER_PREFIX.match(base)
+    if match is None:
+        return base, 1
+    prefix = match.group(1)
+    multiplier = 1_000_000 if prefix == "1M" else int(prefix)
+    return base[match.end():], multiplier
+
+
+class SymbolIndex:
+    """base asset → 交易對的 O(1) 索引（現貨 ccxt 與 Binance 合約共用）
+
+    先比對完整 base asset（BTC、1000SATS），找不到再比對去掉倍數前綴後的幣種
+    （SHIB → 1000SHIBUSDT）；同一幣種有多個倍數時取最小者。
+
+    Example:
+        index = SymbolIndex([("BTCUSDT", "BTC"), ("1000SHIBUSDT", "1000SHIB")])
+        index.resolve("shib")  # "1000SHIBUSDT"
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, str]] = ()):
+        self._entries: list[tuple[str, str]] = []
+        self._by_base: dict[str, str] = {}
+        self._by_root: dict[str, tuple[int, str]] = {}
+        for pair, base in entries:
+            self.add(pair, base)
+
+    def add(self, pair: str, base: str) -> None:
+        base = base.upper()
+        self._entries.append((pair, base))
+        self._by_base.setdefault(base, pair)
+        root, multiplier = split_multiplier(base)
+        if multiplier > 1:
+            current = self._by_root.get(root)
+            if current is None or multiplier < current[0]:
+                self._by_root[root] = (multiplier, pair)
+
+    def resolve(self, symbol: str) -> Optional[str]:
+        upper = symbol.upper()
+        pair = self._by_base.get(upper)
+        if pair is not None:
+            return pair
+        root = self._by_root.get(upper)
+        return root[1] if root is not None else None
+
+    def entries(self) -> list[tuple[str, str]]:
+        return list(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,3 +1,4 @@
+from app.db.models.alert_rule import AlertRule  # noqa: F401
 from app.db.models.api_cache import ApiCache  # noqa: F401
 from app.db.models.app_setting import AppSetting  # noqa: F401
-from app.db.models.price import IndicatorCache, PriceHistory  # noqa: F401
+from app.db.models.price import IndicatorCache, PriceHistory, PriceHistoryStart  # noqa: F401
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from sqlalchemy import Boolean, Column, Float, Index, Integer, String, Text
+
+from app.db.base import Base
+
+
+class AlertRule(Base):
+    """警示規則 — 例如 ETH 1h rsi crosses_below 30；衍生品指標 timeframe 為 NULL"""
+
+    __tablename__ = "alert_rules"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    symbol = Column(String(20), nullable=False)
+    timeframe = Column(String(5), nullable=True)
+    metric = Column(String(30), nullable=False)
+    op = Column(String(20), nullable=False)
+    threshold = Column(Float, nullable=False)
+    webhook_url = Column(Text, nullable=True)
+    enabled = Column(Boolean, nullable=False, default=True)
+    created_at = Column(Float, nullable=False)            # time.time() epoch
+    last_triggered_at = Column(Float, nullable=True)
+
+    __table_args__ = (
+        Index("idx_alert_symbol_tf_metric", "symbol", "timeframe", "metric"),
+    )
@@ -25,6 +25,22 @@ class PriceHistory(Base):
     )
 
 
+class PriceHistoryStart(Base):
+    """交易所可提供的最早 K 線（上市日），早於此不再視為缺口"""
+
+    __tablename__ = "price_history_start"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    symbol = Column(String(20), nullable=False)
+    timeframe = Column(String(5), nullable=False)
+    first_timestamp = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_history_start_symbol_tf", "symbol", "timeframe", unique=True),
+    )
+
+
 class IndicatorCache(Base):
     __tablename__ = "indicator_cache"
 
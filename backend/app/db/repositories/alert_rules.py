@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models.alert_rule import AlertRule
+
+_RULE_COLUMNS = (
+    "id", "symbol", "timeframe", "metric", "op", "threshold",
+    "webhook_url", "enabled", "created_at", "last_triggered_at",
+)
+
+
+def _to_dict(row: AlertRule) -> dict:
+    return {c: getattr(row, c) for c in _RULE_COLUMNS}
+
+
+class AlertRuleRepository:
+    """警示規則儲存 (alert_rules 表)"""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self._sf = session_factory
+
+    async def list(self, enabled_only: bool = False) -> list[dict]:
+        stmt = select(AlertRule).order_by(AlertRule.id)
+        if enabled_only:
+            stmt = stmt.where(AlertRule.enabled.is_(True))
+        async with self._sf() as session:
+            rows = (await session.scalars(stmt)).all()
+        return [_to_dict(r) for r in rows]
+
+    async def create(
+        self,
+        symbol: str,
+        timeframe: Optional[str],
+        metric: str,
+        op: str,
+        threshold: float,
+        webhook_url: Optional[str] = None,
+    ) -> dict:
+        row = AlertRule(
+            symbol=symbol.upper(),
+            timeframe=timeframe,
+            metric=metric,
+            op=op,
+            threshold=threshold,
+            webhook_url=webhook_url,
+            enabled=True,
+            created_at=time.time(),
+        )
+        async with self._sf() as session:
+            session.add(row)
+            await session.commit()
+            await session.refresh(row)
+        return _to_dict(row)
+
+    async def delete(self, rule_id: int) -> bool:
+        async with self._sf() as session:
+            result = await session.execute(delete(AlertRule).where(AlertRule.id == rule_id))
+            await session.commit()
+        return result.rowcount > 0
+
+    async def mark_triggered(self, rule_ids: list[int], at: float) -> None:
+        if not rule_ids:
+            return
+        async with self._sf() as session:
+            await session.execute(
+                update(AlertRule).where(AlertRule.id.in_(rule_ids)).values(last_triggered_at=at)
+            )
+            await session.commit()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models.price import PriceHistory, PriceHistoryStart
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+# SQLite 單一 statement 參數上限 (每列 8 欄)
+_UPSERT_CHUNK = 100
+
+
+def _to_naive_utc(ts: pd.Timestamp) -> datetime:
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return ts.to_pydatetime()
+
+
+class PriceHistoryRepository:
+    """OHLCV 歷史 K 線儲存 (price_history 表)"""
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self._sf = session_factory
+
+    async def load(
+        self, symbol: str, timeframe: str, since: Optional[pd.Timestamp] = None
+    ) -> pd.DataFrame:
+        """讀取已儲存的 K 線，回傳以 UTC timestamp 為索引的 OHLCV DataFrame。"""
+        stmt = select(
+            PriceHistory.timestamp, *(getattr(PriceHistory, c) for c in OHLCV_COLUMNS)
+        ).where(
+            PriceHistory.symbol == symbol.upper(),
+            PriceHistory.timeframe == timeframe,
+        )
+        if since is not None:
+            stmt = stmt.where(PriceHistory.timestamp >= _to_naive_utc(since))
+        stmt = stmt.order_by(PriceHistory.timestamp)
+
+        async with self._sf() as session:
+            rows = (await session.execute(stmt)).all()
+
+        df = pd.DataFrame(rows, columns=["timestamp", *OHLCV_COLUMNS])
+        df["timestamp"] = pd.to_datetime(df["timestamp"]).dt.tz_localize(timezone.utc)
+        return df.set_index("timestamp")
+
+    async def latest_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        async with self._sf() as session:
+            value = await session.scalar(
+                select(func.max(PriceHistory.timestamp)).where(
+                    PriceHistory.symbol == symbol.upper(),
+                    PriceHistory.timeframe == timeframe,
+                )
+            )
+        return pd.Timestamp(value, tz="UTC") if value is not None else None
+
+    async def earliest_available(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        """交易所最早可提供的 K 線時間（未記錄回傳 None）"""
+        async with self._sf() as session:
+            value = await session.scalar(
+                select(PriceHistoryStart.first_timestamp).where(
+                    PriceHistoryStart.symbol == symbol.upper(),
+                    PriceHistoryStart.timeframe == timeframe,
+                )
+            )
+        return pd.Timestamp(value, tz="UTC") if value is not None else None
+
+    async def set_earliest_available(
+        self, symbol: str, timeframe: str, ts: pd.Timestamp
+    ) -> None:
+        stmt = sqlite_insert(PriceHistoryStart).values(
+            symbol=symbol.upper(), timeframe=timeframe, first_timestamp=_to_naive_utc(ts)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PriceHistoryStart.symbol, PriceHistoryStart.timeframe],
+            set_={"first_timestamp": stmt.excluded.first_timestamp},
+        )
+        async with self._sf() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def upsert(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """寫入/更新 K 線（同 symbol+timeframe+timestamp 覆蓋，例如未收盤 K 棒）。"""
+        if df.empty:
+            return 0
+
+        upper = symbol.upper()
+        values = df[OHLCV_COLUMNS].to_numpy(dtype=float)
+        records = [
+            {
+                "symbol": upper,
+                "timeframe": timeframe,
+                "timestamp": _to_naive_utc(ts),
+                **dict(zip(OHLCV_COLUMNS, map(float, row))),
+            }
+            for ts, row in zip(df.index, values)
+        ]
+
+        async with self._sf() as session:
+            for i in range(0, len(records), _UPSERT_CHUNK):
+                stmt = sqlite_insert(PriceHistory).values(records[i: i + _UPSERT_CHUNK])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[
+                        PriceHistory.symbol, PriceHistory.timeframe, PriceHistory.timestamp
+                    ],
+                    set_={c: getattr(stmt.excluded, c) for c in OHLCV_COLUMNS},
+                )
+                await session.execute(stmt)
+            await session.commit()
+
+        logger.debug("Stored %d %s %s bars", len(records), symbol.upper(), timeframe)
+        return len(records)
@@ -1,20 +1,33 @@
 from __future__ import annotations
 
+from app.config import settings
 from app.data.aggregator import DataAggregator
 from app.data.providers.ccxt_provider import CCXTProvider
 from app.data.providers.coingecko import CoinGeckoProvider
+from app.db.session import async_session
+from app.services.alert_service import AlertService
+from app.services.backtest_service import BacktestService
 from app.services.market_service import MarketService
+from app.services.screener_service import ScreenerService
+from app.services.settings_service import SettingsService
+from app.services.stream_service import StreamService
 from app.services.technical_service import TechnicalService
 
 _aggregator = None
+_technical_service = None
+_alert_service = None
+_stream_service = None
 
 
 def get_aggregator() -> DataAggregator:
     global _aggregator
     if _aggregator is None:
+        primary, *others = settings.ccxt_exchanges
         providers = {
-            "ccxt": CCXTProvider(),
+            "ccxt": CCXTProvider(primary),
             "coingecko": CoinGeckoProvider(),
+            # 其他交易所以 exchange id 為名，共用同一個 ExchangePool
+            **{exchange_id: CCXTProvider(exchange_id) for exchange_id in others},
         }
         _aggregator = DataAggregator(providers, primary="ccxt", fallback="coingecko")
     return _aggregator
@@ -22,8 +35,9 @@ def get_aggregator() -> DataAggregator:
 
 def reset_aggregator() -> None:
     """重置 aggregator（用於測試或 event loop 切換時）"""
-    global _aggregator
+    global _aggregator, _technical_service
     _aggregator = None
+    _technical_service = None
 
 
 def get_market_service() -> MarketService:
@@ -31,4 +45,34 @@ def get_market_service() -> MarketService:
 
 
 def get_technical_service() -> TechnicalService:
-    return TechnicalService(get_aggregator())
+    # 共用單一實例：不必每個請求重建 SentimentService / HistoryService
+    global _technical_service
+    if _technical_service is None:
+        _technical_service = TechnicalService(get_aggregator())
+    return _technical_service
+
+
+def get_backtest_service() -> BacktestService:
+    return BacktestService(get_aggregator())
+
+
+def get_screener_service() -> ScreenerService:
+    return ScreenerService(get_aggregator(), get_technical_service())
+
+
+def get_alert_service() -> AlertService:
+    # 規則索引與 SSE 訂閱者常駐於單一實例，排程與 API 共用
+    global _alert_service
+    if _alert_service is None:
+        _alert_service = AlertService(async_session)
+    return _alert_service
+
+
+def get_stream_service() -> StreamService:
+    # 即時行情連線與訂閱狀態常駐於單一實例
+    global _stream_service
+    if _stream_service is None:
+        _stream_service = StreamService(
+            get_technical_service(), SettingsService(async_session), alerts=get_alert_service()
+        )
+    return _stream_service
@@ -12,9 +12,23 @@ from starlette.responses import Response
 
 from app.api.v1.router import api_router
 from app.config import settings
+from app.core.compute import compute
 from app.data.cache import cache
 from app.data.db_cache import DBCache
+from app.data.exchanges import exchanges
+from app.data.http import http_clients
+from app.data.providers.binance_pair_resolver import futures_pairs
+from app.data.providers.coingecko import coin_index
 from app.db.session import async_session, init_db
+from app.dependencies import (
+    get_aggregator,
+    get_alert_service,
+    get_stream_service,
+    get_technical_service,
+)
+from app.services.scheduler import PrecomputeScheduler
+from app.services.sentiment_service import SentimentService
+from app.services.settings_service import SettingsService
 
 logger = logging.getLogger(__name__)
 
@@ -37,11 +51,48 @@ async def lifespan(app: FastAPI):
     db_cache = DBCache(async_session)
     cache.attach_db(db_cache)
 
+    # 背景預先載入交易所 markets（首個請求不必自己付 load_markets），之後定期刷新
+    exchanges.start()
+    # Binance 合約 symbol 索引：載入磁碟快照，背景定期刷新 exchangeInfo
+    futures_pairs.start()
+    # CoinGecko 幣種索引：symbol → coin id 與 /market/search 本地搜尋
+    coin_index.start()
+
+    # 預先建立運算 pool（process worker 啟動需重新 import）
+    compute.start()
+
     # 啟動背景清理任務
     cleanup_task = asyncio.create_task(_periodic_cleanup(db_cache))
 
+    # 載入警示規則索引
+    alerts = get_alert_service()
+    await alerts.load()
+
+    # API key / 偏好設定載入記憶體快照（provider 每次上游請求不必查 DB）
+    settings_svc = SettingsService(async_session)
+    await settings_svc.load()
+
+    # 背景預先計算 watchlist / dashboard 幣種（並驅動警示評估）
+    scheduler = None
+    if settings.scheduler_enabled:
+        scheduler = PrecomputeScheduler(
+            get_technical_service(), SentimentService(), settings_svc,
+            alerts=alerts,
+        )
+        scheduler.start()
+
+    # 即時行情：watchlist 幣種的價格 / K 棒改由 WebSocket 推送
+    if settings.stream_enabled:
+        get_stream_service().start()
+
     yield
 
+    if settings.stream_enabled:
+        await get_stream_service().stop()
+    if scheduler is not None:
+        await scheduler.stop()
+    await alerts.close()
+
     # 關閉時取消背景任務
     cleanup_task.cancel()
     try:
@@ -49,6 +100,12 @@ async def lifespan(app: FastAPI):
     except asyncio.CancelledError:
         pass
 
+    await futures_pairs.aclose()
+    await coin_index.aclose()
+    compute.shutdown()
+    await exchanges.aclose()
+    await http_clients.aclose()
+
 
 app = FastAPI(
     title=settings.app_name,
@@ -90,3 +147,24 @@ app.include_router(api_router, prefix=settings.api_v1_prefix)
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+
+@app.get("/health/rate-limits")
+async def rate_limit_status():
+    """各上游 host 的限流狀態（排隊數、等待時間、429 次數）"""
+    return http_clients.rate_limit_stats()
+
+
+@app.get("/health/providers")
+async def provider_status():
+    """各資料來源斷路器狀態（closed / open / half_open）、健康分數與對沖統計"""
+    aggregator = get_aggregator()
+    return {"providers": aggregator.health(), "hedging": aggregator.hedge_stats()}
+
+
+@app.get("/health/stream")
+async def stream_status():
+    """即時行情 WebSocket 連線狀態"""
+    if not settings.stream_enabled:
+        return {"enabled": False}
+    return {"enabled": True, **get_stream_service().stats()}
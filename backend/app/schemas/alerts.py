@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class AlertRuleCreateRequest(BaseModel):
+    """新增警示規則，例如 ETH 1h rsi crosses_below 30 或 BTC funding_avg > 0.05"""
+    symbol: str = Field(min_length=1, max_length=20)
+    metric: str
+    op: str
+    threshold: float
+    timeframe: Optional[str] = None  # K 線指標必填；衍生品指標忽略
+    webhook_url: Optional[str] = None  # 未指定時使用 CRYPTO_ALERT_WEBHOOK_URL
+
+
+class AlertRuleResponse(BaseModel):
+    id: int
+    symbol: str
+    timeframe: Optional[str] = None
+    metric: str
+    op: str
+    threshold: float
+    webhook_url: Optional[str] = None
+    enabled: bool
+    created_at: float
+    last_triggered_at: Optional[float] = None
+
+
+class AlertRulesResponse(BaseModel):
+    rules: List[AlertRuleResponse]
+
+
+class AlertMetricsResponse(BaseModel):
+    """可用指標與運算子：{名稱: 說明}"""
+    candle: Dict[str, str]
+    derivatives: Dict[str, str]
+    operators: Dict[str, str]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class IndicatorSignal(BaseModel):
@@ -19,6 +19,48 @@ class TechnicalAnalysisResponse(BaseModel):
     indicators: List[IndicatorSignal]
     overall_signal: str  # "bullish" | "bearish" | "neutral"
     overall_score: float  # -1.0 (極度看空) ~ +1.0 (極度看多)
+    missing: List[str] = []  # 逾時或失敗而未納入評分的衍生品來源
+
+
+# --- 批次分析 ---
+
+
+class BatchAnalysisRequest(BaseModel):
+    symbols: List[str] = Field(min_length=1, max_length=50)
+    timeframes: List[str] = Field(default=["1d"], min_length=1, max_length=6)
+
+
+class BatchAnalysisItem(BaseModel):
+    symbol: str
+    timeframe: str
+    analysis: Optional[TechnicalAnalysisResponse] = None
+    error: Optional[str] = None
+
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[BatchAnalysisItem]
+
+
+# --- 多週期共振 ---
+
+
+class TimeframeAnalysis(BaseModel):
+    timeframe: str
+    indicators: List[IndicatorSignal]  # 僅技術指標，衍生品見 MTFAnalysisResponse.derivatives
+    overall_signal: str
+    overall_score: float  # 含共用的衍生品分數
+    consensus: float
+
+
+class MTFAnalysisResponse(BaseModel):
+    symbol: str
+    base_timeframe: str  # 實際抓取的週期，其餘由此重採樣
+    timeframes: List[TimeframeAnalysis]
+    derivatives: List[IndicatorSignal]
+    missing: List[str] = []
+    confluence_score: float  # 各週期加權評分，大週期權重較高
+    confluence_signal: str
+    alignment: float  # 與共振方向一致的週期佔比 (0 ~ 1)
 
 
 class SingleIndicatorResponse(BaseModel):
@@ -46,12 +88,94 @@ class IndicatorSeriesResponse(BaseModel):
     indicator: IndicatorSeriesData
 
 
+# --- 綜合評分時間序列 ---
+
+
+class ScoreSeriesPoint(BaseModel):
+    time: int
+    overall_score: float
+    consensus: float
+    scores: Dict[str, Optional[float]]  # 各指標 continuous_score
+
+
+class ScoreSeriesResponse(BaseModel):
+    symbol: str
+    timeframe: str
+    points: List[ScoreSeriesPoint]
+
+
+# --- 參數掃描 ---
+
+
+class SweepResponse(BaseModel):
+    symbol: str
+    timeframe: str
+    indicator: str
+    params: List[str]  # 參數欄位名稱
+    rows: List[Dict[str, Optional[float]]]  # 每列一組參數：參數值 + 最新值 + continuous_score
+
+
+# --- 回測 ---
+
+
+class BacktestConfigSchema(BaseModel):
+    entry_threshold: float
+    exit_threshold: float
+    fee_rate: float
+
+
+class BacktestMetrics(BaseModel):
+    bars: int
+    total_return: float
+    buy_hold_return: float
+    annualized_return: float
+    max_drawdown: float
+    sharpe: float
+    trades: int
+    hit_rate: float
+    exposure: float  # 持倉時間佔比
+    turnover: float  # 累計換手次數（進出場各計 1）
+
+
+class EquityPoint(BaseModel):
+    time: int
+    value: float
+
+
+class BacktestTrade(BaseModel):
+    entry_time: int
+    exit_time: int
+    trade_return: float  # 含手續費
+
+
+class BacktestResponse(BaseModel):
+    symbol: str
+    timeframe: str
+    start: int
+    end: int
+    config: BacktestConfigSchema
+    metrics: BacktestMetrics
+    equity: List[EquityPoint]  # 降採樣後的淨值曲線
+    trades: List[BacktestTrade]
+
+
 class SupportResistanceLevel(BaseModel):
     price: float
     label: str
 
 
+class SupportResistanceZone(BaseModel):
+    price: float  # 區內擺動點平均價
+    low: float
+    high: float
+    touches: int
+    strength: float  # 觸碰次數 × 新近度衰減
+    last_touch: int  # unix timestamp (秒)
+
+
 class SupportResistanceResponse(BaseModel):
     symbol: str
     timeframe: str
-    levels: List[SupportResistanceLevel]
+    levels: List[SupportResistanceLevel]  # Pivot Points
+    resistance: List[SupportResistanceZone] = []  # 價格之上，由近到遠
+    support: List[SupportResistanceZone] = []  # 價格之下，由近到遠
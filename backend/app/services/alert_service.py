@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.core.alerts.engine import OPERATORS, AlertIndex, AlertRule
+from app.core.alerts.metrics import (
+    CANDLE_METRICS,
+    DERIVATIVE_METRICS,
+    candle_values,
+    derivative_values,
+)
+from app.core.compute import compute
+from app.core.timeframes import TIMEFRAME_MS, to_datetime_index
+from app.data.http import http_clients
+from app.db.repositories.alert_rules import AlertRuleRepository
+
+logger = logging.getLogger(__name__)
+
+
+def _compile(row: dict) -> AlertRule:
+    return AlertRule(
+        id=row["id"],
+        symbol=row["symbol"],
+        timeframe=row["timeframe"],
+        metric=row["metric"],
+        op=row["op"],
+        threshold=row["threshold"],
+        webhook_url=row["webhook_url"],
+    )
+
+
+class AlertService:
+    """警示規則服務 — 規則存 DB，常駐編譯成 AlertIndex
+
+    排程在 K 棒收盤或衍生品刷新後呼叫 on_candles / on_derivatives，
+    只評估該 (symbol, timeframe) 有規則的指標；觸發事件推送到 SSE 訂閱者與 webhook。
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        webhook_url: Optional[str] = None,
+        webhook_timeout: Optional[float] = None,
+        queue_size: Optional[int] = None,
+    ):
+        self._repo = AlertRuleRepository(session_factory)
+        self._index = AlertIndex()
+        self._webhook_url = webhook_url or settings.alert_webhook_url
+        self._webhook_timeout = webhook_timeout or settings.alert_webhook_timeout_seconds
+        self._queue_size = queue_size or settings.alert_stream_queue_size
+        self._subscribers: set[asyncio.Queue] = set()
+        self._last_bar: dict[tuple[str, str], int] = {}  # 已評估的最近收盤 K 棒開盤時間
+        self._background: set[asyncio.Task] = set()
+
+    # ── 規則管理 ──
+
+    async def load(self) -> int:
+        """從 DB 載入啟用中的規則並重建索引"""
+        rows = await self._repo.list(enabled_only=True)
+        self._index = AlertIndex(_compile(r) for r in rows)
+        logger.info("Loaded %d alert rules", len(self._index))
+        return len(self._index)
+
+    async def list_rules(self) -> list[dict]:
+        return await self._repo.list()
+
+    async def create_rule(
+        self,
+        symbol: str,
+        metric: str,
+        op: str,
+        threshold: float,
+        timeframe: Optional[str] = None,
+        webhook_url: Optional[str] = None,
+    ) -> dict:
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}. Available: {list(OPERATORS)}")
+        if metric in CANDLE_METRICS:
+            if timeframe not in TIMEFRAME_MS:
+                raise ValueError(f"Metric {metric} requires a timeframe: {list(TIMEFRAME_MS)}")
+        elif metric in DERIVATIVE_METRICS:
+            timeframe = None  # 衍生品快照不分週期
+        else:
+            raise ValueError(
+                f"Unknown metric: {metric}. "
+                f"Available: {[*CANDLE_METRICS, *DERIVATIVE_METRICS]}"
+            )
+
+        row = await self._repo.create(symbol, timeframe, metric, op, threshold, webhook_url)
+        self._index.add(_compile(row))
+        return row
+
+    async def delete_rule(self, rule_id: int) -> bool:
+        self._index.remove(rule_id)
+        return await self._repo.delete(rule_id)
+
+    # ── 排程查詢 ──
+
+    def candle_keys(self) -> set[tuple[str, str]]:
+        """有 K 線規則的 (symbol, timeframe)"""
+        return {(s, tf) for s, tf in self._index.pairs() if tf is not None}
+
+    def derivative_symbols(self) -> set[str]:
+        return {s for s, tf in self._index.pairs() if tf is None}
+
+    # ── 資料更新 ──
+
+    async def on_candles(self, symbol: str, timeframe: str, df: pd.DataFrame) -> list[dict]:
+        """新 K 棒收盤：以最後一根已收盤 K 棒評估（同一根只評估一次）"""
+        symbol = symbol.upper()
+        metrics = self._index.metrics(symbol, timeframe)
+        if not metrics or df.empty:
+            return []
+
+        # L2 快取還原的 K 線索引為字串 → 先轉成 DatetimeIndex
+        times = to_datetime_index(df.index).as_unit("ms").asi8
+        closed = times + TIMEFRAME_MS[timeframe] <= int(time.time() * 1000)
+        df = df[closed]
+        if len(df) < 2:
+            return []
+        bar = int(times[closed][-1])
+        key = (symbol, timeframe)
+        if self._last_bar.get(key) == bar:
+            return []
+        self._last_bar[key] = bar
+
+        latest, previous = await compute.thread(candle_values, df, metrics)
+        events = self._index.evaluate(symbol, timeframe, latest, previous)
+        self._dispatch(events)
+        return events
+
+    async def on_derivatives(self, symbol: str, snapshot: dict[str, Any]) -> list[dict]:
+        """衍生品刷新：snapshot 為 {funding, open_interest, long_short, taker} 分析結果"""
+        symbol = symbol.upper()
+        metrics = self._index.metrics(symbol, None)
+        if not metrics:
+            return []
+        events = self._index.evaluate(symbol, None, derivative_values(snapshot, metrics))
+        self._dispatch(events)
+        return events
+
+    # ── 推送 ──
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def _dispatch(self, events: list[dict]) -> None:
+        if not events:
+            return
+        for event in events:
+            for queue in self._subscribers:
+                # 慢速訂閱者：丟掉最舊的事件，不阻塞評估
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(event)
+
+        by_url: dict[str, list[dict]] = {}
+        for event in events:
+            rule = self._index.get(event["rule_id"])
+            url = (rule.webhook_url if rule else None) or self._webhook_url
+            if url:
+                by_url.setdefault(url, []).append(event)
+        for url, batch in by_url.items():
+            self._spawn(self._post_webhook(url, batch))
+        self._spawn(self._mark_triggered([e["rule_id"] for e in events]))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _post_webhook(self, url: str, events: list[dict]) -> None:
+        try:
+            resp = await http_clients.post(
+                url, json={"events": events}, timeout=self._webhook_timeout
+            )
+            resp.raise_for_status()
+        except Exception as e:
+            logger.warning("Alert webhook %s failed: %s", url, e)
+
+    async def _mark_triggered(self, rule_ids: list[int]) -> None:
+        try:
+            await self._repo.mark_triggered(rule_ids, time.time())
+        except Exception as e:
+            logger.warning("Failed to record alert triggers: %s", e)
+
+    async def close(self) -> None:
+        """等待尚未完成的 webhook / DB 更新"""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
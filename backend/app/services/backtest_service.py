@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+from app.core.backtest.engine import BacktestConfig, run_backtest
+from app.core.compute import arrays_to_frame, compute, frame_to_arrays
+from app.core.indicators.scoring import score_timeline
+from app.core.timeframes import TIMEFRAME_MS
+from app.data.aggregator import DataAggregator
+from app.services.history_service import HistoryService
+from app.services.technical_service import AVAILABLE_INDICATORS, _index_to_unix
+
+# 指標暖機所需的額外 K 棒（與即時分析預設抓取量一致）
+WARMUP_BARS = 200
+# 淨值曲線回傳點數上限（多年 1h 數萬根，降採樣後給圖表）
+EQUITY_POINTS = 500
+
+
+def _backtest_task(payload: dict, timeframe: str, config: BacktestConfig) -> dict:
+    """分數時間軸 + 回測 + 輸出格式化（可在 process pool 執行）"""
+    df = arrays_to_frame(payload)
+    frame = score_timeline(df, [cls() for cls in AVAILABLE_INDICATORS.values()])
+    result = run_backtest(df, frame["overall_score"], config, timeframe)
+
+    equity = result.equity
+    step = max(1, math.ceil(len(equity) / EQUITY_POINTS))
+    sampled = equity.iloc[::step]
+    if sampled.index[-1] != equity.index[-1]:
+        sampled = equity.iloc[np.r_[np.arange(0, len(equity), step), len(equity) - 1]]
+
+    trades = result.trades
+    return {
+        "start": int(_index_to_unix(equity.index[:1])[0]),
+        "end": int(_index_to_unix(equity.index[-1:])[0]),
+        "metrics": {k: round(v, 6) for k, v in result.metrics.items()},
+        "equity": [
+            {"time": int(ts), "value": round(float(v), 6)}
+            for ts, v in zip(_index_to_unix(sampled.index), sampled.to_numpy())
+        ],
+        "trades": [
+            {
+                "entry_time": int(entry),
+                "exit_time": int(exit_),
+                "trade_return": round(float(ret), 6),
+            }
+            for entry, exit_, ret in zip(
+                _index_to_unix(trades["entry_time"]),
+                _index_to_unix(trades["exit_time"]),
+                trades["return"].to_numpy(),
+            )
+        ],
+    }
+
+
+class BacktestService:
+    """綜合評分策略回測服務"""
+
+    def __init__(self, aggregator: DataAggregator):
+        self._history = HistoryService(aggregator)
+
+    async def run(
+        self,
+        symbol: str,
+        timeframe: str = "4h",
+        days: int = 365,
+        config: Optional[BacktestConfig] = None,
+    ) -> dict:
+        config = config or BacktestConfig()
+        bars = math.ceil(days * 86_400_000 / TIMEFRAME_MS[timeframe]) + WARMUP_BARS
+        df = await self._history.get_history(symbol, timeframe, bars)
+        report = await compute.run(
+            _backtest_task, frame_to_arrays(df), timeframe, config, size=df.size
+        )
+
+        return {
+            "symbol": symbol.upper(),
+            "timeframe": timeframe,
+            **report,
+            "config": {
+                "entry_threshold": config.entry_threshold,
+                "exit_threshold": config.exit_threshold,
+                "fee_rate": config.fee_rate,
+            },
+        }
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import logging
+import time
+
+import pandas as pd
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.timeframes import TIMEFRAME_MS
+from app.data.aggregator import DataAggregator
+from app.db.repositories.price_history import PriceHistoryRepository
+from app.db.session import async_session
+
+logger = logging.getLogger(__name__)
+
+# 交易所單次 OHLCV 請求上限 (Binance = 1000)
+PAGE_LIMIT = 1000
+
+
+class HistoryService:
+    """長歷史 K 線服務 — price_history 本地儲存，只向交易所補齊缺口"""
+
+    def __init__(
+        self,
+        aggregator: DataAggregator,
+        session_factory: async_sessionmaker[AsyncSession] = async_session,
+    ):
+        self._aggregator = aggregator
+        self._repo = PriceHistoryRepository(session_factory)
+
+    async def get_history(self, symbol: str, timeframe: str, bars: int) -> pd.DataFrame:
+        """取得最近 bars 根 K 線（優先讀本地，缺口分頁補抓後寫回）"""
+        tf_ms = TIMEFRAME_MS[timeframe]
+        now_ms = int(time.time() * 1000)
+        start_ms = now_ms - bars * tf_ms
+        start = pd.Timestamp(start_ms, unit="ms", tz="UTC")
+
+        tf_delta = pd.Timedelta(milliseconds=tf_ms)
+
+        try:
+            stored = await self._repo.load(symbol, timeframe, since=start)
+            listed = await self._repo.earliest_available(symbol, timeframe)
+        except Exception:
+            logger.warning("Load price history failed: %s %s", symbol, timeframe, exc_info=True)
+            stored, listed = pd.DataFrame(), None
+
+        # 上市晚於起點的幣種，以交易所最早 K 線為涵蓋起點
+        covered_from = max(start, listed) if listed is not None else start
+
+        # 本地資料不涵蓋起點 → 整段重抓；否則只補最後一根（可能未收盤）之後
+        full_fetch = stored.empty or stored.index[0] > covered_from + tf_delta
+        if full_fetch:
+            fetch_from = start_ms
+        else:
+            fetch_from = int(stored.index[-1].timestamp() * 1000)
+
+        fetched = await self._fetch_range(symbol, timeframe, fetch_from, now_ms)
+        if not fetched.empty:
+            try:
+                await self._repo.upsert(symbol, timeframe, fetched)
+                # 從起點整段抓取仍晚開始 → 交易所沒有更早的資料，記下最早 K 線
+                if full_fetch and fetched.index[0] > start + tf_delta:
+                    await self._repo.set_earliest_available(
+                        symbol, timeframe, fetched.index[0]
+                    )
+            except Exception:
+                logger.warning(
+                    "Store price history failed: %s %s", symbol, timeframe, exc_info=True
+                )
+
+        frames = [f for f in (stored, fetched) if not f.empty]
+        if not frames:
+            raise ValueError(f"No OHLCV history for {symbol} {timeframe}")
+        df = pd.concat(frames)
+        df = df[~df.index.duplicated(keep="last")].sort_index()
+        return df[df.index >= start].tail(bars)
+
+    async def _fetch_range(
+        self, symbol: str, timeframe: str, since_ms: int, until_ms: int
+    ) -> pd.DataFrame:
+        """從 since_ms 起分頁抓取到 until_ms 或空頁為止（僅用主要 provider，確保週期正確）
+
+        不以「頁數不足 PAGE_LIMIT」判斷結束：部分交易所單頁上限低於 PAGE_LIMIT。
+        """
+        tf_ms = TIMEFRAME_MS[timeframe]
+        frames: list[pd.DataFrame] = []
+        cursor = since_ms
+
+        while cursor < until_ms:
+            page = await self._aggregator.get_ohlcv(
+                symbol, timeframe, PAGE_LIMIT,
+                provider=self._aggregator.primary, since=cursor,
+            )
+            if page.empty:
+                break
+            frames.append(page)
+            last_ms = int(page.index[-1].timestamp() * 1000)
+            if last_ms + tf_ms <= cursor:
+                break  # 沒有前進，避免無限迴圈
+            cursor = last_ms + tf_ms
+
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames)
+        return df[~df.index.duplicated(keep="last")].sort_index()
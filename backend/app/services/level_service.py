@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from app.core.indicators.levels import LevelIndex
+from app.core.timeframes import TIMEFRAME_MS, to_datetime_index
+from app.services.history_service import PAGE_LIMIT, HistoryService
+
+logger = logging.getLogger(__name__)
+
+# 建立索引時掃描的歷史 K 棒數：冷啟動最多向交易所抓一頁（之後只增量補齊）
+LEVEL_HISTORY_BARS = PAGE_LIMIT
+# 常駐索引數量上限（LRU）；每次查詢過的 symbol 都會建一份，不能無限成長
+MAX_LEVEL_INDEXES = 128
+
+
+class LevelService:
+    """歷史支撐/壓力區 — 每個 (symbol, timeframe) 一份常駐的 LevelIndex
+
+    首次查詢掃描整段歷史建立索引；之後只在有新 K 棒收盤時補抓並逐根 update。
+    """
+
+    def __init__(self, history: HistoryService):
+        self._history = history
+        self._indexes: OrderedDict[tuple[str, str], LevelIndex] = OrderedDict()
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    async def get_index(self, symbol: str, timeframe: str) -> LevelIndex:
+        key = (symbol.upper(), timeframe)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            tf_ms = TIMEFRAME_MS[timeframe]
+            now_ms = int(time.time() * 1000)
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+            # last_time 為最後一根已收盤 K 棒的開盤時間；下一根尚未收盤就不用補抓
+            if index is not None and index.last_time + 2 * tf_ms > now_ms:
+                return index
+
+            df = await self._history.get_history(symbol, timeframe, LEVEL_HISTORY_BARS)
+            times = to_datetime_index(df.index).as_unit("ms").asi8
+            closed = times + tf_ms <= now_ms
+            df, times = df[closed], times[closed]
+            if df.empty:
+                raise ValueError(f"No closed candles for {symbol} {timeframe}")
+
+            if index is not None:
+                new = times > index.last_time
+                if not new.any():
+                    return index
+                # 新 K 棒緊接在索引之後 → 逐根增量；有缺口則整段重建
+                if times[new][0] == index.last_time + tf_ms:
+                    for bar_high, bar_low, bar_time in zip(
+                        df["high"].to_numpy()[new], df["low"].to_numpy()[new], times[new]
+                    ):
+                        index.update(float(bar_high), float(bar_low), int(bar_time))
+                    return index
+
+            index = LevelIndex.from_ohlcv(df["high"].to_numpy(), df["low"].to_numpy(), times)
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            self._evict()
+            return index
+
+    def _evict(self) -> None:
+        while len(self._indexes) > MAX_LEVEL_INDEXES:
+            key, _ = self._indexes.popitem(last=False)
+            lock = self._locks.get(key)
+            if lock is not None and not lock.locked():
+                del self._locks[key]
+
+    async def nearest(
+        self, symbol: str, timeframe: str, price: float, n: int = 5
+    ) -> dict[str, list[dict]]:
+        """目前價格上方（壓力）與下方（支撐）最近的 n 個價格區，由近到遠"""
+        index = await self.get_index(symbol, timeframe)
+        return {
+            "resistance": [z.to_dict(index.bars) for z in index.above(price, n)],
+            "support": [z.to_dict(index.bars) for z in index.below(price, n)],
+        }
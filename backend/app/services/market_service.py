@@ -3,6 +3,7 @@ import pandas as pd
 
 from app.data.aggregator import DataAggregator
 from app.data.cache import cache
+from app.data.streams import live_market
 
 
 class MarketService:
@@ -12,6 +13,11 @@ class MarketService:
         self._aggregator = aggregator
 
     async def get_prices(self, symbols: list[str]) -> dict[str, float]:
+        # WebSocket 推送的即時價格齊全時直接使用，不打上游
+        live = live_market.prices(symbols)
+        if live and len(live) == len(set(s.upper() for s in symbols)):
+            return live
+
         cache_key = f"prices:{'_'.join(sorted(symbols))}"
         cached = await cache.get(cache_key)
         if cached is not None:
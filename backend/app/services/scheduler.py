@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Optional
+
+from app.config import settings
+from app.core.timeframes import last_candle_close, next_candle_close
+from app.services.alert_service import AlertService
+from app.services.sentiment_service import SentimentService
+from app.services.settings_service import SettingsService
+from app.services.technical_service import TechnicalService
+
+logger = logging.getLogger(__name__)
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+class PrecomputeScheduler:
+    """背景預先計算排程
+
+    - 各週期 K 棒收盤後（+ close_delay）刷新 watchlist / dashboard 幣種的 OHLCV 與完整分析
+    - 每 price_fetch_interval_minutes 刷新資金費率與衍生品（OI / 多空比 / 主動買賣量）
+    - 每個工作加上隨機 jitter，並以 semaphore 限制同時進行的上游請求數
+    - 有警示規則的 (symbol, timeframe) 一併刷新，資料更新後交給 AlertService 評估
+
+    使用者請求因此大多直接命中快取。
+    """
+
+    def __init__(
+        self,
+        technical: TechnicalService,
+        sentiment: SentimentService,
+        settings_svc: SettingsService,
+        timeframes: Optional[list[str]] = None,
+        interval_minutes: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        jitter_seconds: Optional[float] = None,
+        close_delay_seconds: Optional[float] = None,
+        alerts: Optional[AlertService] = None,
+    ):
+        self._technical = technical
+        self._sentiment = sentiment
+        self._settings_svc = settings_svc
+        self._alerts = alerts
+        self._timeframes = list(timeframes or settings.scheduler_timeframes)
+        self._interval_ms = int(
+            (interval_minutes or settings.price_fetch_interval_minutes) * 60_000
+        )
+        self._concurrency = concurrency or settings.scheduler_concurrency
+        if jitter_seconds is None:
+            jitter_seconds = settings.scheduler_jitter_seconds
+        if close_delay_seconds is None:
+            close_delay_seconds = settings.scheduler_close_delay_seconds
+        self._jitter = jitter_seconds
+        self._delay_ms = int(close_delay_seconds * 1000)
+
+        self._task: Optional[asyncio.Task] = None
+        self._last_close: dict[str, int] = {}  # timeframe → 已處理的最近收盤時間
+        self._last_periodic_ms = 0
+
+    # ── 生命週期 ──
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="precompute-scheduler")
+            logger.info("Precompute scheduler started: timeframes=%s", self._timeframes)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    # ── 排程計算 ──
+
+    def timeframes(self) -> list[str]:
+        """設定的週期 ∪ 警示規則用到的週期"""
+        alert_tfs = sorted({tf for _, tf in self._alerts.candle_keys()}) if self._alerts else []
+        return list(dict.fromkeys([*self._timeframes, *alert_tfs]))
+
+    def next_wakeup(self, now_ms: int) -> int:
+        """下一次需要醒來的時間：最近的 K 棒收盤 + delay，或下一次週期刷新"""
+        closes = [
+            next_candle_close(now_ms - self._delay_ms, tf) + self._delay_ms
+            for tf in self.timeframes()
+        ]
+        return min([*closes, self._last_periodic_ms + self._interval_ms])
+
+    def due(self, now_ms: int) -> tuple[list[str], bool]:
+        """回傳 (已收盤待刷新的週期, 是否該刷新衍生品)，並標記為已處理"""
+        closed: list[str] = []
+        for tf in self.timeframes():
+            boundary = last_candle_close(now_ms - self._delay_ms, tf)
+            if self._last_close.get(tf) != boundary:
+                self._last_close[tf] = boundary
+                closed.append(tf)
+        periodic = now_ms >= self._last_periodic_ms + self._interval_ms
+        if periodic:
+            self._last_periodic_ms = now_ms
+        return closed, periodic
+
+    async def symbols(self) -> list[str]:
+        """watchlist ∪ dashboard pins（保留順序、去重）"""
+        try:
+            watchlist = await self._settings_svc.get_watchlist()
+            pins = await self._settings_svc.get_dashboard_pins()
+        except Exception:
+            logger.warning("Scheduler failed to read watchlist", exc_info=True)
+            return []
+        return list(dict.fromkeys(s.upper() for s in [*pins, *watchlist]))
+
+    # ── 刷新工作 ──
+
+    async def run_once(self, timeframes: list[str], derivatives: bool) -> dict[str, int]:
+        """執行一輪刷新：先衍生品（分析會用到），再各週期分析。回傳成功/失敗數。"""
+        symbols = await self.symbols()
+        # (symbol, timeframe) → 是否做完整分析；只有警示規則的組合只刷新 K 線
+        candles: dict[tuple[str, str], bool] = {
+            (s, tf): True for s in symbols for tf in timeframes if tf in self._timeframes
+        }
+        derivative_symbols = list(symbols)
+        if self._alerts is not None:
+            for key in self._alerts.candle_keys():
+                if key[1] in timeframes:
+                    candles.setdefault(key, False)
+            derivative_symbols += sorted(self._alerts.derivative_symbols() - set(symbols))
+
+        stats = {"ok": 0, "failed": 0}
+        if not candles and not (derivatives and derivative_symbols):
+            return stats
+
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def guarded(label: str, job: Callable[[], Awaitable[object]]) -> None:
+            if self._jitter > 0:
+                await asyncio.sleep(random.uniform(0, self._jitter))
+            async with semaphore:
+                try:
+                    await job()
+                    stats["ok"] += 1
+                except Exception as e:
+                    stats["failed"] += 1
+                    logger.warning("Precompute %s failed: %s", label, e)
+
+        if derivatives:
+            await asyncio.gather(*(
+                guarded(f"derivatives {s}", lambda s=s: self._refresh_derivatives(s))
+                for s in derivative_symbols
+            ))
+        if candles:
+            await asyncio.gather(*(
+                guarded(
+                    f"analysis {s} {tf}",
+                    lambda s=s, tf=tf, analyze=analyze: self._refresh_candles(s, tf, analyze),
+                )
+                for (s, tf), analyze in candles.items()
+            ))
+
+        logger.info(
+            "Precompute done: %d symbols, timeframes=%s, derivatives=%s, ok=%d, failed=%d",
+            len(symbols), timeframes, derivatives, stats["ok"], stats["failed"],
+        )
+        return stats
+
+    async def _refresh_candles(self, symbol: str, timeframe: str, analyze: bool) -> None:
+        if analyze:
+            await self._technical.get_full_analysis(symbol, timeframe, refresh=True)
+        if self._alerts is not None and (symbol, timeframe) in self._alerts.candle_keys():
+            # 完整分析剛刷新過 K 線快取，直接讀取；否則強制重抓
+            df = await self._technical.get_ohlcv(symbol, timeframe, refresh=not analyze)
+            await self._alerts.on_candles(symbol, timeframe, df)
+
+    async def _refresh_derivatives(self, symbol: str) -> None:
+        results = await asyncio.gather(
+            self._sentiment.get_funding_rates(symbol, refresh=True),
+            self._sentiment.get_open_interest(symbol, refresh=True),
+            self._sentiment.get_long_short_ratio(symbol, refresh=True),
+            self._sentiment.get_taker_volume(symbol, refresh=True),
+            return_exceptions=True,
+        )
+        errors = [r for r in results if isinstance(r, Exception)]
+        if len(errors) == len(results):
+            raise errors[0]
+        if self._alerts is not None:
+            names = ("funding", "open_interest", "long_short", "taker")
+            snapshot = {
+                name: result
+                for name, result in zip(names, results)
+                if not isinstance(result, Exception)
+            }
+            await self._alerts.on_derivatives(symbol, snapshot)
+
+    async def _loop(self) -> None:
+        # 啟動時先全部暖一次
+        self.due(_now_ms())
+        try:
+            await self.run_once(self.timeframes(), derivatives=True)
+        except Exception:
+            logger.error("Initial precompute failed", exc_info=True)
+
+        while True:
+            wake = self.next_wakeup(_now_ms())
+            await asyncio.sleep(max(0.0, (wake - _now_ms()) / 1000))
+            closed, periodic = self.due(_now_ms())
+            if closed or periodic:
+                try:
+                    await self.run_once(closed, periodic)
+                except Exception:
+                    logger.error("Precompute round failed", exc_info=True)
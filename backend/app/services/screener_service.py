@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.config import settings
+from app.core.compute import compute
+from app.core.indicators.screen import (
+    MIN_SCREEN_BARS,
+    OHLCV_COLUMNS,
+    SCREEN_BARS,
+    SCREEN_FIELDS,
+    Condition,
+    rank,
+    screen_matrix,
+    stack_tail,
+)
+from app.data.aggregator import DataAggregator
+from app.services.market_service import MarketService
+from app.services.technical_service import TechnicalService
+
+logger = logging.getLogger(__name__)
+
+# 穩定幣沒有 XXX/USDT 交易對或價格固定，不列入篩選
+STABLECOINS = {"USDT", "USDC", "DAI", "FDUSD", "TUSD", "USDE", "USDS", "PYUSD", "BUSD", "USDD"}
+
+
+def _row(symbol: str, values: pd.Series) -> dict:
+    row: dict = {"symbol": symbol}
+    for field in SCREEN_FIELDS:
+        v = float(values[field])
+        row[field] = round(v, 6) if np.isfinite(v) else None
+    return row
+
+
+class ScreenerService:
+    """市場篩選器：市值前 N 大幣種，批次計算指標後依條件篩選並排序"""
+
+    def __init__(
+        self,
+        aggregator: DataAggregator,
+        technical: TechnicalService,
+        concurrency: Optional[int] = None,
+    ):
+        self._market = MarketService(aggregator)
+        # 共用 TechnicalService：K 線快取、single-flight 與即時 K 線合併與分析 API 一致
+        self._technical = technical
+        self._concurrency = (
+            concurrency if concurrency is not None else settings.screener_concurrency
+        )
+
+    async def universe(self, top: int) -> list[str]:
+        top = min(top, settings.screener_max_symbols)
+        overview = await self._market.get_market_overview(top)
+        symbols = [str(s).upper() for s in overview["symbol"]]
+        # 去除穩定幣與重複代號（不同鏈的同名幣）
+        return list(dict.fromkeys(s for s in symbols if s not in STABLECOINS))
+
+    async def stream(
+        self,
+        conditions: list[Condition],
+        timeframe: str = "4h",
+        top: int = 100,
+        sort: str = "score",
+        descending: bool = True,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        """逐步產生篩選事件
+
+        - start: 篩選範圍
+        - match: 每批計算完成後立即送出符合條件的幣種
+        - progress: 已完成 / 總數
+        - result: 全部完成後的排序結果（只含符合條件者）
+        """
+        if sort not in SCREEN_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}. Available: {list(SCREEN_FIELDS)}")
+
+        symbols = await self.universe(top)
+        total = len(symbols)
+        yield {
+            "type": "start",
+            "total": total,
+            "timeframe": timeframe,
+            "conditions": [str(c) for c in conditions],
+        }
+
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def fetch(symbol: str) -> tuple[str, Optional[pd.DataFrame]]:
+            async with semaphore:
+                try:
+                    return symbol, await self._technical.get_ohlcv(symbol, timeframe, SCREEN_BARS)
+                except Exception as e:
+                    logger.debug("Screener fetch failed for %s: %s", symbol, e)
+                    return symbol, None
+
+        tasks = [asyncio.ensure_future(fetch(s)) for s in symbols]
+        batch: dict[str, pd.DataFrame] = {}
+        tables: list[pd.DataFrame] = []
+        skipped: list[str] = []
+        done = 0
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                symbol, df = await next_done
+                done += 1
+                if df is None or len(df) < MIN_SCREEN_BARS:
+                    skipped.append(symbol)
+                else:
+                    batch[symbol] = df
+
+                # 每湊滿一批（或最後一筆）就批次計算，結果隨即送出
+                if len(batch) >= self._concurrency or (done == total and batch):
+                    table = await self._screen(batch, conditions)
+                    batch = {}
+                    tables.append(table)
+                    for sym, values in table[table["matched"]].iterrows():
+                        yield {"type": "match", **_row(sym, values)}
+                    yield {"type": "progress", "done": done, "total": total}
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if tables:
+            combined = pd.concat(tables)
+        else:
+            combined = pd.DataFrame(columns=[*SCREEN_FIELDS, "matched"])
+        ranked = rank(combined[combined["matched"].astype(bool)], sort, descending)
+        if limit is not None:
+            ranked = ranked.head(limit)
+
+        yield {
+            "type": "result",
+            "timeframe": timeframe,
+            "sort": sort,
+            "screened": total - len(skipped),
+            "skipped": skipped,
+            "rows": [
+                {"rank": int(values["rank"]), **_row(sym, values)}
+                for sym, values in ranked.iterrows()
+            ],
+        }
+
+    async def _screen(
+        self, frames: dict[str, pd.DataFrame], conditions: list[Condition]
+    ) -> pd.DataFrame:
+        # 在 event loop 上只做尾端對齊；指標計算交給 compute executor（以矩陣傳遞）
+        length = min(SCREEN_BARS, max(len(df) for df in frames.values()))
+        columns = {c: stack_tail(frames.values(), c, length) for c in OHLCV_COLUMNS}
+        return await compute.run(
+            screen_matrix, list(frames), columns, conditions,
+            size=sum(m.size for m in columns.values()),
+        )
+
+    async def run(self, conditions: list[Condition], **kwargs) -> dict:
+        """非串流版本：只回傳最終排序結果"""
+        result: dict = {}
+        async for event in self.stream(conditions, **kwargs):
+            if event["type"] == "result":
+                result = event
+        return result
@@ -33,9 +33,12 @@ class SentimentService:
         await cache.set(cache_key, result, ttl=3600)  # 快取 1 小時
         return result
 
-    async def get_funding_rates(self, symbol: str = "BTC") -> FundingRateAnalysis:
+    async def get_funding_rates(
+        self, symbol: str = "BTC", refresh: bool = False
+    ) -> FundingRateAnalysis:
         cache_key = f"funding:{symbol}"
-        cached = await cache.get(cache_key)
+        # refresh=True：背景排程強制重抓並覆寫快取
+        cached = None if refresh else await cache.get(cache_key)
         if cached is not None:
             return cached
 
@@ -47,10 +50,10 @@ class SentimentService:
         return result
 
     async def get_open_interest(
-        self, symbol: str = "BTC", period: str = "1h", limit: int = 30
+        self, symbol: str = "BTC", period: str = "1h", limit: int = 30, refresh: bool = False
     ) -> OpenInterestAnalysis:
         cache_key = f"open_interest:{symbol}:{period}"
-        cached = await cache.get(cache_key)
+        cached = None if refresh else await cache.get(cache_key)
         if cached is not None:
             return cached
 
@@ -60,10 +63,10 @@ class SentimentService:
         return result
 
     async def get_long_short_ratio(
-        self, symbol: str = "BTC", period: str = "1h", limit: int = 30
+        self, symbol: str = "BTC", period: str = "1h", limit: int = 30, refresh: bool = False
     ) -> LongShortRatioAnalysis:
         cache_key = f"long_short_ratio:{symbol}:{period}"
-        cached = await cache.get(cache_key)
+        cached = None if refresh else await cache.get(cache_key)
         if cached is not None:
             return cached
 
@@ -73,10 +76,10 @@ class SentimentService:
         return result
 
     async def get_taker_volume(
-        self, symbol: str = "BTC", period: str = "1h", limit: int = 30
+        self, symbol: str = "BTC", period: str = "1h", limit: int = 30, refresh: bool = False
     ) -> TakerVolumeAnalysis:
         cache_key = f"taker_volume:{symbol}:{period}"
-        cached = await cache.get(cache_key)
+        cached = None if refresh else await cache.get(cache_key)
         if cached is not None:
             return cached
 
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import time
 from typing import Any, Optional
 
-from sqlalchemy import delete
+from sqlalchemy import delete, select
 from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
@@ -14,6 +15,8 @@ from app.db.models.app_setting import AppSetting
 
 logger = logging.getLogger(__name__)
 
+RELOAD_RETRY_SECONDS = 30.0  # 快照重新載入失敗後多久再試
+
 # 可管理的 API key 定義
 API_KEY_DEFS = {
     "binance_api_key": {
@@ -46,24 +49,78 @@ def _mask_value(value: str) -> str:
     return "*" * (len(value) - 4) + value[-4:]
 
 
+class _Snapshot:
+    """app_settings 整表的記憶體快照（同一個 session factory 的 SettingsService 共用）"""
+
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.loaded_at = float("-inf")
+        self.version = 0  # 每次寫入 +1；載入期間有寫入則捨棄該次載入結果
+        self.reload: Optional[asyncio.Task] = None  # 進行中的重新載入（並行讀取共用）
+
+
 class SettingsService:
-    """應用程式設定服務 — 管理 API key 與使用者偏好"""
+    """應用程式設定服務 — 管理 API key 與使用者偏好
+
+    讀取走記憶體快照（整表一次載入，settings_snapshot_ttl_seconds 後重新載入），
+    各 provider 每次上游請求查 API key 不必再開 DB session；寫入後同步更新快照。
+    """
 
     DEFAULT_WATCHLIST = ["BTC", "ETH", "SOL", "BNB", "XRP"]
     DEFAULT_DASHBOARD_PINS = ["BTC", "ETH", "SOL"]
 
+    _snapshots: dict[Any, _Snapshot] = {}
+
     def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
         self._sf = session_factory
-
-    async def get_api_key(self, name: str) -> Optional[str]:
-        """取得 API key：先查 DB，fallback 到 .env config。"""
+        self._snapshot = SettingsService._snapshots.setdefault(session_factory, _Snapshot())
+
+    async def load(self) -> int:
+        """從 DB 載入全部設定到快照，回傳筆數"""
+        snapshot = self._snapshot
+        version = snapshot.version
+        async with self._sf() as session:
+            rows = (await session.execute(select(AppSetting.key, AppSetting.value))).all()
+        if snapshot.version == version:
+            snapshot.values = {key: value for key, value in rows}
+            snapshot.loaded_at = time.monotonic()
+        return len(rows)
+
+    def invalidate(self) -> None:
+        """下次讀取時重新載入（例如其他程序直接改了 DB）"""
+        self._snapshot.loaded_at = float("-inf")
+
+    async def _reload(self) -> None:
         try:
-            async with self._sf() as session:
-                row = await session.get(AppSetting, f"apikey:{name}")
-                if row is not None:
-                    return row.value
+            await self.load()
         except Exception:
-            logger.warning("Failed to read API key from DB: %s", name, exc_info=True)
+            # 沿用舊快照（或空快照 → fallback 到預設值），RELOAD_RETRY_SECONDS 後再試
+            logger.warning("Failed to load settings from DB", exc_info=True)
+            ttl = settings.settings_snapshot_ttl_seconds
+            self._snapshot.loaded_at = time.monotonic() - ttl + min(RELOAD_RETRY_SECONDS, ttl)
+
+    async def _get(self, key: str) -> Optional[str]:
+        snapshot = self._snapshot
+        if time.monotonic() - snapshot.loaded_at >= settings.settings_snapshot_ttl_seconds:
+            task = snapshot.reload
+            if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+                task = snapshot.reload = asyncio.create_task(self._reload())
+            await asyncio.shield(task)
+        return snapshot.values.get(key)
+
+    def _written(self, key: str, value: Optional[str]) -> None:
+        snapshot = self._snapshot
+        snapshot.version += 1
+        if value is None:
+            snapshot.values.pop(key, None)
+        else:
+            snapshot.values[key] = value
+
+    async def get_api_key(self, name: str) -> Optional[str]:
+        """取得 API key：先查設定快照（DB），fallback 到 .env config。"""
+        value = await self._get(f"apikey:{name}")
+        if value is not None:
+            return value
 
         # Fallback: .env config
         return getattr(settings, name, None)
@@ -89,7 +146,8 @@ class SettingsService:
                 )
                 await session.execute(stmt)
                 await session.commit()
-                logger.info("API key updated: %s", name)
+            self._written(f"apikey:{name}", value)
+            logger.info("API key updated: %s", name)
         except Exception:
             logger.error("Failed to save API key: %s", name, exc_info=True)
             raise
@@ -102,7 +160,8 @@ class SettingsService:
                     delete(AppSetting).where(AppSetting.key == f"apikey:{name}")
                 )
                 await session.commit()
-                logger.info("API key deleted: %s", name)
+            self._written(f"apikey:{name}", None)
+            logger.info("API key deleted: %s", name)
         except Exception:
             logger.error("Failed to delete API key: %s", name, exc_info=True)
             raise
@@ -125,22 +184,22 @@ class SettingsService:
 
     async def get_preference(self, name: str, default: Any = None) -> Any:
         """取得使用者偏好設定（JSON 值）。"""
-        try:
-            async with self._sf() as session:
-                row = await session.get(AppSetting, f"pref:{name}")
-                if row is not None:
-                    return json.loads(row.value)
-        except Exception:
-            logger.warning("Failed to read preference: %s", name, exc_info=True)
+        raw = await self._get(f"pref:{name}")
+        if raw is not None:
+            try:
+                return json.loads(raw)
+            except ValueError:
+                logger.warning("Invalid preference value: %s", name)
         return default
 
     async def set_preference(self, name: str, value: Any) -> None:
         """寫入使用者偏好設定（JSON upsert）。"""
+        raw = json.dumps(value)
         try:
             async with self._sf() as session:
                 stmt = sqlite_insert(AppSetting).values(
                     key=f"pref:{name}",
-                    value=json.dumps(value),
+                    value=raw,
                     updated_at=time.time(),
                 )
                 stmt = stmt.on_conflict_do_update(
@@ -152,6 +211,7 @@ class SettingsService:
                 )
                 await session.execute(stmt)
                 await session.commit()
+            self._written(f"pref:{name}", raw)
         except Exception:
             logger.error("Failed to save preference: %s", name, exc_info=True)
             raise
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from app.config import settings
+from app.data.streams import BinanceStream, LiveMarket, live_market
+from app.services.alert_service import AlertService
+from app.services.settings_service import SettingsService
+from app.services.technical_service import TechnicalService
+
+logger = logging.getLogger(__name__)
+
+
+class StreamService:
+    """即時行情串流服務 — watchlist / dashboard / 警示幣種訂閱 Binance WebSocket
+
+    - 每 stream_sync_seconds 重新讀取追蹤的幣種與週期並調整訂閱
+    - 價格與當前 K 棒寫入 LiveMarket，MarketService / TechnicalService 讀取時合併
+    - K 棒收盤時把即時 K 棒寫回 OHLCV 快取，並交給 AlertService 評估
+    """
+
+    def __init__(
+        self,
+        technical: TechnicalService,
+        settings_svc: SettingsService,
+        alerts: Optional[AlertService] = None,
+        live: Optional[LiveMarket] = None,
+        url: Optional[str] = None,
+        timeframes: Optional[list[str]] = None,
+        sync_seconds: Optional[float] = None,
+    ):
+        self._technical = technical
+        self._settings_svc = settings_svc
+        self._alerts = alerts
+        self._timeframes = list(timeframes or settings.scheduler_timeframes)
+        self._sync_seconds = sync_seconds or settings.stream_sync_seconds
+        self.stream = BinanceStream(
+            live or live_market, url=url, on_candle_closed=self.on_candle_closed
+        )
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sync_loop(), name="stream-sync")
+            self.stream.start()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.stream.stop()
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception:
+                logger.warning("Stream subscription sync failed", exc_info=True)
+            await asyncio.sleep(self._sync_seconds)
+
+    async def tracked(self) -> tuple[list[str], list[str]]:
+        """(幣種, 週期)：watchlist ∪ dashboard pins ∪ 警示規則幣種；設定的週期 ∪ 警示週期"""
+        symbols: list[str] = []
+        try:
+            pins = await self._settings_svc.get_dashboard_pins()
+            watchlist = await self._settings_svc.get_watchlist()
+            symbols = [*pins, *watchlist]
+        except Exception:
+            logger.warning("Stream failed to read watchlist", exc_info=True)
+        timeframes = list(self._timeframes)
+        if self._alerts is not None:
+            keys = sorted(self._alerts.candle_keys())
+            symbols += [s for s, _ in keys]
+            timeframes += [tf for _, tf in keys]
+        return (
+            list(dict.fromkeys(s.upper() for s in symbols)),
+            list(dict.fromkeys(timeframes)),
+        )
+
+    async def sync(self) -> int:
+        symbols, timeframes = await self.tracked()
+        await self.stream.set_symbols(symbols, timeframes)
+        return len(self.stream.streams)
+
+    async def on_candle_closed(self, symbol: str, timeframe: str) -> None:
+        df = await self._technical.apply_live_candles(symbol, timeframe)
+        if self._alerts is None or (symbol, timeframe) not in self._alerts.candle_keys():
+            return
+        if df is None:
+            df = await self._technical.get_ohlcv(symbol, timeframe)
+        await self._alerts.on_candles(symbol, timeframe, df)
+
+    def stats(self) -> dict:
+        return self.stream.stats()
@@ -1,14 +1,34 @@
 from __future__ import annotations
+import asyncio
 import math
+from collections.abc import Awaitable
+
+import numpy as np
 import pandas as pd
 
+from app.config import settings
+from app.core.compute import arrays_to_frame, compute, frame_to_arrays
 from app.core.indicators.base import BaseIndicator, IndicatorResult
 from app.core.indicators.oscillator import KDIndicator, RSIIndicator
+from app.core.indicators.pattern import CandlestickPatternIndicator, DivergenceIndicator
+from app.core.indicators.pivot import pivot_levels
+from app.core.indicators.scoring import (
+    INDICATOR_GROUP,
+    composite_score,
+    confluence_score,
+    overall_signal,
+    score_timeline,
+)
+from app.core.indicators.sweep import SWEEP_PARAMS, sweep_indicator
 from app.core.indicators.trend import EMAIndicator, MACDIndicator
 from app.core.indicators.volatility import BollingerBandsIndicator
 from app.core.indicators.volume import VolumeAnalysis
+from app.core.timeframes import TIMEFRAME_MS, base_timeframe, resample_ohlcv
 from app.data.aggregator import DataAggregator
 from app.data.cache import cache
+from app.data.streams import live_market
+from app.services.history_service import HistoryService
+from app.services.level_service import LevelService
 from app.services.sentiment_service import SentimentService
 
 import logging
@@ -23,8 +43,102 @@ AVAILABLE_INDICATORS: dict[str, type[BaseIndicator]] = {
     "ema": EMAIndicator,
     "bbands": BollingerBandsIndicator,
     "volume": VolumeAnalysis,
+    "pattern": CandlestickPatternIndicator,
+    "divergence": DivergenceIndicator,
 }
 
+# 多週期分析中每個週期使用的 K 線根數（與單週期分析預設抓取量一致）
+MTF_BARS = 200
+# 基礎週期最多抓取根數（約 4.5 年 1h，足夠 1h → 1w）
+MTF_MAX_BASE_BARS = 40_000
+# 缺少衍生品來源的分析只短暫快取：逾時請求在背景完成後，下次分析即可補上
+PARTIAL_ANALYSIS_TTL = 5
+
+
+def _ohlcv_ttl(timeframe: str) -> int:
+    return 60 if timeframe in ("1h", "4h") else 300
+
+
+def _analysis_ttl(timeframe: str, result: dict) -> int:
+    return PARTIAL_ANALYSIS_TTL if result["missing"] else _ohlcv_ttl(timeframe)
+
+
+def _index_to_unix(index: pd.Index) -> np.ndarray:
+    """時間索引 → unix 秒 (int64)；索引可能是 DatetimeIndex、datetime、str 或 int"""
+    dt_index = pd.DatetimeIndex(pd.to_datetime(index))
+    return dt_index.as_unit("s").asi8
+
+
+# ── 可送進 compute executor 的純函式（模組層級、輸入為 NumPy buffers）──
+
+
+def _technical_results_task(payload: dict, tolerance: float) -> list[IndicatorResult]:
+    # 只需最新值 → latest-only 模式，僅計算收斂所需的尾端區間
+    df = arrays_to_frame(payload)
+    results: list[IndicatorResult] = []
+    for indicator_cls in AVAILABLE_INDICATORS.values():
+        try:
+            indicator = indicator_cls()
+            result = indicator.calculate_latest(df, tolerance)
+            results.append(result)
+        except Exception:
+            continue
+    return results
+
+
+def _indicator_series_task(payload: dict, indicator_name: str, kwargs: dict) -> dict:
+    df = arrays_to_frame(payload)
+    indicator = AVAILABLE_INDICATORS[indicator_name](**kwargs)
+    result = indicator.calculate(df)
+
+    # 直接讀 array-backed lines 的 buffer，不逐點建立 pd.Series
+    times = _index_to_unix(result.values.index)
+    lines: dict[str, list[dict]] = {}
+    for line_name, buf in result.values.buffers.items():
+        finite = np.isfinite(buf)
+        lines[line_name] = [
+            {"time": int(ts), "value": float(val) if ok else None}
+            for ts, val, ok in zip(times, buf, finite)
+        ]
+    return {"name": result.name, "lines": lines}
+
+
+def _score_series_task(payload: dict) -> list[dict]:
+    df = arrays_to_frame(payload)
+    frame = score_timeline(df, [cls() for cls in AVAILABLE_INDICATORS.values()])
+
+    indicator_cols = [c for c in frame.columns if c not in ("overall_score", "consensus")]
+    # 去掉所有指標都還在暖機 (NaN) 的開頭 K 棒
+    frame = frame[frame[indicator_cols].notna().any(axis=1)]
+
+    times = _index_to_unix(frame.index)
+    scores = frame[indicator_cols].to_numpy(dtype=np.float64)
+    return [
+        {
+            "time": int(ts),
+            "overall_score": round(float(overall), 4),
+            "consensus": round(float(cons), 4),
+            "scores": {
+                name: round(float(v), 4) if np.isfinite(v) else None
+                for name, v in zip(indicator_cols, row)
+            },
+        }
+        for ts, overall, cons, row in zip(
+            times, frame["overall_score"], frame["consensus"], scores
+        )
+    ]
+
+
+def _sweep_task(payload: dict, name: str, grid: dict[str, list[float]]) -> list[dict]:
+    table = sweep_indicator(name, arrays_to_frame(payload), grid)
+    values = table.to_numpy(dtype=np.float64)
+    finite = np.isfinite(values)
+    columns = list(table.columns)
+    return [
+        {col: float(v) if ok else None for col, v, ok in zip(columns, row, row_ok)}
+        for row, row_ok in zip(values, finite)
+    ]
+
 
 class TechnicalService:
     """技術分析服務"""
@@ -32,17 +146,39 @@ class TechnicalService:
     def __init__(self, aggregator: DataAggregator):
         self._aggregator = aggregator
         self._sentiment = SentimentService()
-
-    async def _get_ohlcv(self, symbol: str, timeframe: str, limit: int = 200) -> pd.DataFrame:
+        self._history = HistoryService(aggregator)
+        self._levels = LevelService(self._history)
+        # 超過期限仍在執行的衍生品請求（保留參照避免被回收）
+        self._background: set[asyncio.Task] = set()
+
+    async def get_ohlcv(
+        self, symbol: str, timeframe: str, limit: int = 200, refresh: bool = False
+    ) -> pd.DataFrame:
+        """K 線（OHLCV 快取 + 即時 K 棒合併；refresh=True 時重抓並覆寫快取）"""
         cache_key = f"ohlcv:{symbol}:{timeframe}:{limit}"
-        cached = await cache.get(cache_key)
+        cached = None if refresh else await cache.get(cache_key)
         if cached is not None:
-            return cached
+            return live_market.merge(symbol, timeframe, cached)
 
         df = await self._aggregator.get_ohlcv(symbol, timeframe, limit)
-        ttl = 60 if timeframe in ("1h", "4h") else 300
-        await cache.set(cache_key, df, ttl=ttl)
-        return df
+        await cache.set(cache_key, df, ttl=_ohlcv_ttl(timeframe))
+        return live_market.merge(symbol, timeframe, df)
+
+    async def apply_live_candles(
+        self, symbol: str, timeframe: str, limit: int = 200
+    ) -> pd.DataFrame | None:
+        """K 棒收盤（WebSocket 推送）：把即時 K 棒寫回 OHLCV 快取，回傳更新後的 K 線
+
+        快取不存在時回傳 None（下次請求再走 REST）。
+        """
+        cache_key = f"ohlcv:{symbol}:{timeframe}:{limit}"
+        cached = await cache.get(cache_key)
+        if cached is None:
+            return None
+        merged = live_market.merge(symbol, timeframe, cached)
+        if merged is not cached:
+            await cache.set(cache_key, merged, ttl=_ohlcv_ttl(timeframe))
+        return merged
 
     async def get_indicator(
         self, symbol: str, indicator_name: str, timeframe: str = "1d", **kwargs
@@ -54,131 +190,231 @@ class TechnicalService:
                 f"Available: {list(AVAILABLE_INDICATORS.keys())}"
             )
 
-        df = await self._get_ohlcv(symbol, timeframe)
+        df = await self.get_ohlcv(symbol, timeframe)
         indicator = indicator_cls(**kwargs)
-        return indicator.calculate(df)
+        return indicator.calculate_latest(df, settings.indicator_warmup_tolerance)
 
     async def get_full_analysis(
         self,
         symbol: str,
         timeframe: str = "1d",
+        refresh: bool = False,
     ) -> dict:
-        df = await self._get_ohlcv(symbol, timeframe)
-
-        results: list[IndicatorResult] = []
-        for indicator_cls in AVAILABLE_INDICATORS.values():
-            try:
-                indicator = indicator_cls()
-                result = indicator.calculate(df)
-                results.append(result)
-            except Exception:
-                continue
+        """完整技術分析（結果快取，refresh=True 時重抓 K 線並覆寫快取）
+
+        K 線 + 技術指標與衍生品來源同時進行；衍生品只等 analysis_deadline_seconds，
+        逾時來源列入 missing，延遲上限由預算決定而非最慢的上游。
+        """
+        cache_key = f"analysis:{symbol.upper()}:{timeframe}"
+        cached = None if refresh else await cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        derivatives = self._derivatives_signals(symbol, settings.analysis_deadline_seconds)
+        result = await self._analyze(symbol, timeframe, refresh, derivatives)
+        await cache.set(cache_key, result, ttl=_analysis_ttl(timeframe, result))
+        return result
+
+    async def get_batch_analysis(
+        self,
+        symbols: list[str],
+        timeframes: list[str],
+        concurrency: int | None = None,
+    ) -> list[dict]:
+        """多幣種 × 多週期完整分析
+
+        (symbol, timeframe) 去重後以有限併發執行；同一幣種的衍生品只抓一次，
+        供其所有週期共用。單項失敗不影響其他項目，以 error 欄位回報。
+        """
+        symbols = list(dict.fromkeys(s.upper() for s in symbols))
+        timeframes = list(dict.fromkeys(timeframes))
+        semaphore = asyncio.Semaphore(concurrency or settings.analysis_batch_concurrency)
+        derivatives: dict[str, asyncio.Future] = {}
+
+        def _shared_derivatives(symbol: str) -> asyncio.Future:
+            if symbol not in derivatives:
+                derivatives[symbol] = asyncio.ensure_future(
+                    self._derivatives_signals(symbol, settings.analysis_deadline_seconds)
+                )
+            return derivatives[symbol]
+
+        async def _one(symbol: str, timeframe: str) -> dict:
+            item = {"symbol": symbol, "timeframe": timeframe, "analysis": None, "error": None}
+            async with semaphore:
+                try:
+                    cache_key = f"analysis:{symbol}:{timeframe}"
+                    result = await cache.get(cache_key)
+                    if result is None:
+                        result = await self._analyze(
+                            symbol, timeframe, False, _shared_derivatives(symbol)
+                        )
+                        await cache.set(cache_key, result, ttl=_analysis_ttl(timeframe, result))
+                    item["analysis"] = result
+                except Exception as e:
+                    logger.warning(f"Batch analysis failed for {symbol} {timeframe}: {e}")
+                    item["error"] = f"No data available for {symbol}"
+            return item
+
+        return list(await asyncio.gather(
+            *(_one(symbol, tf) for symbol in symbols for tf in timeframes)
+        ))
+
+    async def _analyze(
+        self,
+        symbol: str,
+        timeframe: str,
+        refresh: bool,
+        derivatives: Awaitable[tuple[list[dict], list[str]]],
+    ) -> dict:
+        async def _technical() -> list[IndicatorResult]:
+            df = await self.get_ohlcv(symbol, timeframe, refresh=refresh)
+            return await self._technical_results(df)
+
+        results, (derivatives_signals, missing) = await asyncio.gather(_technical(), derivatives)
+        return self._summarize(symbol, timeframe, results, derivatives_signals, missing)
+
+    async def get_mtf_analysis(self, symbol: str, timeframes: list[str]) -> dict:
+        """多週期分析：只抓最細週期一次，本地重採樣出較大週期，衍生品共用一次
+
+        回傳各週期的分析結果 + 跨週期共振 (confluence) 評分。
+        """
+        timeframes = sorted(set(timeframes), key=TIMEFRAME_MS.__getitem__)
+        base = base_timeframe(timeframes)
+        ratio = max(TIMEFRAME_MS[tf] // TIMEFRAME_MS[base] for tf in timeframes)
+        # 最大週期也要有 MTF_BARS 根；多抓一個桶補開頭被捨棄的不完整 K 棒
+        bars = MTF_BARS * ratio + ratio
+        if bars > MTF_MAX_BASE_BARS:
+            raise ValueError(
+                f"Timeframes {timeframes} span too wide a range for base timeframe {base}"
+            )
+
+        base_df, (derivatives_signals, missing) = await asyncio.gather(
+            self._history.get_history(symbol, base, bars),
+            self._derivatives_signals(symbol, settings.analysis_deadline_seconds),
+        )
+
+        frames = [resample_ohlcv(base_df, base, tf).tail(MTF_BARS) for tf in timeframes]
+        all_results = await asyncio.gather(*(self._technical_results(df) for df in frames))
+
+        analyses: list[dict] = []
+        for tf, results in zip(timeframes, all_results):
+            summary = self._summarize(symbol, tf, results, derivatives_signals, missing)
+            # 衍生品各週期相同，只在最外層列一次
+            summary["indicators"] = [r.to_dict() for r in results]
+            del summary["missing"]
+            analyses.append(summary)
+
+        score, alignment = confluence_score(
+            {a["timeframe"]: a["overall_score"] for a in analyses}, base
+        )
+
+        return {
+            "symbol": symbol.upper(),
+            "base_timeframe": base,
+            "timeframes": analyses,
+            "derivatives": derivatives_signals,
+            "missing": missing,
+            "confluence_score": round(score, 4),
+            "confluence_signal": overall_signal(score),
+            "alignment": round(alignment, 4),
+        }
+
+    async def _technical_results(self, df: pd.DataFrame) -> list[IndicatorResult]:
+        return await compute.run(
+            _technical_results_task,
+            frame_to_arrays(df),
+            settings.indicator_warmup_tolerance,
+            size=df.size,
+        )
+
+    async def _derivatives_signals(
+        self, symbol: str, timeout: float | None = None
+    ) -> tuple[list[dict], list[str]]:
+        """衍生品指標：三個來源並行抓取，timeout 秒內未完成或失敗的來源列入 missing
+
+        逾時的請求不取消，留在背景完成以回填快取，下次分析即可命中。
+        """
+        sources = {
+            "OI": self._open_interest_signal(symbol),
+            "LS_Ratio": self._long_short_signal(symbol),
+            "Taker": self._taker_signal(symbol),
+        }
+        tasks = {name: asyncio.ensure_future(coro) for name, coro in sources.items()}
+        done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
 
-        # 取得衍生品指標（不阻塞技術指標）
         derivatives_signals: list[dict] = []
-        try:
-            oi = await self._sentiment.get_open_interest(symbol)
-            derivatives_signals.append({
-                "name": "OI",
-                "signal": oi.signal,
-                "strength": oi.strength,
-                "continuous_score": oi.continuous_score,
-                "latest_values": {"OI_value": oi.current_oi_value, "change_pct": oi.change_pct},
-                "metadata": {"trend": oi.trend},
-            })
-        except Exception:
-            logger.debug("OI fetch failed for %s", symbol)
+        missing: list[str] = []
+        for name, task in tasks.items():
+            if task in done and not task.cancelled() and task.exception() is None:
+                derivatives_signals.append(task.result())
+                continue
+            missing.append(name)
+            if task in pending:
+                logger.debug("%s fetch for %s exceeded %.1fs deadline", name, symbol, timeout)
+                self._background.add(task)
+                task.add_done_callback(self._discard_background)
+            elif not task.cancelled():
+                logger.debug("%s fetch failed for %s: %s", name, symbol, task.exception())
+        return derivatives_signals, missing
+
+    def _discard_background(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("Late derivatives fetch failed: %s", task.exception())
+
+    async def _open_interest_signal(self, symbol: str) -> dict:
+        oi = await self._sentiment.get_open_interest(symbol)
+        return {
+            "name": "OI",
+            "signal": oi.signal,
+            "strength": oi.strength,
+            "continuous_score": oi.continuous_score,
+            "latest_values": {"OI_value": oi.current_oi_value, "change_pct": oi.change_pct},
+            "metadata": {"trend": oi.trend},
+        }
 
-        try:
-            ls = await self._sentiment.get_long_short_ratio(symbol)
-            derivatives_signals.append({
-                "name": "LS_Ratio",
-                "signal": ls.signal,
-                "strength": ls.strength,
-                "continuous_score": ls.continuous_score,
-                "latest_values": {"ratio": ls.current_ratio, "long_pct": ls.long_pct},
-                "metadata": {"trend": ls.trend},
-            })
-        except Exception:
-            logger.debug("LS ratio fetch failed for %s", symbol)
+    async def _long_short_signal(self, symbol: str) -> dict:
+        ls = await self._sentiment.get_long_short_ratio(symbol)
+        return {
+            "name": "LS_Ratio",
+            "signal": ls.signal,
+            "strength": ls.strength,
+            "continuous_score": ls.continuous_score,
+            "latest_values": {"ratio": ls.current_ratio, "long_pct": ls.long_pct},
+            "metadata": {"trend": ls.trend},
+        }
 
-        try:
-            tv = await self._sentiment.get_taker_volume(symbol)
-            derivatives_signals.append({
-                "name": "Taker",
-                "signal": tv.signal,
-                "strength": tv.strength,
-                "continuous_score": tv.continuous_score,
-                "latest_values": {"ratio": tv.current_ratio, "buy_vol": tv.buy_vol},
-                "metadata": {"pressure": tv.pressure},
-            })
-        except Exception:
-            logger.debug("Taker volume fetch failed for %s", symbol)
-
-        # ── 分組加權綜合評分（連續分數版）──
-        # 使用各指標的 continuous_score（-1.0 ~ +1.0）取代離散 signal×strength
-        GROUP_WEIGHTS = {
-            "momentum": 0.25,    # RSI, KD, MACD
-            "trend": 0.20,       # EMA
-            "volatility": 0.15,  # BBANDS
-            "volume": 0.10,      # Volume
-            "derivatives": 0.30, # OI, LS_Ratio, Taker
+    async def _taker_signal(self, symbol: str) -> dict:
+        tv = await self._sentiment.get_taker_volume(symbol)
+        return {
+            "name": "Taker",
+            "signal": tv.signal,
+            "strength": tv.strength,
+            "continuous_score": tv.continuous_score,
+            "latest_values": {"ratio": tv.current_ratio, "buy_vol": tv.buy_vol},
+            "metadata": {"pressure": tv.pressure},
         }
-        INDICATOR_GROUP = {
-            "RSI": "momentum",
-            "KD": "momentum",
-            "MACD": "momentum",
-            "EMA": "trend",
-            "BBANDS": "volatility",
-            "Volume": "volume",
-            "OI": "derivatives",
-            "LS_Ratio": "derivatives",
-            "Taker": "derivatives",
+
+    def _summarize(
+        self,
+        symbol: str,
+        timeframe: str,
+        results: list[IndicatorResult],
+        derivatives_signals: list[dict],
+        missing: list[str],
+    ) -> dict:
+        # 整組來源都缺失的群組 → 權重重新分配給其餘群組
+        present = {r.name for r in results} | {ds["name"] for ds in derivatives_signals}
+        missing_groups = {INDICATOR_GROUP[name] for name in missing} - {
+            INDICATOR_GROUP[name] for name in present if name in INDICATOR_GROUP
         }
 
-        # 收集每組的 continuous_score
-        group_values: dict[str, list[float]] = {g: [] for g in GROUP_WEIGHTS}
-        all_scores: list[float] = []
-
-        for r in results:
-            group = INDICATOR_GROUP.get(r.name)
-            if group:
-                group_values[group].append(r.continuous_score)
-                all_scores.append(r.continuous_score)
-
-        for ds in derivatives_signals:
-            group = INDICATOR_GROUP.get(ds["name"])
-            if group:
-                cs = ds.get("continuous_score", 0.0)
-                group_values[group].append(cs)
-                all_scores.append(cs)
-
-        # 綜合評分 = Σ(組內平均 × 群組權重)
-        overall_score = 0.0
-        for group, weight in GROUP_WEIGHTS.items():
-            values = group_values[group]
-            if values:
-                group_avg = sum(values) / len(values)
-                overall_score += group_avg * weight
-
-        if overall_score > 0.2:
-            overall_signal = "bullish"
-        elif overall_score < -0.2:
-            overall_signal = "bearish"
-        else:
-            overall_signal = "neutral"
-
-        # ── 一致性指標 (Consensus) ──
-        # consensus = 1 - std(all_scores)
-        # std=0 → 所有指標完全一致 → consensus=1.0
-        # std≈1 → 指標極度分歧 → consensus≈0.0
-        if len(all_scores) >= 2:
-            mean_s = sum(all_scores) / len(all_scores)
-            variance = sum((s - mean_s) ** 2 for s in all_scores) / len(all_scores)
-            std_s = math.sqrt(variance)
-            consensus = round(max(1.0 - std_s, 0.0), 4)
-        else:
-            consensus = 1.0
+        # ── 分組加權綜合評分 + 一致性指標 (Consensus) ──
+        overall_score, consensus = composite_score(
+            [(r.name, r.continuous_score) for r in results]
+            + [(ds["name"], ds.get("continuous_score", 0.0)) for ds in derivatives_signals],
+            missing_groups,
+        )
 
         all_indicators = [r.to_dict() for r in results] + derivatives_signals
 
@@ -186,9 +422,10 @@ class TechnicalService:
             "symbol": symbol.upper(),
             "timeframe": timeframe,
             "indicators": all_indicators,
-            "overall_signal": overall_signal,
+            "overall_signal": overall_signal(overall_score),
             "overall_score": round(overall_score, 4),
-            "consensus": consensus,
+            "consensus": round(consensus, 4),
+            "missing": missing,
         }
 
     async def get_indicator_series(
@@ -202,42 +439,74 @@ class TechnicalService:
                 f"Available: {list(AVAILABLE_INDICATORS.keys())}"
             )
 
-        df = await self._get_ohlcv(symbol, timeframe)
-        indicator = indicator_cls(**kwargs)
-        result = indicator.calculate(df)
-
-        lines: dict[str, list[dict]] = {}
-        for line_name, series in result.values.items():
-            points = []
-            for idx, val in series.items():
-                # idx 可能是 pd.Timestamp, datetime, str, 或 int
-                ts = int(pd.Timestamp(idx).timestamp())
-                fval = float(val) if pd.notna(val) and not (isinstance(val, float) and (math.isnan(val) or math.isinf(val))) else None
-                points.append({"time": ts, "value": fval})
-            lines[line_name] = points
+        df = await self.get_ohlcv(symbol, timeframe)
+        indicator = await compute.run(
+            _indicator_series_task,
+            frame_to_arrays(df),
+            indicator_name.lower(),
+            kwargs,
+            size=df.size,
+        )
+
+        return {
+            "symbol": symbol.upper(),
+            "timeframe": timeframe,
+            "indicator": indicator,
+        }
+
+    async def get_score_series(
+        self, symbol: str, timeframe: str = "1d", limit: int = 200
+    ) -> dict:
+        """綜合評分時間序列：每個指標的 continuous_score 與分組加權 overall_score
+
+        所有指標各自一次向量化計算整段歷史，不逐根重跑分析。
+        衍生品沒有歷史資料，序列只含技術指標群組。
+        """
+        df = await self.get_ohlcv(symbol, timeframe, limit)
+        points = await compute.run(_score_series_task, frame_to_arrays(df), size=df.size)
 
         return {
             "symbol": symbol.upper(),
             "timeframe": timeframe,
-            "indicator": {"name": result.name, "lines": lines},
+            "points": points,
+        }
+
+    async def sweep_indicator(
+        self,
+        symbol: str,
+        indicator_name: str,
+        grid: dict[str, list[float]],
+        timeframe: str = "1d",
+    ) -> dict:
+        """參數掃描：同一份 OHLCV 一次算完整組參數的最新值與連續分數"""
+        name = indicator_name.lower()
+        df = await self.get_ohlcv(symbol, timeframe)
+        # 掃描成本 ≈ K 線數 × 參數組合數
+        combos = int(np.prod([len(v) for v in grid.values()])) if grid else 1
+        rows = await compute.run(
+            _sweep_task, frame_to_arrays(df), name, grid, size=df.size * combos
+        )
+
+        return {
+            "symbol": symbol.upper(),
+            "timeframe": timeframe,
+            "indicator": name,
+            "params": SWEEP_PARAMS[name],
+            "rows": rows,
         }
 
     async def get_support_resistance(
-        self, symbol: str, timeframe: str = "1d"
+        self, symbol: str, timeframe: str = "1d", n: int = 5
     ) -> dict:
-        """用 Pivot Points 計算支撐/壓力位"""
-        df = await self._get_ohlcv(symbol, timeframe)
-        recent = df.tail(20)
-        high = float(recent["high"].max())
-        low = float(recent["low"].min())
+        """支撐/壓力位：近期 Pivot Points + 歷史擺動點聚合的價格區（上下各最近 n 個）"""
+        df = await self.get_ohlcv(symbol, timeframe)
+        levels = pivot_levels(
+            df["high"].to_numpy(dtype=np.float64),
+            df["low"].to_numpy(dtype=np.float64),
+            df["close"].to_numpy(dtype=np.float64),
+        )
         close = float(df["close"].iloc[-1])
 
-        pp = (high + low + close) / 3
-        r1 = 2 * pp - low
-        r2 = pp + (high - low)
-        s1 = 2 * pp - high
-        s2 = pp - (high - low)
-
         # 根據價格大小動態決定小數位數
         def _precision(price: float) -> int:
             if price == 0:
@@ -246,19 +515,27 @@ class TechnicalService:
             if abs_p >= 1:
                 return 2
             # 小數幣：保留到有效數字 +2 位
-            import math
             return max(2, -int(math.floor(math.log10(abs_p))) + 2)
 
         ndigits = _precision(close)
 
+        try:
+            zones = await self._levels.nearest(symbol, timeframe, close, n)
+        except Exception:
+            logger.warning("Level zones failed for %s %s", symbol, timeframe, exc_info=True)
+            zones = {"resistance": [], "support": []}
+        for side in zones.values():
+            for zone in side:
+                for k in ("price", "low", "high"):
+                    zone[k] = round(zone[k], ndigits)
+                zone["last_touch"] //= 1000
+
         return {
             "symbol": symbol.upper(),
             "timeframe": timeframe,
             "levels": [
-                {"price": round(s2, ndigits), "label": "S2"},
-                {"price": round(s1, ndigits), "label": "S1"},
-                {"price": round(pp, ndigits), "label": "PP"},
-                {"price": round(r1, ndigits), "label": "R1"},
-                {"price": round(r2, ndigits), "label": "R2"},
+                {"price": round(price, ndigits), "label": label}
+                for label, price in levels.items()
             ],
+            **zones,
         }
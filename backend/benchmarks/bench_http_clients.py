@@ -0,0 +1,86 @@
+"""HTTP 連線重用基準測試：每次請求新建 AsyncClient vs 共用連線池
+
+預設對本機 HTTP server 發送（只含 TCP 握手成本）；傳入 URL 可量測真實上游（含 TLS）：
+
+執行：
+    cd backend && python benchmarks/bench_http_clients.py
+    cd backend && python benchmarks/bench_http_clients.py https://fapi.binance.com/fapi/v1/ping
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from app.data.http import HttpClients
+
+N_REQUESTS = 200
+
+
+async def _serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """最小 HTTP/1.1 keep-alive server"""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head:
+                break
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: 2\r\nConnection: keep-alive\r\n\r\n{}"
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _measure(fetch, n: int) -> list[float]:
+    latencies = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        resp = await fetch()
+        resp.raise_for_status()
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def _report(label: str, latencies: list[float]) -> None:
+    ms = sorted(v * 1e3 for v in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    median, mean = statistics.median(ms), statistics.mean(ms)
+    print(f"{label:>16} {median:>9.2f}ms {p95:>9.2f}ms {mean:>9.2f}ms")
+
+
+async def main() -> None:
+    server = None
+    if len(sys.argv) > 1:
+        url, n = sys.argv[1], 20
+    else:
+        server = await asyncio.start_server(_serve, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        url, n = f"http://127.0.0.1:{port}/ping", N_REQUESTS
+
+    async def fresh() -> httpx.Response:
+        # 舊做法：每次請求新建 client → 每次重新握手
+        async with httpx.AsyncClient(timeout=10.0) as client:
+            return await client.get(url)
+
+    pooled = HttpClients()
+
+    print(f"url={url} requests={n}")
+    print(f"{'':>16} {'p50':>11} {'p95':>11} {'mean':>11}")
+    _report("fresh client", await _measure(fresh, n))
+    _report("shared pool", await _measure(lambda: pooled.get(url), n))
+
+    await pooled.aclose()
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""滾動極值基準測試（1M 根 K 棒）
+
+執行：
+    cd backend && python benchmarks/bench_rolling_extrema.py
+"""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.indicators.extrema import RollingExtrema, rolling_max
+
+N_BARS = 1_000_000
+WINDOWS = (14, 200, 5000)
+
+
+def _timeit(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    np.random.seed(0)
+    high = 30000 * np.exp(np.cumsum(np.random.normal(0, 0.01, N_BARS)))
+    series = pd.Series(high)
+
+    print(f"bars={N_BARS:,}")
+    print(f"{'window':>8} {'rolling_max':>12} {'pandas':>12} {'streaming/bar':>14}")
+    for window in WINDOWS:
+        t_ours = _timeit(lambda: rolling_max(high, window))
+        t_pandas = _timeit(lambda: series.rolling(window).max())
+
+        def _stream() -> None:
+            rx = RollingExtrema(window, mode="max")
+            for v in high:
+                rx.update(v)
+
+        t_stream = _timeit(_stream, repeat=1)
+        print(
+            f"{window:>8} {t_ours * 1e3:>10.1f}ms {t_pandas * 1e3:>10.1f}ms "
+            f"{t_stream / N_BARS * 1e9:>11.0f}ns"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -63,3 +63,29 @@ def bearish_ohlcv() -> pd.DataFrame:
     df.index.name = "timestamp"
 
     return df
+
+
+@pytest.fixture
+def long_ohlcv() -> pd.DataFrame:
+    """產生較長的隨機漫步 OHLCV 數據（超過各指標收斂所需長度）"""
+    np.random.seed(7)
+    n = 600
+
+    close = 30000 * np.exp(np.cumsum(np.random.normal(0, 0.01, n)))
+    high = close * (1 + np.abs(np.random.normal(0.004, 0.002, n)))
+    low = close * (1 - np.abs(np.random.normal(0.004, 0.002, n)))
+    open_price = close * (1 + np.random.normal(0, 0.002, n))
+    volume = np.random.uniform(100, 1000, n)
+
+    dates = pd.date_range("2023-01-01", periods=n, freq="h", tz="UTC")
+
+    df = pd.DataFrame({
+        "open": open_price,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": volume,
+    }, index=dates)
+    df.index.name = "timestamp"
+
+    return df
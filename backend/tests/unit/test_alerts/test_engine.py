@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from app.core.alerts.engine import AlertIndex, AlertRule
+from app.core.alerts.metrics import candle_values, derivative_values
+
+
+def _rule(id_, metric="rsi", op="crosses_below", threshold=30.0, symbol="ETH", timeframe="1h"):
+    return AlertRule(id_, symbol, timeframe, metric, op, threshold)
+
+
+def test_unknown_operator_rejected():
+    with pytest.raises(ValueError):
+        _rule(1, op="!=")
+
+
+@pytest.mark.parametrize(
+    "op, prev, now, expected",
+    [
+        ("crosses_below", 31.0, 29.0, True),
+        ("crosses_below", 29.0, 28.0, False),  # 已在門檻下方
+        ("crosses_below", None, 29.0, False),  # cross 需要前值
+        ("crosses_above", 29.0, 31.0, True),
+        ("<", None, 29.0, True),  # level 型首次成立即觸發
+        ("<", 29.0, 28.0, False),  # 持續成立不重複觸發
+        ("<=", 31.0, 30.0, True),
+        (">", 31.0, math.nan, False),
+    ],
+)
+def test_triggered_is_edge_based(op, prev, now, expected):
+    assert _rule(1, op=op).triggered(prev, now) is expected
+
+
+def test_index_only_evaluates_affected_keys():
+    index = AlertIndex([
+        _rule(1),
+        _rule(2, op="<", threshold=25.0),
+        _rule(3, symbol="BTC"),
+        _rule(4, metric="funding_avg", op=">", threshold=0.05, timeframe=None),
+    ])
+    assert index.metrics("ETH", "1h") == {"rsi"}
+    assert index.metrics("ETH", None) == {"funding_avg"}
+    assert index.metrics("ETH", "4h") == set()
+    assert index.pairs() == {("ETH", "1h"), ("BTC", "1h"), ("ETH", None)}
+
+    events = index.evaluate("ETH", "1h", {"rsi": 28.0}, previous={"rsi": 35.0}, now_ms=1)
+    assert [e["rule_id"] for e in events] == [1]
+    assert events[0]["message"] == "ETH 1h rsi crosses_below 30"
+
+    # 未提供 previous 時使用上一次更新記住的值
+    assert index.evaluate("ETH", None, {"funding_avg": 0.01}) == []
+    events = index.evaluate("ETH", None, {"funding_avg": 0.08})
+    assert [e["rule_id"] for e in events] == [4]
+    assert index.evaluate("ETH", None, {"funding_avg": 0.09}) == []
+
+
+def test_index_remove_cleans_up_keys():
+    index = AlertIndex([_rule(1), _rule(2, metric="price", op=">", threshold=1.0)])
+    assert index.remove(1).id == 1
+    assert index.remove(1) is None
+    assert index.metrics("ETH", "1h") == {"price"}
+    index.remove(2)
+    assert len(index) == 0
+    assert index.pairs() == set()
+
+
+def test_candle_values_last_two_bars(sample_ohlcv):
+    latest, previous = candle_values(sample_ohlcv, {"price", "change_pct", "rsi"})
+    close = sample_ohlcv["close"].to_numpy()
+    assert latest["price"] == close[-1]
+    assert previous["price"] == close[-2]
+    assert latest["change_pct"] == pytest.approx((close[-1] / close[-2] - 1) * 100)
+    assert 0 <= latest["rsi"] <= 100
+    assert candle_values(sample_ohlcv.iloc[:1], {"price"}) == ({}, {})
+
+
+def test_derivative_values_skip_missing_sources():
+    class Funding:
+        avg_rate = 0.0006
+
+    values = derivative_values({"funding": Funding()}, {"funding_avg", "ls_ratio"})
+    assert values == {"funding_avg": pytest.approx(0.06)}
+
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.backtest.engine import (
+    BacktestConfig,
+    max_drawdown,
+    run_backtest,
+    target_positions,
+)
+from app.core.indicators.scoring import score_timeline
+from app.services.technical_service import AVAILABLE_INDICATORS
+
+
+def _frame(close: list[float]) -> pd.DataFrame:
+    idx = pd.date_range("2024-01-01", periods=len(close), freq="4h", tz="UTC")
+    return pd.DataFrame({"close": close}, index=idx)
+
+
+class TestTargetPositions:
+    def test_hysteresis(self):
+        score = np.array([np.nan, 0.0, 0.5, 0.1, np.nan, -0.1, -0.5, 0.0, 0.3])
+        pos = target_positions(score, 0.2, -0.2)
+        np.testing.assert_array_equal(pos, [0, 0, 1, 1, 1, 1, 0, 0, 1])
+
+
+class TestRunBacktest:
+    def test_next_bar_execution_no_lookahead(self):
+        df = _frame([100, 100, 110, 121, 121])
+        # 第 1 根收盤看多 → 承擔第 2、3 根的漲幅；第 3 根收盤出場
+        score = pd.Series([np.nan, 0.5, 0.5, -0.5, -0.5], index=df.index)
+        result = run_backtest(df, score, BacktestConfig(fee_rate=0.0), "4h")
+
+        assert result.metrics["total_return"] == pytest.approx(0.21)
+        assert result.metrics["trades"] == 1
+        assert result.metrics["hit_rate"] == 1.0
+        # 暖機那根略過
+        assert len(result.equity) == 4
+
+    def test_fees_charged_on_entry_and_exit(self):
+        df = _frame([100, 100, 100, 100])
+        score = pd.Series([0.5, -0.5, -0.5, -0.5], index=df.index)
+        result = run_backtest(df, score, BacktestConfig(fee_rate=0.01), "4h")
+        assert result.metrics["total_return"] == pytest.approx(0.99 * 0.99 - 1)
+        assert result.trades["return"].iloc[0] == pytest.approx(0.99 * 0.99 - 1)
+
+    def test_open_trade_closed_at_last_bar(self):
+        df = _frame([100, 100, 90, 80])
+        score = pd.Series([0.5, 0.5, 0.5, 0.5], index=df.index)
+        result = run_backtest(df, score, BacktestConfig(fee_rate=0.0), "4h")
+        assert result.metrics["trades"] == 1
+        assert result.trades["exit_time"].iloc[0] == df.index[-1]
+        assert result.metrics["max_drawdown"] == pytest.approx(-0.2)
+        assert result.metrics["hit_rate"] == 0.0
+
+    def test_matches_bar_by_bar_simulation(self, long_ohlcv):
+        frame = score_timeline(long_ohlcv, [cls() for cls in AVAILABLE_INDICATORS.values()])
+        config = BacktestConfig(entry_threshold=0.1, exit_threshold=-0.1, fee_rate=0.001)
+        result = run_backtest(long_ohlcv, frame["overall_score"], config, "1h")
+
+        score = frame["overall_score"].to_numpy()
+        close = long_ohlcv["close"].to_numpy()
+        start = int(np.flatnonzero(np.isfinite(score))[0])
+        # 逐根模擬：倉位在收盤決定、下一根生效
+        equity, signal, held = 1.0, 0.0, 0.0
+        for t in range(start, len(close)):
+            pos = signal
+            ret = close[t] / close[t - 1] - 1 if t > start else 0.0
+            equity *= 1 + pos * ret - config.fee_rate * abs(pos - held)
+            held = pos
+            if score[t] > config.entry_threshold:
+                signal = 1.0
+            elif score[t] < config.exit_threshold:
+                signal = 0.0
+
+        assert result.equity.iloc[-1] == pytest.approx(equity, rel=1e-9)
+
+    def test_invalid_thresholds(self):
+        with pytest.raises(ValueError):
+            BacktestConfig(entry_threshold=-0.3, exit_threshold=0.3)
+
+
+def test_max_drawdown():
+    assert max_drawdown(np.array([1.0, 1.2, 0.9, 1.5, 1.2])) == pytest.approx(-0.25)
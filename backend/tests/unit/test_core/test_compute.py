@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.compute import ComputeExecutor, arrays_to_frame, frame_to_arrays
+from app.services.technical_service import AVAILABLE_INDICATORS, _technical_results_task
+
+
+def _busy(seconds: float) -> str:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+    return threading.current_thread().name
+
+
+def test_frame_round_trip(long_ohlcv):
+    payload = frame_to_arrays(long_ohlcv)
+    assert payload["index"].dtype == np.int64
+    assert all(v.dtype == np.float64 and v.flags.c_contiguous for v in payload["columns"].values())
+    pd.testing.assert_frame_equal(arrays_to_frame(payload), long_ohlcv, check_freq=False)
+
+
+def test_route_by_size():
+    executor = ComputeExecutor(process_workers=2, thread_workers=1, process_threshold=1000)
+    assert executor.route(999) == "thread"
+    assert executor.route(1000) == "process"
+    assert ComputeExecutor(process_workers=0, process_threshold=1).route(10**9) == "thread"
+
+
+async def test_small_work_runs_in_thread_and_loop_stays_responsive():
+    executor = ComputeExecutor(process_workers=0, thread_workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        name = await executor.run(_busy, 0.2, size=10)
+    finally:
+        task.cancel()
+        executor.shutdown()
+    assert name.startswith("compute")
+    assert ticks >= 5
+
+
+async def test_large_work_runs_in_process_pool(long_ohlcv):
+    executor = ComputeExecutor(process_workers=1, thread_workers=1, process_threshold=0)
+    try:
+        results = await executor.run(
+            _technical_results_task, frame_to_arrays(long_ohlcv), 1e-4, size=long_ohlcv.size
+        )
+    finally:
+        executor.shutdown()
+
+    expected = _technical_results_task(frame_to_arrays(long_ohlcv), 1e-4)
+    assert [r.name for r in results] == [r.name for r in expected]
+    assert [r.continuous_score for r in results] == [r.continuous_score for r in expected]
+    assert len(results) == len(AVAILABLE_INDICATORS)
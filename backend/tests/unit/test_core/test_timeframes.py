@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.timeframes import (
+    base_timeframe,
+    last_candle_close,
+    next_candle_close,
+    resample_ohlcv,
+)
+
+
+def _hourly(start: str, n: int) -> pd.DataFrame:
+    idx = pd.date_range(start, periods=n, freq="h", tz="UTC", name="timestamp")
+    values = np.arange(n, dtype=float)
+    return pd.DataFrame(
+        {
+            "open": values, "high": values + 0.5, "low": values - 0.5,
+            "close": values + 0.1, "volume": 1.0,
+        },
+        index=idx,
+    )
+
+
+class TestBaseTimeframe:
+    def test_finest_divides_all(self):
+        assert base_timeframe(["4h", "1h", "1d"]) == "1h"
+
+    def test_falls_back_to_common_divisor(self):
+        assert base_timeframe(["3d", "1w"]) == "1d"
+
+    def test_empty(self):
+        with pytest.raises(ValueError):
+            base_timeframe([])
+
+
+class TestResample:
+    def test_ohlcv_aggregation(self):
+        df = _hourly("2024-01-01 00:00", 12)
+        out = resample_ohlcv(df, "1h", "4h")
+        assert list(out.index.hour) == [0, 4, 8]
+        first = out.iloc[0]
+        assert (first["open"], first["high"], first["low"], first["close"], first["volume"]) == (
+            0.0, 3.5, -0.5, 3.1, 4.0,
+        )
+
+    def test_drops_partial_first_bucket_keeps_open_last(self):
+        df = _hourly("2024-01-01 02:00", 9)  # 02:00 ~ 10:00
+        out = resample_ohlcv(df, "1h", "4h")
+        assert list(out.index.hour) == [4, 8]
+        assert out.iloc[-1]["volume"] == 3.0  # 未收盤的 08:00 K 棒
+
+    def test_weekly_starts_monday(self):
+        df = _hourly("2024-01-01 00:00", 24 * 21)  # 2024-01-01 為週一
+        out = resample_ohlcv(df, "1h", "1w")
+        assert len(out) == 3
+        assert all(ts.dayofweek == 0 for ts in out.index)
+
+    def test_daily_matches_direct_groupby(self, long_ohlcv):
+        out = resample_ohlcv(long_ohlcv, "1h", "1d")
+        day = long_ohlcv.index.floor("D")
+        expected = long_ohlcv.groupby(day).agg(
+            {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+        )
+        pd.testing.assert_frame_equal(
+            out, expected.iloc[: len(out)], check_names=False, check_freq=False
+        )
+
+    def test_invalid_pair(self):
+        with pytest.raises(ValueError):
+            resample_ohlcv(_hourly("2024-01-01", 10), "4h", "1h")
+
+
+def _ms(text: str) -> int:
+    return int(pd.Timestamp(text, tz="UTC").timestamp() * 1000)
+
+
+class TestCandleClose:
+    def test_hourly_and_daily(self):
+        now = _ms("2024-01-03 13:45")
+        assert last_candle_close(now, "4h") == _ms("2024-01-03 12:00")
+        assert next_candle_close(now, "1d") == _ms("2024-01-04")
+
+    def test_weekly_closes_on_monday(self):
+        now = _ms("2024-01-03 13:45")
+        assert pd.Timestamp(last_candle_close(now, "1w"), unit="ms").dayofweek == 0
+        assert next_candle_close(now, "1w") == _ms("2024-01-08")
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from app.config import settings
+from app.data.aggregator import DataAggregator
+from app.data.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+class FakeProvider:
+    def __init__(self, name: str, fail: bool = False, delay: float = 0.0):
+        self.name = name
+        self.fail = fail
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+
+    async def get_ohlcv(self, symbol, timeframe="1d", limit=100, since=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.fail:
+            raise ConnectionError(f"{self.name} down")
+        df = pd.DataFrame({"close": [1.0]}, index=[pd.Timestamp(0, tz="UTC")])
+        return df.assign(source=self.name)
+
+    async def get_current_price(self, symbols):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError(f"{self.name} down")
+        return {s: 1.0 for s in symbols}
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    opts = dict(window_seconds=60, min_calls=3, error_rate=0.5,
+                slow_call_seconds=0.05, slow_call_rate=0.5, open_seconds=0.05)
+    opts.update(kwargs)
+    return CircuitBreaker("test", **opts)
+
+
+def test_breaker_opens_on_error_rate_then_half_opens():
+    b = _breaker()
+    b.record(True, 0.01)
+    b.record(False, 0.01)
+    assert b.state == "closed"  # 未達 min_calls
+    b.record(False, 0.01)
+    assert b.state == "open"
+    assert not b.allow() and b.rejected == 1
+
+
+async def test_breaker_probe_closes_or_reopens():
+    b = _breaker()
+    for _ in range(3):
+        b.record(False, 0.01)
+    await asyncio.sleep(0.06)
+    assert b.state == "half_open"
+    assert b.acquire() is True
+    assert not b.allow()  # 只放行一個探測請求
+    b.record(False, 0.01, probe=True)
+    assert b.state == "open" and b.opened == 2
+
+    await asyncio.sleep(0.06)
+    assert b.acquire() is True
+    b.record(True, 0.01, probe=True)
+    assert b.state == "closed"
+    assert b.stats()["calls"] == 0
+
+
+async def test_breaker_only_probe_outcome_transitions():
+    b = _breaker()
+    for _ in range(3):
+        b.record(False, 0.01)
+    await asyncio.sleep(0.06)
+    assert b.acquire() is True
+
+    # 開啟前送出的呼叫、指定來源的呼叫晚到：不關閉也不重新開啟
+    b.record(True, 0.01)
+    b.record(False, 0.01)
+    assert b.state == "half_open" and b.opened == 1
+    assert not b.allow()  # 探測名額仍被佔用
+
+    b.release()  # 非探測呼叫取消不釋放名額
+    assert not b.allow()
+    b.release(probe=True)
+    assert b.acquire() is True
+    b.record(True, 0.01, probe=True)
+    assert b.state == "closed"
+
+
+def test_breaker_zero_settings_not_replaced_by_defaults():
+    b = CircuitBreaker("test", min_calls=0, open_seconds=0.0)
+    assert b._min_calls == 0 and b._open_seconds == 0.0
+
+
+async def test_aggregator_probe_closes_breaker():
+    primary = FakeProvider("ccxt")
+    agg = DataAggregator({"ccxt": primary, "coingecko": FakeProvider("coingecko")})
+    agg._breakers = {n: _breaker() for n in ("ccxt", "coingecko")}
+    agg._breakers["ccxt"]._trip(time.monotonic(), "test")
+    await asyncio.sleep(0.06)
+
+    df = await agg.get_ohlcv("BTC")
+    assert df["source"].iloc[0] == "ccxt"
+    assert agg.health()["ccxt"]["state"] == "closed"
+
+
+def test_breaker_opens_on_slow_calls():
+    b = _breaker()
+    for _ in range(3):
+        b.record(True, 0.2)
+    stats = b.stats()
+    assert stats["state"] == "open" and stats["slow_rate"] == 1.0 and stats["health"] == 0.0
+
+
+async def test_open_primary_routes_straight_to_fallback(monkeypatch):
+    primary, fallback = FakeProvider("ccxt", fail=True), FakeProvider("coingecko")
+    agg = DataAggregator({"ccxt": primary, "coingecko": fallback})
+    agg._breakers = {n: _breaker(open_seconds=60) for n in ("ccxt", "coingecko")}
+
+    for _ in range(3):
+        df = await agg.get_ohlcv("BTC")
+        assert df["source"].iloc[0] == "coingecko"
+    assert primary.calls == 3
+    assert agg.health()["ccxt"]["state"] == "open"
+
+    # 斷路器開啟 → 不再呼叫主要來源
+    await agg.get_ohlcv("BTC")
+    await agg.get_current_price(["BTC"])
+    assert primary.calls == 3 and fallback.calls == 5
+    assert agg.health()["ccxt"]["rejected"] == 2
+
+
+async def test_all_open_fails_fast():
+    agg = DataAggregator(
+        {"ccxt": FakeProvider("ccxt", fail=True), "coingecko": FakeProvider("cg", fail=True)}
+    )
+    agg._breakers = {n: _breaker(open_seconds=60) for n in ("ccxt", "coingecko")}
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            await agg.get_current_price(["BTC"])
+    with pytest.raises(CircuitOpenError):
+        await agg.get_current_price(["BTC"])
+
+
+async def test_explicit_provider_bypasses_breaker():
+    primary = FakeProvider("ccxt")
+    agg = DataAggregator({"ccxt": primary, "coingecko": FakeProvider("coingecko")})
+    agg._breakers = {n: _breaker(open_seconds=60) for n in ("ccxt", "coingecko")}
+    agg._breakers["ccxt"]._trip(time.monotonic(), "test")
+    df = await agg.get_ohlcv("BTC", provider="ccxt")
+    assert df["source"].iloc[0] == "ccxt"
+    with pytest.raises(ValueError):
+        await agg.get_ohlcv("BTC", provider="nope")
+
+
+@pytest.fixture
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(settings, "hedge_default_delay_seconds", 0.05)
+    monkeypatch.setattr(settings, "hedge_min_delay_seconds", 0.01)
+
+
+def _hedging(primary, fallback, ratio=1.0, burst=5.0) -> DataAggregator:
+    agg = DataAggregator({"ccxt": primary, "coingecko": fallback}, hedge=True)
+    agg._breakers = {n: _breaker(slow_call_seconds=10) for n in ("ccxt", "coingecko")}
+    agg._budget.ratio, agg._budget.burst, agg._budget._tokens = ratio, burst, burst
+    return agg
+
+
+async def test_hedge_fast_primary_never_fires_fallback(hedge_settings):
+    primary, fallback = FakeProvider("ccxt"), FakeProvider("coingecko")
+    agg = _hedging(primary, fallback)
+    df = await agg.get_ohlcv("BTC")
+    assert df["source"].iloc[0] == "ccxt"
+    assert fallback.calls == 0 and agg.hedge_stats()["hedged"] == 0
+
+
+async def test_hedge_slow_primary_takes_fallback_and_cancels_loser(hedge_settings):
+    primary, fallback = FakeProvider("ccxt", delay=1.0), FakeProvider("coingecko", delay=0.01)
+    agg = _hedging(primary, fallback)
+    t0 = time.monotonic()
+    df = await agg.get_ohlcv("BTC")
+    assert time.monotonic() - t0 < 0.5
+    assert df["source"].iloc[0] == "coingecko"
+    await asyncio.sleep(0)
+    assert primary.cancelled == 1
+    stats = agg.hedge_stats()
+    assert stats["hedged"] == 1 and stats["fallback_wins"] == 1
+    assert agg.health()["ccxt"]["calls"] == 0  # 被取消的一方不計入
+
+
+async def test_hedge_budget_caps_extra_load(hedge_settings):
+    primary, fallback = FakeProvider("ccxt", delay=0.1), FakeProvider("coingecko")
+    agg = _hedging(primary, fallback, ratio=0.25, burst=1.0)
+    for _ in range(8):
+        await agg.get_ohlcv("BTC")
+    stats = agg.hedge_stats()
+    # 初始 1 個額度 + 每 4 個請求 1 個
+    assert stats["hedged"] <= 1 + 8 * 0.25
+    assert stats["denied"] > 0
+    assert fallback.calls == stats["hedged"]
+
+
+async def test_hedge_falls_back_when_primary_fails_fast(hedge_settings):
+    primary, fallback = FakeProvider("ccxt", fail=True), FakeProvider("coingecko")
+    agg = _hedging(primary, fallback)
+    df = await agg.get_ohlcv("BTC")
+    assert df["source"].iloc[0] == "coingecko"
+    assert agg.hedge_stats()["hedged"] == 0
+
+
+def test_latency_quantile_needs_samples():
+    b = _breaker()
+    b.record(True, 0.1)
+    assert b.latency_quantile(0.9) is None
+    for latency in (0.2, 0.3, 0.4):
+        b.record(True, latency)
+    assert b.latency_quantile(0.9) == 0.4
+    assert b.latency_quantile(0.5) == 0.3
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from app.core.indicators.oscillator import KDIndicator
+from app.data.cache import _deserialize, _serialize
+
+
+class TestSerialization:
+    def test_dataframe_roundtrip(self, sample_ohlcv):
+        restored = _deserialize(_serialize(sample_ohlcv.reset_index(drop=True)))
+        assert restored["close"].tolist() == sample_ohlcv["close"].tolist()
+
+    def test_indicator_result_roundtrip(self, sample_ohlcv):
+        result = KDIndicator().calculate(sample_ohlcv)
+        restored = _deserialize(_serialize(result))
+
+        assert restored.name == "KD"
+        assert restored.continuous_score == result.continuous_score
+        assert restored.values.index.equals(result.values.index)
+        np.testing.assert_array_equal(restored.values.buffer("K"), result.values.buffer("K"))
+        assert restored.to_dict() == result.to_dict()
+
+    def test_lines_emitted_as_raw_buffers(self, sample_ohlcv):
+        result = KDIndicator().calculate(sample_ohlcv)
+        payload = json.loads(_serialize(result))
+        lines = payload["fields"]["values"]
+
+        assert lines["__type"] == "lines"
+        assert isinstance(lines["buffers"]["K"], str)
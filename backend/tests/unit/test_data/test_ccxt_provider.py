@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+
+import ccxt.async_support as ccxt
+
+from app.data.providers.ccxt_provider import CCXTProvider
+
+LISTED = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "1000PEPE/USDT", "ETH/BTC"]
+
+
+class FakeExchange:
+    def __init__(self, bulk: bool = True):
+        self.has = {"fetchTickers": bulk}
+        self.symbols = LISTED
+        self.markets = {
+            s: {"symbol": s, "base": s.split("/")[0], "quote": s.split("/")[1]} for s in LISTED
+        }
+        self.calls: list[tuple] = []
+        self.rejected: set[str] = set()  # 模擬 markets 過期：已下架但仍在 markets 中
+        self.active = 0
+        self.peak = 0
+
+    def _ticker(self, pair):
+        return {"symbol": pair, "last": float(len(pair)), "quoteVolume": 1.0, "percentage": 0.5}
+
+    async def fetch_tickers(self, symbols=None):
+        self.calls.append(("tickers", tuple(symbols) if symbols else None))
+        await asyncio.sleep(0.01)
+        # 與 ccxt 相同：任一交易對無效即整批 BadSymbol
+        bad = [p for p in symbols or () if p not in LISTED or p in self.rejected]
+        if bad:
+            raise ccxt.BadSymbol(f"binance does not have market symbol {bad[0]}")
+        return {p: self._ticker(p) for p in (symbols or LISTED)}
+
+    async def fetch_ticker(self, pair):
+        self.calls.append(("ticker", pair))
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.005)
+        self.active -= 1
+        if pair == "SOL/USDT" or pair in self.rejected:
+            raise RuntimeError("halted")
+        return self._ticker(pair)
+
+
+class FakePool:
+    def __init__(self, exchange):
+        self._exchange = exchange
+
+    async def get(self, exchange_id):
+        return self._exchange
+
+    def loaded_at(self, exchange_id):
+        return 1.0
+
+
+async def test_prices_use_one_bulk_request():
+    exchange = FakeExchange()
+    provider = CCXTProvider("fake", pool=FakePool(exchange))
+    prices = await provider.get_current_price(["btc", "ETH", "pepe", "SOL"])
+    assert prices == {"BTC": 8.0, "ETH": 8.0, "PEPE": 13.0, "SOL": 8.0}
+    assert exchange.calls == [("tickers", ("1000PEPE/USDT", "BTC/USDT", "ETH/USDT", "SOL/USDT"))]
+
+
+async def test_unknown_symbol_does_not_blank_batch():
+    exchange = FakeExchange()
+    provider = CCXTProvider("fake", pool=FakePool(exchange))
+    prices = await provider.get_current_price(["BTC", "FOO", "ETH"])
+    assert prices == {"BTC": 8.0, "ETH": 8.0}
+    assert exchange.calls == [("tickers", ("BTC/USDT", "ETH/USDT"))]
+
+
+async def test_bad_symbol_falls_back_to_per_pair():
+    exchange = FakeExchange()
+    exchange.rejected = {"ETH/USDT"}
+    provider = CCXTProvider("fake", pool=FakePool(exchange))
+    prices = await provider.get_current_price(["BTC", "ETH"])
+    assert prices == {"BTC": 8.0}
+    assert exchange.calls[1:] == [("ticker", "BTC/USDT"), ("ticker", "ETH/USDT")]
+
+
+async def test_prices_fallback_bounded_concurrency(monkeypatch):
+    monkeypatch.setattr("app.data.providers.ccxt_provider.settings.ccxt_ticker_concurrency", 2)
+    exchange = FakeExchange(bulk=False)
+    provider = CCXTProvider("fake", pool=FakePool(exchange))
+    prices = await provider.get_current_price(["BTC", "ETH", "SOL", "PEPE"])
+    # 單一交易對失敗只略過該幣種
+    assert set(prices) == {"BTC", "ETH", "PEPE"}
+    assert len(exchange.calls) == 4
+    assert exchange.peak <= 2
+
+
+async def test_overview_snapshot_shared_with_prices():
+    exchange = FakeExchange()
+    provider = CCXTProvider("fake", pool=FakePool(exchange))
+    overviews = await asyncio.gather(*(provider.get_market_overview(3) for _ in range(3)))
+    assert exchange.calls == [("tickers", None)]  # 並行的總覽只抓一次全市場
+    assert list(overviews[0]["symbol"]) == ["BTC", "ETH", "SOL"]
+
+    # 快照有效期間價格直接取用，不再發請求
+    assert await provider.get_current_price(["ETH"]) == {"ETH": 8.0}
+    assert len(exchange.calls) == 1
+
+    provider._tickers_at -= 3600  # 快照過期
+    await provider.get_current_price(["ETH"])
+    assert exchange.calls[-1] == ("tickers", ("ETH/USDT",))
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import app.data.providers.coingecko as coingecko_module
+from app.data.coin_index import CoinIndex
+from app.data.http import HttpClients
+from app.data.providers.coingecko import CoinGeckoIndex, CoinGeckoProvider
+
+COINS = [
+    ["bitcoin", "btc", "Bitcoin", 1, "btc.png"],
+    ["bitcoin-cash", "bch", "Bitcoin Cash", 20, None],
+    ["wrapped-bitcoin", "wbtc", "Wrapped Bitcoin", 15, None],
+    ["ethereum", "eth", "Ethereum", 2, None],
+    ["ethereum-wormhole", "eth", "Ethereum (Wormhole)", None, None],
+    ["ether-fake", "eth", "Ether Fake", None, None],
+    ["solana", "sol", "Solana", 5, None],
+    ["bit-token", "bit", "BIT Token", 300, None],
+]
+
+
+def test_resolve_prefers_market_cap_rank():
+    index = CoinIndex(COINS)
+    assert index.resolve("eth") == "ethereum"
+    assert index.resolve("BTC") == "bitcoin"
+    assert index.resolve("doge") is None
+
+
+def test_resolve_unranked_prefers_shorter_id():
+    index = CoinIndex([c for c in COINS if c[0] != "ethereum"])
+    assert index.resolve("ETH") == "ether-fake"
+
+
+def test_search_exact_symbol_then_rank():
+    index = CoinIndex(COINS)
+    results = index.search("bit")
+    # 完全符合 symbol 的 BIT 優先，其餘前綴匹配依市值排名
+    assert [r["name"] for r in results] == [
+        "BIT Token", "Bitcoin", "Wrapped Bitcoin", "Bitcoin Cash",
+    ]
+    assert results[1] == {
+        "symbol": "BTC", "name": "Bitcoin", "market_cap_rank": 1, "thumb": "btc.png",
+    }
+
+
+def test_search_limit_and_empty_query():
+    index = CoinIndex(COINS)
+    assert [r["symbol"] for r in index.search("bit", limit=2)] == ["BIT", "BTC"]
+    assert index.search("  ") == []
+
+
+def test_search_fuzzy_matches_typos():
+    index = CoinIndex(COINS)
+    assert index.search("solanna")[0]["name"] == "Solana"
+    assert index.search("xyzxyz") == []
+
+
+# ── CoinGeckoIndex（/coins/list + /coins/markets）──
+
+IMAGES = "https://coin-images.coingecko.com/coins/images"
+
+
+class _NoKeySettings:
+    async def get_api_key(self, key: str):
+        return None
+
+
+@pytest.fixture
+def coingecko_api(monkeypatch):
+    state = {"calls": 0, "fail_markets": False}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/coins/list"):
+            state["calls"] += 1
+            return httpx.Response(200, json=[
+                {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+                {"id": "ethereum-wormhole", "symbol": "eth", "name": "Ethereum (Wormhole)"},
+                {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+            ])
+        if request.url.path.endswith("/coins/markets"):
+            if state["fail_markets"] or request.url.params["page"] != "1":
+                return httpx.Response(500)
+            return httpx.Response(200, json=[
+                {"id": "bitcoin", "market_cap_rank": 1, "image": f"{IMAGES}/1/large/btc.png"},
+                {"id": "ethereum", "market_cap_rank": 2, "image": f"{IMAGES}/279/large/eth.png"},
+            ])
+        return httpx.Response(404)
+
+    clients = HttpClients(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(coingecko_module, "http_clients", clients)
+    monkeypatch.setattr(coingecko_module, "_settings_svc", _NoKeySettings())
+    return state
+
+
+async def test_coingecko_index_persists_snapshot(tmp_path, coingecko_api):
+    path = tmp_path / "coins.json"
+    index = CoinGeckoIndex(CoinGeckoProvider(), path=str(path), refresh_seconds=3600, rank_pages=2)
+    await index.ensure()
+    assert index.resolve("ETH") == "ethereum"
+    # 縮圖欄位存 thumb 尺寸，而非 /coins/markets 回傳的大圖
+    assert index.search("eth")[0]["thumb"] == f"{IMAGES}/279/thumb/eth.png"
+    assert coingecko_api["calls"] == 1 and len(index) == 3
+
+    snapshot = json.loads(path.read_text())
+    assert ["bitcoin", "btc", "Bitcoin", 1, f"{IMAGES}/1/thumb/btc.png"] in snapshot["data"]
+
+    # 重啟：從快照載入，不重新下載
+    restarted = CoinGeckoIndex(CoinGeckoProvider(), path=str(path), refresh_seconds=3600)
+    await restarted.ensure()
+    assert restarted.resolve("btc") == "bitcoin"
+    assert coingecko_api["calls"] == 1
+
+
+async def test_coingecko_index_without_ranks(tmp_path, coingecko_api):
+    coingecko_api["fail_markets"] = True
+    index = CoinGeckoIndex(
+        CoinGeckoProvider(), path=str(tmp_path / "coins.json"), refresh_seconds=3600
+    )
+    assert await index.refresh()
+    # 排名取得失敗仍可使用；同 symbol 以較短的 id 優先
+    assert index.resolve("eth") == "ethereum"
+
+
+async def test_cold_start_resolves_without_waiting(tmp_path, coingecko_api, monkeypatch):
+    index = CoinGeckoIndex(
+        CoinGeckoProvider(), path=str(tmp_path / "coins.json"), refresh_seconds=3600
+    )
+    monkeypatch.setattr(coingecko_module, "coin_index", index)
+    release = asyncio.Event()
+    download = index._download
+
+    async def _slow_download():
+        await release.wait()
+        return await download()
+
+    monkeypatch.setattr(index, "_download", _slow_download)
+
+    # 無快照：直接猜 symbol 小寫，下載在背景進行
+    provider = CoinGeckoProvider()
+    assert await asyncio.wait_for(provider._get_coin_id("ETH"), 1) == "eth"
+    assert len(index) == 0
+
+    release.set()
+    await index.refresh()
+    assert await provider._get_coin_id("ETH") == "ethereum"
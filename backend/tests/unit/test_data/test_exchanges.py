@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+import app.data.exchanges as exchanges_module
+from app.data.exchanges import ExchangePool
+from app.data.providers.ccxt_provider import CCXTProvider
+
+
+class FakeExchange:
+    instances: list[FakeExchange] = []
+    listed = ["BTC/USDT", "ETH/USDT"]
+
+    def __init__(self, options):
+        self.options = options
+        self.markets: dict = {}
+        self.symbols: list[str] = []
+        self.loads = 0
+        self.closed = False
+        FakeExchange.instances.append(self)
+
+    async def load_markets(self, reload=False):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        self.symbols = list(FakeExchange.listed)
+        self.markets = {}
+        for s in self.symbols:
+            base, quote = s.split("/")
+            self.markets[s] = {"symbol": s, "base": base, "quote": quote}
+        return self.markets
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_ccxt(monkeypatch):
+    FakeExchange.instances = []
+    FakeExchange.listed = ["BTC/USDT", "ETH/USDT"]
+    monkeypatch.setattr(exchanges_module.ccxt, "fakex", FakeExchange, raising=False)
+    monkeypatch.setattr(exchanges_module.ccxt, "otherx", FakeExchange, raising=False)
+
+
+async def test_concurrent_first_use_loads_markets_once():
+    pool = ExchangePool()
+    a, b = await asyncio.gather(pool.get("fakex"), pool.get("fakex"))
+    assert a is b
+    assert a.loads == 1
+    assert a.options["enableRateLimit"] is True
+    assert pool.loaded_at("fakex") is not None
+    with pytest.raises(ValueError):
+        pool.exchange("nosuchexchange")
+    await pool.aclose()
+    assert a.closed
+
+
+async def test_start_preloads_multiple_exchanges_and_refreshes():
+    pool = ExchangePool()
+    pool.start(["fakex", "otherx"], interval_seconds=0.02)
+    # 預先載入在背景進行；此時進來的請求等待同一個載入工作
+    fakex = await pool.get("fakex")
+    await asyncio.sleep(0.08)
+    otherx = pool.exchange("otherx")
+    assert fakex is not otherx
+    assert otherx.markets and fakex.loads >= 2
+
+    await pool.aclose()
+    assert fakex.closed and otherx.closed
+
+
+def test_exchanges_rebuilt_on_new_event_loop():
+    pool = ExchangePool()
+
+    async def _get():
+        return await pool.get("fakex")
+
+    first = asyncio.run(_get())
+    second = asyncio.run(_get())
+    assert first is not second
+    assert second.loads == 1
+
+
+async def test_provider_pair_index_follows_markets_reload():
+    pool = ExchangePool()
+    provider = CCXTProvider("fakex", pool=pool)
+    FakeExchange.listed = ["BTC/USDT", "1000PEPE/USDT"]
+    assert await provider._resolve_pair("pepe") == "1000PEPE/USDT"
+
+    FakeExchange.listed = ["BTC/USDT", "PEPE/USDT"]
+    await pool.load_markets("fakex", reload=True)
+    assert await provider._resolve_pair("pepe") == "PEPE/USDT"
+    await provider.close()
+    assert FakeExchange.instances[0].closed
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from app.data.http import HttpClients
+
+
+def _registry(seen: list[str]) -> HttpClients:
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        return httpx.Response(200, json={"host": request.url.host})
+
+    return HttpClients(transport=httpx.MockTransport(handler))
+
+
+async def test_one_client_per_host():
+    seen: list[str] = []
+    http = _registry(seen)
+    a = http.client("https://fapi.binance.com/fapi/v1/premiumIndex")
+    assert http.client("https://fapi.binance.com/futures/data/openInterestHist") is a
+    assert http.client("https://api.okx.com/api/v5/public/funding-rate") is not a
+    assert http.hosts == ["https://fapi.binance.com", "https://api.okx.com"]
+
+    resp = await http.get("https://api.okx.com/x", params={"instId": "BTC"})
+    assert resp.json() == {"host": "api.okx.com"}
+    assert seen == ["https://api.okx.com/x?instId=BTC"]
+    await http.aclose()
+    assert http.hosts == []
+    assert a.is_closed
+
+
+async def test_central_limits_and_timeouts():
+    http = HttpClients(timeout=7.0, connect_timeout=2.0, http2=False)
+    client = http.client("https://api.coingecko.com/api/v3/ping")
+    assert client.timeout == httpx.Timeout(7.0, connect=2.0)
+    await http.aclose()
+
+
+def test_clients_rebuilt_on_new_event_loop():
+    # CLI 每個指令各自 asyncio.run：上一個 loop 的連線不可重用
+    http = _registry([])
+
+    async def _get_client():
+        return http.client("https://api.alternative.me/fng/")
+
+    first = asyncio.run(_get_client())
+    second = asyncio.run(_get_client())
+    assert first is not second
+    assert http.hosts == ["https://api.alternative.me"]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.data.http import HttpClients
+from app.data.rate_limit import (
+    HostLimit,
+    RateLimiter,
+    RateLimitExceededError,
+    TokenBucket,
+    request_tier,
+    request_weight,
+)
+
+HOST = "api.test"
+LIMITS = {
+    HOST: {"public": HostLimit(50.0, 2.0, "x-used-weight", 100), "key": HostLimit(100.0, 5.0)}
+}
+
+
+def _response(status: int, headers: dict | None = None) -> httpx.Response:
+    return httpx.Response(status, headers=headers, request=httpx.Request("GET", f"https://{HOST}/x"))
+
+
+def test_tier_and_weight():
+    assert request_tier({"X-MBX-APIKEY": "k"}, None) == "key"
+    assert request_tier(None, {"a": "BTC", "api_key": "k"}) == "key"
+    assert request_tier({"Accept": "json"}, {"symbol": "BTC"}) == "public"
+    assert request_weight("fapi.binance.com", "/fapi/v1/premiumIndex", None) == 10.0
+    assert request_weight("fapi.binance.com", "/fapi/v1/premiumIndex", {"symbol": "X"}) == 1.0
+
+
+async def test_bucket_is_fair_and_paced():
+    bucket = TokenBucket(HostLimit(50.0, 2.0))
+    order: list[int] = []
+
+    async def _one(i: int) -> None:
+        await bucket.acquire()
+        order.append(i)
+
+    t0 = time.monotonic()
+    await asyncio.gather(*(_one(i) for i in range(6)))
+    elapsed = time.monotonic() - t0
+    assert order == list(range(6))  # 先到先得
+    assert 0.06 <= elapsed < 0.5  # 2 個 burst，其餘 4 個以 50/s 補充
+    stats = bucket.stats()
+    assert stats["requests"] == 6 and stats["waiting"] == 0 and stats["max_wait_ms"] > 0
+
+
+async def test_limiter_keys_by_host_and_tier():
+    limiter = RateLimiter(LIMITS)
+    assert limiter.bucket("unlisted.host", "public") is None
+    public = limiter.bucket(HOST, "public")
+    assert limiter.bucket(HOST, "key") is not public
+    assert limiter.bucket(HOST, "enterprise") is public  # 未列出的等級共用第一個設定
+
+
+async def test_retry_after_and_ban_block_the_host():
+    limiter = RateLimiter(LIMITS)
+    bucket = limiter.bucket(HOST, "public")
+
+    limiter.observe(bucket, _response(429, {"Retry-After": "3"}))
+    assert bucket.rate == 25.0  # 速率減半
+    assert 2.5 < bucket.projected_wait() <= 3.0
+    with pytest.raises(RateLimitExceededError):
+        await bucket.acquire(max_wait=1.0)
+
+    limiter.observe(bucket, _response(418))
+    assert bucket.projected_wait() >= 119
+    assert limiter.stats()[f"{HOST}:public"]["throttled"] == 2
+
+
+async def test_used_weight_header_pauses_until_next_window():
+    limiter = RateLimiter(LIMITS)
+    bucket = limiter.bucket(HOST, "public")
+    limiter.observe(bucket, _response(200, {"x-used-weight": "50"}))
+    assert bucket.projected_wait() == 0
+    limiter.observe(bucket, _response(200, {"x-used-weight": "95"}))
+    assert 0 < bucket.projected_wait() <= 60
+
+
+async def test_http_clients_retry_after_429(monkeypatch):
+    calls: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.05"})
+        return httpx.Response(200, json={"ok": True})
+
+    http = HttpClients(transport=httpx.MockTransport(handler), limiter=RateLimiter(LIMITS))
+    resp = await http.get(f"https://{HOST}/x")
+    assert resp.status_code == 200
+    assert len(calls) == 2 and calls[1] - calls[0] >= 0.04
+    assert http.rate_limit_stats()[f"{HOST}:public"]["throttled"] == 1
+
+    # 不在限流表的 host 直接送出
+    resp = await http.get("https://other.test/y")
+    assert resp.status_code == 200
+    await http.aclose()
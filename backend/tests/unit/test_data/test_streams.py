@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pandas as pd
+import pytest
+from websockets.asyncio.server import serve
+
+import app.data.streams as streams_module
+from app.data.cache import _deserialize, _serialize
+from app.data.streams import BinanceStream, LiveMarket
+
+HOUR = 3_600_000
+
+
+def _frame(n: int = 4) -> pd.DataFrame:
+    index = pd.to_datetime([i * HOUR for i in range(n)], unit="ms", utc=True)
+    return pd.DataFrame(
+        {"open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10.0}, index=index
+    )
+
+
+def _kline(symbol: str, open_ms: int, close: float, closed: bool) -> str:
+    k = {
+        "t": open_ms, "i": "1h", "o": "1", "h": "3", "l": "0.5", "c": str(close), "v": "7",
+        "x": closed,
+    }
+    data = {"e": "kline", "s": symbol, "k": k}
+    return json.dumps({"stream": f"{symbol.lower()}@kline_1h", "data": data})
+
+
+def _ticker(symbol: str, **fields) -> str:
+    data = {"e": "24hrMiniTicker", "s": symbol, **fields}
+    return json.dumps({"stream": f"{symbol.lower()}@miniTicker", "data": data})
+
+
+def test_merge_updates_last_and_appends():
+    live = LiveMarket(keep_bars=3)
+    df = _frame()
+    live.update_candle("btc", "1h", 3 * HOUR, (1.0, 3.0, 0.5, 2.5, 20.0))
+    live.update_candle("BTC", "1h", 4 * HOUR, (2.5, 2.6, 2.4, 2.55, 1.0))
+
+    merged = live.merge("BTC", "1h", df)
+    assert len(merged) == len(df)
+    assert merged.index[-1] == pd.Timestamp(4 * HOUR, unit="ms", tz="UTC")
+    assert merged["close"].iloc[-2] == 2.5 and merged["close"].iloc[-1] == 2.55
+    assert merged.index.is_monotonic_increasing
+    assert df["close"].iloc[-1] == 1.5  # 不修改原本（快取中的）K 線
+
+
+def test_merge_skips_gaps_and_unknown_keys():
+    live = LiveMarket(keep_bars=3)
+    df = _frame()
+    assert live.merge("BTC", "1h", df) is df
+    live.update_candle("BTC", "1h", 6 * HOUR, (1.0, 1.0, 1.0, 1.0, 1.0))  # 漏了 4h、5h
+    assert live.merge("BTC", "1h", df) is df
+
+
+def test_merge_into_l2_round_tripped_frame():
+    # L2 (SQLite) 快取還原的 DataFrame 索引為字串
+    cached = _deserialize(_serialize(_frame()))
+    assert not isinstance(cached.index, pd.DatetimeIndex)
+    live = LiveMarket()
+    live.update_candle("BTC", "1h", 4 * HOUR, (2.5, 2.6, 2.4, 2.55, 1.0))
+
+    merged = live.merge("BTC", "1h", cached)
+    assert isinstance(merged.index, pd.DatetimeIndex)
+    assert merged.index[-1] == pd.Timestamp(4 * HOUR, unit="ms", tz="UTC")
+    assert merged.index[0] == pd.Timestamp(HOUR, unit="ms", tz="UTC")
+    assert merged["close"].iloc[-1] == 2.55
+
+
+def test_prices_respect_max_age():
+    live = LiveMarket()
+    live.update_price("btc", 100.0)
+    assert live.prices(["BTC", "ETH"], max_age=5) == {"BTC": 100.0}
+    assert live.prices(["BTC"], max_age=-1) == {}
+
+
+@pytest.fixture
+def fast_reconnect(monkeypatch):
+    monkeypatch.setattr(streams_module, "RECONNECT_INITIAL_SECONDS", 0.01)
+
+
+async def test_stream_ingests_and_resubscribes_after_reconnect(fast_reconnect):
+    requests: list[list[dict]] = []
+
+    async def handler(ws):
+        conn: list[dict] = []
+        requests.append(conn)
+        conn.append(json.loads(await ws.recv()))
+        await ws.send(json.dumps({"result": None, "id": conn[-1]["id"]}))
+        if len(requests) == 1:
+            await ws.send(_ticker("BTCUSDT", c="101.5"))
+            await ws.send(_kline("BTCUSDT", 3 * HOUR, 102.0, closed=True))
+            await ws.send(_kline("DOGEUSDT", 3 * HOUR, 1.0, closed=True))  # 未訂閱 → 忽略
+            return  # 伺服器斷線 → 用戶端重連
+        async for raw in ws:
+            conn.append(json.loads(raw))
+
+    closed: list[tuple[str, str]] = []
+
+    async def on_closed(symbol: str, timeframe: str) -> None:
+        closed.append((symbol, timeframe))
+
+    live = LiveMarket()
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        stream = BinanceStream(live, url=f"ws://127.0.0.1:{port}", on_candle_closed=on_closed)
+        await stream.set_symbols(["btc"], ["1h"])
+        stream.start()
+        for _ in range(200):
+            if stream.connects >= 2 and len(requests) >= 2 and requests[1]:
+                break
+            await asyncio.sleep(0.01)
+
+        assert requests[0][0]["method"] == "SUBSCRIBE"
+        assert sorted(requests[0][0]["params"]) == ["btcusdt@kline_1h", "btcusdt@miniTicker"]
+        # 重連後重新訂閱相同 stream
+        assert sorted(requests[1][0]["params"]) == sorted(requests[0][0]["params"])
+        assert live.prices(["BTC"]) == {"BTC": 102.0}
+        assert live.candles("BTC", "1h") == [(3 * HOUR, (1.0, 3.0, 0.5, 102.0, 7.0))]
+        assert closed == [("BTC", "1h")]
+
+        # 連線中調整訂閱 → 只送差異
+        await stream.set_symbols(["BTC", "ETH"], [])
+        for _ in range(100):
+            if len(requests[1]) >= 3:
+                break
+            await asyncio.sleep(0.01)
+        assert requests[1][1] == {
+            "method": "UNSUBSCRIBE", "params": ["btcusdt@kline_1h"], "id": requests[1][1]["id"]
+        }
+        assert requests[1][2]["params"] == ["ethusdt@miniTicker"]
+        assert stream.stats()["connected"] is True
+
+        await stream.stop()
+    assert stream.stats()["connected"] is False
+
+
+async def test_stream_survives_malformed_frames(fast_reconnect):
+    async def handler(ws):
+        await ws.recv()
+        await ws.send(_ticker("BTCUSDT"))  # 缺少價格
+        await ws.send(_ticker("BTCUSDT", c="n/a"))
+        await ws.send(json.dumps({"data": {"e": "kline", "s": "BTCUSDT", "k": None}}))
+        await ws.send(_ticker("BTCUSDT", c="99.5"))
+        await ws.wait_closed()
+
+    live = LiveMarket()
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        stream = BinanceStream(live, url=f"ws://127.0.0.1:{port}")
+        await stream.set_symbols(["BTC"], ["1h"])
+        stream.start()
+        for _ in range(200):
+            if live.prices(["BTC"]):
+                break
+            await asyncio.sleep(0.01)
+
+        assert live.prices(["BTC"]) == {"BTC": 99.5}
+        assert stream.connects == 1 and stream.messages == 4
+        await stream.stop()
+
+
+async def test_stream_reconnects_after_unexpected_error(fast_reconnect, monkeypatch):
+    async def handler(ws):
+        await ws.recv()
+        await ws.send(_ticker("BTCUSDT", c="1"))
+        await ws.wait_closed()
+
+    live = LiveMarket()
+    async with serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        stream = BinanceStream(live, url=f"ws://127.0.0.1:{port}")
+        handle = stream._handle
+        failures = iter([RuntimeError("bug")])
+
+        def flaky(raw):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            handle(raw)
+
+        monkeypatch.setattr(stream, "_handle", flaky)
+        await stream.set_symbols(["BTC"], [])
+        stream.start()
+        for _ in range(200):
+            if live.prices(["BTC"]):
+                break
+            await asyncio.sleep(0.01)
+
+        assert stream.connects == 2
+        assert live.prices(["BTC"]) == {"BTC": 1.0}
+        await stream.stop()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+import app.data.providers.binance_pair_resolver as resolver_module
+from app.data.http import HttpClients
+from app.data.providers.binance_pair_resolver import FuturesPairIndex
+from app.data.symbol_index import SymbolIndex, split_multiplier
+
+
+def _contract(symbol: str, base: str, quote: str = "USDT", kind: str = "PERPETUAL") -> dict:
+    return {"symbol": symbol, "baseAsset": base, "quoteAsset": quote, "contractType": kind}
+
+
+EXCHANGE_INFO = {
+    "symbols": [
+        _contract("BTCUSDT", "BTC"),
+        _contract("1000SHIBUSDT", "1000SHIB"),
+        _contract("1MBABYDOGEUSDT", "1MBABYDOGE"),
+        _contract("1INCHUSDT", "1INCH"),
+        _contract("BTCUSDT_260327", "BTC", kind="CURRENT_QUARTER"),
+        _contract("ETHBTC", "ETH", quote="BTC"),
+    ]
+}
+
+
+def test_split_multiplier():
+    assert split_multiplier("1000SHIB") == ("SHIB", 1000)
+    assert split_multiplier("1MBABYDOGE") == ("BABYDOGE", 1_000_000)
+    assert split_multiplier("1000000MOG") == ("MOG", 1_000_000)
+    assert split_multiplier("1INCH") == ("1INCH", 1)
+    assert split_multiplier("BTC") == ("BTC", 1)
+
+
+def test_index_prefers_exact_base_then_smallest_multiplier():
+    index = SymbolIndex([
+        ("10000SATSUSDT", "10000SATS"), ("1000SATSUSDT", "1000SATS"),
+        ("1000PEPEUSDT", "1000PEPE"), ("PEPEUSDT", "PEPE"), ("1INCHUSDT", "1INCH"),
+    ])
+    assert index.resolve("sats") == "1000SATSUSDT"
+    assert index.resolve("10000SATS") == "10000SATSUSDT"
+    assert index.resolve("PEPE") == "PEPEUSDT"
+    assert index.resolve("1inch") == "1INCHUSDT"
+    assert index.resolve("INCH") is None
+    assert len(index) == 5
+
+
+@pytest.fixture
+def exchange_info(monkeypatch):
+    state = {"calls": 0, "fail": False}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        state["calls"] += 1
+        if state["fail"]:
+            return httpx.Response(503)
+        return httpx.Response(200, json=EXCHANGE_INFO)
+
+    clients = HttpClients(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(resolver_module, "http_clients", clients)
+    return state
+
+
+async def test_futures_index_persists_snapshot(tmp_path, exchange_info):
+    path = tmp_path / "futures.json"
+    index = FuturesPairIndex(path=str(path), refresh_seconds=3600)
+    assert await index.resolve("shib") == "1000SHIBUSDT"
+    assert await index.resolve("BABYDOGE") == "1MBABYDOGEUSDT"
+    assert await index.resolve("unknown") == "UNKNOWNUSDT"
+    assert exchange_info["calls"] == 1 and len(index) == 4  # 只收 USDT 永續
+
+    snapshot = json.loads(path.read_text())
+    assert ["1000SHIBUSDT", "1000SHIB"] in snapshot["data"]
+
+    # 重啟：從快照載入，不重新下載
+    restarted = FuturesPairIndex(path=str(path), refresh_seconds=3600)
+    assert await restarted.resolve("SHIB") == "1000SHIBUSDT"
+    assert exchange_info["calls"] == 1
+
+
+async def test_failed_refresh_keeps_previous_index(tmp_path, exchange_info):
+    index = FuturesPairIndex(path=str(tmp_path / "futures.json"), refresh_seconds=3600)
+    assert await index.refresh()
+    exchange_info["fail"] = True
+    assert not await index.refresh()
+    assert await index.resolve("SHIB") == "1000SHIBUSDT"
+
+
+async def test_stale_index_refreshes_in_background(tmp_path, exchange_info):
+    index = FuturesPairIndex(path=str(tmp_path / "futures.json"), refresh_seconds=3600)
+    assert await index.resolve("BTC") == "BTCUSDT"
+    index._updated_at -= 7200
+    assert await index.resolve("BTC") == "BTCUSDT"  # 不等待刷新
+    await index._refresh
+    assert exchange_info["calls"] == 2 and not index.stale()
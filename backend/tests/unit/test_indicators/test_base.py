@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+from app.core.indicators.base import LATEST_KEEP, IndicatorLines, ema_warmup
+from app.core.indicators.oscillator import KDIndicator, RSIIndicator
+from app.core.indicators.trend import EMAIndicator, MACDIndicator
+from app.core.indicators.volatility import BollingerBandsIndicator
+from app.core.indicators.volume import VolumeAnalysis
+
+
+class TestEmaWarmup:
+    def test_residual_weight_below_tolerance(self):
+        alpha = 2 / 27
+        k = ema_warmup(alpha, 1e-4)
+        assert (1 - alpha) ** k <= 1e-4
+        assert (1 - alpha) ** (k - 1) > 1e-4
+
+    def test_looser_tolerance_needs_fewer_bars(self):
+        assert ema_warmup(0.1, 1e-2) < ema_warmup(0.1, 1e-6)
+
+
+class TestCalculateLatest:
+    @pytest.mark.parametrize("indicator", [
+        RSIIndicator(),
+        KDIndicator(),
+        MACDIndicator(),
+        EMAIndicator(),
+        BollingerBandsIndicator(),
+        VolumeAnalysis(),
+    ])
+    def test_matches_full_calculation(self, long_ohlcv, indicator):
+        full = indicator.calculate(long_ohlcv)
+        latest = indicator.calculate_latest(long_ohlcv)
+
+        assert latest.signal == full.signal
+        assert latest.continuous_score == pytest.approx(full.continuous_score, abs=1e-3)
+        for name, series in full.values.items():
+            assert latest.values[name].iloc[-1] == pytest.approx(
+                series.iloc[-1], rel=1e-3
+            )
+
+    def test_keeps_only_tail(self, long_ohlcv):
+        result = RSIIndicator().calculate_latest(long_ohlcv)
+        assert len(result.values["rsi"]) == LATEST_KEEP
+
+    def test_warmup_shorter_than_history(self, long_ohlcv):
+        for indicator in (RSIIndicator(), MACDIndicator(), EMAIndicator()):
+            assert indicator.warmup_period() < len(long_ohlcv)
+
+    def test_short_history_uses_everything(self, sample_ohlcv):
+        full = MACDIndicator().calculate(sample_ohlcv)
+        latest = MACDIndicator().calculate_latest(sample_ohlcv)
+        assert math.isclose(
+            latest.values["macd"].iloc[-1], full.values["macd"].iloc[-1]
+        )
+
+    def test_volume_needs_full_history(self):
+        assert VolumeAnalysis().warmup_period() is None
+
+
+class TestIndicatorLines:
+    def test_lines_share_index_and_materialize_on_access(self, sample_ohlcv):
+        result = MACDIndicator().calculate(sample_ohlcv)
+        lines = result.values
+
+        assert isinstance(lines, IndicatorLines)
+        assert set(lines) == {"macd", "signal", "histogram"}
+        series = lines["macd"]
+        assert series.index is lines.index
+        assert series.iloc[-1] == lines.latest("macd")
+
+    def test_to_dict_reads_latest_from_buffer(self, sample_ohlcv):
+        result = EMAIndicator().calculate(sample_ohlcv)
+        d = result.to_dict()
+        assert d["latest_values"]["ema_fast"] == round(
+            float(result.values.buffer("ema_fast")[-1]), 4
+        )
+
+    def test_tail_is_view(self, sample_ohlcv):
+        lines = RSIIndicator().calculate(sample_ohlcv).values
+        tail = lines.tail(3)
+        assert len(tail.index) == 3
+        assert np.shares_memory(tail.buffer("rsi"), lines.buffer("rsi"))
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.indicators.extrema import RollingExtrema, rolling_max, rolling_min
+from app.core.indicators.pivot import StreamingPivot, pivot_levels, pivot_series
+
+
+@pytest.fixture
+def noisy() -> np.ndarray:
+    np.random.seed(11)
+    x = np.random.normal(0, 1, 1003)
+    x[500] = np.nan
+    return x
+
+
+class TestRollingExtrema:
+    @pytest.mark.parametrize("window", [1, 3, 14, 100])
+    def test_array_matches_pandas(self, noisy, window):
+        s = pd.Series(noisy)
+        np.testing.assert_allclose(
+            rolling_max(noisy, window), s.rolling(window).max().to_numpy(), equal_nan=True
+        )
+        np.testing.assert_allclose(
+            rolling_min(noisy, window), s.rolling(window).min().to_numpy(), equal_nan=True
+        )
+
+    @pytest.mark.parametrize("window", [1, 5, 20])
+    def test_streaming_matches_array(self, noisy, window):
+        rx = RollingExtrema(window, mode="max")
+        streamed = np.array([rx.update(v) for v in noisy])
+        np.testing.assert_allclose(streamed, rolling_max(noisy, window), equal_nan=True)
+
+    def test_from_array_continues_stream(self, noisy):
+        rx = RollingExtrema.from_array(noisy[:800], 14, mode="min")
+        streamed = np.array([rx.update(v) for v in noisy[800:]])
+        np.testing.assert_allclose(streamed, rolling_min(noisy, 14)[800:], equal_nan=True)
+
+    def test_window_longer_than_data(self):
+        assert np.isnan(rolling_max(np.arange(3.0), 5)).all()
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            RollingExtrema(0)
+
+
+class TestPivot:
+    def test_levels_match_tail_extrema(self, sample_ohlcv):
+        recent = sample_ohlcv.tail(20)
+        levels = pivot_levels(
+            sample_ohlcv["high"].to_numpy(),
+            sample_ohlcv["low"].to_numpy(),
+            sample_ohlcv["close"].to_numpy(),
+        )
+        pp = (recent["high"].max() + recent["low"].min() + sample_ohlcv["close"].iloc[-1]) / 3
+        assert levels["PP"] == pytest.approx(pp)
+        assert levels["S2"] < levels["S1"] < levels["PP"] < levels["R1"] < levels["R2"]
+
+    def test_streaming_matches_series(self, sample_ohlcv):
+        high = sample_ohlcv["high"].to_numpy()
+        low = sample_ohlcv["low"].to_numpy()
+        close = sample_ohlcv["close"].to_numpy()
+        series = pivot_series(high, low, close)
+
+        sp = StreamingPivot()
+        for i, (h, lo, c) in enumerate(zip(high, low, close)):
+            levels = sp.update(h, lo, c)
+            if levels is None:
+                assert math.isnan(series["PP"][i])
+            else:
+                assert levels["PP"] == pytest.approx(series["PP"][i])
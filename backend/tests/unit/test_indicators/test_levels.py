@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.core.indicators.levels import LevelIndex, fractal_swings
+
+
+def _brute_swings(high, low, width):
+    highs, lows = [], []
+    for i in range(width, len(high) - width):
+        left_h, right_h = high[i - width:i], high[i + 1:i + width + 1]
+        left_l, right_l = low[i - width:i], low[i + 1:i + width + 1]
+        if high[i] > left_h.max() and high[i] >= right_h.max():
+            highs.append(i)
+        if low[i] < left_l.min() and low[i] <= right_l.min():
+            lows.append(i)
+    return highs, lows
+
+
+@pytest.mark.parametrize("width", [1, 2, 3])
+def test_fractal_swings_match_brute_force(long_ohlcv, width):
+    high = long_ohlcv["high"].to_numpy()[:500]
+    low = long_ohlcv["low"].to_numpy()[:500]
+    highs, lows = fractal_swings(high, low, width)
+    exp_highs, exp_lows = _brute_swings(high, low, width)
+    assert highs.tolist() == exp_highs
+    assert lows.tolist() == exp_lows
+
+
+def test_plateau_counted_once():
+    high = np.array([1, 2, 5, 5, 2, 1, 1], dtype=float)
+    low = high - 0.5
+    highs, _ = fractal_swings(high, low, 2)
+    assert highs.tolist() == [2]
+
+
+def test_zones_cluster_nearby_swings():
+    index = LevelIndex(tolerance=0.01)
+    for bar, price in enumerate([100.0, 100.5, 120.0, 99.8, 80.0]):
+        index.add_touch(price, bar, bar * 1000)
+
+    prices = [round(z.price, 2) for z in index.zones]
+    assert prices == [80.0, 100.1, 120.0]
+    zone = index.zones[1]
+    assert zone.touches == 3 and zone.low == 99.8 and zone.high == 100.5
+    assert zone.last_bar == 3
+
+
+def test_nearest_above_below():
+    index = LevelIndex()
+    for bar, price in enumerate([10.0, 20.0, 30.0, 40.0, 50.0]):
+        index.add_touch(price, bar, bar)
+
+    assert [z.price for z in index.above(25.0, 2)] == [30.0, 40.0]
+    assert [z.price for z in index.below(25.0, 5)] == [20.0, 10.0]
+    assert index.above(60.0, 3) == []
+
+
+def test_recency_decays_strength():
+    index = LevelIndex(half_life=10)
+    index.add_touch(100.0, 0, 0)
+    index.add_touch(200.0, 10, 10)
+    old, recent = index.zones
+    assert old.strength(10, 10) == pytest.approx(0.5)
+    assert recent.strength(10, 10) == pytest.approx(1.0)
+
+
+def test_incremental_update_matches_full_build(long_ohlcv):
+    high = long_ohlcv["high"].to_numpy()
+    low = long_ohlcv["low"].to_numpy()
+    times = long_ohlcv.index.as_unit("ms").asi8
+
+    full = LevelIndex.from_ohlcv(high, low, times)
+    streamed = LevelIndex.from_ohlcv(high[:300], low[:300], times[:300])
+    for h, lo, t in zip(high[300:], low[300:], times[300:]):
+        streamed.update(float(h), float(lo), int(t))
+
+    assert streamed.bars == full.bars and streamed.last_time == full.last_time
+    assert len(streamed) == len(full)
+    for a, b in zip(streamed.zones, full.zones):
+        assert a.price == pytest.approx(b.price)
+        assert a.touches == b.touches
+        assert a.strength(full.bars) == pytest.approx(b.strength(full.bars))
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from app.core.indicators.pattern import (
+    PATTERN_DECAY_BARS,
+    CandlestickPatternIndicator,
+    DivergenceIndicator,
+    candlestick_masks,
+    divergence_masks,
+    pattern_score,
+)
+
+
+def _bars(rows: list[tuple[float, float, float, float]]) -> tuple[np.ndarray, ...]:
+    o, h, lo, c = (np.array(col, dtype=np.float64) for col in zip(*rows))
+    return o, h, lo, c
+
+
+# 6 根下跌作為前段趨勢
+DOWNTREND = [(110 - 2 * i, 111 - 2 * i, 107 - 2 * i, 108 - 2 * i) for i in range(6)]
+UPTREND = [(90 + 2 * i, 93 + 2 * i, 89 + 2 * i, 92 + 2 * i) for i in range(6)]
+
+
+class TestCandlestick:
+    def test_bullish_engulfing(self):
+        masks = candlestick_masks(*_bars(DOWNTREND + [(98, 98.5, 95, 96), (95.5, 99.5, 95, 99)]))
+        assert masks["bullish_engulfing"][-1]
+        assert not masks["bearish_engulfing"].any()
+
+    def test_hammer_needs_downtrend(self):
+        hammer = (96.5, 97.6, 92, 97.5)
+        assert candlestick_masks(*_bars(DOWNTREND + [hammer]))["hammer"][-1]
+        assert not candlestick_masks(*_bars(UPTREND + [hammer]))["hammer"][-1]
+
+    def test_evening_star(self):
+        rows = UPTREND + [
+            (102, 107, 101.5, 106.5), (107, 108, 106.5, 107.2), (106.8, 107, 102, 102.5),
+        ]
+        assert candlestick_masks(*_bars(rows))["evening_star"][-1]
+
+    def test_score_decays(self):
+        rows = DOWNTREND + [(98, 98.5, 95, 96), (95.5, 99.5, 95, 99)]
+        rows += [(99, 99.5, 98.5, 99.2)] * (PATTERN_DECAY_BARS + 1)
+        score = pattern_score(*_bars(rows))
+        engulf = len(DOWNTREND) + 1
+        assert score[engulf] == pytest.approx(0.6)
+        assert score[engulf + 1] == pytest.approx(0.3)
+        assert score[engulf + PATTERN_DECAY_BARS] == 0.0
+
+    def test_matrix_matches_columns(self, long_ohlcv):
+        cols = [long_ohlcv[c].to_numpy() for c in ("open", "high", "low", "close")]
+        stacked = [np.column_stack([c, c[::-1]]) for c in cols]
+        batch = pattern_score(*stacked)
+        assert np.allclose(batch[:, 0], pattern_score(*cols))
+        assert np.allclose(batch[:, 1], pattern_score(*(c[::-1] for c in cols)))
+
+
+class TestDivergence:
+    def test_bullish_divergence_confirmed_after_width(self):
+        # 價格第二個低點更低，震盪指標第二個低點較高
+        low = np.array([10, 9, 8, 9, 10, 11, 10, 9, 7, 9, 10, 11], dtype=np.float64)
+        high = low + 1
+        osc = np.array([50, 40, 30, 40, 50, 60, 50, 40, 35, 45, 50, 55], dtype=np.float64)
+        bullish, bearish = divergence_masks(high, low, osc, width=2)
+        assert np.flatnonzero(bullish).tolist() == [10]
+        assert not bearish.any()
+
+    def test_no_divergence_when_oscillator_confirms(self):
+        low = np.array([10, 9, 8, 9, 10, 11, 10, 9, 7, 9, 10, 11], dtype=np.float64)
+        osc = np.array([50, 40, 30, 40, 50, 60, 50, 40, 25, 45, 50, 55], dtype=np.float64)
+        bullish, _ = divergence_masks(low + 1, low, osc, width=2)
+        assert not bullish.any()
+
+
+@pytest.mark.parametrize("indicator", [CandlestickPatternIndicator(), DivergenceIndicator()])
+def test_series_matches_calculate(indicator, long_ohlcv):
+    series = indicator.continuous_series(long_ohlcv)
+    for end in (150, 333, len(long_ohlcv)):
+        df = long_ohlcv.iloc[:end]
+        assert indicator.calculate(df).continuous_score == pytest.approx(series[end - 1], abs=1e-4)
+        assert indicator.calculate_latest(df).continuous_score == pytest.approx(
+            series[end - 1], abs=1e-3
+        )
+
+
+def test_result_is_serializable(long_ohlcv):
+    result = DivergenceIndicator().calculate(long_ohlcv).to_dict()
+    assert set(result["latest_values"]) == {"divergence_score"}
+    assert result["signal"] in ("bullish", "bearish", "neutral")
+    json.dumps(result)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.indicators.oscillator import KDIndicator, RSIIndicator
+from app.core.indicators.scoring import (
+    GROUP_WEIGHTS,
+    INDICATOR_GROUP,
+    composite_score,
+    composite_series,
+    confluence_score,
+    overall_signal,
+    score_timeline,
+)
+from app.core.indicators.trend import EMAIndicator, MACDIndicator
+from app.core.indicators.volatility import BollingerBandsIndicator
+from app.core.indicators.volume import VolumeAnalysis
+
+INDICATORS = [
+    RSIIndicator(),
+    KDIndicator(),
+    MACDIndicator(),
+    EMAIndicator(),
+    BollingerBandsIndicator(),
+    VolumeAnalysis(),
+]
+
+
+class TestContinuousSeries:
+    @pytest.mark.parametrize("indicator", INDICATORS, ids=lambda i: i.name)
+    def test_matches_per_bar_calculation(self, sample_ohlcv, indicator):
+        series = indicator.continuous_series(sample_ohlcv)
+        assert len(series) == len(sample_ohlcv)
+
+        for i in (40, 60, 99):
+            expected = indicator.calculate(sample_ohlcv.iloc[: i + 1]).continuous_score
+            assert series[i] == pytest.approx(expected, abs=1e-4)
+
+    def test_volume_all_zero_is_neutral(self, sample_ohlcv):
+        df = sample_ohlcv.assign(volume=0.0)
+        assert (VolumeAnalysis().continuous_series(df) == 0.0).all()
+
+
+class TestComposite:
+    def test_composite_score_weights(self):
+        overall, consensus = composite_score([("RSI", 0.5), ("KD", 0.1), ("EMA", -0.2)])
+        assert overall == pytest.approx(0.3 * 0.25 - 0.2 * 0.20)
+        assert 0.0 <= consensus <= 1.0
+
+    def test_missing_group_weights_renormalized(self):
+        overall, _ = composite_score([("RSI", 0.5), ("EMA", -0.2)], missing_groups={"derivatives"})
+        present = 1.0 - GROUP_WEIGHTS["derivatives"]
+        assert overall == pytest.approx((0.5 * 0.25 - 0.2 * 0.20) / present)
+
+    def test_single_score_full_consensus(self):
+        _, consensus = composite_score([("RSI", 0.5)])
+        assert consensus == 1.0
+
+    def test_unknown_indicator_ignored(self):
+        assert composite_score([("FOO", 1.0)]) == (0.0, 1.0)
+
+    def test_series_matches_scalar(self):
+        frame = pd.DataFrame({
+            "RSI": [0.5, np.nan, -0.3],
+            "KD": [0.1, 0.2, np.nan],
+            "EMA": [-0.2, 0.4, 0.6],
+        })
+        overall, consensus = composite_series(frame)
+        for i, row in frame.iterrows():
+            pairs = [(k, v) for k, v in row.items() if not math.isnan(v)]
+            absent = set(GROUP_WEIGHTS) - {INDICATOR_GROUP[k] for k, _ in pairs}
+            exp_overall, exp_consensus = composite_score(pairs, absent)
+            assert overall[i] == pytest.approx(exp_overall)
+            assert consensus[i] == pytest.approx(exp_consensus)
+
+    def test_series_renormalizes_by_present_groups(self):
+        frame = pd.DataFrame({"RSI": [0.4, np.nan], "EMA": [np.nan, -0.6]})
+        overall, _ = composite_series(frame)
+        # 每根只有單一群組有值 → 綜合分數即該群組分數（不被缺席群組稀釋）
+        np.testing.assert_allclose(overall, [0.4, -0.6])
+        assert composite_series(pd.DataFrame({"RSI": [np.nan]}))[0][0] == 0.0
+
+    def test_overall_signal_thresholds(self):
+        assert overall_signal(0.25) == "bullish"
+        assert overall_signal(-0.25) == "bearish"
+        assert overall_signal(0.1) == "neutral"
+
+
+class TestScoreTimeline:
+    def test_columns_and_length(self, sample_ohlcv):
+        frame = score_timeline(sample_ohlcv, INDICATORS)
+        assert len(frame) == len(sample_ohlcv)
+        assert {"RSI", "KD", "MACD", "EMA", "BBANDS", "Volume"} <= set(frame.columns)
+        assert frame["overall_score"].between(-1, 1).all()
+
+
+class TestConfluenceScore:
+    def test_higher_timeframes_weigh_more(self):
+        score, alignment = confluence_score({"1h": -0.5, "4h": 0.5, "1d": 0.5}, "1h")
+        # 權重 1 : 3 : 5.585
+        expected = (-0.5 * 1 + 0.5 * 3 + 0.5 * (1 + np.log2(24))) / (4 + 1 + np.log2(24))
+        assert score == pytest.approx(expected)
+        assert alignment == pytest.approx(2 / 3)
+
+    def test_empty(self):
+        assert confluence_score({}, "1h") == (0.0, 0.0)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core.indicators.oscillator import RSIIndicator
+from app.core.indicators.pattern import CandlestickPatternIndicator, DivergenceIndicator
+from app.core.indicators.screen import parse_condition, parse_conditions, rank, screen
+from app.core.indicators.trend import EMAIndicator, MACDIndicator
+from app.core.indicators.volatility import BollingerBandsIndicator
+
+
+@pytest.fixture
+def frames() -> dict[str, pd.DataFrame]:
+    rng = np.random.default_rng(3)
+    out = {}
+    for i, n in enumerate([200, 200, 120, 60]):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+        idx = pd.date_range("2024-01-01", periods=n, freq="4h", tz="UTC")
+        open_ = close * (1 + rng.normal(0, 0.005, n))
+        out[f"C{i}"] = pd.DataFrame(
+            {"open": open_, "high": np.maximum(open_, close) * 1.01,
+             "low": np.minimum(open_, close) * 0.99,
+             "close": close, "volume": rng.uniform(1, 10, n)},
+            index=idx,
+        )
+    return out
+
+
+class TestParseCondition:
+    def test_numeric_and_category(self):
+        assert parse_condition("RSI < 30").value == 30
+        cond = parse_condition("ema_cross=bullish")
+        assert (cond.field, cond.op, cond.value) == ("ema_cross", "=", 1.0)
+
+    def test_comma_joined(self):
+        assert len(parse_conditions(["rsi<30,score>=0.2", "macd_cross=bearish"])) == 3
+
+    @pytest.mark.parametrize("spec", ["rsi", "foo<1", "rsi<abc", "rsi~30"])
+    def test_invalid(self, spec):
+        with pytest.raises(ValueError):
+            parse_condition(spec)
+
+
+class TestScreen:
+    def test_batched_fields_match_single_indicators(self, frames):
+        table = screen(frames, [])
+        for symbol, df in frames.items():
+            row = table.loc[symbol]
+            rsi = RSIIndicator().calculate(df)
+            macd = MACDIndicator().calculate(df)
+            ema = EMAIndicator().calculate(df)
+            bb = BollingerBandsIndicator().calculate(df)
+            assert row["rsi"] == pytest.approx(rsi.values.latest("rsi"))
+            assert row["macd_hist"] == pytest.approx(macd.values.latest("histogram"))
+            assert row["ema_fast"] == pytest.approx(ema.values.latest("ema_fast"))
+            assert row["ema_slow"] == pytest.approx(ema.values.latest("ema_slow"))
+            assert row["bb_pct_b"] == pytest.approx(bb.metadata["percent_b"], abs=1e-3)
+            pattern = CandlestickPatternIndicator().continuous_series(df)[-1]
+            divergence = DivergenceIndicator().continuous_series(df)[-1]
+            assert row["pattern"] == pytest.approx(pattern)
+            assert row["divergence"] == pytest.approx(divergence)
+
+    def test_conditions_are_anded(self, frames):
+        conditions = parse_conditions(["rsi>0", "ema_trend=bullish"])
+        table = screen(frames, conditions)
+        expected = table["ema_trend"] == 1.0
+        assert table["matched"].tolist() == expected.tolist()
+
+    def test_rank(self, frames):
+        ranked = rank(screen(frames, []), "rsi", descending=False)
+        assert ranked["rsi"].is_monotonic_increasing
+        assert ranked["rank"].tolist() == [1, 2, 3, 4]
+        with pytest.raises(ValueError):
+            rank(ranked, "nope")
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.indicators.oscillator import RSIIndicator
+from app.core.indicators.sweep import MAX_SWEEP_COMBINATIONS, parse_grid_values, sweep_indicator
+from app.core.indicators.trend import EMAIndicator, MACDIndicator
+from app.core.indicators.volatility import BollingerBandsIndicator
+
+
+class TestSweep:
+    def test_rsi_matches_single_calculation(self, sample_ohlcv):
+        table = sweep_indicator("rsi", sample_ohlcv, {"period": range(5, 51)})
+
+        assert len(table) == 46
+        for period in (5, 14, 50):
+            row = table[table["period"] == period].iloc[0]
+            single = RSIIndicator(period=period).calculate(sample_ohlcv)
+            assert row["rsi"] == pytest.approx(single.values.latest("rsi"), rel=1e-9)
+            assert row["continuous_score"] == pytest.approx(single.continuous_score, abs=1e-4)
+
+    def test_ema_pairs_only_fast_below_slow(self, sample_ohlcv):
+        table = sweep_indicator(
+            "ema", sample_ohlcv, {"fast_period": [5, 9, 30], "slow_period": [21, 30]}
+        )
+        assert (table["fast_period"] < table["slow_period"]).all()
+        assert len(table) == 4
+
+        row = table[(table["fast_period"] == 9) & (table["slow_period"] == 21)].iloc[0]
+        single = EMAIndicator(9, 21).calculate(sample_ohlcv)
+        assert row["ema_fast"] == pytest.approx(single.values.latest("ema_fast"))
+        assert row["ema_slow"] == pytest.approx(single.values.latest("ema_slow"))
+        assert row["continuous_score"] == pytest.approx(single.continuous_score, abs=1e-4)
+
+    def test_macd_matches_single_calculation(self, sample_ohlcv):
+        table = sweep_indicator(
+            "macd", sample_ohlcv, {"fast": [8, 12], "slow": [21, 26], "signal_period": [5, 9]}
+        )
+        assert len(table) == 8
+
+        row = table[
+            (table["fast"] == 8) & (table["slow"] == 21) & (table["signal_period"] == 5)
+        ].iloc[0]
+        single = MACDIndicator(8, 21, 5).calculate(sample_ohlcv)
+        assert row["macd"] == pytest.approx(single.values.latest("macd"))
+        assert row["histogram"] == pytest.approx(single.values.latest("histogram"))
+        assert row["continuous_score"] == pytest.approx(single.continuous_score, abs=1e-4)
+
+    def test_bbands_matches_single_calculation(self, sample_ohlcv):
+        table = sweep_indicator("bbands", sample_ohlcv, {"period": [10, 20], "std_dev": [1.5, 2.0]})
+        row = table[(table["period"] == 20) & (table["std_dev"] == 2.0)].iloc[0]
+        single = BollingerBandsIndicator().calculate(sample_ohlcv)
+        assert row["upper"] == pytest.approx(single.values.latest("upper"))
+        assert row["percent_b"] == pytest.approx(single.metadata["percent_b"], abs=1e-4)
+
+    def test_unknown_parameter_rejected(self, sample_ohlcv):
+        with pytest.raises(ValueError):
+            sweep_indicator("rsi", sample_ohlcv, {"window": [14]})
+
+    def test_unsupported_indicator_rejected(self, sample_ohlcv):
+        with pytest.raises(ValueError):
+            sweep_indicator("volume", sample_ohlcv, {})
+
+    def test_grid_size_capped(self, sample_ohlcv):
+        with pytest.raises(ValueError):
+            sweep_indicator("rsi", sample_ohlcv, {"period": range(1, MAX_SWEEP_COMBINATIONS + 2)})
+
+    @pytest.mark.parametrize(
+        "name, grid",
+        [
+            ("ema", {"fast_period": [0, 5], "slow_period": [20]}),
+            ("macd", {"signal_period": [0]}),
+            ("bbands", {"period": [-1, 20]}),
+        ],
+    )
+    def test_periods_must_be_positive(self, sample_ohlcv, name, grid):
+        with pytest.raises(ValueError, match=">= 1"):
+            sweep_indicator(name, sample_ohlcv, grid)
+
+
+class TestParseGridValues:
+    def test_range(self):
+        assert parse_grid_values("5-8") == [5, 6, 7, 8]
+
+    def test_range_with_step(self):
+        assert parse_grid_values("10-30:10") == [10, 20, 30]
+
+    def test_list_of_floats(self):
+        assert parse_grid_values("1.5,2,2.5") == [1.5, 2.0, 2.5]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_grid_values("a-b")
+
+    @pytest.mark.parametrize("spec", ["0-inf", "nan-5", "1-5:0", "inf,2"])
+    def test_non_finite_rejected(self, spec):
+        with pytest.raises(ValueError, match="Invalid grid spec"):
+            parse_grid_values(spec)
+
+    def test_huge_range_rejected_before_expansion(self):
+        with pytest.raises(ValueError, match="max"):
+            parse_grid_values("1-20000000000")
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.services.alert_service as alert_module
+from app.data.cache import _deserialize, _serialize
+from app.data.http import HttpClients
+from app.db.base import Base
+from app.services.alert_service import AlertService
+
+
+class Funding:
+    def __init__(self, avg_rate):
+        self.avg_rate = avg_rate
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'alerts.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def webhook(monkeypatch):
+    """攔截 webhook POST：記錄 (url, payload)"""
+    received: list[tuple[str, dict]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append((str(request.url), json.loads(request.content)))
+        return httpx.Response(200)
+
+    monkeypatch.setattr(
+        alert_module, "http_clients", HttpClients(transport=httpx.MockTransport(handler))
+    )
+    return received
+
+
+def _hourly(close: np.ndarray) -> pd.DataFrame:
+    # 最後一根為尚未收盤的 K 棒
+    end = pd.Timestamp.now(tz="UTC").floor("h")
+    idx = pd.date_range(end=end, periods=len(close), freq="h", name="timestamp")
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+        index=idx,
+    )
+
+
+async def test_rules_validated_persisted_and_reloaded(session_factory):
+    service = AlertService(session_factory)
+    with pytest.raises(ValueError):
+        await service.create_rule("ETH", "rsi", "<", 30)  # K 線指標缺 timeframe
+    with pytest.raises(ValueError):
+        await service.create_rule("ETH", "unknown", "<", 30, timeframe="1h")
+
+    rsi = await service.create_rule("eth", "rsi", "crosses_below", 30, timeframe="1h")
+    funding = await service.create_rule("BTC", "funding_avg", ">", 0.05, timeframe="4h")
+    assert rsi["symbol"] == "ETH" and funding["timeframe"] is None
+    assert service.candle_keys() == {("ETH", "1h")}
+    assert service.derivative_symbols() == {"BTC"}
+
+    reloaded = AlertService(session_factory)
+    assert await reloaded.load() == 2
+    assert await reloaded.delete_rule(rsi["id"]) is True
+    assert await reloaded.delete_rule(rsi["id"]) is False
+    assert reloaded.candle_keys() == set()
+
+
+async def test_candle_close_delivers_to_stream_and_webhook(session_factory, webhook):
+    service = AlertService(session_factory, webhook_url="http://hooks.test/default")
+    rule = await service.create_rule("ETH", "price", "crosses_below", 100, timeframe="1h")
+    await service.create_rule(
+        "ETH", "price", "<", 100, timeframe="1h", webhook_url="http://hooks.test/own"
+    )
+    await service.create_rule("ETH", "rsi", ">", 99, timeframe="4h")  # 其他週期不受影響
+    queue = service.subscribe()
+
+    # 已收盤的最後兩根：101 → 99；未收盤那根 50 不列入
+    df = _hourly(np.array([105.0, 103.0, 101.0, 99.0, 50.0]))
+    events = await service.on_candles("eth", "1h", df)
+    assert sorted(e["rule_id"] for e in events) == [rule["id"], rule["id"] + 1]
+    assert {e["value"] for e in events} == {99.0}
+    assert queue.qsize() == 2
+
+    # 同一根 K 棒不重複評估
+    assert await service.on_candles("ETH", "1h", df) == []
+
+    await service.close()
+    assert sorted(url for url, _ in webhook) == ["http://hooks.test/default", "http://hooks.test/own"]
+    assert all(len(payload["events"]) == 1 for _, payload in webhook)
+    rows = {r["id"]: r for r in await service.list_rules()}
+    assert rows[rule["id"]]["last_triggered_at"] is not None
+
+
+async def test_derivatives_snapshot_and_slow_subscriber(session_factory, webhook):
+    service = AlertService(session_factory, queue_size=1)
+    await service.create_rule("BTC", "funding_avg", ">", 0.05)
+    await service.create_rule("BTC", "funding_avg", ">", 0.02)
+    queue = service.subscribe()
+
+    assert await service.on_derivatives("BTC", {"funding": Funding(0.0001)}) == []
+    events = await service.on_derivatives("btc", {"funding": Funding(0.0008)})
+    assert len(events) == 2
+    # 佇列滿了丟最舊的，保留最新事件
+    assert queue.qsize() == 1
+    assert queue.get_nowait() == events[-1]
+    # 快照缺少來源時略過，不觸發也不報錯
+    assert await service.on_derivatives("BTC", {}) == []
+
+    service.unsubscribe(queue)
+    await service.close()
+    assert webhook == []  # 未設定 webhook
+
+
+async def test_candle_close_accepts_l2_cached_frame(session_factory):
+    service = AlertService(session_factory)
+    rule = await service.create_rule("ETH", "price", "crosses_below", 100, timeframe="1h")
+    df = _deserialize(_serialize(_hourly(np.array([105.0, 103.0, 101.0, 99.0, 50.0]))))
+
+    events = await service.on_candles("ETH", "1h", df)
+    assert [e["rule_id"] for e in events] == [rule["id"]]
+    await service.close()
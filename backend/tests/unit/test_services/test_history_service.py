@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.db.repositories.price_history import PriceHistoryRepository
+from app.services.history_service import HistoryService
+
+HOUR_MS = 3_600_000
+
+
+class FakeAggregator:
+    """依 since 分頁回傳 1h K 線，直到現在"""
+
+    primary = "ccxt"
+
+    def __init__(self, listed_ms: int = 0, page_cap: int | None = None):
+        self.calls: list[int] = []
+        self.listed_ms = listed_ms
+        self.page_cap = page_cap
+
+    async def get_ohlcv(self, symbol, timeframe, limit, provider=None, since=None):
+        self.calls.append(since)
+        now_ms = int(time.time() * 1000)
+        since = max(since, self.listed_ms)
+        first = since - since % HOUR_MS + (HOUR_MS if since % HOUR_MS else 0)
+        stamps = np.arange(first, now_ms, HOUR_MS)[:min(limit, self.page_cap or limit)]
+        close = 100 + (stamps // HOUR_MS % 50).astype(float)
+        idx = pd.to_datetime(stamps, unit="ms", utc=True)
+        return pd.DataFrame(
+            {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+            index=pd.Index(idx, name="timestamp"),
+        )
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'history.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def test_pages_then_serves_from_store(session_factory):
+    agg = FakeAggregator()
+    service = HistoryService(agg, session_factory)
+
+    df = await service.get_history("BTC", "1h", 2500)
+    assert len(df) >= 2499
+    assert df.index.is_monotonic_increasing
+    assert len(agg.calls) == 3  # 2500 根 → 3 頁
+
+    stored = await PriceHistoryRepository(session_factory).load("BTC", "1h")
+    assert len(stored) == len(df)
+
+    # 第二次只補最後一根之後的缺口
+    agg.calls.clear()
+    again = await service.get_history("BTC", "1h", 2500)
+    assert len(agg.calls) == 1
+    assert agg.calls[0] == int(stored.index[-1].timestamp() * 1000)
+    np.testing.assert_allclose(again["close"].to_numpy()[-100:], df["close"].to_numpy()[-100:])
+
+
+async def test_upsert_overwrites_existing_bar(session_factory):
+    repo = PriceHistoryRepository(session_factory)
+    idx = pd.date_range("2024-01-01", periods=3, freq="h", tz="UTC")
+    df = pd.DataFrame(
+        {c: [1.0, 2.0, 3.0] for c in ["open", "high", "low", "close", "volume"]}, index=idx
+    )
+    await repo.upsert("btc", "1h", df)
+    await repo.upsert("BTC", "1h", df.iloc[-1:] * 10)
+
+    loaded = await repo.load("BTC", "1h")
+    assert list(loaded["close"]) == [1.0, 2.0, 30.0]
+    assert loaded.index[0] == idx[0]
+    assert await repo.latest_timestamp("BTC", "1h") == idx[-1]
+
+
+async def test_late_listing_is_treated_as_covered(session_factory):
+    # 300 根前才上市：要求 2500 根時只能拿到 ~300 根，之後不應每次整段重抓
+    listed_ms = int(time.time() * 1000) - 300 * HOUR_MS
+    agg = FakeAggregator(listed_ms=listed_ms)
+    service = HistoryService(agg, session_factory)
+
+    df = await service.get_history("NEW", "1h", 2500)
+    assert 299 <= len(df) <= 300
+    first = await PriceHistoryRepository(session_factory).earliest_available("NEW", "1h")
+    assert first == df.index[0]
+
+    agg.calls.clear()
+    again = await service.get_history("NEW", "1h", 2500)
+    assert agg.calls == [int(df.index[-1].timestamp() * 1000)]
+    assert len(again) == len(df)
+
+
+async def test_pages_past_short_exchange_pages(session_factory):
+    # 交易所單頁上限 500 < PAGE_LIMIT：仍需繼續分頁直到現在
+    agg = FakeAggregator(page_cap=500)
+    service = HistoryService(agg, session_factory)
+
+    df = await service.get_history("BTC", "1h", 1200)
+    assert len(df) >= 1199
+    assert len(agg.calls) == 3
+    assert df.index[-1] > pd.Timestamp.now(tz="UTC") - pd.Timedelta(hours=2)
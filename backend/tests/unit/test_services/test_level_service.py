@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.indicators.levels import LevelIndex
+from app.services import level_service
+from app.services.history_service import PAGE_LIMIT
+from app.services.level_service import LevelService
+
+HOUR_MS = 3_600_000
+
+
+class FakeHistory:
+    def __init__(self, df):
+        self.df = df
+        self.calls = 0
+        self.bars: list[int] = []
+
+    async def get_history(self, symbol, timeframe, bars):
+        self.calls += 1
+        self.bars.append(bars)
+        return self.df
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = {"ms": 0}
+    monkeypatch.setattr(level_service.time, "time", lambda: now["ms"] / 1000)
+    return now
+
+
+def _open_times(df):
+    return df.index.as_unit("ms").asi8
+
+
+async def test_builds_index_from_closed_candles(long_ohlcv, clock):
+    history = FakeHistory(long_ohlcv)
+    # 最後一根尚未收盤
+    clock["ms"] = int(_open_times(long_ohlcv)[-1]) + HOUR_MS // 2
+    service = LevelService(history)
+
+    index = await service.get_index("btc", "1h")
+    expected = LevelIndex.from_ohlcv(
+        long_ohlcv["high"].to_numpy()[:-1],
+        long_ohlcv["low"].to_numpy()[:-1],
+        _open_times(long_ohlcv)[:-1],
+    )
+    assert index.bars == len(long_ohlcv) - 1
+    assert [z.price for z in index.zones] == [z.price for z in expected.zones]
+
+    # 下一根收盤前不再抓取
+    await service.get_index("BTC", "1h")
+    assert history.calls == 1
+
+
+async def test_updates_incrementally_as_bars_close(long_ohlcv, clock):
+    history = FakeHistory(long_ohlcv.iloc[:400])
+    clock["ms"] = int(_open_times(long_ohlcv)[399]) + HOUR_MS
+    service = LevelService(history)
+    index = await service.get_index("BTC", "1h")
+
+    history.df = long_ohlcv
+    clock["ms"] = int(_open_times(long_ohlcv)[-1]) + HOUR_MS
+    updated = await service.get_index("BTC", "1h")
+
+    full = LevelIndex.from_ohlcv(
+        long_ohlcv["high"].to_numpy(), long_ohlcv["low"].to_numpy(), _open_times(long_ohlcv)
+    )
+    assert updated is index
+    assert updated.bars == full.bars
+    assert [z.touches for z in updated.zones] == [z.touches for z in full.zones]
+
+
+async def test_nearest_splits_support_and_resistance(long_ohlcv, clock):
+    clock["ms"] = int(_open_times(long_ohlcv)[-1]) + HOUR_MS
+    service = LevelService(FakeHistory(long_ohlcv))
+    price = float(long_ohlcv["close"].iloc[-1])
+
+    result = await service.nearest("BTC", "1h", price, n=3)
+
+    assert 0 < len(result["resistance"]) <= 3 and 0 < len(result["support"]) <= 3
+    above = [z["price"] for z in result["resistance"]]
+    below = [z["price"] for z in result["support"]]
+    assert above == sorted(above) and all(p > price for p in above)
+    assert below == sorted(below, reverse=True) and all(p < price for p in below)
+
+
+async def test_empty_history_raises(long_ohlcv, clock):
+    clock["ms"] = int(_open_times(long_ohlcv)[0])
+    service = LevelService(FakeHistory(long_ohlcv.iloc[:1]))
+    with pytest.raises(ValueError):
+        await service.get_index("BTC", "1h")
+
+
+async def test_cold_build_fetches_at_most_one_page(long_ohlcv, clock):
+    clock["ms"] = int(_open_times(long_ohlcv)[-1]) + HOUR_MS
+    history = FakeHistory(long_ohlcv)
+    await LevelService(history).get_index("BTC", "1h")
+    assert history.bars == [PAGE_LIMIT]
+
+
+async def test_accepts_string_index(long_ohlcv, clock):
+    # L2 快取還原的 DataFrame 索引為字串
+    clock["ms"] = int(_open_times(long_ohlcv)[-1]) + HOUR_MS
+    cached = long_ohlcv.set_axis(long_ohlcv.index.astype(str))
+    index = await LevelService(FakeHistory(cached)).get_index("BTC", "1h")
+    assert index.bars == len(long_ohlcv)
+    assert index.last_time == int(_open_times(long_ohlcv)[-1])
+
+
+async def test_indexes_evicted_lru(long_ohlcv, clock, monkeypatch):
+    monkeypatch.setattr(level_service, "MAX_LEVEL_INDEXES", 2)
+    clock["ms"] = int(_open_times(long_ohlcv)[-1]) + HOUR_MS
+    history = FakeHistory(long_ohlcv)
+    service = LevelService(history)
+
+    await service.get_index("A", "1h")
+    await service.get_index("B", "1h")
+    await service.get_index("A", "1h")  # A 變成最近使用
+    await service.get_index("C", "1h")
+
+    assert list(service._indexes) == [("A", "1h"), ("C", "1h")]
+    assert ("B", "1h") not in service._locks
+    assert history.calls == 3
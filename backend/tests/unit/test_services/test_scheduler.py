@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+
+import pandas as pd
+
+from app.services.scheduler import PrecomputeScheduler
+
+HOUR_MS = 3_600_000
+
+
+def _ms(ts: str) -> int:
+    return int(pd.Timestamp(ts, tz="UTC").timestamp() * 1000)
+
+
+class FakeSettings:
+    async def get_watchlist(self):
+        return ["BTC", "eth", "SOL"]
+
+    async def get_dashboard_pins(self):
+        return ["ETH", "DOGE"]
+
+
+class FakeTechnical:
+    def __init__(self, log):
+        self.log = log
+        self.active = 0
+        self.peak = 0
+
+    async def get_full_analysis(self, symbol, timeframe, refresh=False):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.005)
+        self.active -= 1
+        if symbol == "DOGE":
+            raise RuntimeError("no market")
+        self.log.append(("analysis", symbol, timeframe, refresh))
+
+    async def get_ohlcv(self, symbol, timeframe, refresh=False):
+        self.log.append(("ohlcv", symbol, timeframe, refresh))
+        return f"df:{symbol}:{timeframe}"
+
+
+class FakeSentiment:
+    def __init__(self, log):
+        self.log = log
+
+    async def get_funding_rates(self, symbol, refresh=False):
+        self.log.append(("funding", symbol, refresh))
+
+    async def get_open_interest(self, symbol, refresh=False):
+        self.log.append(("oi", symbol, refresh))
+
+    async def get_long_short_ratio(self, symbol, refresh=False):
+        raise RuntimeError("offline")
+
+    async def get_taker_volume(self, symbol, refresh=False):
+        self.log.append(("taker", symbol, refresh))
+
+
+def _scheduler(log, **kwargs):
+    technical = FakeTechnical(log)
+    scheduler = PrecomputeScheduler(
+        technical, FakeSentiment(log), FakeSettings(),
+        timeframes=["1h", "4h"], interval_minutes=5, concurrency=2,
+        jitter_seconds=0, close_delay_seconds=5, **kwargs,
+    )
+    return scheduler, technical
+
+
+async def test_symbols_union_pins_first():
+    scheduler, _ = _scheduler([])
+    assert await scheduler.symbols() == ["ETH", "DOGE", "BTC", "SOL"]
+
+
+def test_due_tracks_candle_closes_and_interval():
+    scheduler, _ = _scheduler([])
+    t0 = _ms("2024-01-01 03:58")
+    assert scheduler.due(t0) == (["1h", "4h"], True)
+    assert scheduler.due(t0 + 1000) == ([], False)
+
+    # 下一次醒來：04:00 收盤 + 5 秒 delay（早於 04:03 的週期刷新）
+    four = _ms("2024-01-01 04:00")
+    assert scheduler.next_wakeup(t0 + 1000) == four + 5000
+    assert scheduler.due(four + 2000) == ([], False)  # 還在 delay 內
+    assert scheduler.due(four + 6000) == (["1h", "4h"], False)
+
+    assert scheduler.next_wakeup(four + 6000) == t0 + 5 * 60_000
+    assert scheduler.due(t0 + 5 * 60_000) == ([], True)
+    assert scheduler.due(_ms("2024-01-01 05:00") + 6000) == (["1h"], True)
+
+
+async def test_run_once_refreshes_derivatives_then_analyses():
+    log: list[tuple] = []
+    scheduler, technical = _scheduler(log)
+    stats = await scheduler.run_once(["1h", "4h"], derivatives=True)
+
+    kinds = [entry[0] for entry in log]
+    first_analysis = kinds.index("analysis")
+    assert set(kinds[:first_analysis]) == {"funding", "oi", "taker"}
+    assert all(entry[-1] is True for entry in log)
+
+    analysed = {(e[1], e[2]) for e in log if e[0] == "analysis"}
+    assert analysed == {(s, tf) for s in ("ETH", "BTC", "SOL") for tf in ("1h", "4h")}
+    assert technical.peak <= 2
+    assert stats == {"ok": 4 + 6, "failed": 2}
+
+
+class FakeAlerts:
+    def __init__(self, log):
+        self.log = log
+
+    def candle_keys(self):
+        return {("ETH", "1h"), ("ADA", "15m")}
+
+    def derivative_symbols(self):
+        return {"BTC", "XRP"}
+
+    async def on_candles(self, symbol, timeframe, df):
+        self.log.append(("candles", symbol, timeframe, df))
+
+    async def on_derivatives(self, symbol, snapshot):
+        self.log.append(("snapshot", symbol, sorted(snapshot)))
+
+
+async def test_run_once_feeds_alert_rules():
+    log: list[tuple] = []
+    scheduler, _ = _scheduler(log, alerts=FakeAlerts(log))
+    # 警示規則的週期一併排程
+    assert scheduler.timeframes() == ["1h", "4h", "15m"]
+
+    await scheduler.run_once(["1h", "15m"], derivatives=True)
+    snapshots = {e[1]: e[2] for e in log if e[0] == "snapshot"}
+    assert set(snapshots) == {"ETH", "DOGE", "BTC", "SOL", "XRP"}
+    assert snapshots["XRP"] == ["funding", "open_interest", "taker"]
+
+    # 已做完整分析的 K 線讀快取；只有警示規則的組合強制重抓 K 線、不做分析
+    assert ("ohlcv", "ETH", "1h", False) in log
+    assert ("ohlcv", "ADA", "15m", True) in log
+    assert not any(e[0] == "analysis" and e[1] == "ADA" for e in log)
+    assert {e[1:3] for e in log if e[0] == "candles"} == {("ETH", "1h"), ("ADA", "15m")}
+
+
+async def test_start_stop():
+    scheduler, _ = _scheduler([])
+    scheduler.start()
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+    assert scheduler._task is None
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from app.core.indicators.screen import parse_conditions
+from app.services.screener_service import ScreenerService
+from app.services.technical_service import TechnicalService
+
+SYMBOLS = ["SCRA", "SCRB", "USDT", "SCRC", "SCRD", "SCRE", "SCRNEW"]
+
+
+class FakeAggregator:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def get_market_overview(self, limit=20, provider=None):
+        return pd.DataFrame({"symbol": [s.lower() for s in SYMBOLS][:limit]})
+
+    async def get_ohlcv(self, symbol, timeframe="1d", limit=100, provider=None, since=None):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            if symbol == "SCRE":
+                raise RuntimeError("no market")
+            n = 20 if symbol == "SCRNEW" else limit
+            drift = {"SCRA": 0.01, "SCRB": -0.01}.get(symbol, 0.0)
+            rng = np.random.default_rng(len(symbol) + ord(symbol[-1]))
+            close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.01, n)))
+            idx = pd.date_range("2024-01-01", periods=n, freq="4h", tz="UTC")
+            return pd.DataFrame(
+                {"open": close, "high": close, "low": close, "close": close, "volume": 1.0},
+                index=idx,
+            )
+        finally:
+            self.active -= 1
+
+
+async def test_stream_events_and_ranking():
+    agg = FakeAggregator()
+    service = ScreenerService(agg, TechnicalService(agg), concurrency=2)
+    events = [
+        e async for e in service.stream(parse_conditions(["rsi>0"]), top=len(SYMBOLS), sort="rsi")
+    ]
+
+    assert events[0] == {"type": "start", "total": 6, "timeframe": "4h", "conditions": ["rsi>0"]}
+    assert agg.peak <= 2
+
+    matches = [e["symbol"] for e in events if e["type"] == "match"]
+    result = events[-1]
+    assert result["type"] == "result"
+    assert sorted(result["skipped"]) == ["SCRE", "SCRNEW"]
+    assert sorted(matches) == sorted(r["symbol"] for r in result["rows"])
+
+    rsis = [r["rsi"] for r in result["rows"]]
+    assert rsis == sorted(rsis, reverse=True)
+    assert result["rows"][0]["symbol"] == "SCRA"
+    assert [r["rank"] for r in result["rows"]] == list(range(1, len(rsis) + 1))
+
+
+async def test_run_filters():
+    agg = FakeAggregator()
+    service = ScreenerService(agg, TechnicalService(agg), concurrency=3)
+    result = await service.run(parse_conditions(["ema_trend=bearish"]), top=len(SYMBOLS))
+    assert "SCRB" in [r["symbol"] for r in result["rows"]]
+    assert all(r["ema_trend"] == -1.0 for r in result["rows"])
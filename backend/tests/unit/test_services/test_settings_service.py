@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.db.base import Base
+from app.services.settings_service import SettingsService
+
+
+class CountingFactory:
+    """包裝 session factory，記錄開啟 DB session 的次數"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self.sessions = 0
+
+    def __call__(self):
+        self.sessions += 1
+        return self._factory()
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'settings.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield CountingFactory(async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    await engine.dispose()
+
+
+async def test_reads_are_served_from_snapshot(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "coingecko_api_key", "env-key")
+    svc = SettingsService(session_factory)
+    await svc.set_api_key("coingecko_api_key", "db-key")
+    await svc.set_watchlist(["btc", "ETH", "btc"])
+    await svc.load()
+
+    before = session_factory.sessions
+    for _ in range(5):
+        assert await svc.get_api_key("coingecko_api_key") == "db-key"
+        assert await svc.get_watchlist() == ["BTC", "ETH"]
+        assert await svc.get_dashboard_pins() == ["BTC", "ETH"]  # SOL 已不在 watchlist
+    assert session_factory.sessions == before
+
+    # 刪除後立即生效，並回到 .env 設定
+    await svc.delete_api_key("coingecko_api_key")
+    assert await svc.get_api_key("coingecko_api_key") == "env-key"
+
+
+async def test_writes_are_visible_to_other_instances(session_factory):
+    writer, reader = SettingsService(session_factory), SettingsService(session_factory)
+    assert await reader.get_watchlist() == SettingsService.DEFAULT_WATCHLIST
+    await writer.set_dashboard_pins(["sol"])
+    assert await reader.get_dashboard_pins() == ["SOL"]
+    await writer.set_api_key("glassnode_api_key", "g1")
+    assert await reader.get_api_key("glassnode_api_key") == "g1"
+
+
+async def test_snapshot_reloads_after_ttl_or_invalidate(session_factory, monkeypatch):
+    svc = SettingsService(session_factory)
+    await svc.load()
+    other = SettingsService(CountingFactory(session_factory._factory))
+    other._snapshot = type(svc._snapshot)()  # 模擬另一個程序：獨立快照
+    await other.set_watchlist(["DOGE"])
+
+    assert await svc.get_watchlist() == SettingsService.DEFAULT_WATCHLIST  # 快照仍有效
+    svc.invalidate()
+    assert await svc.get_watchlist() == ["DOGE"]
+
+    await other.set_watchlist(["PEPE"])
+    monkeypatch.setattr(settings, "settings_snapshot_ttl_seconds", 0.0)
+    assert await svc.get_watchlist() == ["PEPE"]
+
+
+async def test_concurrent_reloads_share_one_session(session_factory):
+    svc = SettingsService(session_factory)
+    await svc.set_api_key("coingecko_api_key", "db-key")
+    svc.invalidate()
+
+    before = session_factory.sessions
+    keys = await asyncio.gather(*(svc.get_api_key("coingecko_api_key") for _ in range(10)))
+    assert keys == ["db-key"] * 10
+    assert session_factory.sessions == before + 1
+
+
+class BrokenFactory(CountingFactory):
+    def __call__(self):
+        super().__call__()
+        raise OSError("database is locked")
+
+
+async def test_failed_reload_backs_off(monkeypatch):
+    monkeypatch.setattr(settings, "coingecko_api_key", "env-key")
+    factory = BrokenFactory(None)
+    svc = SettingsService(factory)
+
+    keys = await asyncio.gather(*(svc.get_api_key("coingecko_api_key") for _ in range(5)))
+    assert keys == ["env-key"] * 5
+    assert await svc.get_api_key("coingecko_api_key") == "env-key"
+    # 失敗後 RELOAD_RETRY_SECONDS 內不再查 DB
+    assert factory.sessions == 1
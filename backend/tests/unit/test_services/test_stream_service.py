@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from app.data.streams import LiveMarket
+from app.services.stream_service import StreamService
+
+
+class FakeSettings:
+    async def get_watchlist(self):
+        return ["BTC", "eth"]
+
+    async def get_dashboard_pins(self):
+        return ["ETH", "DOGE"]
+
+
+class FakeTechnical:
+    def __init__(self, cached: bool):
+        self.cached = cached
+        self.log: list[tuple] = []
+
+    async def apply_live_candles(self, symbol, timeframe, limit=200):
+        self.log.append(("apply", symbol, timeframe))
+        return f"merged:{symbol}:{timeframe}" if self.cached else None
+
+    async def get_ohlcv(self, symbol, timeframe, refresh=False):
+        self.log.append(("ohlcv", symbol, timeframe))
+        return f"df:{symbol}:{timeframe}"
+
+
+class FakeAlerts:
+    def __init__(self):
+        self.evaluated: list[tuple] = []
+
+    def candle_keys(self):
+        return {("SOL", "15m"), ("BTC", "1h")}
+
+    async def on_candles(self, symbol, timeframe, df):
+        self.evaluated.append((symbol, timeframe, df))
+
+
+def _service(technical, alerts=None) -> StreamService:
+    return StreamService(
+        technical, FakeSettings(), alerts=alerts, live=LiveMarket(),
+        url="ws://127.0.0.1:1", timeframes=["1h", "4h"],
+    )
+
+
+async def test_tracked_symbols_include_alert_rules():
+    service = _service(FakeTechnical(True), FakeAlerts())
+    symbols, timeframes = await service.tracked()
+    assert symbols == ["ETH", "DOGE", "BTC", "SOL"]
+    assert timeframes == ["1h", "4h", "15m"]
+
+    assert await service.sync() == 4 + 4 * 3  # 每幣一個 miniTicker + 各週期 kline
+    assert "solusdt@kline_15m" in service.stream.streams
+
+
+async def test_candle_close_updates_cache_and_evaluates_alerts():
+    technical, alerts = FakeTechnical(True), FakeAlerts()
+    service = _service(technical, alerts)
+    await service.on_candle_closed("ETH", "4h")  # 無警示規則 → 只更新快取
+    await service.on_candle_closed("BTC", "1h")
+    assert technical.log == [("apply", "ETH", "4h"), ("apply", "BTC", "1h")]
+    assert alerts.evaluated == [("BTC", "1h", "merged:BTC:1h")]
+
+
+async def test_candle_close_without_cached_frame_fetches_for_alerts():
+    technical, alerts = FakeTechnical(False), FakeAlerts()
+    await _service(technical, alerts).on_candle_closed("BTC", "1h")
+    assert technical.log[-1] == ("ohlcv", "BTC", "1h")
+    assert alerts.evaluated == [("BTC", "1h", "df:BTC:1h")]
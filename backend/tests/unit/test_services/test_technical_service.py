@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+import app.services.technical_service as technical_module
+from app.config import settings
+from app.core.indicators.scoring import composite_score
+from app.core.timeframes import resample_ohlcv
+from app.data.cache import cache
+from app.services.technical_service import MTF_BARS, TechnicalService
+
+
+class FakeHistory:
+    def __init__(self, df):
+        self.df = df
+        self.calls: list[tuple[str, str, int]] = []
+
+    async def get_history(self, symbol, timeframe, bars):
+        self.calls.append((symbol, timeframe, bars))
+        return self.df.tail(bars)
+
+
+class NoDerivatives:
+    def __getattr__(self, name):
+        async def _fail(*args, **kwargs):
+            raise RuntimeError("offline")
+        return _fail
+
+
+@pytest.fixture
+def service(long_ohlcv):
+    svc = TechnicalService(aggregator=None)
+    svc._history = FakeHistory(long_ohlcv)
+    svc._sentiment = NoDerivatives()
+    return svc
+
+
+async def test_mtf_fetches_base_once(service, long_ohlcv):
+    result = await service.get_mtf_analysis("btc", ["4h", "1h", "1d"])
+
+    assert service._history.calls == [("btc", "1h", MTF_BARS * 24 + 24)]
+    assert result["base_timeframe"] == "1h"
+    assert [a["timeframe"] for a in result["timeframes"]] == ["1h", "4h", "1d"]
+    assert result["derivatives"] == []
+    assert -1.0 <= result["confluence_score"] <= 1.0
+    assert 0.0 <= result["alignment"] <= 1.0
+
+
+async def test_mtf_timeframe_matches_single_analysis(service, long_ohlcv):
+    result = await service.get_mtf_analysis("BTC", ["1h", "4h"])
+    four_hour = resample_ohlcv(long_ohlcv, "1h", "4h").tail(MTF_BARS)
+
+    async def _ohlcv(symbol, timeframe, limit=200, refresh=False):
+        return four_hour
+
+    service.get_ohlcv = _ohlcv
+    single = await service.get_full_analysis("BTC", "4h")
+
+    mtf_4h = result["timeframes"][1]
+    assert mtf_4h["overall_score"] == single["overall_score"]
+    assert mtf_4h["indicators"] == single["indicators"]
+
+
+async def test_mtf_rejects_too_wide_span(service):
+    with pytest.raises(ValueError):
+        await service.get_mtf_analysis("BTC", ["15m", "1w"])
+
+
+class SlowDerivatives:
+    """OI 立即回傳，其餘來源遠超過期限"""
+
+    def __init__(self):
+        self.late_done = 0
+
+    async def get_open_interest(self, symbol):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(
+            signal="bullish", strength=0.5, continuous_score=0.5,
+            current_oi_value=1.0, change_pct=2.0, trend="up",
+        )
+
+    async def _late(self, symbol):
+        await asyncio.sleep(0.2)
+        self.late_done += 1
+        raise RuntimeError("late")
+
+    get_long_short_ratio = _late
+    get_taker_volume = _late
+
+
+async def test_full_analysis_drops_late_derivatives(service, long_ohlcv, monkeypatch):
+    monkeypatch.setattr(settings, "analysis_deadline_seconds", 0.05)
+    service._sentiment = SlowDerivatives()
+
+    async def _ohlcv(symbol, timeframe, limit=200, refresh=False):
+        return long_ohlcv.tail(200)
+
+    service.get_ohlcv = _ohlcv
+    started = time.monotonic()
+    result = await service.get_full_analysis("ETH", "1h", refresh=True)
+
+    assert time.monotonic() - started < 0.2
+    assert result["missing"] == ["LS_Ratio", "Taker"]
+    assert [i["name"] for i in result["indicators"]][-1] == "OI"
+    # 逾時請求留在背景完成
+    await asyncio.sleep(0.25)
+    assert service._sentiment.late_done == 2
+    assert not service._background
+
+
+class BackfillingDerivatives(SlowDerivatives):
+    """逾時來源在背景完成後寫入快取，下次請求立即回傳"""
+
+    def __init__(self):
+        super().__init__()
+        self.cached: set[str] = set()
+
+    async def _backfill(self, name):
+        if name not in self.cached:
+            await asyncio.sleep(0.1)
+            self.cached.add(name)
+        return await self.get_open_interest("")
+
+    async def get_long_short_ratio(self, symbol):
+        from types import SimpleNamespace
+
+        await self._backfill("LS_Ratio")
+        return SimpleNamespace(
+            signal="neutral", strength=0.0, continuous_score=0.0,
+            current_ratio=1.0, long_pct=50.0, trend="flat",
+        )
+
+    async def get_taker_volume(self, symbol):
+        from types import SimpleNamespace
+
+        await self._backfill("Taker")
+        return SimpleNamespace(
+            signal="neutral", strength=0.0, continuous_score=0.0,
+            current_ratio=1.0, buy_vol=1.0, pressure="neutral",
+        )
+
+
+async def test_partial_analysis_not_cached_past_backfill(service, long_ohlcv, monkeypatch):
+    cache.clear()
+    monkeypatch.setattr(settings, "analysis_deadline_seconds", 0.05)
+    monkeypatch.setattr(technical_module, "PARTIAL_ANALYSIS_TTL", 0.1)
+    service._sentiment = BackfillingDerivatives()
+
+    async def _ohlcv(symbol, timeframe, limit=200, refresh=False):
+        return long_ohlcv.tail(200)
+
+    service.get_ohlcv = _ohlcv
+    first = await service.get_full_analysis("ETH", "1h")
+    assert first["missing"] == ["LS_Ratio", "Taker"]
+
+    # 背景請求完成後，下一次分析包含先前逾時的來源
+    await asyncio.sleep(0.15)
+    assert not service._background
+    second = await service.get_full_analysis("ETH", "1h")
+    assert second["missing"] == []
+    assert {i["name"] for i in second["indicators"]} >= {"OI", "LS_Ratio", "Taker"}
+
+    # 完整結果照常快取
+    assert await service.get_full_analysis("ETH", "1h") is second
+
+
+async def test_missing_derivatives_group_renormalized(service, long_ohlcv):
+    async def _ohlcv(symbol, timeframe, limit=200, refresh=False):
+        return long_ohlcv.tail(200)
+
+    service.get_ohlcv = _ohlcv
+    result = await service.get_full_analysis("ETH", "1h", refresh=True)
+    technical = [(i["name"], i["continuous_score"]) for i in result["indicators"]]
+
+    assert result["missing"] == ["OI", "LS_Ratio", "Taker"]
+    expected, _ = composite_score(technical, {"derivatives"})
+    assert result["overall_score"] == pytest.approx(expected, abs=1e-4)
+
+
+async def test_score_timeline_matches_live_score(service, long_ohlcv):
+    # 衍生品缺席時，時間軸最後一根應與即時分析的 overall_score 同尺度、同值
+    frame = long_ohlcv.tail(300)
+
+    async def _ohlcv(symbol, timeframe, limit=200, refresh=False):
+        return frame
+
+    service.get_ohlcv = _ohlcv
+    live = await service.get_full_analysis("SOL", "1h", refresh=True)
+    timeline = await service.get_score_series("SOL", "1h", len(frame))
+
+    assert live["missing"] == ["OI", "LS_Ratio", "Taker"]
+    assert timeline["points"][-1]["overall_score"] == pytest.approx(
+        live["overall_score"], abs=1e-3
+    )
+
+
+class CountingDerivatives(NoDerivatives):
+    def __init__(self):
+        self.calls: list[str] = []
+
+    async def get_open_interest(self, symbol):
+        self.calls.append(symbol)
+        raise RuntimeError("offline")
+
+
+async def test_batch_analysis_dedupes_and_reports_errors(service, long_ohlcv):
+    cache.clear()
+    service._sentiment = CountingDerivatives()
+    fetched: list[tuple[str, str]] = []
+    active = peak = 0
+
+    async def _ohlcv(symbol, timeframe, limit=200, refresh=False):
+        nonlocal active, peak
+        fetched.append((symbol, timeframe))
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if symbol == "NOPE":
+            raise ValueError("no data")
+        return long_ohlcv.tail(200)
+
+    service.get_ohlcv = _ohlcv
+    results = await service.get_batch_analysis(
+        ["btc", "BTC", "eth", "nope"], ["1h", "4h", "1h"], concurrency=2
+    )
+
+    assert [(r["symbol"], r["timeframe"]) for r in results] == [
+        ("BTC", "1h"), ("BTC", "4h"), ("ETH", "1h"), ("ETH", "4h"), ("NOPE", "1h"), ("NOPE", "4h"),
+    ]
+    assert sorted(fetched) == sorted((r["symbol"], r["timeframe"]) for r in results)
+    assert peak <= 2
+    # 衍生品每個幣種只抓一次，各週期共用
+    assert sorted(service._sentiment.calls) == ["BTC", "ETH", "NOPE"]
+    assert all(r["analysis"]["symbol"] == r["symbol"] for r in results[:4])
+    assert results[4]["analysis"] is None and results[4]["error"]
+
+    # 再次請求直接命中分析快取
+    fetched.clear()
+    await service.get_batch_analysis(["BTC"], ["1h"])
+    assert fetched == []
+    cache.clear()